@@ -1,16 +1,21 @@
 import { computed, onBeforeUnmount, ref, shallowRef, type Ref } from 'vue'
-import type { SessionSummary, StreamEnvelope, StreamFrameEnvelope } from '~/types/infer'
+import type { SessionSummary, StreamEnvelope, StreamFlowEnvelope, StreamFrameEnvelope } from '~/types/infer'
 import {
   applyDetectionsToSession,
   buildSessionAggregateSummary,
   createSessionAggregateState
 } from '~/utils/session-aggregator'
 import { useAuth } from '~/composables/useAuth'
+import { encodeRawFrame } from '~/utils/raw-frame'
 
 export interface UseInferenceStreamOptions {
   videoElement: Ref<HTMLVideoElement | null>
   frameIntervalMs?: number
   jpegQuality?: number
+  // 'raw' skips JPEG encoding; only worth it when the inference service is co-located (Tauri desktop).
+  frameFormat?: 'jpeg' | 'raw'
+  // Let the server pace the send rate and JPEG quality to its current load.
+  flowControl?: boolean
   auth?: {
     init: () => Promise<void>
     websocketUrl: (path: string) => string
@@ -22,8 +27,12 @@ const STOP_TIMEOUT_MS = 1000
 export function useInferenceStream(options: UseInferenceStreamOptions) {
   const auth = options.auth ?? useAuth()
 
-  const frameIntervalMs = options.frameIntervalMs ?? 300
-  const jpegQuality = options.jpegQuality ?? 0.8
+  const baseFrameIntervalMs = options.frameIntervalMs ?? 300
+  const baseJpegQuality = options.jpegQuality ?? 0.8
+  const frameFormat = options.frameFormat ?? 'jpeg'
+  const flowControl = options.flowControl ?? false
+  let frameIntervalMs = baseFrameIntervalMs
+  let jpegQuality = baseJpegQuality
 
   const websocket = shallowRef<WebSocket | null>(null)
   const canvas = shallowRef<HTMLCanvasElement | null>(null)
@@ -64,6 +73,8 @@ export function useInferenceStream(options: UseInferenceStreamOptions) {
     streamError.value = ''
     resetManualStop()
     resetSession()
+    frameIntervalMs = baseFrameIntervalMs
+    jpegQuality = baseJpegQuality
 
     await auth.init()
     const wsUrl = auth.websocketUrl('/v1/infer/stream')
@@ -75,6 +86,13 @@ export function useInferenceStream(options: UseInferenceStreamOptions) {
       }
       connectionState.value = 'streaming'
       streamError.value = ''
+      if (flowControl) {
+        socket.send(JSON.stringify({
+          type: 'config',
+          target_fps: 1000 / baseFrameIntervalMs,
+          flow_control: true
+        }))
+      }
       startFrameLoop()
     }
 
@@ -102,6 +120,11 @@ export function useInferenceStream(options: UseInferenceStreamOptions) {
         return
       }
 
+      if (payload.type === 'flow') {
+        applyFlowUpdate(payload)
+        return
+      }
+
       if (payload.type === 'error') {
         streamError.value = payload.detail || '识别流返回错误。'
       }
@@ -185,6 +208,18 @@ export function useInferenceStream(options: UseInferenceStreamOptions) {
     }
   }
 
+  function applyFlowUpdate(update: StreamFlowEnvelope) {
+    if (update.frame_interval_ms > 0 && update.frame_interval_ms !== frameIntervalMs) {
+      frameIntervalMs = update.frame_interval_ms
+      if (sendTimer.value !== null) {
+        startFrameLoop()
+      }
+    }
+    if (update.jpeg_quality > 0 && update.jpeg_quality <= 1) {
+      jpegQuality = update.jpeg_quality
+    }
+  }
+
   function resetSession() {
     aggregateState.value = createSessionAggregateState()
     serverSummary.value = null
@@ -294,19 +329,12 @@ export function useInferenceStream(options: UseInferenceStreamOptions) {
       }
 
       context.drawImage(video, 0, 0, width, height)
-      const blob = await canvasToJpeg(frameCanvas, jpegQuality)
-      if (!blob) {
+      const buffer = frameFormat === 'raw'
+        ? encodeRawFrame(context.getImageData(0, 0, width, height))
+        : await encodeJpegFrame(frameCanvas, socket)
+      if (!buffer) {
         return
       }
-
-      if (manualStop.value && stoppingSocket === socket) {
-        return
-      }
-      if (websocket.value !== socket || socket.readyState !== WebSocket.OPEN) {
-        return
-      }
-
-      const buffer = await blob.arrayBuffer()
       if (manualStop.value && stoppingSocket === socket) {
         return
       }
@@ -328,6 +356,22 @@ export function useInferenceStream(options: UseInferenceStreamOptions) {
     }
   }
 
+  async function encodeJpegFrame(frameCanvas: HTMLCanvasElement, socket: WebSocket) {
+    const blob = await canvasToJpeg(frameCanvas, jpegQuality)
+    if (!blob) {
+      return null
+    }
+
+    if (manualStop.value && stoppingSocket === socket) {
+      return null
+    }
+    if (websocket.value !== socket || socket.readyState !== WebSocket.OPEN) {
+      return null
+    }
+
+    return blob.arrayBuffer()
+  }
+
   function ensureCanvas(width: number, height: number) {
     const current = canvas.value || document.createElement('canvas')
     if (current.width !== width) {
@@ -383,6 +427,9 @@ function parseStreamEnvelope(raw: unknown): StreamEnvelope | null {
   if (record.type === 'error') {
     return payload as StreamEnvelope
   }
+  if (record.type === 'flow') {
+    return payload as StreamFlowEnvelope
+  }
   return null
 }
 
@@ -23,6 +23,7 @@ export interface FrameResult {
   timestamp_ms: number
   detections: Detection[]
   frame_summary: FrameSummary
+  imgsz?: number | null
 }
 
 export interface RipenessRatio {
@@ -57,4 +58,10 @@ export interface StreamErrorEnvelope {
   detail: string
 }
 
-export type StreamEnvelope = StreamFrameEnvelope | StreamSummaryEnvelope | StreamErrorEnvelope
+export interface StreamFlowEnvelope {
+  type: 'flow'
+  frame_interval_ms: number
+  jpeg_quality: number
+}
+
+export type StreamEnvelope = StreamFrameEnvelope | StreamSummaryEnvelope | StreamErrorEnvelope | StreamFlowEnvelope
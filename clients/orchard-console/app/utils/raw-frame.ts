@@ -0,0 +1,31 @@
+// Binary layout shared with services/inference-api/app/inference/frames.py:
+// magic "LRAW", u8 version, u8 pixel format, u16 reserved, u32 width, u32 height, u32 stride (little-endian).
+export const RAW_FRAME_HEADER_BYTES = 20
+export const RAW_FRAME_VERSION = 1
+export const RAW_PIXEL_FORMAT_RGBA = 5
+
+export interface RawFrameSource {
+  width: number
+  height: number
+  data: Uint8ClampedArray
+}
+
+export function encodeRawFrame(image: RawFrameSource): ArrayBuffer {
+  const stride = image.width * 4
+  const buffer = new ArrayBuffer(RAW_FRAME_HEADER_BYTES + stride * image.height)
+  const view = new DataView(buffer)
+
+  view.setUint8(0, 0x4c)
+  view.setUint8(1, 0x52)
+  view.setUint8(2, 0x41)
+  view.setUint8(3, 0x57)
+  view.setUint8(4, RAW_FRAME_VERSION)
+  view.setUint8(5, RAW_PIXEL_FORMAT_RGBA)
+  view.setUint16(6, 0, true)
+  view.setUint32(8, image.width, true)
+  view.setUint32(12, image.height, true)
+  view.setUint32(16, stride, true)
+
+  new Uint8Array(buffer, RAW_FRAME_HEADER_BYTES).set(image.data.subarray(0, stride * image.height))
+  return buffer
+}
@@ -0,0 +1,19 @@
+import { describe, expect, it } from 'vitest'
+import { encodeRawFrame, RAW_FRAME_HEADER_BYTES, RAW_PIXEL_FORMAT_RGBA } from '../../app/utils/raw-frame'
+
+describe('raw frame encoder', () => {
+  it('writes the LRAW header followed by RGBA pixels', () => {
+    const data = new Uint8ClampedArray([1, 2, 3, 255, 4, 5, 6, 255])
+    const buffer = encodeRawFrame({ width: 2, height: 1, data })
+    const view = new DataView(buffer)
+
+    expect(buffer.byteLength).toBe(RAW_FRAME_HEADER_BYTES + 8)
+    expect(new TextDecoder().decode(new Uint8Array(buffer, 0, 4))).toBe('LRAW')
+    expect(view.getUint8(4)).toBe(1)
+    expect(view.getUint8(5)).toBe(RAW_PIXEL_FORMAT_RGBA)
+    expect(view.getUint32(8, true)).toBe(2)
+    expect(view.getUint32(12, true)).toBe(1)
+    expect(view.getUint32(16, true)).toBe(8)
+    expect(Array.from(new Uint8Array(buffer, RAW_FRAME_HEADER_BYTES))).toEqual([1, 2, 3, 255, 4, 5, 6, 255])
+  })
+})
@@ -206,6 +206,38 @@ describe('useInferenceStream', () => {
     expect(stream.streamError.value).toBe('')
   })
 
+  it('negotiates flow control and follows server pacing updates', async () => {
+    const stream = useInferenceStream({
+      videoElement: ref(createFakeVideo()),
+      frameIntervalMs: 50,
+      flowControl: true,
+      auth: fakeAuth()
+    })
+
+    await stream.startStream()
+    const socket = FakeWebSocket.instances[0]!
+    socket.open()
+
+    expect(socket.sent).toHaveLength(1)
+    expect(JSON.parse(socket.sent[0] as string)).toEqual({
+      type: 'config',
+      target_fps: 20,
+      flow_control: true
+    })
+
+    nextBlob = {
+      arrayBuffer: vi.fn(async () => new ArrayBuffer(8))
+    }
+    socket.emitMessage({ type: 'flow', frame_interval_ms: 200, jpeg_quality: 0.6 })
+
+    await vi.advanceTimersByTimeAsync(150)
+    expect(socket.sent).toHaveLength(1)
+
+    await vi.advanceTimersByTimeAsync(50)
+    expect(socket.sent).toHaveLength(2)
+    expect(socket.sent[1]).toBeInstanceOf(ArrayBuffer)
+  })
+
   it('still reports an unexpected close as a stream error', async () => {
     const stream = useInferenceStream({
       videoElement: ref(createFakeVideo()),
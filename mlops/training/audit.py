@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+MLOPS_DIR = SCRIPT_DIR.parent
+REPO_ROOT = MLOPS_DIR.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from mlops.training.data_yaml import dataset_root, list_images, load_data_yaml  # noqa: E402
+
+CACHE_VERSION = 1
+# Slack for YOLO coordinates that land just outside [0, 1] after rounding.
+COORD_TOLERANCE = 1e-3
+
+# Sample keys already in the cache; workers skip decoding files whose content matches one.
+_KNOWN_KEYS: frozenset[str] = frozenset()
+
+
+def is_explicit_relative_path(raw_path: str) -> bool:
+    return raw_path in {'.', '..'} or raw_path.startswith('./') or raw_path.startswith('../') or raw_path.startswith('.\\') or raw_path.startswith('..\\')
+
+
+def resolve_input_path(raw_path: str) -> Path:
+    path = Path(raw_path)
+    if path.is_absolute():
+        return path
+
+    candidates = [
+        Path.cwd() / path,
+        SCRIPT_DIR / path,
+        MLOPS_DIR / path,
+        REPO_ROOT / path,
+    ]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+
+    if is_explicit_relative_path(raw_path):
+        return (Path.cwd() / path).resolve()
+    return (REPO_ROOT / path).resolve()
+
+
+def resolve_output_path(raw_path: str) -> Path:
+    path = Path(raw_path)
+    if path.is_absolute():
+        return path
+
+    if is_explicit_relative_path(raw_path):
+        return (Path.cwd() / path).resolve()
+    return (REPO_ROOT / path).resolve()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Audit a YOLO dataset: class distribution, bad boxes, corrupt images, split leakage')
+    parser.add_argument('--data', required=True, help='Path to data YAML')
+    parser.add_argument('--splits', default='train,val,test', help='Comma-separated splits to audit (missing ones are skipped)')
+    parser.add_argument('--output', default='mlops/artifacts/metrics/data_audit.json')
+    parser.add_argument('--cache', default='mlops/artifacts/audit/cache.json', help='Per-file result cache ("" disables it)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--min-box-px', type=float, default=12.0, help='Boxes narrower or shorter than this are reported as tiny')
+    parser.add_argument('--phash-distance', type=int, default=6, help='Largest perceptual-hash Hamming distance counted as a near duplicate')
+    parser.add_argument('--max-examples', type=int, default=50, help='Examples listed per issue kind')
+    parser.add_argument('--strict', action='store_true', help='Exit non-zero on corrupt images, bad labels or cross-split duplicates')
+    return parser.parse_args(argv)
+
+
+def class_names(data: dict) -> list[str]:
+    names = data.get('names') or []
+    if isinstance(names, dict):
+        return [str(names[key]) for key in sorted(names)]
+    return [str(name) for name in names]
+
+
+def label_path_for(image_path: Path) -> Path:
+    """Ultralytics convention: the last ``images`` directory becomes ``labels``, suffix ``.txt``."""
+    parts = list(image_path.parts)
+    for index in range(len(parts) - 1, -1, -1):
+        if parts[index] == 'images':
+            parts[index] = 'labels'
+            break
+    return Path(*parts).with_suffix('.txt')
+
+
+def perceptual_hash(image: np.ndarray) -> int:
+    """64-bit DCT pHash: low-frequency 8x8 block of a 32x32 grey thumbnail, thresholded at its median."""
+    import cv2
+
+    grey = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    thumb = cv2.resize(grey, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    block = cv2.dct(thumb)[:8, :8].flatten()
+    # The DC term only tracks overall brightness.
+    bits = block > np.median(block[1:])
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def parse_label(text: str) -> tuple[list[list[float]], list[str]]:
+    boxes: list[list[float]] = []
+    errors: list[str] = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        fields = line.split()
+        if not fields:
+            continue
+        if len(fields) != 5:
+            errors.append(f'line {number}: expected 5 fields, got {len(fields)}')
+            continue
+        try:
+            class_id = int(fields[0])
+            values = [float(field) for field in fields[1:]]
+        except ValueError:
+            errors.append(f'line {number}: non-numeric field')
+            continue
+        boxes.append([class_id, *values])
+    return boxes, errors
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def sample_key(image_bytes: bytes, label_bytes: bytes | None) -> str:
+    image_digest = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+    label_digest = '-' if label_bytes is None else hashlib.blake2b(label_bytes, digest_size=16).hexdigest()
+    return f'{image_digest}:{label_digest}'
+
+
+def _init_worker(known: frozenset[str]) -> None:
+    global _KNOWN_KEYS
+    _KNOWN_KEYS = known
+
+
+def scan_sample(paths: tuple[str, str]) -> dict:
+    """Hash, decode and parse one image/label pair; only the key when its content is already cached."""
+    import cv2
+
+    image_path, label_path = Path(paths[0]), Path(paths[1])
+    image_bytes = _read(image_path) or b''
+    label_bytes = _read(label_path)
+    key = sample_key(image_bytes, label_bytes)
+    if key in _KNOWN_KEYS:
+        return {'key': key}
+
+    record: dict = {'key': key, 'width': None, 'height': None, 'phash': None, 'error': None}
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR) if image_bytes else None
+    if image is None:
+        record['error'] = 'empty file' if not image_bytes else 'cannot decode'
+    else:
+        record['height'], record['width'] = image.shape[:2]
+        record['phash'] = f'{perceptual_hash(image):016x}'
+        # OpenCV decodes truncated JPEGs with a grey tail instead of failing.
+        if image_path.suffix.lower() in {'.jpg', '.jpeg'} and not image_bytes.rstrip(b'\x00').endswith(b'\xff\xd9'):
+            record['error'] = 'truncated JPEG'
+
+    if label_bytes is None:
+        record['boxes'], record['label_errors'] = None, []
+    else:
+        record['boxes'], record['label_errors'] = parse_label(label_bytes.decode('utf-8', errors='replace'))
+    return record
+
+
+def _stat(path: Path) -> list[int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def load_cache(path: Path | None) -> dict:
+    empty = {'version': CACHE_VERSION, 'files': {}, 'samples': {}}
+    if path is None or not path.exists():
+        return empty
+    try:
+        cache = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return empty
+    return cache if cache.get('version') == CACHE_VERSION else empty
+
+
+def save_cache(path: Path, cache: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_suffix('.tmp')
+    staging.write_text(json.dumps(cache, separators=(',', ':')), encoding='utf-8')
+    os.replace(staging, path)
+
+
+def scan(images: list[Path], cache: dict, workers: int) -> tuple[dict[Path, dict], dict[str, int]]:
+    """Records for every image, reusing cache entries whose size and mtime (or content) are unchanged."""
+    files, samples = cache['files'], cache['samples']
+    records: dict[Path, dict] = {}
+    pending: list[tuple[Path, list[int] | None, list[int] | None]] = []
+    for image in images:
+        label = label_path_for(image)
+        image_stat, label_stat = _stat(image), _stat(label)
+        entry = files.get(str(image))
+        if entry and entry['image'] == image_stat and entry['label'] == label_stat and entry['key'] in samples:
+            records[image] = samples[entry['key']]
+        else:
+            pending.append((image, image_stat, label_stat))
+
+    tasks = [(str(image), str(label_path_for(image))) for image, _, _ in pending]
+    known = frozenset(samples)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(known,)) as pool:
+            results = list(pool.map(scan_sample, tasks, chunksize=max(1, min(256, len(tasks) // (workers * 4)))))
+    else:
+        _init_worker(known)
+        results = [scan_sample(task) for task in tasks]
+
+    for (image, image_stat, label_stat), result in zip(pending, results):
+        key = result['key']
+        if len(result) > 1:
+            samples[key] = result
+        files[str(image)] = {'image': image_stat, 'label': label_stat, 'key': key}
+        records[image] = samples[key]
+
+    # Forget files that left the dataset and records nothing points at any more.
+    audited = {str(image) for image in images}
+    cache['files'] = {path: entry for path, entry in files.items() if path in audited}
+    referenced = {entry['key'] for entry in cache['files'].values()}
+    cache['samples'] = {key: record for key, record in samples.items() if key in referenced}
+    return records, {'images': len(images), 'cache_hits': len(images) - len(pending), 'scanned': len(pending)}
+
+
+def box_issues(record: dict, min_box_px: float, class_count: int) -> tuple[list[dict], list[dict]]:
+    """Tiny boxes (below ``min_box_px`` on a side) and degenerate ones (invalid class, size or bounds)."""
+    tiny: list[dict] = []
+    degenerate: list[dict] = []
+    width, height = record['width'], record['height']
+    for class_id, x, y, w, h in record['boxes'] or []:
+        reasons = []
+        if class_count and not 0 <= class_id < class_count:
+            reasons.append(f'unknown class {class_id}')
+        if w <= 0 or h <= 0:
+            reasons.append('non-positive size')
+        elif x - w / 2 < -COORD_TOLERANCE or y - h / 2 < -COORD_TOLERANCE or x + w / 2 > 1 + COORD_TOLERANCE or y + h / 2 > 1 + COORD_TOLERANCE:
+            reasons.append('outside the image')
+        if reasons:
+            degenerate.append({'class_id': class_id, 'box': [x, y, w, h], 'reasons': reasons})
+        elif width and height and (w * width < min_box_px or h * height < min_box_px):
+            tiny.append({'class_id': class_id, 'width_px': round(w * width, 1), 'height_px': round(h * height, 1)})
+    return tiny, degenerate
+
+
+def cross_split_duplicates(hashes: list[tuple[str, str, int]], max_distance: int) -> list[dict]:
+    """Pairs from different splits whose perceptual hashes differ in at most ``max_distance`` bits.
+
+    Multi-index hashing: the 64 bits are cut into ``max_distance + 1`` bands, so
+    by pigeonhole any close pair agrees exactly on at least one band; only pairs
+    sharing a band value are compared.
+    """
+    if len(hashes) < 2:
+        return []
+    splits = np.array([split for split, _, _ in hashes])
+    values = np.array([value for _, _, value in hashes], dtype=np.uint64)
+    bands = max_distance + 1
+    edges = np.linspace(0, 64, bands + 1).astype(int)
+    found: dict[tuple[int, int], int] = {}
+    for start, stop in zip(edges[:-1], edges[1:]):
+        if stop == start:
+            continue
+        band = (values >> np.uint64(start)) & np.uint64((1 << int(stop - start)) - 1)
+        order = np.argsort(band, kind='stable')
+        boundaries = np.flatnonzero(np.diff(band[order])) + 1
+        for group in np.split(order, boundaries):
+            if len(group) < 2 or len(set(splits[group])) < 2:
+                continue
+            # Row chunks bound memory for the large buckets near-uniform images produce.
+            for offset in range(0, len(group), 1024):
+                rows = group[offset : offset + 1024]
+                distances = np.bitwise_count(values[rows, None] ^ values[None, group])
+                for i, j in zip(*np.nonzero(distances <= max_distance)):
+                    a, b = int(rows[i]), int(group[j])
+                    if a < b and splits[a] != splits[b]:
+                        found[(a, b)] = int(distances[i, j])
+    return [
+        {
+            'distance': distance,
+            'a': {'split': hashes[a][0], 'image': hashes[a][1]},
+            'b': {'split': hashes[b][0], 'image': hashes[b][1]},
+        }
+        for (a, b), distance in sorted(found.items(), key=lambda item: (item[1], item[0]))
+    ]
+
+
+def build_report(
+    split_records: dict[str, dict[Path, dict]],
+    names: list[str],
+    root: Path,
+    *,
+    min_box_px: float,
+    phash_distance: int,
+    max_examples: int,
+) -> dict:
+    def display(path: Path) -> str:
+        return path.relative_to(root).as_posix() if path.is_relative_to(root) else str(path)
+
+    def issue(examples: list[dict]) -> dict:
+        return {'count': len(examples), 'examples': examples[:max_examples]}
+
+    splits: dict[str, dict] = {}
+    corrupt: list[dict] = []
+    tiny: list[dict] = []
+    degenerate: list[dict] = []
+    label_errors: list[dict] = []
+    missing_labels: list[dict] = []
+    hashes: list[tuple[str, str, int]] = []
+    for split, records in split_records.items():
+        per_class = dict.fromkeys(names, 0)
+        stats = {'images': len(records), 'instances': 0, 'background_images': 0, 'missing_labels': 0}
+        for image, record in records.items():
+            name = display(image)
+            if record['error']:
+                corrupt.append({'split': split, 'image': name, 'error': record['error']})
+            if record['phash'] is not None:
+                hashes.append((split, name, int(record['phash'], 16)))
+            if record['boxes'] is None:
+                stats['missing_labels'] += 1
+                missing_labels.append({'split': split, 'image': name})
+                continue
+            if record['label_errors']:
+                label_errors.append({'split': split, 'image': name, 'errors': record['label_errors']})
+            if not record['boxes']:
+                stats['background_images'] += 1
+            for box in record['boxes']:
+                class_id = box[0]
+                label = names[class_id] if 0 <= class_id < len(names) else str(class_id)
+                per_class[label] = per_class.get(label, 0) + 1
+                stats['instances'] += 1
+            small, bad = box_issues(record, min_box_px, len(names))
+            tiny.extend({'split': split, 'image': name, **item} for item in small)
+            degenerate.extend({'split': split, 'image': name, **item} for item in bad)
+        stats['classes'] = {
+            label: {'instances': count, 'share': round(count / stats['instances'], 4) if stats['instances'] else 0.0}
+            for label, count in per_class.items()
+        }
+        splits[split] = stats
+
+    duplicates = cross_split_duplicates(hashes, phash_distance)
+    return {
+        'classes': names,
+        'splits': splits,
+        'corrupt_images': issue(corrupt),
+        'missing_labels': issue(missing_labels),
+        'label_errors': issue(label_errors),
+        'tiny_boxes': {'min_box_px': min_box_px, **issue(tiny)},
+        'degenerate_boxes': issue(degenerate),
+        'cross_split_duplicates': {'max_distance': phash_distance, **issue(duplicates)},
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    data_path = resolve_input_path(args.data)
+    data = load_data_yaml(data_path)
+    root = dataset_root(data_path, data)
+    names = class_names(data)
+    cache_path = resolve_output_path(args.cache) if args.cache else None
+    cache = load_cache(cache_path)
+
+    split_images_by_name = {
+        split: list_images(root, data[split])
+        for split in (name.strip() for name in args.splits.split(','))
+        if split and data.get(split)
+    }
+    if not split_images_by_name:
+        print(f'[audit] no splits found in {data_path}', file=sys.stderr)
+        return 2
+
+    all_images = sorted({image for images in split_images_by_name.values() for image in images})
+    records, scan_stats = scan(all_images, cache, max(1, args.workers))
+    if cache_path is not None:
+        save_cache(cache_path, cache)
+    print(f"[audit] {scan_stats['images']} images: {scan_stats['cache_hits']} cached, {scan_stats['scanned']} scanned")
+
+    report = build_report(
+        {split: {image: records[image] for image in images} for split, images in split_images_by_name.items()},
+        names,
+        root,
+        min_box_px=args.min_box_px,
+        phash_distance=args.phash_distance,
+        max_examples=args.max_examples,
+    )
+    report['dataset'] = str(data_path)
+    report['scan'] = scan_stats
+
+    out_path = resolve_output_path(args.output)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f'Audit report written to: {out_path}')
+
+    problems = {
+        key: report[key]['count']
+        for key in ('corrupt_images', 'label_errors', 'degenerate_boxes', 'cross_split_duplicates')
+        if report[key]['count']
+    }
+    if problems:
+        print(f'[audit] issues found: {problems}', file=sys.stderr)
+    return 1 if args.strict and problems else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,36 @@
+"""Reading Ultralytics data YAMLs, shared by the training, audit and evaluation scripts."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+IMAGE_SUFFIXES = frozenset({'.bmp', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp'})
+
+
+def load_data_yaml(path: Path) -> dict:
+    import yaml
+
+    data = yaml.safe_load(path.read_text(encoding='utf-8')) or {}
+    if not isinstance(data, dict):
+        raise ValueError(f'Data YAML must contain a mapping: {path}')
+    return data
+
+
+def dataset_root(data_path: Path, data: dict) -> Path:
+    root = Path(data.get('path') or data_path.parent)
+    return root if root.is_absolute() else (data_path.parent / root).resolve()
+
+
+def list_images(root: Path, entries: object) -> list[Path]:
+    """Image files of one split entry (a directory, a .txt list, or a list of those), sorted."""
+    images: list[Path] = []
+    for entry in entries if isinstance(entries, list) else [entries]:
+        location = Path(entry) if Path(entry).is_absolute() else root / entry
+        if location.is_dir():
+            images.extend(p for p in location.rglob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+        elif location.suffix == '.txt' and location.exists():
+            for line in location.read_text(encoding='utf-8').splitlines():
+                if line.strip():
+                    item = Path(line.strip())
+                    images.append(item if item.is_absolute() else (root / item).resolve())
+    return sorted(images)
@@ -2,6 +2,11 @@ from __future__ import annotations
 
 import argparse
 import json
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path
 
 from lychee_common.device import resolve_torch_device
@@ -9,6 +14,21 @@ from lychee_common.device import resolve_torch_device
 SCRIPT_DIR = Path(__file__).resolve().parent
 MLOPS_DIR = SCRIPT_DIR.parent
 REPO_ROOT = MLOPS_DIR.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from mlops.training.data_yaml import dataset_root, list_images, load_data_yaml  # noqa: E402
+
+# Export layouts next to a checkpoint, as written by ultralytics export and quantize.py.
+FORMAT_LAYOUTS = (
+    ('pt', '{stem}.pt'),
+    ('torchscript', '{stem}.torchscript'),
+    ('onnx', '{stem}.onnx'),
+    ('onnx_int8', '{stem}.int8.onnx'),
+    ('openvino', '{stem}_openvino_model'),
+    ('engine', '{stem}.engine'),
+)
+BUDGET_KEYS = ('max_p50_ms', 'max_p95_ms', 'max_load_s', 'max_rss_mb', 'min_fps')
 
 
 def is_explicit_relative_path(raw_path: str) -> bool:
@@ -45,18 +65,246 @@ def resolve_output_path(raw_path: str) -> Path:
     return (REPO_ROOT / path).resolve()
 
 
-def parse_args() -> argparse.Namespace:
+def int_list(raw: str) -> list[int]:
+    values = [int(part) for part in raw.split(',') if part.strip()]
+    if not values or any(value <= 0 for value in values):
+        raise argparse.ArgumentTypeError(f'Expected a comma-separated list of positive integers: {raw!r}')
+    return values
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description='Evaluate YOLO model for lychee ripeness')
     parser.add_argument('--model', required=True, help='Path to .pt checkpoint')
     parser.add_argument('--data', required=True, help='Path to data YAML')
     parser.add_argument('--imgsz', type=int, default=640)
     parser.add_argument('--device', default='cpu')
     parser.add_argument('--output', default='mlops/artifacts/metrics/eval_metrics.json')
-    return parser.parse_args()
+    parser.add_argument('--skip-benchmark', action='store_true', help='Only compute mAP')
+    parser.add_argument('--bench-device', default=None, help='Device to benchmark on (default: --device)')
+    parser.add_argument('--bench-formats', default='all', help='Comma-separated formats to benchmark, e.g. pt,onnx_int8')
+    parser.add_argument('--bench-imgsz', type=int_list, default=None, help='Input sizes for throughput (default: --imgsz)')
+    parser.add_argument('--bench-batch-sizes', type=int_list, default=[1, 4, 8])
+    parser.add_argument('--bench-images', type=int, default=32, help='Validation images cycled through the benchmark')
+    parser.add_argument('--bench-warmup', type=int, default=5)
+    parser.add_argument('--bench-iterations', type=int, default=50)
+    parser.add_argument('--max-p50-ms', type=float, default=None, help='Budget for batch-1 median latency')
+    parser.add_argument('--max-p95-ms', type=float, default=None, help='Budget for batch-1 p95 latency')
+    parser.add_argument('--max-load-s', type=float, default=None, help='Budget for load plus first inference')
+    parser.add_argument('--max-rss-mb', type=float, default=None, help='Budget for peak resident memory')
+    parser.add_argument('--min-fps', type=float, default=None, help='Lowest acceptable best throughput at --imgsz')
+    return parser.parse_args(argv)
+
+
+def discover_formats(model_path: Path) -> dict[str, Path]:
+    """The checkpoint plus every export of it found next to it, keyed by format name."""
+    stem = model_path.name.split('.')[0]
+    found: dict[str, Path] = {}
+    for name, layout in FORMAT_LAYOUTS:
+        candidate = model_path.with_name(layout.format(stem=stem))
+        if candidate == model_path or candidate.exists():
+            found[name] = candidate
+    if model_path not in found.values():
+        found[model_path.suffix.lstrip('.') or model_path.name] = model_path
+    return found
+
+
+def split_images(data_path: Path, split: str = 'val') -> list[Path]:
+    data = load_data_yaml(data_path)
+    return list_images(dataset_root(data_path, data), data.get(split) or [])
+
+
+def latency_summary(samples_ms: list[float]) -> dict[str, float]:
+    ordered = sorted(samples_ms)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method='inclusive')
+        p50, p90, p95, p99 = cuts[49], cuts[89], cuts[94], cuts[98]
+    else:
+        p50 = p90 = p95 = p99 = ordered[0]
+    return {
+        'p50': round(p50, 3),
+        'p90': round(p90, 3),
+        'p95': round(p95, 3),
+        'p99': round(p99, 3),
+        'mean': round(statistics.fmean(ordered), 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        # Windows: psutil ships with ultralytics and exposes the peak working set.
+        try:
+            import psutil
+
+            return round(psutil.Process().memory_info().peak_wset / 2**20, 1)
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere.
+    return round(peak / 2**20 if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def benchmark_format(
+    model_path: str,
+    device: str,
+    image_paths: list[str],
+    imgsz: list[int],
+    batch_sizes: list[int],
+    warmup: int,
+    iterations: int,
+) -> dict:
+    """Time one model file end to end through ``YOLO.predict``; meant to run in a fresh process."""
+    import cv2
+    import numpy as np
+
+    frames = [frame for frame in (cv2.imread(path, cv2.IMREAD_COLOR) for path in image_paths) if frame is not None]
+    if not frames:
+        frames = [np.full((imgsz[0], imgsz[0], 3), 114, dtype=np.uint8)]
+
+    start = time.perf_counter()
+    from ultralytics import YOLO
 
+    model = YOLO(model_path, task='detect')
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    model.predict(frames[0], imgsz=imgsz[0], device=device, verbose=False)
+    first_inference_ms = (time.perf_counter() - start) * 1000.0
 
-def main() -> None:
-    args = parse_args()
+    result: dict = {
+        'path': model_path,
+        'load_s': round(load_s, 3),
+        'first_inference_ms': round(first_inference_ms, 3),
+        'throughput': [],
+    }
+    cursor = 0
+
+    def next_batch(size: int) -> list:
+        nonlocal cursor
+        batch = [frames[(cursor + i) % len(frames)] for i in range(size)]
+        cursor += size
+        return batch
+
+    # Batch 1 at the primary size runs first so its warmup reflects a cold model.
+    for size in imgsz:
+        for batch_size in batch_sizes:
+            def run() -> None:
+                batch = next_batch(batch_size)
+                model.predict(batch[0] if batch_size == 1 else batch, imgsz=size, device=device, verbose=False)
+
+            entry: dict = {'imgsz': size, 'batch': batch_size}
+            try:
+                start = time.perf_counter()
+                for _ in range(warmup):
+                    run()
+                warmup_s = time.perf_counter() - start
+                samples = []
+                for _ in range(max(1, iterations)):
+                    start = time.perf_counter()
+                    run()
+                    samples.append((time.perf_counter() - start) * 1000.0)
+            except Exception as exc:
+                # Fixed-shape exports reject other batch sizes and input sizes.
+                entry['error'] = str(exc).splitlines()[0] if str(exc) else type(exc).__name__
+                result['throughput'].append(entry)
+                continue
+            entry['images_per_s'] = round(batch_size * len(samples) * 1000.0 / sum(samples), 2)
+            entry['batch_latency_ms'] = round(statistics.fmean(samples), 3)
+            result['throughput'].append(entry)
+            if 'latency_ms' not in result and size == imgsz[0] and batch_size == 1:
+                result['warmup_s'] = round(warmup_s, 3)
+                result['latency_ms'] = {'imgsz': size, **latency_summary(samples)}
+
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def check_budgets(result: dict, budgets: dict[str, float | None], imgsz: int) -> list[str]:
+    """Human-readable budget violations for one benchmarked format."""
+    violations = []
+    if 'error' in result:
+        if any(value is not None for value in budgets.values()):
+            violations.append(f"benchmark failed: {result['error']}")
+        return violations
+
+    latency = result.get('latency_ms')
+    for key, percentile in (('max_p50_ms', 'p50'), ('max_p95_ms', 'p95')):
+        limit = budgets.get(key)
+        if limit is None:
+            continue
+        if latency is None:
+            violations.append(f'{percentile} latency unavailable for budget {limit} ms')
+        elif latency[percentile] > limit:
+            violations.append(f'{percentile} latency {latency[percentile]} ms exceeds {limit} ms')
+
+    limit = budgets.get('max_load_s')
+    if limit is not None:
+        load_s = result['load_s'] + result['first_inference_ms'] / 1000.0
+        if load_s > limit:
+            violations.append(f'load plus first inference {load_s:.3f} s exceeds {limit} s')
+
+    limit = budgets.get('max_rss_mb')
+    if limit is not None and result.get('peak_rss_mb') is not None and result['peak_rss_mb'] > limit:
+        violations.append(f"peak RSS {result['peak_rss_mb']} MB exceeds {limit} MB")
+
+    limit = budgets.get('min_fps')
+    if limit is not None:
+        rates = [e['images_per_s'] for e in result.get('throughput', []) if e['imgsz'] == imgsz and 'images_per_s' in e]
+        best = max(rates, default=0.0)
+        if best < limit:
+            violations.append(f'best throughput {best} images/s at imgsz {imgsz} is below {limit}')
+    return violations
+
+
+def run_benchmarks(args: argparse.Namespace, model_path: Path, data_path: Path, device: str) -> dict:
+    formats = discover_formats(model_path)
+    if args.bench_formats != 'all':
+        wanted = {name.strip() for name in args.bench_formats.split(',') if name.strip()}
+        formats = {name: path for name, path in formats.items() if name in wanted or path == model_path}
+    imgsz = list(dict.fromkeys([args.imgsz, *(args.bench_imgsz or [])]))
+    batch_sizes = list(dict.fromkeys([1, *args.bench_batch_sizes]))
+    images = [str(path) for path in split_images(data_path)[: max(1, args.bench_images)]]
+    budgets = {key: getattr(args, key) for key in BUDGET_KEYS}
+
+    results: dict[str, dict] = {}
+    for name, path in formats.items():
+        print(f'[benchmark] {name}: {path}')
+        # A fresh process per format keeps load time cold and peak RSS per model.
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            future = pool.submit(
+                benchmark_format,
+                str(path),
+                device,
+                images,
+                imgsz,
+                batch_sizes,
+                args.bench_warmup,
+                args.bench_iterations,
+            )
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = {'path': str(path), 'error': str(exc)}
+        result['primary'] = path == model_path
+        result['violations'] = check_budgets(result, budgets, args.imgsz)
+        results[name] = result
+
+    primary = next(result for result in results.values() if result['primary'])
+    return {
+        'device': device,
+        'images': len(images),
+        'imgsz': imgsz,
+        'batch_sizes': batch_sizes,
+        'budgets': budgets,
+        'formats': results,
+        # Only the evaluated checkpoint gates; other formats are reported for comparison.
+        'passed': not primary['violations'],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
     resolved_device, device_warning = resolve_torch_device(args.device)
     if device_warning:
         print(f'[device] {device_warning}')
@@ -75,9 +323,25 @@ def main() -> None:
         'mAP50': float(getattr(metrics.box, 'map50', 0.0)),
         'mAP50_95': float(getattr(metrics.box, 'map', 0.0)),
     }
+    if not args.skip_benchmark:
+        bench_device = resolved_device
+        if args.bench_device:
+            bench_device, bench_warning = resolve_torch_device(args.bench_device)
+            if bench_warning:
+                print(f'[device] {bench_warning}')
+        payload['benchmark'] = run_benchmarks(args, model_path, data_path, bench_device)
     out_path.write_text(json.dumps(payload, indent=2), encoding='utf-8')
     print(f'Metrics written to: {out_path}')
 
+    benchmark = payload.get('benchmark')
+    if benchmark and not benchmark['passed']:
+        for name, result in benchmark['formats'].items():
+            if result['primary']:
+                for violation in result['violations']:
+                    print(f'[benchmark] {name}: {violation}', file=sys.stderr)
+        return 1
+    return 0
+
 
 if __name__ == '__main__':
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+MLOPS_DIR = SCRIPT_DIR.parent
+REPO_ROOT = MLOPS_DIR.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from mlops.training.data_yaml import dataset_root, list_images, load_data_yaml  # noqa: E402
+
+METRIC_KEYS = ('mAP50', 'mAP50_95')
+
+
+def is_explicit_relative_path(raw_path: str) -> bool:
+    return raw_path in {'.', '..'} or raw_path.startswith('./') or raw_path.startswith('../') or raw_path.startswith('.\\') or raw_path.startswith('..\\')
+
+
+def resolve_input_path(raw_path: str) -> Path:
+    path = Path(raw_path)
+    if path.is_absolute():
+        return path
+
+    candidates = [
+        Path.cwd() / path,
+        SCRIPT_DIR / path,
+        MLOPS_DIR / path,
+        REPO_ROOT / path,
+    ]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+
+    if is_explicit_relative_path(raw_path):
+        return (Path.cwd() / path).resolve()
+    return (REPO_ROOT / path).resolve()
+
+
+def resolve_output_path(raw_path: str) -> Path:
+    path = Path(raw_path)
+    if path.is_absolute():
+        return path
+
+    if is_explicit_relative_path(raw_path):
+        return (Path.cwd() / path).resolve()
+    return (REPO_ROOT / path).resolve()
+
+
+def default_report_path(model_path: Path) -> Path:
+    # mlops/artifacts/models/<run>/weights/best.pt -> mlops/artifacts/metrics/<run>-int8_report.json
+    run_name = model_path.parent.parent.name if model_path.parent.name == 'weights' else model_path.stem
+    return REPO_ROOT / 'mlops' / 'artifacts' / 'metrics' / f'{run_name}-int8_report.json'
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='INT8 static quantization of a trained lychee YOLO model')
+    parser.add_argument('--model', required=True, help='Path to best.pt (exported to ONNX first) or an fp32 .onnx')
+    parser.add_argument('--data', required=True, help='Path to data YAML')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--calib-size', type=int, default=200, help='Training images sampled for calibration')
+    parser.add_argument('--calib-method', choices=['minmax', 'entropy', 'percentile'], default='minmax')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-map-drop', type=float, default=0.01, help='Largest allowed absolute mAP drop')
+    parser.add_argument('--latency-iterations', type=int, default=50)
+    parser.add_argument('--threads', type=int, default=0, help='onnxruntime intra-op threads for latency (0 = default)')
+    parser.add_argument('--work-dir', default='mlops/artifacts/quantize')
+    parser.add_argument('--publish', default='', help='Published INT8 model path (default: <model dir>/<stem>.int8.onnx)')
+    parser.add_argument('--report', default='', help='Report path (default: mlops/artifacts/metrics/<stem>-int8_report.json)')
+    return parser.parse_args(argv)
+
+
+def split_images(data_path: Path, split: str = 'train') -> list[Path]:
+    """Image files of one split of an Ultralytics data YAML (directories or .txt lists)."""
+    data = load_data_yaml(data_path)
+    entries = data.get(split)
+    if entries is None:
+        raise ValueError(f"Data YAML has no '{split}' split: {data_path}")
+    return list_images(dataset_root(data_path, data), entries)
+
+
+def sample_calibration(images: list[Path], count: int, seed: int) -> list[Path]:
+    if count >= len(images):
+        return list(images)
+    return sorted(random.Random(seed).sample(images, count))
+
+
+def preprocess(image: np.ndarray, imgsz: int) -> np.ndarray:
+    """Letterbox a BGR image to the model input: (1, 3, imgsz, imgsz) RGB float32 in [0, 1]."""
+    import cv2
+
+    height, width = image.shape[:2]
+    ratio = min(imgsz / height, imgsz / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (imgsz - new_w) / 2, (imgsz - new_h) / 2
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return np.ascontiguousarray(image[..., ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+class CalibrationFeed:
+    """Yields one preprocessed calibration image per call, in the shape onnxruntime calibrators expect."""
+
+    def __init__(self, paths: list[Path], input_name: str, imgsz: int) -> None:
+        self.paths = paths
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self._index = 0
+
+    def get_next(self) -> dict[str, np.ndarray] | None:
+        import cv2
+
+        while self._index < len(self.paths):
+            path = self.paths[self._index]
+            self._index += 1
+            image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if image is not None:
+                return {self.input_name: preprocess(image, self.imgsz)}
+        return None
+
+    def rewind(self) -> None:
+        self._index = 0
+
+
+def export_onnx(model_path: Path, imgsz: int) -> Path:
+    if model_path.suffix == '.onnx':
+        return model_path
+
+    from ultralytics import YOLO
+
+    # Dynamic batch and spatial axes: the service feeds ladder rungs, tiles and
+    # batches through the same model. Calibration still runs at --imgsz.
+    return Path(YOLO(str(model_path)).export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True))
+
+
+def quantize_onnx(fp32_path: Path, int8_path: Path, calibration: list[Path], imgsz: int, method: str) -> Path:
+    try:
+        import onnx
+        import onnxruntime as ort
+        from onnxruntime.quantization import (
+            CalibrationDataReader,
+            CalibrationMethod,
+            QuantFormat,
+            QuantType,
+            quantize_static,
+        )
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+    except ImportError as exc:
+        raise RuntimeError('INT8 quantization needs onnx and onnxruntime: uv pip install onnx onnxruntime') from exc
+
+    int8_path.parent.mkdir(parents=True, exist_ok=True)
+    prepared = int8_path.with_name(f'{fp32_path.stem}.prep.onnx')
+    quant_pre_process(str(fp32_path), str(prepared))
+    input_name = ort.InferenceSession(str(prepared), providers=['CPUExecutionProvider']).get_inputs()[0].name
+
+    class Reader(CalibrationDataReader):
+        def __init__(self, feed: CalibrationFeed) -> None:
+            self.feed = feed
+
+        def get_next(self) -> dict[str, np.ndarray] | None:
+            return self.feed.get_next()
+
+    quantize_static(
+        str(prepared),
+        str(int8_path),
+        Reader(CalibrationFeed(calibration, input_name, imgsz)),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method={
+            'minmax': CalibrationMethod.MinMax,
+            'entropy': CalibrationMethod.Entropy,
+            'percentile': CalibrationMethod.Percentile,
+        }[method],
+    )
+    prepared.unlink(missing_ok=True)
+
+    # Ultralytics reads task, names, stride and imgsz from the export metadata.
+    source = onnx.load(str(fp32_path))
+    quantized = onnx.load(str(int8_path))
+    present = {prop.key for prop in quantized.metadata_props}
+    for prop in source.metadata_props:
+        if prop.key not in present:
+            quantized.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(quantized, str(int8_path))
+    return int8_path
+
+
+def evaluate(model_path: Path, data_path: Path, imgsz: int) -> dict[str, float]:
+    """Same metrics as eval.py, on CPU."""
+    from ultralytics import YOLO
+
+    metrics = YOLO(str(model_path), task='detect').val(data=str(data_path), imgsz=imgsz, device='cpu')
+    return {
+        'mAP50': float(getattr(metrics.box, 'map50', 0.0)),
+        'mAP50_95': float(getattr(metrics.box, 'map', 0.0)),
+    }
+
+
+def cpu_latency_ms(onnx_path: Path, imgsz: int, iterations: int, threads: int = 0) -> float:
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    if threads > 0:
+        options.intra_op_num_threads = threads
+    session = ort.InferenceSession(str(onnx_path), sess_options=options, providers=['CPUExecutionProvider'])
+    feed = {session.get_inputs()[0].name: np.random.default_rng(0).random((1, 3, imgsz, imgsz), dtype=np.float32)}
+    session.run(None, feed)
+    samples = []
+    for _ in range(max(1, iterations)):
+        start = time.perf_counter()
+        session.run(None, feed)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(samples)
+
+
+def build_report(
+    fp32: dict[str, float],
+    int8: dict[str, float],
+    max_map_drop: float,
+) -> dict:
+    drops = {key: round(fp32[key] - int8[key], 6) for key in METRIC_KEYS}
+    speedup = fp32['latency_ms'] / int8['latency_ms'] if int8.get('latency_ms') else None
+    return {
+        'fp32': fp32,
+        'int8': int8,
+        'map_drop': drops,
+        'max_map_drop': max_map_drop,
+        'cpu_speedup': round(speedup, 3) if speedup is not None else None,
+        'passed': all(drop <= max_map_drop for drop in drops.values()),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    model_path = resolve_input_path(args.model)
+    data_path = resolve_input_path(args.data)
+    work_dir = resolve_output_path(args.work_dir)
+    stem = model_path.stem
+    publish_path = resolve_output_path(args.publish) if args.publish else model_path.with_name(f'{stem}.int8.onnx')
+    report_path = resolve_output_path(args.report) if args.report else default_report_path(model_path)
+
+    calibration = sample_calibration(split_images(data_path, 'train'), args.calib_size, args.seed)
+    if not calibration:
+        print('[quantize] no calibration images found in the train split', file=sys.stderr)
+        return 2
+    print(f'[quantize] calibrating on {len(calibration)} training images')
+
+    fp32_onnx = export_onnx(model_path, args.imgsz)
+    staged = quantize_onnx(fp32_onnx, work_dir / f'{stem}.int8.onnx', calibration, args.imgsz, args.calib_method)
+
+    # Both sides run through onnxruntime so the drop isolates quantization error.
+    fp32 = {
+        **evaluate(fp32_onnx, data_path, args.imgsz),
+        'latency_ms': cpu_latency_ms(fp32_onnx, args.imgsz, args.latency_iterations, args.threads),
+    }
+    int8 = {
+        **evaluate(staged, data_path, args.imgsz),
+        'latency_ms': cpu_latency_ms(staged, args.imgsz, args.latency_iterations, args.threads),
+    }
+    report = build_report(fp32, int8, args.max_map_drop)
+    report['calibration_images'] = len(calibration)
+    report['calibration_method'] = args.calib_method
+
+    if report['passed']:
+        publish_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(staged, publish_path)
+        report['published'] = str(publish_path)
+    else:
+        report['published'] = None
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f'Report written to: {report_path}')
+    if not report['passed']:
+        print(
+            f"[quantize] refusing to publish: mAP drop {report['map_drop']} exceeds {args.max_map_drop}; "
+            f'staged model left at {staged}',
+            file=sys.stderr,
+        )
+        return 1
+    print(f'INT8 model published: {publish_path}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
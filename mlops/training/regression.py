@@ -0,0 +1,439 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+MLOPS_DIR = SCRIPT_DIR.parent
+REPO_ROOT = MLOPS_DIR.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from mlops.training.data_yaml import dataset_root, list_images, load_data_yaml  # noqa: E402
+
+RIPENESS_CONSTANTS = REPO_ROOT / 'shared' / 'contracts' / 'constants' / 'ripeness.json'
+BACKGROUND = 'background'
+
+_MODEL: Any = None
+_SETTINGS: dict[str, Any] = {}
+
+
+def is_explicit_relative_path(raw_path: str) -> bool:
+    return raw_path in {'.', '..'} or raw_path.startswith('./') or raw_path.startswith('../') or raw_path.startswith('.\\') or raw_path.startswith('..\\')
+
+
+def resolve_input_path(raw_path: str) -> Path:
+    path = Path(raw_path)
+    if path.is_absolute():
+        return path
+
+    candidates = [
+        Path.cwd() / path,
+        SCRIPT_DIR / path,
+        MLOPS_DIR / path,
+        REPO_ROOT / path,
+    ]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+
+    if is_explicit_relative_path(raw_path):
+        return (Path.cwd() / path).resolve()
+    return (REPO_ROOT / path).resolve()
+
+
+def resolve_output_path(raw_path: str) -> Path:
+    path = Path(raw_path)
+    if path.is_absolute():
+        return path
+
+    if is_explicit_relative_path(raw_path):
+        return (Path.cwd() / path).resolve()
+    return (REPO_ROOT / path).resolve()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Regression evaluation on the frozen golden set with a prediction cache')
+    parser.add_argument('--model', required=True, help='Path to .pt checkpoint (or any Ultralytics-loadable export)')
+    parser.add_argument('--data', required=True, help='Path to data YAML')
+    parser.add_argument('--split', default='golden_test_set', help='Data YAML key of the golden set')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1), help='Inference worker processes')
+    parser.add_argument('--conf', type=float, default=0.25, help='Confidence threshold (applied to cached predictions)')
+    parser.add_argument('--nms-iou', type=float, default=0.45, help='NMS IoU (applied to cached predictions)')
+    parser.add_argument('--match-iou', type=float, default=0.5, help='IoU for a prediction to match a label')
+    parser.add_argument('--max-det', type=int, default=300)
+    parser.add_argument('--candidate-conf', type=float, default=0.001, help='Floor for cached candidates; part of the cache key')
+    parser.add_argument('--max-candidates', type=int, default=1000, help='Cached candidates per image; part of the cache key')
+    parser.add_argument('--baseline', default='', help='Model to diff against (default: the previous model evaluated here)')
+    parser.add_argument('--cache-dir', default='mlops/artifacts/regression')
+    parser.add_argument('--output', default='', help='Report path (default: mlops/artifacts/metrics/<run>-regression.json)')
+    parser.add_argument('--max-regressed', type=int, default=None, help='Exit non-zero when more images regress than this')
+    return parser.parse_args(argv)
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_key(settings: dict[str, Any]) -> str:
+    return hashlib.blake2b(json.dumps(settings, sort_keys=True).encode(), digest_size=6).hexdigest()
+
+
+def default_report_path(model_path: Path) -> Path:
+    run_name = model_path.parent.parent.name if model_path.parent.name == 'weights' else model_path.stem
+    return REPO_ROOT / 'mlops' / 'artifacts' / 'metrics' / f'{run_name}-regression.json'
+
+
+def load_split(data_path: Path, split: str) -> tuple[list[Path], list[str]]:
+    data = load_data_yaml(data_path)
+    entries = data.get(split)
+    if not entries:
+        raise SystemExit(f"Data YAML has no '{split}' split: {data_path}")
+    images = list_images(dataset_root(data_path, data), entries)
+
+    names = data.get('names')
+    if isinstance(names, dict):
+        names = [names[key] for key in sorted(names)]
+    if not names:
+        names = json.loads(RIPENESS_CONSTANTS.read_text(encoding='utf-8'))['classes']
+    return images, [str(name) for name in names]
+
+
+def label_path_for(image_path: Path) -> Path:
+    parts = list(image_path.parts)
+    for index in range(len(parts) - 1, -1, -1):
+        if parts[index] == 'images':
+            parts[index] = 'labels'
+            break
+    return Path(*parts).with_suffix('.txt')
+
+
+def load_labels(image_path: Path, shape: tuple[int, int]) -> np.ndarray:
+    """Ground truth as ``(N, 5)`` rows of ``[x1, y1, x2, y2, class]`` in pixels."""
+    path = label_path_for(image_path)
+    if not path.exists():
+        return np.zeros((0, 5), dtype=np.float32)
+    rows = [line.split() for line in path.read_text(encoding='utf-8').splitlines() if line.strip()]
+    values = np.array([[float(v) for v in row[:5]] for row in rows if len(row) >= 5], dtype=np.float32).reshape(-1, 5)
+    height, width = shape
+    cls, x, y, w, h = values.T
+    return np.stack([(x - w / 2) * width, (y - h / 2) * height, (x + w / 2) * width, (y + h / 2) * height, cls], axis=1)
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between ``(N, 4)`` and ``(M, 4)`` xyxy boxes."""
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:4], b[None, :, 2:4])
+    inter = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def postprocess(candidates: np.ndarray, conf: float, nms_iou: float, max_det: int) -> np.ndarray:
+    """Confidence filter and class-wise greedy NMS over cached ``[x1, y1, x2, y2, conf, class]`` candidates."""
+    rows = candidates[candidates[:, 4] >= conf]
+    rows = rows[np.argsort(-rows[:, 4], kind='stable')]
+    if len(rows) == 0:
+        return rows
+    # Offsetting each class far apart makes one NMS pass class-aware.
+    offset = rows[:, 5:6] * (float(rows[:, :4].max()) + 1.0)
+    boxes = rows[:, :4] + offset
+    ious = box_iou(boxes, boxes)
+    suppressed = np.zeros(len(rows), dtype=bool)
+    keep = []
+    for index in range(len(rows)):
+        if suppressed[index]:
+            continue
+        keep.append(index)
+        if len(keep) == max_det:
+            break
+        suppressed |= ious[index] > nms_iou
+    return rows[keep]
+
+
+def match(predictions: np.ndarray, labels: np.ndarray, match_iou: float) -> tuple[list[tuple[int, int]], list[int], list[int]]:
+    """Greedy class-agnostic matching by confidence: (label class, predicted class) pairs, missed and spurious classes."""
+    pairs: list[tuple[int, int]] = []
+    if len(labels) == 0:
+        return pairs, [], [int(c) for c in predictions[:, 5]]
+    if len(predictions) == 0:
+        return pairs, [int(c) for c in labels[:, 4]], []
+    ious = box_iou(predictions[:, :4], labels[:, :4])
+    used = np.zeros(len(labels), dtype=bool)
+    spurious: list[int] = []
+    for index in np.argsort(-predictions[:, 4], kind='stable'):
+        candidates = np.where(used, -1.0, ious[index])
+        best = int(np.argmax(candidates))
+        if candidates[best] >= match_iou:
+            used[best] = True
+            pairs.append((int(labels[best, 4]), int(predictions[index, 5])))
+        else:
+            spurious.append(int(predictions[index, 5]))
+    missed = [int(c) for c in labels[~used, 4]]
+    return pairs, missed, spurious
+
+
+def score_image(predictions: np.ndarray, labels: np.ndarray, match_iou: float) -> dict[str, Any]:
+    pairs, missed, spurious = match(predictions, labels, match_iou)
+    correct = sum(1 for truth, predicted in pairs if truth == predicted)
+    return {
+        'pairs': pairs,
+        'missed': missed,
+        'spurious': spurious,
+        'tp': correct,
+        'errors': len(pairs) - correct + len(missed) + len(spurious),
+    }
+
+
+def build_metrics(scores: dict[str, dict[str, Any]], names: list[str]) -> dict[str, Any]:
+    size = len(names) + 1
+    background = len(names)
+    # Rows are the predicted class, columns the labelled class; the last of each is background.
+    matrix = np.zeros((size, size), dtype=np.int64)
+    for score in scores.values():
+        for truth, predicted in score['pairs']:
+            matrix[min(predicted, background), min(truth, background)] += 1
+        for truth in score['missed']:
+            matrix[background, min(truth, background)] += 1
+        for predicted in score['spurious']:
+            matrix[min(predicted, background), background] += 1
+
+    per_class = {}
+    for index, name in enumerate(names):
+        tp = int(matrix[index, index])
+        predicted = int(matrix[index, :].sum())
+        support = int(matrix[:, index].sum())
+        per_class[name] = {
+            'precision': round(tp / predicted, 4) if predicted else 0.0,
+            'recall': round(tp / support, 4) if support else 0.0,
+            'tp': tp,
+            'fp': predicted - tp,
+            'fn': support - tp,
+            'support': support,
+        }
+    tp = int(np.trace(matrix[:background, :background]))
+    predicted = int(matrix[:background, :].sum())
+    support = int(matrix[:, :background].sum())
+    return {
+        'precision': round(tp / predicted, 4) if predicted else 0.0,
+        'recall': round(tp / support, 4) if support else 0.0,
+        'per_class': per_class,
+        'confusion_matrix': {'predicted_by_label': [*names, BACKGROUND], 'matrix': matrix.tolist()},
+    }
+
+
+def diff_scores(current: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """Images whose error count (misclassified + missed + spurious) went up or down against the baseline."""
+    regressed, improved = [], []
+    for image, score in current.items():
+        if image not in baseline:
+            continue
+        delta = score['errors'] - baseline[image]['errors']
+        if delta:
+            entry = {'image': image, 'errors': score['errors'], 'baseline_errors': baseline[image]['errors'], 'delta': delta}
+            (regressed if delta > 0 else improved).append(entry)
+    regressed.sort(key=lambda entry: (-entry['delta'], entry['image']))
+    improved.sort(key=lambda entry: (entry['delta'], entry['image']))
+    return {'regressed': regressed, 'improved': improved}
+
+
+class PredictionCache:
+    """Raw candidates per (model hash, inference settings, image hash), one ``.npz`` per image."""
+
+    def __init__(self, root: Path, model_hash: str, settings: dict[str, Any]) -> None:
+        self.directory = root / 'predictions' / model_hash / settings_key(settings)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / 'settings.json').write_text(json.dumps(settings, sort_keys=True), encoding='utf-8')
+
+    def path(self, image_hash: str) -> Path:
+        return self.directory / f'{image_hash}.npz'
+
+    def get(self, image_hash: str) -> tuple[np.ndarray, tuple[int, int]] | None:
+        path = self.path(image_hash)
+        if not path.exists():
+            return None
+        with np.load(path) as stored:
+            return stored['candidates'], (int(stored['shape'][0]), int(stored['shape'][1]))
+
+    def put(self, image_hash: str, candidates: np.ndarray, shape: tuple[int, int]) -> None:
+        staging = self.directory / f'{image_hash}.tmp.npz'
+        np.savez(staging, candidates=candidates.astype(np.float32), shape=np.array(shape, dtype=np.int64))
+        os.replace(staging, self.path(image_hash))
+
+
+def _init_worker(model_path: str, settings: dict[str, Any], device: str, threads: int) -> None:
+    global _MODEL, _SETTINGS
+    import torch
+    from ultralytics import YOLO
+
+    if threads > 0:
+        torch.set_num_threads(threads)
+    _MODEL = YOLO(model_path, task='detect')
+    _SETTINGS = {**settings, 'device': device}
+
+
+def predict_shard(paths: list[str]) -> list[tuple[np.ndarray, tuple[int, int]]]:
+    """Candidates for one shard: a near-zero confidence floor and no effective NMS, so both can be applied later."""
+    results = _MODEL.predict(
+        paths,
+        imgsz=_SETTINGS['imgsz'],
+        conf=_SETTINGS['candidate_conf'],
+        iou=1.0,
+        max_det=_SETTINGS['max_candidates'],
+        device=_SETTINGS['device'],
+        verbose=False,
+        stream=True,
+    )
+    return [(result.boxes.data.float().cpu().numpy(), tuple(result.orig_shape)) for result in results]
+
+
+def predict_missing(
+    model_path: Path,
+    images: dict[Path, str],
+    cache: PredictionCache,
+    settings: dict[str, Any],
+    device: str,
+    workers: int,
+) -> int:
+    """Run the model only on image contents whose predictions are not cached; returns the number of forward passes."""
+    # Byte-identical images share one prediction, so each content hash is inferred once.
+    unique = {image_hash: path for path, image_hash in images.items()}
+    missing = [(image_hash, path) for image_hash, path in unique.items() if not cache.path(image_hash).exists()]
+    if not missing:
+        return 0
+    workers = max(1, min(workers, len(missing)))
+    shard_size = math.ceil(len(missing) / (workers * 4))
+    shards = [missing[i : i + shard_size] for i in range(0, len(missing), shard_size)]
+    threads = max(1, (os.cpu_count() or 1) // workers) if device == 'cpu' else 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(model_path), settings, device, threads),
+    ) as pool:
+        for shard, outputs in zip(shards, pool.map(predict_shard, [[str(p) for _, p in shard] for shard in shards])):
+            for (image_hash, _), (candidates, shape) in zip(shard, outputs):
+                cache.put(image_hash, candidates, shape)
+    print(f'[regression] {len(missing)} images inferred in {time.perf_counter() - started:.1f}s on {workers} workers')
+    return len(missing)
+
+
+def load_history(path: Path) -> list[dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def evaluate_model(
+    model_path: Path,
+    images: dict[Path, str],
+    settings: dict[str, Any],
+    args: argparse.Namespace,
+    cache_root: Path,
+    model_hash: str | None = None,
+) -> tuple[dict[str, dict[str, Any]], int, str]:
+    model_hash = model_hash or file_hash(model_path)
+    cache = PredictionCache(cache_root, model_hash, settings)
+    forward_passes = predict_missing(model_path, images, cache, settings, args.device, args.workers)
+    scores: dict[str, dict[str, Any]] = {}
+    for path, image_hash in images.items():
+        candidates, shape = cache.get(image_hash)
+        predictions = postprocess(candidates, args.conf, args.nms_iou, args.max_det)
+        scores[str(path)] = score_image(predictions, load_labels(path, shape), args.match_iou)
+    return scores, forward_passes, model_hash
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    model_path = resolve_input_path(args.model)
+    data_path = resolve_input_path(args.data)
+    cache_root = resolve_output_path(args.cache_dir)
+    image_paths, names = load_split(data_path, args.split)
+    if not image_paths:
+        print(f'[regression] no images in split {args.split}', file=sys.stderr)
+        return 2
+
+    # Only what changes the forward pass belongs in the key; thresholds and NMS are re-applied offline.
+    settings = {
+        'imgsz': args.imgsz,
+        'candidate_conf': args.candidate_conf,
+        'max_candidates': args.max_candidates,
+    }
+    # Keyed by path so duplicate golden images still count; the hash only keys the prediction cache.
+    images = {path: file_hash(path) for path in image_paths}
+    scores, forward_passes, model_hash = evaluate_model(model_path, images, settings, args, cache_root)
+
+    history_path = cache_root / 'history.json'
+    history = load_history(history_path)
+    baseline_path = resolve_input_path(args.baseline) if args.baseline else None
+    baseline_hash = None
+    if baseline_path is None:
+        # The most recent other model evaluated on this split with the same settings.
+        for entry in reversed(history):
+            if entry['model_hash'] != model_hash and entry['settings'] == settings and entry['split'] == args.split:
+                baseline_path, baseline_hash = Path(entry['model']), entry['model_hash']
+                break
+
+    report: dict[str, Any] = {
+        'model': str(model_path),
+        'model_hash': model_hash,
+        'data': str(data_path),
+        'split': args.split,
+        'images': len(images),
+        'settings': settings,
+        'postprocess': {'conf': args.conf, 'nms_iou': args.nms_iou, 'max_det': args.max_det, 'match_iou': args.match_iou},
+        'forward_passes': forward_passes,
+        **build_metrics(scores, names),
+    }
+    if baseline_path is not None:
+        baseline_scores, baseline_passes, baseline_hash = evaluate_model(
+            baseline_path, images, settings, args, cache_root, model_hash=baseline_hash
+        )
+        diff = diff_scores(scores, baseline_scores)
+        report['baseline'] = {
+            'model': str(baseline_path),
+            'model_hash': baseline_hash,
+            'forward_passes': baseline_passes,
+            **{key: value for key, value in build_metrics(baseline_scores, names).items() if key != 'confusion_matrix'},
+        }
+        report['diff'] = {'regressed_count': len(diff['regressed']), 'improved_count': len(diff['improved']), **diff}
+
+    history = [entry for entry in history if entry['model_hash'] != model_hash or entry['settings'] != settings]
+    history.append({'model': str(model_path), 'model_hash': model_hash, 'settings': settings, 'split': args.split})
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    history_path.write_text(json.dumps(history, indent=2), encoding='utf-8')
+
+    out_path = resolve_output_path(args.output) if args.output else default_report_path(model_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"[regression] precision {report['precision']} recall {report['recall']} ({forward_passes} forward passes)")
+    if 'diff' in report:
+        print(f"[regression] vs {report['baseline']['model']}: {report['diff']['regressed_count']} regressed, {report['diff']['improved_count']} improved")
+    print(f'Report written to: {out_path}')
+
+    if args.max_regressed is not None and report.get('diff', {}).get('regressed_count', 0) > args.max_regressed:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+MLOPS_DIR = SCRIPT_DIR.parent
+REPO_ROOT = MLOPS_DIR.parent
+VALUE_KEY = 'mAP50_95'
+
+
+def is_explicit_relative_path(raw_path: str) -> bool:
+    return raw_path in {'.', '..'} or raw_path.startswith('./') or raw_path.startswith('../') or raw_path.startswith('.\\') or raw_path.startswith('..\\')
+
+
+def resolve_input_path(raw_path: str) -> Path:
+    path = Path(raw_path)
+    if path.is_absolute():
+        return path
+
+    candidates = [
+        Path.cwd() / path,
+        SCRIPT_DIR / path,
+        MLOPS_DIR / path,
+        REPO_ROOT / path,
+    ]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+
+    if is_explicit_relative_path(raw_path):
+        return (Path.cwd() / path).resolve()
+    return (REPO_ROOT / path).resolve()
+
+
+def resolve_output_path(raw_path: str) -> Path:
+    path = Path(raw_path)
+    if path.is_absolute():
+        return path
+
+    if is_explicit_relative_path(raw_path):
+        return (Path.cwd() / path).resolve()
+    return (REPO_ROOT / path).resolve()
+
+
+def csv_list(raw: str) -> list[str]:
+    return [part.strip() for part in raw.split(',') if part.strip()]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Sweep model sizes and input resolutions for a latency/accuracy Pareto front')
+    parser.add_argument('--data', required=True, help='Path to data YAML')
+    parser.add_argument('--models', type=csv_list, default=['yolo26n', 'yolo26s', 'yolo26m'], help='Base models: names or .pt paths')
+    parser.add_argument('--imgsz', type=lambda raw: [int(v) for v in csv_list(raw)], default=[480, 640, 800])
+    parser.add_argument('--epochs', type=int, default=100, help='0 evaluates the given checkpoints without training')
+    parser.add_argument('--train-device', default='auto')
+    parser.add_argument('--train-jobs', type=int, default=1, help='Variants training at once (they share the GPU)')
+    parser.add_argument('--threads', type=int, default=4, help='CPU cores given to each variant benchmark')
+    parser.add_argument('--jobs', type=int, default=0, help='Variants evaluated at once (default: cores // --threads)')
+    parser.add_argument('--bench-iterations', type=int, default=50)
+    parser.add_argument('--budget-ms', type=float, default=None, help='Per-frame CPU latency budget for the recommendation')
+    parser.add_argument('--latency-metric', choices=['p50', 'p95'], default='p95')
+    parser.add_argument('--sweep-dir', default='mlops/artifacts/sweeps/default', help='Runs, logs and reports; reruns resume here')
+    parser.add_argument('--model-config', default='tooling/configs/model.yaml.example', help='Base for the recommended model.yaml')
+    return parser.parse_args(argv)
+
+
+@dataclass(slots=True)
+class Variant:
+    model: str
+    imgsz: int
+    epochs: int
+    data: str
+
+    @property
+    def name(self) -> str:
+        return f'{Path(self.model).stem}-{self.imgsz}'
+
+
+def base_weights(model: str) -> str:
+    """A ``.pt`` path as given, else ``mlops/pretrained/<name>.pt`` when present, else the name for Ultralytics to fetch."""
+    if model.endswith('.pt'):
+        return str(resolve_input_path(model))
+    pretrained = MLOPS_DIR / 'pretrained' / f'{model}.pt'
+    return str(pretrained) if pretrained.exists() else f'{model}.pt'
+
+
+def core_slices(threads: int, jobs: int) -> list[list[int]]:
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+    threads = max(1, min(threads, len(cores)))
+    jobs = jobs or max(1, len(cores) // threads)
+    # Disjoint slices while they last; past that, benchmarks share cores and timings get noisier.
+    wrapped = cores * 2
+    return [wrapped[(i * threads) % len(cores) :][:threads] for i in range(jobs)]
+
+
+def run_logged(command: list[str], log_path: Path, cores: list[int] | None = None) -> int:
+    env = dict(os.environ)
+    if cores:
+        for key in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+            env[key] = str(len(cores))
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, 'a', encoding='utf-8') as log:
+        log.write(f'$ {" ".join(command)}\n')
+        log.flush()
+        process = subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        if cores and hasattr(os, 'sched_setaffinity'):
+            try:
+                os.sched_setaffinity(process.pid, cores)
+            except OSError:
+                pass
+        return process.wait()
+
+
+class SweepRunner:
+    """Trains (or reuses) and evaluates variants; every finished stage is recorded so reruns resume.
+
+    ``train`` and ``evaluate`` are the two phases; calling the runner does both for one variant.
+    """
+
+    def __init__(
+        self,
+        sweep_dir: Path,
+        args: argparse.Namespace,
+        run: Callable[[list[str], Path, list[int] | None], int] = run_logged,
+    ) -> None:
+        self.sweep_dir = sweep_dir
+        self.args = args
+        self.run = run
+        self._train_gate = threading.Semaphore(max(1, args.train_jobs))
+        self._slices: queue.Queue[list[int]] = queue.Queue()
+        for cores in core_slices(args.threads, args.jobs):
+            self._slices.put(cores)
+
+    @property
+    def jobs(self) -> int:
+        return self._slices.qsize()
+
+    def _stage_done(self, marker: Path, config: dict) -> bool:
+        state = _read_json(marker)
+        return state.get('config') == config and state.get('done', True)
+
+    def _train(self, variant: Variant, out_dir: Path, config: dict) -> Path:
+        run_dir = self.sweep_dir / 'runs' / variant.name
+        marker = out_dir / 'train.json'
+        if self._stage_done(marker, config):
+            return run_dir / 'weights' / 'best.pt'
+        if _read_json(marker).get('config') != config:
+            # Started with other data or epochs (or never): nothing to resume.
+            shutil.rmtree(run_dir, ignore_errors=True)
+        marker.write_text(json.dumps({'config': config, 'done': False}), encoding='utf-8')
+
+        last = run_dir / 'weights' / 'last.pt'
+        command = [sys.executable, str(SCRIPT_DIR / 'train.py'), '--data', variant.data, '--imgsz', str(variant.imgsz)]
+        command += ['--epochs', str(variant.epochs), '--device', self.args.train_device]
+        command += ['--project', str(run_dir.parent), '--name', variant.name, '--exist-ok']
+        command += ['--model', str(last), '--resume'] if last.exists() else ['--model', base_weights(variant.model)]
+        with self._train_gate:
+            print(f"[sweep] {variant.name}: {'resuming' if last.exists() else 'training'}")
+            if self.run(command, out_dir / 'train.log', None) != 0:
+                raise RuntimeError(f'training failed, see {out_dir / "train.log"}')
+        marker.write_text(json.dumps({'config': config, 'done': True}), encoding='utf-8')
+        return run_dir / 'weights' / 'best.pt'
+
+    def _evaluate(self, variant: Variant, weights: Path, out_dir: Path) -> dict:
+        eval_path = out_dir / 'eval.json'
+        command = [sys.executable, str(SCRIPT_DIR / 'eval.py'), '--model', str(weights), '--data', variant.data]
+        command += ['--imgsz', str(variant.imgsz), '--device', self.args.train_device, '--bench-device', 'cpu']
+        command += ['--bench-formats', 'pt', '--bench-batch-sizes', '1', '--bench-iterations', str(self.args.bench_iterations)]
+        command += ['--output', str(eval_path)]
+        cores = self._slices.get()
+        try:
+            print(f'[sweep] {variant.name}: evaluating on cores {cores[0]}-{cores[-1]}')
+            if self.run(command, out_dir / 'eval.log', cores) != 0 or not eval_path.exists():
+                raise RuntimeError(f'evaluation failed, see {out_dir / "eval.log"}')
+        finally:
+            self._slices.put(cores)
+        return json.loads(eval_path.read_text(encoding='utf-8'))
+
+    def train(self, variant: Variant) -> dict | Path:
+        """First phase: the variant's cached result or error row when it is settled, else weights to evaluate."""
+        out_dir = self.sweep_dir / variant.name
+        out_dir.mkdir(parents=True, exist_ok=True)
+        config = asdict(variant)
+        result_path = out_dir / 'result.json'
+        if self._stage_done(result_path, config):
+            print(f'[sweep] {variant.name}: cached')
+            return json.loads(result_path.read_text(encoding='utf-8'))
+        try:
+            return self._train(variant, out_dir, config) if variant.epochs > 0 else Path(base_weights(variant.model))
+        except Exception as exc:
+            print(f'[sweep] {variant.name}: {exc}', file=sys.stderr)
+            return {'variant': variant.name, 'config': config, 'error': str(exc)}
+
+    def evaluate(self, variant: Variant, trained: dict | Path) -> dict:
+        """Second phase: mAP and the core-pinned CPU benchmark for weights from ``train``."""
+        if isinstance(trained, dict):
+            return trained
+        out_dir = self.sweep_dir / variant.name
+        try:
+            metrics = self._evaluate(variant, trained, out_dir)
+        except Exception as exc:
+            print(f'[sweep] {variant.name}: {exc}', file=sys.stderr)
+            return {'variant': variant.name, 'config': asdict(variant), 'error': str(exc)}
+
+        result = summarize(variant, trained, metrics)
+        (out_dir / 'result.json').write_text(json.dumps(result, indent=2), encoding='utf-8')
+        return result
+
+    def __call__(self, variant: Variant) -> dict:
+        return self.evaluate(variant, self.train(variant))
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def summarize(variant: Variant, weights: Path, metrics: dict) -> dict:
+    bench = next(iter(metrics.get('benchmark', {}).get('formats', {}).values()), {})
+    latency = bench.get('latency_ms') or {}
+    return {
+        'variant': variant.name,
+        'config': asdict(variant),
+        'weights': str(weights),
+        'mAP50': metrics.get('mAP50'),
+        'mAP50_95': metrics.get('mAP50_95'),
+        'latency_ms': {key: latency.get(key) for key in ('p50', 'p95', 'p99')},
+        'peak_rss_mb': bench.get('peak_rss_mb'),
+        'load_s': bench.get('load_s'),
+        'bench_error': bench.get('error'),
+    }
+
+
+def pareto_front(rows: list[dict], metric: str) -> list[dict]:
+    """Variants no other variant beats on both latency (lower) and mAP50-95 (higher), fastest first."""
+    usable = [row for row in rows if row.get(VALUE_KEY) is not None and row['latency_ms'].get(metric) is not None]
+    front: list[dict] = []
+    best = float('-inf')
+    for row in sorted(usable, key=lambda r: (r['latency_ms'][metric], -r[VALUE_KEY])):
+        if row[VALUE_KEY] > best:
+            front.append(row)
+            best = row[VALUE_KEY]
+    return front
+
+
+def recommend(front: list[dict], budget_ms: float | None, metric: str) -> dict | None:
+    """Most accurate front variant within the budget (the front is already latency-sorted)."""
+    feasible = [row for row in front if budget_ms is None or row['latency_ms'][metric] <= budget_ms]
+    return feasible[-1] if feasible else None
+
+
+def write_model_config(base_path: Path, row: dict, out_path: Path) -> Path:
+    import yaml
+
+    config = yaml.safe_load(base_path.read_text(encoding='utf-8')) if base_path.exists() else {}
+    weights = Path(row['weights'])
+    config = dict(config or {})
+    config['yolo_version'] = Path(row['config']['model']).stem
+    config['model_path'] = weights.relative_to(REPO_ROOT).as_posix() if weights.is_relative_to(REPO_ROOT) else str(weights)
+    config['imgsz'] = row['config']['imgsz']
+    # A ladder tuned for another resolution would step outside what was measured.
+    config['resolution_ladder'] = []
+    out_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding='utf-8')
+    return out_path
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    sweep_dir = resolve_output_path(args.sweep_dir)
+    data = str(resolve_input_path(args.data))
+    variants = [Variant(model, imgsz, args.epochs, data) for model in args.models for imgsz in args.imgsz]
+    runner = SweepRunner(sweep_dir, args)
+    print(f'[sweep] {len(variants)} variants, {runner.jobs} evaluated at once with {args.threads} cores each')
+
+    # Every variant trains before any benchmark starts: a CPU training run on
+    # the same host would otherwise skew the core-pinned latency numbers.
+    with ThreadPoolExecutor(max_workers=max(1, args.train_jobs)) as pool:
+        trained = list(pool.map(runner.train, variants))
+    with ThreadPoolExecutor(max_workers=runner.jobs) as pool:
+        results = list(pool.map(runner.evaluate, variants, trained))
+
+    rows = [row for row in results if 'error' not in row]
+    failed = [row for row in results if 'error' in row]
+    front = pareto_front(rows, args.latency_metric)
+    choice = recommend(front, args.budget_ms, args.latency_metric)
+    report = {
+        'latency_metric': args.latency_metric,
+        'budget_ms': args.budget_ms,
+        'variants': sorted(rows, key=lambda r: (r['latency_ms'][args.latency_metric] or float('inf'))),
+        'pareto': [row['variant'] for row in front],
+        'recommended': choice['variant'] if choice else None,
+        'failed': failed,
+    }
+    if choice is not None:
+        config_path = write_model_config(resolve_input_path(args.model_config), choice, sweep_dir / 'recommended_model.yaml')
+        report['recommended_config'] = str(config_path)
+
+    report_path = sweep_dir / 'sweep_report.json'
+    report_path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    for row in report['variants']:
+        marker = '*' if row['variant'] in report['pareto'] else ' '
+        print(
+            f"{marker} {row['variant']:<20} mAP50-95 {row[VALUE_KEY]}  "
+            f"{args.latency_metric} {row['latency_ms'][args.latency_metric]} ms  RSS {row['peak_rss_mb']} MB"
+        )
+    print(f'Sweep report written to: {report_path}')
+    if choice is None:
+        print(f'[sweep] no variant meets the {args.budget_ms} ms budget', file=sys.stderr)
+    else:
+        print(f"[sweep] recommended: {choice['variant']} -> {report['recommended_config']}")
+    return 1 if failed or choice is None else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,13 +1,27 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any
+
+import numpy as np
 
 from lychee_common.device import resolve_torch_device
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 MLOPS_DIR = SCRIPT_DIR.parent
 REPO_ROOT = MLOPS_DIR.parent
+IMAGE_CACHE_VERSION = 1
+# Share of epoch wall time spent waiting on the loader above which the run is called input-bound.
+DATA_WAIT_WARNING = 0.25
 
 
 def is_explicit_relative_path(raw_path: str) -> bool:
@@ -44,22 +58,283 @@ def resolve_output_path(raw_path: str) -> Path:
     return (REPO_ROOT / path).resolve()
 
 
-def parse_args() -> argparse.Namespace:
+def batch_arg(raw: str) -> float:
+    """Ultralytics batch: a size, -1 / ``auto`` for auto-batch, or a (0, 1) GPU memory fraction."""
+    if raw == 'auto':
+        return -1
+    value = float(raw)
+    if value == -1 or 0 < value < 1:
+        return value
+    if value >= 1 and value.is_integer():
+        return int(value)
+    raise argparse.ArgumentTypeError(f'Expected a batch size, -1/auto or a memory fraction in (0, 1): {raw!r}')
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description='Train YOLO stable baseline for lychee ripeness')
     parser.add_argument('--data', required=True, help='Path to data YAML')
     parser.add_argument('--model', default='mlops/pretrained/yolo26n.pt', help='Pretrained model checkpoint')
     parser.add_argument('--epochs', type=int, default=100)
     parser.add_argument('--imgsz', type=int, default=640)
-    parser.add_argument('--batch', type=int, default=16)
+    parser.add_argument('--batch', type=batch_arg, default=None, help='Batch size, -1/auto, or GPU memory fraction (default: 16)')
+    parser.add_argument('--workers', type=int, default=8, help='Data loader worker processes')
+    parser.add_argument(
+        '--cache',
+        choices=['none', 'ram', 'disk', 'memmap'],
+        default=None,
+        help='Image cache: ultralytics ram/disk, or memmap for the pre-resized on-disk cache (default: none)',
+    )
+    parser.add_argument('--cache-dir', default='mlops/artifacts/cache/images', help='Where memmap image caches live')
+    parser.add_argument(
+        '--throughput',
+        action='store_true',
+        help='Report images/s and data-wait vs compute per epoch; defaults --cache memmap and --batch auto',
+    )
     parser.add_argument('--device', default='cpu')
     parser.add_argument('--project', default='mlops/artifacts/models')
     parser.add_argument('--name', default='lychee_v1')
+    parser.add_argument('--exist-ok', action='store_true', help='Reuse <project>/<name> instead of incrementing the run name')
+    parser.add_argument('--resume', action='store_true', help='Resume the interrupted run whose last.pt is --model')
     parser.add_argument('--export-onnx', action='store_true')
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.cache is None:
+        args.cache = 'memmap' if args.throughput else 'none'
+    if args.batch is None:
+        args.batch = -1 if args.throughput else 16
+    return args
+
+
+def dataset_fingerprint(image_files: list[str], imgsz: int) -> str:
+    """Cheap content key: every path with its size and mtime, plus the target size."""
+    digest = hashlib.blake2b(f'v{IMAGE_CACHE_VERSION}:{imgsz}'.encode(), digest_size=12)
+    for path in image_files:
+        stat = os.stat(path)
+        digest.update(f'{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n'.encode())
+    return digest.hexdigest()
+
+
+def decode_resized(task: tuple[str, int]) -> tuple[np.ndarray | None, tuple[int, int]]:
+    """Decode one image and resize its long side to ``imgsz`` exactly as Ultralytics' training loader does."""
+    import cv2
+
+    path, imgsz = task
+    image = cv2.imread(path, cv2.IMREAD_COLOR)
+    if image is None:
+        return None, (0, 0)
+    h0, w0 = image.shape[:2]
+    ratio = imgsz / max(h0, w0)
+    if ratio != 1:
+        size = (min(math.ceil(w0 * ratio), imgsz), min(math.ceil(h0 * ratio), imgsz))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_LINEAR)
+    return np.ascontiguousarray(image), (h0, w0)
+
+
+def build_image_cache(image_files: list[str], imgsz: int, cache_root: Path, workers: int) -> Path:
+    """Decode and resize ``image_files`` once into ``<cache_root>/<fingerprint>-<imgsz>``; reuse it afterwards.
+
+    Images are packed back to back in ``images.u8``; ``index.npy`` holds one
+    ``[offset, h, w, h0, w0]`` row per entry of ``files.json`` (offset -1 when
+    the image could not be decoded).
+    """
+    target = cache_root / f'{dataset_fingerprint(image_files, imgsz)}-{imgsz}'
+    if (target / 'index.npy').exists():
+        print(f'[cache] reusing {target}')
+        return target
+
+    staging = target.with_name(f'{target.name}.partial')
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    started = time.perf_counter()
+    tasks = [(path, imgsz) for path in image_files]
+    index = np.full((len(image_files), 5), -1, dtype=np.int64)
+    offset = 0
+    with open(staging / 'images.u8', 'wb') as out:
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            decoded = pool.map(decode_resized, tasks, chunksize=max(1, min(64, len(tasks) // (workers * 4))))
+        else:
+            pool = None
+            decoded = map(decode_resized, tasks)
+        try:
+            for row, (image, (h0, w0)) in enumerate(decoded):
+                if image is None:
+                    continue
+                index[row] = (offset, image.shape[0], image.shape[1], h0, w0)
+                out.write(image.data)
+                offset += image.nbytes
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    np.save(staging / 'index.npy', index)
+    (staging / 'files.json').write_text(json.dumps(image_files), encoding='utf-8')
+    os.replace(staging, target)
+    print(
+        f'[cache] decoded {len(image_files)} images to {target} '
+        f'({offset / 2**30:.2f} GiB) in {time.perf_counter() - started:.1f}s'
+    )
+    return target
+
+
+class CachedImages:
+    """Stand-in for ``dataset.ims`` that serves pre-resized images from a memory-mapped cache.
+
+    The mapping is opened lazily in each loader worker and never pickled.
+    Each lookup returns a copy, because some augmentations write into the
+    image in place; assignments (RAM caching, buffer eviction) are ignored, so
+    uncached images simply fall back to decoding.
+    """
+
+    def __init__(self, cache_dir: Path, rows: np.ndarray, index: np.ndarray) -> None:
+        self.path = cache_dir / 'images.u8'
+        self.rows = rows
+        self.index = index
+        self._data: np.memmap | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {'path': self.path, 'rows': self.rows, 'index': self.index, '_data': None}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, i: int) -> np.ndarray | None:
+        row = self.rows[i]
+        if row < 0:
+            return None
+        offset, height, width, _, _ = (int(value) for value in self.index[row])
+        if offset < 0:
+            return None
+        if self._data is None:
+            self._data = np.memmap(self.path, dtype=np.uint8, mode='r')
+        return self._data[offset : offset + height * width * 3].reshape(height, width, 3).copy()
+
+    def __setitem__(self, i: int, value: object) -> None:
+        pass
 
 
-def main() -> None:
-    args = parse_args()
+class PinnedList(list):
+    """List whose entries cannot be cleared back to ``None`` by buffer eviction."""
+
+    def __setitem__(self, i: Any, value: Any) -> None:
+        if value is not None:
+            super().__setitem__(i, value)
+
+
+def attach_image_cache(dataset: Any, cache_dir: Path) -> int:
+    """Point an Ultralytics dataset's image slots at ``cache_dir``; returns how many images are served from it."""
+    files = json.loads((cache_dir / 'files.json').read_text(encoding='utf-8'))
+    index = np.load(cache_dir / 'index.npy')
+    lookup = {path: row for row, path in enumerate(files)}
+    rows = np.array([lookup.get(path, -1) for path in dataset.im_files], dtype=np.int64)
+    hw0, hw = PinnedList(), PinnedList()
+    for row in rows:
+        if row >= 0 and index[row, 0] >= 0:
+            hw.append((int(index[row, 1]), int(index[row, 2])))
+            hw0.append((int(index[row, 3]), int(index[row, 4])))
+        else:
+            hw.append(None)
+            hw0.append(None)
+    dataset.ims = CachedImages(cache_dir, rows, index)
+    dataset.im_hw0, dataset.im_hw = hw0, hw
+    return sum(1 for value in hw if value is not None)
+
+
+def make_image_cache_trainer(cache_root: Path, workers: int) -> type:
+    from ultralytics.models.yolo.detect import DetectionTrainer
+
+    class ImageCacheTrainer(DetectionTrainer):
+        def build_dataset(self, img_path: str, mode: str = 'train', batch: int | None = None) -> Any:
+            dataset = super().build_dataset(img_path, mode, batch)
+            cache_dir = build_image_cache(list(dataset.im_files), dataset.imgsz, cache_root, workers)
+            served = attach_image_cache(dataset, cache_dir)
+            print(f'[cache] {mode}: {served}/{len(dataset.im_files)} images served from {cache_dir.name}')
+            return dataset
+
+    return ImageCacheTrainer
+
+
+class ThroughputMonitor:
+    """Splits each training epoch into time waiting on the data loader and time in the training step.
+
+    Wait is measured from the end of one step (or the epoch start) to the next
+    batch arriving; compute from the batch arriving to the end of its step.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter, sync: Callable[[], None] | None = None) -> None:
+        self.clock = clock
+        self.sync = sync
+        self.epochs: list[dict[str, float | int]] = []
+        self._epoch_started = self._mark = 0.0
+        self._wait = self._compute = 0.0
+        self._batches = 0
+
+    def epoch_start(self) -> None:
+        self._epoch_started = self._mark = self.clock()
+        self._wait = self._compute = 0.0
+        self._batches = 0
+
+    def batch_start(self) -> None:
+        now = self.clock()
+        self._wait += now - self._mark
+        self._mark = now
+
+    def batch_end(self) -> None:
+        if self.sync is not None:
+            # Kernels run asynchronously; without a sync the step looks free and the wait absorbs it.
+            self.sync()
+        now = self.clock()
+        self._compute += now - self._mark
+        self._mark = now
+        self._batches += 1
+
+    def epoch_end(self, epoch: int, images: int) -> dict[str, float | int]:
+        wall = self.clock() - self._epoch_started
+        record = {
+            'epoch': epoch,
+            'batches': self._batches,
+            'images': images,
+            'wall_s': round(wall, 3),
+            'data_wait_s': round(self._wait, 3),
+            'compute_s': round(self._compute, 3),
+            'images_per_s': round(images / wall, 2) if wall > 0 else 0.0,
+            'data_wait_share': round(self._wait / wall, 4) if wall > 0 else 0.0,
+        }
+        self.epochs.append(record)
+        return record
+
+    def summary(self) -> dict[str, Any]:
+        # The first epoch includes worker start-up and cache warm-up; report steady state separately.
+        steady = self.epochs[1:] or self.epochs
+        wall = sum(epoch['wall_s'] for epoch in steady)
+        wait = sum(epoch['data_wait_s'] for epoch in steady)
+        images = sum(epoch['images'] for epoch in steady)
+        share = wait / wall if wall > 0 else 0.0
+        return {
+            'epochs': self.epochs,
+            'steady_images_per_s': round(images / wall, 2) if wall > 0 else 0.0,
+            'steady_data_wait_share': round(share, 4),
+            'input_bound': share > DATA_WAIT_WARNING,
+        }
+
+    def attach(self, model: Any) -> None:
+        def on_epoch_end(trainer: Any) -> None:
+            record = self.epoch_end(trainer.epoch + 1, len(trainer.train_loader.dataset))
+            print(
+                f"[throughput] epoch {record['epoch']}: {record['images_per_s']} img/s, "
+                f"data wait {record['data_wait_s']}s / compute {record['compute_s']}s "
+                f"({record['data_wait_share']:.0%} waiting)"
+            )
+
+        model.add_callback('on_train_epoch_start', lambda trainer: self.epoch_start())
+        model.add_callback('on_train_batch_start', lambda trainer: self.batch_start())
+        model.add_callback('on_train_batch_end', lambda trainer: self.batch_end())
+        model.add_callback('on_train_epoch_end', on_epoch_end)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     resolved_device, device_warning = resolve_torch_device(args.device)
     if device_warning:
         print(f'[device] {device_warning}')
@@ -71,19 +346,52 @@ def main() -> None:
     project_path = resolve_output_path(args.project)
 
     model = YOLO(str(model_path))
+    monitor = None
+    if args.throughput:
+        sync = None
+        if resolved_device not in {'cpu', 'mps'}:
+            import torch
+
+            sync = torch.cuda.synchronize
+        monitor = ThroughputMonitor(sync=sync)
+        monitor.attach(model)
+
+    trainer = None
+    if args.cache == 'memmap':
+        if ',' in str(resolved_device):
+            print('[cache] memmap cache is not wired into multi-GPU (DDP) training; loading images directly')
+        else:
+            trainer = make_image_cache_trainer(resolve_output_path(args.cache_dir), args.workers)
+
     results = model.train(
         data=str(data_path),
         epochs=args.epochs,
         imgsz=args.imgsz,
         batch=args.batch,
+        workers=args.workers,
+        cache=args.cache if args.cache in {'ram', 'disk'} else False,
         device=resolved_device,
         project=str(project_path),
         name=args.name,
+        exist_ok=args.exist_ok,
+        resume=args.resume,
+        trainer=trainer,
     )
 
     save_dir = Path(results.save_dir)
     print(f'Training done: {save_dir}')
 
+    if monitor is not None and monitor.epochs:
+        report = monitor.summary()
+        report_path = save_dir / 'throughput.json'
+        report_path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(
+            f"[throughput] steady state {report['steady_images_per_s']} img/s, "
+            f"{report['steady_data_wait_share']:.0%} of epoch time waiting on data: {report_path}"
+        )
+        if report['input_bound']:
+            print('[throughput] input-bound: raise --workers, use --cache memmap, or move the dataset to local disk')
+
     best_pt = save_dir / 'weights' / 'best.pt'
     if best_pt.exists():
         print(f'Best checkpoint: {best_pt}')
@@ -2,6 +2,7 @@ package config
 
 import (
 	"bytes"
+	"context"
 	"fmt"
 	"net"
 	"net/url"
@@ -39,9 +40,25 @@ type ServerConfig struct {
 }
 
 // UpstreamConfig defines the backend FastAPI service connection.
+//
+// When SocketPath is set, the upstream is reached over that Unix domain
+// socket and BaseURL only supplies the scheme and Host header.
 type UpstreamConfig struct {
-	BaseURL  string `yaml:"base_url"`
-	TimeoutS int    `yaml:"timeout_s"`
+	BaseURL    string `yaml:"base_url"`
+	SocketPath string `yaml:"socket_path"`
+	TimeoutS   int    `yaml:"timeout_s"`
+}
+
+// DialContext returns the dial function for upstream connections. With a
+// SocketPath every connection goes to the socket, whatever address is asked for.
+func (u UpstreamConfig) DialContext(dialer *net.Dialer) func(ctx context.Context, network, address string) (net.Conn, error) {
+	socketPath := strings.TrimSpace(u.SocketPath)
+	if socketPath == "" {
+		return dialer.DialContext
+	}
+	return func(ctx context.Context, _, _ string) (net.Conn, error) {
+		return dialer.DialContext(ctx, "unix", socketPath)
+	}
 }
 
 // DBConfig defines database connection settings.
@@ -512,6 +529,9 @@ func applyEnvOverrides(cfg *Config) {
 	if cfg == nil {
 		return
 	}
+	if value := strings.TrimSpace(os.Getenv("LYCHEE_UPSTREAM_SOCKET_PATH")); value != "" {
+		cfg.Upstream.SocketPath = value
+	}
 	if value := strings.TrimSpace(os.Getenv("LYCHEE_AUTH_MODE")); value != "" {
 		cfg.Auth.Mode = AuthModeConfig(strings.ToLower(value))
 	}
@@ -5,7 +5,9 @@ import (
 	"fmt"
 	"io"
 	"log/slog"
+	"net"
 	"net/http"
+	"strings"
 	"time"
 
 	"github.com/lychee-ripe/gateway/internal/config"
@@ -33,8 +35,13 @@ type healthResponse struct {
 // Health returns an HTTP handler that checks its own liveness and the upstream
 // FastAPI /v1/health endpoint, returning an aggregated status.
 func Health(cfg config.UpstreamConfig, logger *slog.Logger) http.HandlerFunc {
-	client := &http.Client{
-		Timeout: time.Duration(cfg.TimeoutS) * time.Second,
+	timeout := time.Duration(cfg.TimeoutS) * time.Second
+	client := &http.Client{Timeout: timeout}
+	if strings.TrimSpace(cfg.SocketPath) != "" {
+		// Keep the default transport's proxy, timeouts and idle limits; only the dial changes.
+		transport := http.DefaultTransport.(*http.Transport).Clone()
+		transport.DialContext = cfg.DialContext(&net.Dialer{Timeout: timeout, KeepAlive: 30 * time.Second})
+		client.Transport = transport
 	}
 
 	return func(w http.ResponseWriter, r *http.Request) {
@@ -2,8 +2,10 @@ package handler
 
 import (
 	"encoding/json"
+	"net"
 	"net/http"
 	"net/http/httptest"
+	"path/filepath"
 	"testing"
 
 	"github.com/lychee-ripe/gateway/internal/config"
@@ -72,3 +74,32 @@ func TestHealthUpstreamDown(t *testing.T) {
 		t.Errorf("status = %q, want degraded", resp.Status)
 	}
 }
+
+func TestHealthUpstreamUnixSocket(t *testing.T) {
+	socketPath := filepath.Join(t.TempDir(), "inference-api.sock")
+	listener, err := net.Listen("unix", socketPath)
+	if err != nil {
+		t.Skipf("unix sockets unavailable: %v", err)
+	}
+
+	upstream := httptest.NewUnstartedServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		w.Header().Set("Content-Type", "application/json")
+		_, _ = w.Write([]byte(`{"status":"ok","model":{"model_version":"1.0.0","schema_version":"v1","adapter":"yolo","loaded":true}}`))
+	}))
+	upstream.Listener.Close()
+	upstream.Listener = listener
+	upstream.Start()
+	defer upstream.Close()
+
+	cfg := config.UpstreamConfig{
+		BaseURL:    "http://inference-api:8000",
+		SocketPath: socketPath,
+		TimeoutS:   5,
+	}
+	rec := httptest.NewRecorder()
+	Health(cfg, slog.Default())(rec, httptest.NewRequest(http.MethodGet, "/healthz", nil))
+
+	if rec.Code != http.StatusOK {
+		t.Fatalf("status = %d, body = %q", rec.Code, rec.Body.String())
+	}
+}
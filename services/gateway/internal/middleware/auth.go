@@ -274,6 +274,9 @@ func isPublicPath(path string) bool {
 	return strings.HasPrefix(path, "/v1/trace/")
 }
 
+// isAuthorized is an operator allowlist; everything else, including the
+// inference service's /v1/debug/ profiling and /v1/jobs bulk endpoints, is
+// admin only.
 func isAuthorized(r *http.Request, role domain.UserRole) bool {
 	path := r.URL.Path
 	method := r.Method
@@ -1,6 +1,7 @@
 package proxy
 
 import (
+	"context"
 	"crypto/tls"
 	"io"
 	"log/slog"
@@ -22,11 +23,12 @@ func New(cfg config.UpstreamConfig, logger *slog.Logger) (http.Handler, error) {
 		return nil, err
 	}
 
+	dial := cfg.DialContext(&net.Dialer{
+		Timeout:   time.Duration(cfg.TimeoutS) * time.Second,
+		KeepAlive: 30 * time.Second,
+	})
 	transport := &http.Transport{
-		DialContext: (&net.Dialer{
-			Timeout:   time.Duration(cfg.TimeoutS) * time.Second,
-			KeepAlive: 30 * time.Second,
-		}).DialContext,
+		DialContext:           dial,
 		MaxIdleConns:          100,
 		IdleConnTimeout:       90 * time.Second,
 		TLSHandshakeTimeout:   10 * time.Second,
@@ -58,6 +60,7 @@ func New(cfg config.UpstreamConfig, logger *slog.Logger) (http.Handler, error) {
 	return &handler{
 		proxy:   rp,
 		target:  target,
+		dial:    dial,
 		timeout: time.Duration(cfg.TimeoutS) * time.Second,
 		logger:  logger,
 	}, nil
@@ -66,6 +69,7 @@ func New(cfg config.UpstreamConfig, logger *slog.Logger) (http.Handler, error) {
 type handler struct {
 	proxy   *httputil.ReverseProxy
 	target  *url.URL
+	dial    func(ctx context.Context, network, address string) (net.Conn, error)
 	timeout time.Duration
 	logger  *slog.Logger
 }
@@ -89,7 +93,9 @@ func (h *handler) handleWebSocket(w http.ResponseWriter, r *http.Request) {
 	stripSensitiveQueryParam(r, "access_token")
 
 	// Dial upstream, using TLS when the upstream scheme is HTTPS.
-	rawConn, err := net.DialTimeout("tcp", h.target.Host, h.timeout)
+	dialCtx, cancel := context.WithTimeout(r.Context(), h.timeout)
+	rawConn, err := h.dial(dialCtx, "tcp", h.target.Host)
+	cancel()
 	if err != nil {
 		h.logger.Error("ws: dial upstream failed", "error", err)
 		http.Error(w, `{"error":"upstream unavailable"}`, http.StatusBadGateway)
@@ -3,8 +3,10 @@ package proxy
 import (
 	"bufio"
 	"log/slog"
+	"net"
 	"net/http"
 	"net/http/httptest"
+	"path/filepath"
 	"strings"
 	"testing"
 
@@ -142,3 +144,38 @@ func TestHTTPProxyForwarding(t *testing.T) {
 func readHTTPRequest(raw string) (*http.Request, error) {
 	return http.ReadRequest(bufio.NewReader(strings.NewReader(raw)))
 }
+
+func TestUnixSocketUpstream(t *testing.T) {
+	socketPath := filepath.Join(t.TempDir(), "inference-api.sock")
+	listener, err := net.Listen("unix", socketPath)
+	if err != nil {
+		t.Skipf("unix sockets unavailable: %v", err)
+	}
+
+	upstream := httptest.NewUnstartedServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		_, _ = w.Write([]byte(r.Host + " " + r.URL.Path))
+	}))
+	upstream.Listener.Close()
+	upstream.Listener = listener
+	upstream.Start()
+	defer upstream.Close()
+
+	h, err := New(config.UpstreamConfig{
+		BaseURL:    "http://inference-api:8000",
+		SocketPath: socketPath,
+		TimeoutS:   5,
+	}, slog.Default())
+	if err != nil {
+		t.Fatal(err)
+	}
+
+	rec := httptest.NewRecorder()
+	h.ServeHTTP(rec, httptest.NewRequest(http.MethodGet, "/v1/health", nil))
+
+	if rec.Code != http.StatusOK {
+		t.Fatalf("status = %d, body = %q", rec.Code, rec.Body.String())
+	}
+	if got := rec.Body.String(); got != "inference-api:8000 /v1/health" {
+		t.Errorf("upstream saw %q", got)
+	}
+}
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import socket
+import struct
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from pydantic import ValidationError
+
+from app.inference.detections import RIPENESS_CODES
+from app.inference.scheduler import WorkClass
+from app.inference.stream_config import negotiate_stream_settings
+from app.schemas.api import StreamConfigRequest, StreamSettings
+from app.schemas.common import Detection, FrameResult, FrameSummary, SessionSummary
+
+if TYPE_CHECKING:
+    from starlette.datastructures import State
+
+    from app.inference.detections import DetectionBatch
+
+FRAMED_VERSION = 1
+# body length, excluding these four bytes
+LENGTH_PREFIX = struct.Struct("<I")
+# message kind, protocol version, sequence number
+MESSAGE_HEADER = struct.Struct("<BB2xI")
+# client timestamp (ms); negative means "use the server clock"
+FRAME_HEADER = struct.Struct("<q")
+# frame index, timestamp (ms), detector input size (0 = unknown), detection count
+RESULT_HEADER = struct.Struct("<IqII")
+# x1, y1, x2, y2, confidence, ripeness code, track id (-1 = untracked)
+DETECTION_RECORD = struct.Struct("<5fB3xi")
+# DETECTION_RECORD as a structured dtype, so a whole DetectionBatch packs in one pass.
+DETECTION_DTYPE = np.dtype(
+    {
+        "names": ["box", "confidence", "ripeness", "track_id"],
+        "formats": [("<f4", (4,)), "<f4", "u1", "<i4"],
+        "offsets": [0, 16, 20, 24],
+        "itemsize": DETECTION_RECORD.size,
+    }
+)
+_RIPENESS_INDEX = {label: code for code, label in enumerate(RIPENESS_CODES)}
+
+
+class MessageKind(IntEnum):
+    FRAME = 0x01
+    CONFIG = 0x02
+    CLOSE = 0x03
+    RESULT = 0x81
+    CONFIG_ACK = 0x82
+    SUMMARY = 0x83
+    ERROR = 0xFF
+
+
+class FramingError(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class Message:
+    kind: MessageKind
+    sequence: int
+    body: bytes
+
+
+def encode_message(kind: MessageKind, sequence: int, body: bytes = b"") -> bytes:
+    header = MESSAGE_HEADER.pack(kind, FRAMED_VERSION, sequence)
+    return LENGTH_PREFIX.pack(len(header) + len(body)) + header + body
+
+
+def encode_frame(sequence: int, payload: bytes, timestamp_ms: int = -1) -> bytes:
+    return encode_message(MessageKind.FRAME, sequence, FRAME_HEADER.pack(timestamp_ms) + payload)
+
+
+def encode_result(sequence: int, result: FrameResult, columns: tuple[DetectionBatch, np.ndarray] | None = None) -> bytes:
+    """Pack a RESULT; ``columns`` is the ``(DetectionBatch, ripeness codes)`` behind ``result`` when known."""
+    header = RESULT_HEADER.pack(result.frame_index, result.timestamp_ms, result.imgsz or 0, len(result.detections))
+    if columns is None:
+        parts = [header]
+        for det in result.detections:
+            track_id = -1 if det.track_id is None else det.track_id
+            parts.append(DETECTION_RECORD.pack(*det.bbox, det.confidence, _RIPENESS_INDEX[det.ripeness], track_id))
+        return encode_message(MessageKind.RESULT, sequence, b"".join(parts))
+
+    detections, ripeness = columns
+    records = np.zeros(len(detections), dtype=DETECTION_DTYPE)
+    records["box"] = detections.boxes
+    records["confidence"] = detections.confidences
+    records["ripeness"] = ripeness
+    # UNTRACKED is -1, the wire value for "untracked".
+    records["track_id"] = detections.track_ids
+    return encode_message(MessageKind.RESULT, sequence, header + records.tobytes())
+
+
+def decode_result(body: bytes) -> FrameResult:
+    """Rebuild the ``FrameResult`` a RESULT body was encoded from (float32 precision)."""
+    frame_index, timestamp_ms, imgsz, count = RESULT_HEADER.unpack_from(body)
+    if len(body) != RESULT_HEADER.size + count * DETECTION_RECORD.size:
+        raise FramingError("Result body length does not match its detection count")
+    detections = []
+    summary = FrameSummary()
+    for x1, y1, x2, y2, confidence, code, track_id in DETECTION_RECORD.iter_unpack(body[RESULT_HEADER.size :]):
+        ripeness = RIPENESS_CODES[code]
+        detections.append(
+            Detection(
+                bbox=(x1, y1, x2, y2),
+                ripeness=ripeness,
+                confidence=confidence,
+                track_id=None if track_id < 0 else track_id,
+            )
+        )
+        setattr(summary, ripeness, getattr(summary, ripeness) + 1)
+    summary.total = len(detections)
+    return FrameResult(
+        frame_index=frame_index,
+        timestamp_ms=timestamp_ms,
+        detections=detections,
+        frame_summary=summary,
+        imgsz=imgsz or None,
+    )
+
+
+def parse_message(data: bytes) -> Message:
+    if len(data) < MESSAGE_HEADER.size:
+        raise FramingError("Message is shorter than its header")
+    kind, version, sequence = MESSAGE_HEADER.unpack_from(data)
+    if version != FRAMED_VERSION:
+        raise FramingError(f"Unsupported framed protocol version: {version}")
+    try:
+        message_kind = MessageKind(kind)
+    except ValueError as exc:
+        raise FramingError(f"Unknown message kind: {kind:#x}") from exc
+    return Message(kind=message_kind, sequence=sequence, body=data[MESSAGE_HEADER.size :])
+
+
+async def read_message(reader: asyncio.StreamReader, max_bytes: int) -> Message | None:
+    """Read one length-prefixed message; ``None`` on a clean end of stream."""
+    try:
+        prefix = await reader.readexactly(LENGTH_PREFIX.size)
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial:
+            raise FramingError("Connection closed inside a length prefix") from exc
+        return None
+    (length,) = LENGTH_PREFIX.unpack(prefix)
+    if length > max_bytes:
+        raise FramingError(f"Message of {length} bytes exceeds the {max_bytes} byte limit")
+    return parse_message(await reader.readexactly(length))
+
+
+async def _serve_connection(state: State, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    # Resolved per call so tests can patch the decoder the WebSocket path uses.
+    from app.api.v1 import endpoints
+
+    pipeline = state.pipeline
+    scheduler = state.scheduler
+    service_cfg = state.service_cfg
+    session = pipeline.create_stream_session()
+    session_key = object()
+    max_bytes = service_cfg.max_upload_mb * 1024 * 1024 + MESSAGE_HEADER.size + FRAME_HEADER.size
+    frames_received = 0
+    started = time.perf_counter()
+
+    def send_error(sequence: int, detail: str) -> None:
+        writer.write(encode_message(MessageKind.ERROR, sequence, detail.encode("utf-8")))
+
+    try:
+        while True:
+            try:
+                message = await read_message(reader, max_bytes)
+            except FramingError as exc:
+                # The stream cannot be resynchronised after a bad prefix.
+                send_error(0, str(exc))
+                break
+            if message is None or message.kind == MessageKind.CLOSE:
+                break
+
+            if message.kind == MessageKind.CONFIG:
+                if frames_received:
+                    send_error(message.sequence, "Config must be sent before the first frame")
+                    continue
+                try:
+                    config_request = StreamConfigRequest.model_validate_json(message.body or b"{}")
+                except ValidationError as exc:
+                    send_error(message.sequence, f"Invalid config: {exc.errors()}")
+                    continue
+                settings = negotiate_stream_settings(config_request, service_cfg, state.model_cfg)
+                session = pipeline.create_stream_session(settings)
+                ack = settings.model_dump_json().encode("utf-8")
+                writer.write(encode_message(MessageKind.CONFIG_ACK, message.sequence, ack))
+                await writer.drain()
+                continue
+
+            if message.kind != MessageKind.FRAME:
+                send_error(message.sequence, f"Unexpected message kind: {message.kind.name}")
+                continue
+            if len(message.body) <= FRAME_HEADER.size:
+                send_error(message.sequence, "Empty frame payload")
+                continue
+
+            frames_received += 1
+            (timestamp_ms,) = FRAME_HEADER.unpack_from(message.body)
+            if timestamp_ms < 0:
+                timestamp_ms = int((time.perf_counter() - started) * 1000)
+            if not pipeline.admit_stream_frame(session, timestamp_ms):
+                send_error(message.sequence, "Frame dropped: exceeds negotiated target_fps")
+                continue
+
+            payload = message.body[FRAME_HEADER.size :]
+            try:
+                result = await scheduler.run(
+                    functools.partial(
+                        endpoints._run_stream_frame, pipeline, payload, session, timestamp_ms, time.perf_counter()
+                    ),
+                    work_class=WorkClass.STREAM,
+                    session_key=session_key,
+                    deadline_s=service_cfg.stream_frame_deadline_ms / 1000.0,
+                )
+            except Exception as exc:
+                send_error(message.sequence, str(exc))
+                continue
+            # One frame in flight per connection, so the session's last columns are this result's.
+            columns = (session.last_detections, session.last_ripeness) if session.last_detections is not None else None
+            writer.write(encode_result(message.sequence, result, columns))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        summary = session.aggregator.build_summary().model_dump_json().encode("utf-8")
+        try:
+            writer.write(encode_message(MessageKind.SUMMARY, 0, summary))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+
+async def start_framed_server(state: State, path: Path) -> asyncio.AbstractServer:
+    """Listen for framed-protocol clients on a Unix domain socket at ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.is_socket():
+        # Left behind by a previous process that did not shut down cleanly.
+        path.unlink()
+    server = await asyncio.start_unix_server(functools.partial(_serve_connection, state), path=str(path))
+    os.chmod(path, 0o660)
+    return server
+
+
+class FramedClient:
+    """Blocking client for the framed protocol, for co-located callers and benchmarks."""
+
+    def __init__(self, path: str | Path, timeout: float | None = 30.0) -> None:
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(str(path))
+        self._sequence = 0
+        self.summary: SessionSummary | None = None
+
+    def __enter__(self) -> FramedClient:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _recv_exactly(self, size: int) -> bytes:
+        view = memoryview(bytearray(size))
+        received = 0
+        while received < size:
+            count = self._sock.recv_into(view[received:])
+            if not count:
+                raise ConnectionError("Framed connection closed")
+            received += count
+        return view.tobytes()
+
+    def receive(self) -> Message:
+        (length,) = LENGTH_PREFIX.unpack(self._recv_exactly(LENGTH_PREFIX.size))
+        return parse_message(self._recv_exactly(length))
+
+    def _request(self, data: bytes) -> Message:
+        self._sock.sendall(data)
+        message = self.receive()
+        if message.kind == MessageKind.ERROR:
+            raise RuntimeError(message.body.decode("utf-8"))
+        return message
+
+    def _next_sequence(self) -> int:
+        self._sequence += 1
+        return self._sequence
+
+    def configure(self, **config: Any) -> StreamSettings:
+        body = StreamConfigRequest(**config).model_dump_json().encode("utf-8")
+        message = self._request(encode_message(MessageKind.CONFIG, self._next_sequence(), body))
+        return StreamSettings.model_validate_json(message.body)
+
+    def infer(self, payload: bytes, timestamp_ms: int = -1) -> FrameResult:
+        message = self._request(encode_frame(self._next_sequence(), payload, timestamp_ms))
+        return decode_result(message.body)
+
+    def close(self) -> SessionSummary | None:
+        if self._sock.fileno() < 0:
+            return self.summary
+        try:
+            self._sock.sendall(encode_message(MessageKind.CLOSE, self._next_sequence()))
+            message = self.receive()
+            if message.kind == MessageKind.SUMMARY:
+                self.summary = SessionSummary.model_validate_json(message.body)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._sock.close()
+        return self.summary
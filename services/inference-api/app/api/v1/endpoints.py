@@ -1,22 +1,55 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import json
 import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
 
-import numpy as np
-from fastapi import APIRouter, File, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, File, HTTPException, Query, Request, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
+from app.inference.flow_control import FlowController, FlowSettings
+from app.inference.profiling import ProfilerBusy
+from app.inference.scheduler import DeadlineExceeded, QueueFull, WorkClass
+from app.inference.stream_config import negotiate_stream_settings
 from app.schemas.api import (
+    CpuProfileResponse,
     CurrentModelResponse,
     HealthResponse,
     ImageInferResponse,
+    IngestListResponse,
+    IngestSessionInfo,
+    IngestStartRequest,
+    JobInfo,
+    JobListResponse,
+    JobSubmitRequest,
+    MemoryProfileResponse,
+    MetricsResponse,
+    StreamConfigEnvelope,
+    StreamConfigRequest,
+    StreamFlowEnvelope,
     StreamFrameEnvelope,
     StreamSummaryEnvelope,
 )
 
+if TYPE_CHECKING:
+    import numpy as np
+
+    from app.inference.buffers import BufferPool
+    from app.inference.pipeline import InferencePipeline, StreamSession
+    from app.inference.recording import RecordingHandle
+    from app.schemas.common import FrameResult
+
 router = APIRouter()
 
 
 def _decode_image_bytes(data: bytes) -> np.ndarray:
+    import numpy as np
+
     try:
         import cv2
     except Exception as exc:
@@ -29,6 +62,59 @@ def _decode_image_bytes(data: bytes) -> np.ndarray:
     return img
 
 
+def _decode_stream_frame(data: bytes, input_format: str, pool: BufferPool | None = None) -> np.ndarray:
+    from app.inference.frames import is_raw_frame, parse_raw_frame, to_adapter_frame
+
+    if is_raw_frame(data):
+        pixels, pixel_format = parse_raw_frame(data)
+        return to_adapter_frame(pixels, pixel_format, target=input_format, pool=pool)
+    # cv2.imdecode has no output-buffer overload in Python; the pipeline moves
+    # the frame into a pooled buffer at its first resize.
+    return _decode_image_bytes(data)
+
+
+def _run_stream_frame(
+    pipeline: InferencePipeline,
+    payload: bytes,
+    session: StreamSession,
+    timestamp_ms: int,
+    submitted_at: float,
+) -> FrameResult:
+    """Decode and infer one stream frame on a scheduler worker; shared by every stream transport."""
+    queue_wait_ms = (time.perf_counter() - submitted_at) * 1000.0
+    frame = _decode_stream_frame(payload, pipeline.detector.input_format, pipeline.buffer_pool)
+    try:
+        return pipeline.infer_stream_frame(frame, session, timestamp_ms, queue_wait_ms=queue_wait_ms)
+    finally:
+        if pipeline.buffer_pool is not None:
+            pipeline.buffer_pool.release(frame)
+
+
+def _parse_config_command(text: str) -> StreamConfigRequest | None:
+    stripped = text.strip()
+    if stripped.lower() == 'config':
+        return StreamConfigRequest()
+    if not stripped.startswith('{'):
+        return None
+    try:
+        data = json.loads(stripped)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get('type') != 'config':
+        return None
+    return StreamConfigRequest.model_validate(data)
+
+
+def _frame_payload(envelope: StreamFrameEnvelope, output_encoding: str) -> str:
+    data = envelope.model_dump()
+    if output_encoding == 'json_compact':
+        for det in data['result']['detections']:
+            det['bbox'] = [round(v, 1) for v in det['bbox']]
+            det['confidence'] = round(det['confidence'], 3)
+        return json.dumps(data, separators=(',', ':'))
+    return json.dumps(data)
+
+
 @router.get('/health', response_model=HealthResponse)
 async def health(request: Request) -> HealthResponse:
     pipeline = request.app.state.pipeline
@@ -43,8 +129,224 @@ async def current_model(request: Request) -> CurrentModelResponse:
     return CurrentModelResponse(**meta.model_dump())
 
 
+@router.get('/metrics', response_model=MetricsResponse)
+async def metrics(request: Request) -> MetricsResponse:
+    pipeline = request.app.state.pipeline
+    pool = pipeline.buffer_pool
+    recorder = request.app.state.recorder
+    return MetricsResponse(
+        scheduler=request.app.state.scheduler.stats(),
+        buffer_pool=pool.stats() if pool is not None else None,
+        recorder=recorder.stats() if recorder is not None else None,
+        shadow=pipeline.shadow.stats() if pipeline.shadow is not None else None,
+    )
+
+
+def _ingest_manager(request: Request):
+    manager = request.app.state.ingest
+    if manager is None:
+        raise HTTPException(status_code=404, detail='Ingestion is disabled')
+    return manager
+
+
+@router.post('/ingest', response_model=IngestSessionInfo, status_code=201)
+async def start_ingest(request: Request, body: IngestStartRequest) -> IngestSessionInfo:
+    from app.inference.ingest import is_source_allowed
+
+    manager = _ingest_manager(request)
+    service_cfg = request.app.state.service_cfg
+    if not is_source_allowed(body.source, service_cfg.ingest_allowed_sources):
+        raise HTTPException(status_code=403, detail='Source is not in ingest_allowed_sources')
+
+    settings = negotiate_stream_settings(body.config or StreamConfigRequest(), service_cfg, request.app.state.model_cfg)
+    try:
+        session = manager.start(body.source, request.app.state.pipeline, settings, repeat=body.repeat)
+    except QueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    return IngestSessionInfo(**session.info())
+
+
+@router.get('/ingest', response_model=IngestListResponse)
+async def list_ingest(request: Request) -> IngestListResponse:
+    manager = _ingest_manager(request)
+    return IngestListResponse(sessions=[IngestSessionInfo(**s.info()) for s in manager.list()])
+
+
+@router.get('/ingest/{ingest_id}', response_model=IngestSessionInfo)
+async def get_ingest(request: Request, ingest_id: str) -> IngestSessionInfo:
+    session = _ingest_manager(request).get(ingest_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail='Ingest session not found')
+    return IngestSessionInfo(**session.info())
+
+
+@router.delete('/ingest/{ingest_id}', response_model=IngestSessionInfo)
+async def stop_ingest(request: Request, ingest_id: str) -> IngestSessionInfo:
+    manager = _ingest_manager(request)
+    # Joining the decode/inference threads blocks; keep it off the event loop.
+    session = await asyncio.to_thread(manager.remove, ingest_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail='Ingest session not found')
+    return IngestSessionInfo(**session.info())
+
+
+@router.websocket('/ingest/{ingest_id}/stream')
+async def ingest_stream(websocket: WebSocket, ingest_id: str) -> None:
+    manager = websocket.app.state.ingest
+    session = manager.get(ingest_id) if manager is not None else None
+    await websocket.accept()
+    if session is None:
+        await websocket.send_json({'type': 'error', 'detail': 'Ingest session not found'})
+        await websocket.close()
+        return
+
+    subscriber = session.subscribe()
+    try:
+        while True:
+            message = await subscriber.get()
+            if message is None:
+                break
+            await websocket.send_json(message)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.unsubscribe(subscriber)
+
+
+def _job_manager(request: Request):
+    manager = request.app.state.jobs
+    if manager is None:
+        raise HTTPException(status_code=404, detail='Bulk jobs are disabled')
+    return manager
+
+
+@router.post('/jobs', response_model=JobInfo, status_code=201)
+async def submit_job(request: Request, body: JobSubmitRequest) -> JobInfo:
+    manager = _job_manager(request)
+    if not manager.is_manifest_allowed(body.manifest):
+        raise HTTPException(status_code=403, detail='Manifest is not under bulk_allowed_roots')
+    try:
+        job = manager.submit(body.manifest, request.app.state.pipeline, batch_size=body.batch_size)
+    except QueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    return JobInfo(**job.info())
+
+
+@router.get('/jobs', response_model=JobListResponse)
+async def list_jobs(request: Request) -> JobListResponse:
+    return JobListResponse(jobs=[JobInfo(**info) for info in _job_manager(request).list()])
+
+
+@router.get('/jobs/{job_id}', response_model=JobInfo)
+async def get_job(request: Request, job_id: str) -> JobInfo:
+    info = _job_manager(request).get(job_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return JobInfo(**info)
+
+
+@router.delete('/jobs/{job_id}', response_model=JobInfo)
+async def cancel_job(request: Request, job_id: str) -> JobInfo:
+    manager = _job_manager(request)
+    # Waits for the in-flight batch to finish; keep it off the event loop.
+    if await asyncio.to_thread(manager.cancel, job_id) is None:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return JobInfo(**manager.get(job_id))
+
+
+@router.post('/jobs/{job_id}/resume', response_model=JobInfo)
+async def resume_job(request: Request, job_id: str) -> JobInfo:
+    from app.inference.jobs import JobStateError
+
+    manager = _job_manager(request)
+    try:
+        job = manager.resume(job_id, request.app.state.pipeline)
+    except JobStateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except QueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    if job is None:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return JobInfo(**job.info())
+
+
+def _iter_results(path: Path, size: int, chunk_size: int = 1 << 16):
+    """Yield the complete lines within the first ``size`` bytes of ``path``.
+
+    A running job keeps appending and a resume may truncate a torn tail, so
+    the download is bounded by the size seen at request time and never ends
+    on a half-written line.
+    """
+    with path.open('rb') as source:
+        remaining = size
+        pending = b''
+        while remaining > 0:
+            chunk = source.read(min(chunk_size, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            pending += chunk
+            cut = pending.rfind(b'\n') + 1
+            if cut:
+                yield pending[:cut]
+                pending = pending[cut:]
+
+
+@router.get('/jobs/{job_id}/results')
+async def job_results(request: Request, job_id: str) -> StreamingResponse:
+    path = _job_manager(request).results_path(job_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail='Job has no results yet')
+    return StreamingResponse(
+        _iter_results(path, path.stat().st_size),
+        media_type='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename="{job_id}.ndjson"'},
+    )
+
+
+def _profiler(request: Request):
+    profiler = request.app.state.profiler
+    if profiler is None:
+        raise HTTPException(status_code=404, detail='Profiling is disabled')
+    return profiler
+
+
+@router.post('/debug/profile/cpu', response_model=CpuProfileResponse)
+async def profile_cpu(
+    request: Request,
+    seconds: float = Query(default=10.0, gt=0.0),
+    mode: Literal['sample', 'deterministic'] = Query(default='sample'),
+) -> CpuProfileResponse:
+    profiler = _profiler(request)
+    try:
+        profile = await profiler.cpu(seconds, mode=mode, scheduler=request.app.state.scheduler)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    return CpuProfileResponse(**asdict(profile))
+
+
+@router.post('/debug/profile/memory', response_model=MemoryProfileResponse)
+async def profile_memory(
+    request: Request,
+    seconds: float = Query(default=10.0, gt=0.0),
+    top: int = Query(default=25, ge=1, le=200),
+) -> MemoryProfileResponse:
+    profiler = _profiler(request)
+    try:
+        profile = await profiler.memory(seconds, top=top)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    return MemoryProfileResponse(**asdict(profile))
+
+
 @router.post('/infer/image', response_model=ImageInferResponse)
-async def infer_image(request: Request, file: UploadFile = File(...)) -> ImageInferResponse:
+async def infer_image(
+    request: Request,
+    file: UploadFile = File(...),
+    tiled: bool = Query(default=False),
+    max_tiles: int | None = Query(default=None, ge=1),
+) -> ImageInferResponse:
     pipeline = request.app.state.pipeline
     service_cfg = request.app.state.service_cfg
 
@@ -53,9 +355,17 @@ async def infer_image(request: Request, file: UploadFile = File(...)) -> ImageIn
     if len(body) > max_bytes:
         raise HTTPException(status_code=413, detail='Uploaded file is too large')
 
-    try:
+    def run() -> tuple[FrameResult, float]:
         frame = _decode_image_bytes(body)
-        result, inference_ms = pipeline.infer_image(frame)
+        return pipeline.infer_image(frame, tiled=tiled, max_tiles=max_tiles)
+
+    try:
+        result, inference_ms = await request.app.state.scheduler.run(
+            run,
+            work_class=WorkClass.IMAGE,
+            session_key=object(),
+            deadline_s=service_cfg.image_deadline_ms / 1000.0,
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except RuntimeError as exc:
@@ -74,7 +384,16 @@ async def infer_image(request: Request, file: UploadFile = File(...)) -> ImageIn
 async def infer_stream(websocket: WebSocket) -> None:
     await websocket.accept()
     pipeline = websocket.app.state.pipeline
+    scheduler = websocket.app.state.scheduler
+    service_cfg = websocket.app.state.service_cfg
     session = pipeline.create_stream_session()
+    session_key = object()
+    output_encoding = 'json'
+    flow: FlowController | None = None
+    recorder = websocket.app.state.recorder
+    record = recorder is not None and service_cfg.recording_mode == 'all'
+    recording: RecordingHandle | None = None
+    frames_received = 0
     started = time.perf_counter()
 
     try:
@@ -88,7 +407,38 @@ async def infer_stream(websocket: WebSocket) -> None:
                 text = msg['text'].strip().lower()
                 if text in {'close', 'stop', 'eos'}:
                     break
-                await websocket.send_json({'type': 'error', 'detail': 'Unsupported text command'})
+                try:
+                    config_request = _parse_config_command(msg['text'])
+                except ValidationError as exc:
+                    await websocket.send_json({'type': 'error', 'detail': f'Invalid config: {exc.errors()}'})
+                    continue
+                if config_request is None:
+                    await websocket.send_json({'type': 'error', 'detail': 'Unsupported text command'})
+                    continue
+                if frames_received:
+                    await websocket.send_json({'type': 'error', 'detail': 'Config must be sent before the first frame'})
+                    continue
+
+                settings = negotiate_stream_settings(
+                    config_request,
+                    websocket.app.state.service_cfg,
+                    websocket.app.state.model_cfg,
+                )
+                session = pipeline.create_stream_session(settings)
+                output_encoding = settings.output_encoding
+                if settings.flow_control:
+                    flow = FlowController(
+                        FlowSettings(
+                            target_latency_ms=service_cfg.stream_flow_target_latency_ms,
+                            max_fps=settings.target_fps,
+                        ),
+                        initial_fps=settings.target_fps,
+                    )
+                record = recorder is not None and settings.record
+                if record and recording is None:
+                    recording = recorder.open_session()
+                    settings.recording_id = recording.session_id
+                await websocket.send_json(StreamConfigEnvelope(settings=settings).model_dump())
                 continue
 
             payload = msg.get('bytes')
@@ -96,12 +446,30 @@ async def infer_stream(websocket: WebSocket) -> None:
                 await websocket.send_json({'type': 'error', 'detail': 'Empty frame payload'})
                 continue
 
+            frames_received += 1
+            if record and recording is None:
+                recording = recorder.open_session()
+            received_at = time.perf_counter()
             timestamp_ms = int((time.perf_counter() - started) * 1000)
+            if not pipeline.admit_stream_frame(session, timestamp_ms):
+                await websocket.send_json({'type': 'error', 'detail': 'Frame dropped: exceeds negotiated target_fps'})
+                continue
+
+            submitted_at = time.perf_counter()
+
             try:
-                frame = _decode_image_bytes(payload)
-                result = pipeline.infer_stream_frame(frame, session, timestamp_ms)
+                result = await scheduler.run(
+                    functools.partial(_run_stream_frame, pipeline, payload, session, timestamp_ms, submitted_at),
+                    work_class=WorkClass.STREAM,
+                    session_key=session_key,
+                    deadline_s=service_cfg.stream_frame_deadline_ms / 1000.0,
+                )
             except Exception as exc:
                 await websocket.send_json({'type': 'error', 'detail': str(exc)})
+                if flow is not None and isinstance(exc, (DeadlineExceeded, QueueFull)):
+                    update = flow.observe(float('inf'), scheduler.queue_depth_per_worker())
+                    if update is not None:
+                        await websocket.send_json(StreamFlowEnvelope(**asdict(update)).model_dump())
                 continue
 
             meta = pipeline.model_meta()
@@ -110,12 +478,21 @@ async def infer_stream(websocket: WebSocket) -> None:
                 schema_version=meta.schema_version,
                 result=result,
             )
-            await websocket.send_json(envelope.model_dump())
+            await websocket.send_text(_frame_payload(envelope, output_encoding))
+            if recording is not None:
+                recorder.record_frame(recording, payload, result)
+            if flow is not None:
+                latency_ms = (time.perf_counter() - received_at) * 1000.0
+                update = flow.observe(latency_ms, scheduler.queue_depth_per_worker())
+                if update is not None:
+                    await websocket.send_json(StreamFlowEnvelope(**asdict(update)).model_dump())
     except WebSocketDisconnect:
         pass
     finally:
         meta = pipeline.model_meta()
         summary = session.aggregator.build_summary()
+        if recording is not None:
+            recorder.close_session(recording, summary)
         envelope = StreamSummaryEnvelope(
             model_version=meta.model_version,
             schema_version=meta.schema_version,
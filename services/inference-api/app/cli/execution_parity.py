@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from app.cli.offline import list_images
+from app.paths import resolve_repo_path
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from app.inference.adapters.yolo_stable import YoloStableAdapter
+    from app.settings import ModelConfig
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Compare the optimized torch execution mode against the stock Ultralytics predictor'
+    )
+    parser.add_argument('images', help='Folder of sample images')
+    parser.add_argument('--model-config', default=os.getenv('LYCHEE_MODEL_CONFIG', 'tooling/configs/model.yaml'))
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--compile', choices=['none', 'compile', 'trace'], default=None, help='Override optimized_compile')
+    parser.add_argument('--limit', type=int, default=16, help='Images to compare')
+    parser.add_argument('--iterations', type=int, default=10, help='Timed runs per image')
+    parser.add_argument('--min-recall', type=float, default=0.95, help='Exit non-zero below this matched share')
+    return parser.parse_args(argv)
+
+
+def load_frames(folder: Path, limit: int) -> list[np.ndarray]:
+    import cv2
+
+    frames = []
+    for path in list_images(folder)[: max(1, limit)]:
+        frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if frame is not None:
+            frames.append(frame)
+    if not frames:
+        raise SystemExit(f'No readable images in {folder}')
+    return frames
+
+
+def build_adapter(model_cfg: ModelConfig, **overrides: object) -> YoloStableAdapter:
+    from app.inference.adapters.yolo_stable import YoloStableAdapter
+
+    adapter = YoloStableAdapter(model_cfg.model_copy(update={'autotune': False, **overrides}))
+    adapter.load()
+    adapter.warmup()
+    return adapter
+
+
+def main(argv: list[str] | None = None) -> int:
+    from app.inference.adapters.yolo_optimized import compare_execution
+    from app.settings import load_model_config
+
+    args = parse_args(argv)
+    model_cfg = load_model_config(resolve_repo_path(args.model_config))
+    frames = load_frames(Path(args.images), args.limit)
+
+    reference = build_adapter(model_cfg, device=args.device, execution_mode='predictor')
+    candidate = build_adapter(
+        model_cfg,
+        device=args.device,
+        execution_mode='optimized',
+        optimized_compile=args.compile or model_cfg.optimized_compile,
+    )
+    report = compare_execution(
+        reference._infer,
+        candidate._infer,
+        frames,
+        model_cfg.imgsz,
+        iterations=args.iterations,
+    )
+    print(json.dumps(report.as_dict()))
+    if report.recall < args.min_recall:
+        print(f'[parity] recall {report.recall:.3f} is below {args.min_recall}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
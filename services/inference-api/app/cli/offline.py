@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+from pydantic import BaseModel
+
+from app.paths import resolve_repo_path
+from app.schemas.common import FrameResult, SessionSummary
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from app.inference.pipeline import InferencePipeline, StreamSession
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
+_END = object()
+
+
+class OfflineFrameRecord(BaseModel):
+    type: Literal['frame'] = 'frame'
+    source_index: int
+    model_version: str
+    schema_version: str
+    result: FrameResult
+
+
+class OfflineSummaryRecord(BaseModel):
+    type: Literal['summary'] = 'summary'
+    model_version: str
+    schema_version: str
+    frames: int
+    summary: SessionSummary
+
+
+@dataclass(slots=True)
+class SourceFrame:
+    source_index: int
+    timestamp_ms: int
+    frame: np.ndarray
+
+
+@dataclass(slots=True)
+class ResumeState:
+    frames: list[OfflineFrameRecord]
+    completed: bool
+    valid_bytes: int
+
+
+def list_images(folder: Path) -> list[Path]:
+    return sorted(p for p in folder.iterdir() if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES)
+
+
+def iter_video(path: Path, stride: int, start: int) -> Iterator[SourceFrame]:
+    import cv2
+
+    capture = cv2.VideoCapture(str(path))
+    if not capture.isOpened():
+        raise ValueError(f'Cannot open video: {path}')
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    try:
+        if start:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+        index = start
+        while True:
+            # grab() skips the colour conversion for frames the stride drops.
+            if not capture.grab():
+                break
+            if index % stride == 0:
+                ok, frame = capture.retrieve()
+                if not ok:
+                    break
+                yield SourceFrame(source_index=index, timestamp_ms=int(index * 1000.0 / fps), frame=frame)
+            index += 1
+    finally:
+        capture.release()
+
+
+def iter_folder(
+    images: list[Path],
+    stride: int,
+    start: int,
+    fps: float,
+    workers: int,
+) -> Iterator[SourceFrame]:
+    import cv2
+
+    def read(index: int) -> SourceFrame:
+        frame = cv2.imread(str(images[index]), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError(f'Cannot decode image: {images[index]}')
+        return SourceFrame(source_index=index, timestamp_ms=int(index * 1000.0 / fps), frame=frame)
+
+    indices = [i for i in range(start, len(images)) if i % stride == 0]
+    # A bounded window of in-flight decodes keeps order and memory in check.
+    window = max(1, workers * 2)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='offline-decode') as pool:
+        pending: deque[Future[SourceFrame]] = deque()
+        for index in indices:
+            pending.append(pool.submit(read, index))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def prefetch(source: Iterable[SourceFrame], maxsize: int) -> Iterator[SourceFrame]:
+    """Run ``source`` on a producer thread, handing frames over through a bounded queue."""
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            for item in source:
+                while not stop.is_set():
+                    try:
+                        buffer.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            buffer.put(_END)
+        except BaseException as exc:
+            buffer.put(exc)
+
+    thread = threading.Thread(target=produce, name='offline-producer', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+
+
+def batched(frames: Iterable[SourceFrame], size: int) -> Iterator[list[SourceFrame]]:
+    batch: list[SourceFrame] = []
+    for frame in frames:
+        batch.append(frame)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_resume_state(path: Path) -> ResumeState:
+    """Read back complete lines of a previous run; a torn trailing line is discarded."""
+    frames: list[OfflineFrameRecord] = []
+    completed = False
+    valid_bytes = 0
+    if not path.exists():
+        return ResumeState(frames=frames, completed=completed, valid_bytes=valid_bytes)
+    with path.open('rb') as handle:
+        for line in handle:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                data = json.loads(line)
+            except ValueError:
+                break
+            if data.get('type') == 'summary':
+                completed = True
+            elif data.get('type') == 'frame':
+                frames.append(OfflineFrameRecord.model_validate(data))
+            valid_bytes += len(line)
+    return ResumeState(frames=frames, completed=completed, valid_bytes=valid_bytes)
+
+
+def restore_session(session: StreamSession, frames: list[OfflineFrameRecord]) -> None:
+    """Rebuild aggregator counts and tracker state from already written frames."""
+    import numpy as np
+
+    from app.inference.detections import UNTRACKED, encode_ripeness
+
+    max_track_id = 0
+    for record in frames:
+        detections = record.result.detections
+        track_ids = np.array([UNTRACKED if d.track_id is None else d.track_id for d in detections], dtype=np.int64)
+        session.aggregator.update_session(encode_ripeness(d.ripeness for d in detections), track_ids)
+        max_track_id = max(max_track_id, int(track_ids.max(initial=0)))
+    if frames:
+        last = frames[-1].result.detections
+        session.tracker.seed({d.track_id: d.bbox for d in last if d.track_id is not None}, max_track_id + 1)
+        session.frame_index = frames[-1].result.frame_index + 1
+
+
+class Progress:
+    def __init__(self, total: int | None, done: int, interval_s: float = 2.0, enabled: bool = True) -> None:
+        self.total = total
+        self.done = done
+        self.interval_s = interval_s
+        self.enabled = enabled
+        self._started = time.perf_counter()
+        self._start_done = done
+        self._last = 0.0
+
+    def update(self, count: int, force: bool = False) -> None:
+        self.done += count
+        now = time.perf_counter()
+        if not self.enabled or (not force and now - self._last < self.interval_s):
+            return
+        self._last = now
+        rate = (self.done - self._start_done) / max(now - self._started, 1e-9)
+        if self.total:
+            remaining = max(self.total - self.done, 0) / rate if rate > 0 else float('inf')
+            line = f'[offline] {self.done}/{self.total} frames {rate:.1f} fps eta {remaining:.0f}s'
+        else:
+            line = f'[offline] {self.done} frames {rate:.1f} fps'
+        print(line, file=sys.stderr, flush=True)
+
+
+def run_offline(
+    pipeline: InferencePipeline,
+    frames: Iterable[SourceFrame],
+    output: Path,
+    *,
+    batch_size: int = 8,
+    resume: ResumeState | None = None,
+    progress: Progress | None = None,
+) -> SessionSummary:
+    session = pipeline.create_stream_session()
+    written = 0
+    mode = 'wb'
+    if resume is not None and resume.frames:
+        restore_session(session, resume.frames)
+        written = len(resume.frames)
+        mode = 'r+b'
+    meta = pipeline.model_meta()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open(mode) as sink:
+        if mode == 'r+b':
+            sink.seek(resume.valid_bytes)
+            sink.truncate()
+        for batch in batched(frames, batch_size):
+            results = pipeline.infer_stream_batch(
+                [item.frame for item in batch],
+                session,
+                [item.timestamp_ms for item in batch],
+            )
+            lines = [
+                OfflineFrameRecord(
+                    source_index=item.source_index,
+                    model_version=meta.model_version,
+                    schema_version=meta.schema_version,
+                    result=result,
+                ).model_dump_json()
+                for item, result in zip(batch, results)
+            ]
+            sink.write(('\n'.join(lines) + '\n').encode('utf-8'))
+            sink.flush()
+            written += len(batch)
+            if progress is not None:
+                progress.update(len(batch))
+
+        summary = session.aggregator.build_summary()
+        record = OfflineSummaryRecord(
+            model_version=meta.model_version,
+            schema_version=meta.schema_version,
+            frames=written,
+            summary=summary,
+        )
+        sink.write((record.model_dump_json() + '\n').encode('utf-8'))
+    if progress is not None:
+        progress.update(0, force=True)
+    return summary
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Run lychee detection over a video file or an image folder')
+    parser.add_argument('source', help='Video file or folder of images')
+    parser.add_argument('--output', required=True, help='NDJSON output path (one frame per line, summary last)')
+    parser.add_argument('--model-config', default=os.getenv('LYCHEE_MODEL_CONFIG', 'tooling/configs/model.yaml'))
+    parser.add_argument('--stride', type=int, default=1, help='Process every Nth source frame')
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--decode-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--prefetch', type=int, default=32, help='Decoded frames buffered ahead of detection')
+    parser.add_argument('--fps', type=float, default=1.0, help='Timestamp rate for image folders')
+    parser.add_argument('--overwrite', action='store_true', help='Start over instead of resuming an existing output')
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args(argv)
+    if args.stride < 1 or args.batch_size < 1 or args.prefetch < 1:
+        parser.error('--stride, --batch-size and --prefetch must be >= 1')
+    return args
+
+
+def build_frames(args: argparse.Namespace, start: int) -> tuple[Iterable[SourceFrame], int | None]:
+    source = Path(args.source)
+    if source.is_dir():
+        images = list_images(source)
+        total = len(range(0, len(images), args.stride))
+        return iter_folder(images, args.stride, start, args.fps, args.decode_workers), total
+
+    import cv2
+
+    capture = cv2.VideoCapture(str(source))
+    frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    capture.release()
+    total = len(range(0, frame_count, args.stride)) if frame_count > 0 else None
+    return iter_video(source, args.stride, start), total
+
+
+def build_offline_pipeline(model_config: str, batch_size: int) -> InferencePipeline:
+    from app.inference.factory import build_detector
+    from app.inference.pipeline import InferencePipeline
+    from app.settings import DEFAULT_SCHEMA_VERSION, load_model_config
+
+    model_cfg = load_model_config(resolve_repo_path(model_config))
+    # --batch-size is the model batch here, even above the service's cap.
+    model_cfg = model_cfg.model_copy(update={'max_batch_size': max(model_cfg.max_batch_size, batch_size)})
+    detector = build_detector(model_cfg)
+    detector.load()
+    detector.warmup()
+    return InferencePipeline(
+        detector=detector,
+        model_version=model_cfg.model_version,
+        schema_version=DEFAULT_SCHEMA_VERSION,
+    )
+
+
+def main(
+    argv: list[str] | None = None,
+    pipeline_factory: Callable[[str, int], InferencePipeline] = build_offline_pipeline,
+) -> int:
+    args = parse_args(argv)
+    output = Path(args.output)
+
+    resume = None if args.overwrite else load_resume_state(output)
+    if resume is not None and resume.completed:
+        print(f'[offline] {output} is already complete; pass --overwrite to redo it', file=sys.stderr)
+        return 0
+    start = resume.frames[-1].source_index + 1 if resume is not None and resume.frames else 0
+
+    pipeline = pipeline_factory(args.model_config, args.batch_size)
+    frames, total = build_frames(args, start)
+    progress = Progress(total=total, done=len(resume.frames) if resume else 0, enabled=not args.quiet)
+    summary = run_offline(
+        pipeline,
+        prefetch(frames, args.prefetch),
+        output,
+        batch_size=args.batch_size,
+        resume=resume,
+        progress=progress,
+    )
+    print(json.dumps(summary.model_dump()))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,21 +1,19 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
 from typing import Sequence
 
 import numpy as np
 
-
-@dataclass(slots=True)
-class RawDetection:
-    bbox: tuple[float, float, float, float]
-    class_id: int
-    confidence: float
+from app.inference.detections import DetectionBatch, encode_ripeness
 
 
 class DetectorAdapter(ABC):
     name: str = "base"
+    input_format: str = "bgr"
+    imgsz: int = 640
+    # Whether several scheduler workers may call predict on one instance at once.
+    thread_safe: bool = False
 
     @abstractmethod
     def load(self) -> None:
@@ -26,13 +24,23 @@ class DetectorAdapter(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def predict(self, frame: np.ndarray) -> Sequence[RawDetection]:
+    def predict(self, frame: np.ndarray, imgsz: int | None = None) -> DetectionBatch:
         raise NotImplementedError
 
+    def predict_batch(self, frames: Sequence[np.ndarray], imgsz: int | None = None) -> list[DetectionBatch]:
+        return [self.predict(frame, imgsz=imgsz) for frame in frames]
+
     @abstractmethod
     def ripeness_from_class_id(self, class_id: int) -> str:
         raise NotImplementedError
 
+    def ripeness_codes(self, class_ids: np.ndarray) -> np.ndarray:
+        """Map class ids to ``RIPENESS_CODES`` indices, calling ``ripeness_from_class_id`` once per distinct id."""
+        if not len(class_ids):
+            return np.empty(0, dtype=np.uint8)
+        unique, inverse = np.unique(class_ids, return_inverse=True)
+        return encode_ripeness(self.ripeness_from_class_id(int(c)) for c in unique)[inverse.reshape(-1)]
+
     @property
     @abstractmethod
     def loaded(self) -> bool:
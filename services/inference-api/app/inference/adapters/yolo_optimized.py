@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import statistics
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import numpy as np
+
+from app.inference.detections import DetectionBatch, pairwise_iou
+
+CompileMode = Literal["none", "compile", "trace"]
+LETTERBOX_PAD = 114
+MAX_DETECTIONS = 300
+
+
+def letterbox(frame: np.ndarray, size: int) -> tuple[np.ndarray, float, tuple[float, float]]:
+    """Resize to fit a ``size`` square keeping aspect ratio, padding the rest with grey.
+
+    Returns the padded image, the resize ratio and the (x, y) padding so
+    boxes can be mapped back with ``unletterbox_boxes``.
+    """
+    import cv2
+
+    height, width = frame.shape[:2]
+    ratio = min(size / height, size / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+    pad_x, pad_y = (size - new_w) / 2, (size - new_h) / 2
+    if (new_w, new_h) != (width, height):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    padded = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(LETTERBOX_PAD,) * 3)
+    return padded, ratio, (pad_x, pad_y)
+
+
+def unletterbox_boxes(
+    boxes: np.ndarray,
+    ratio: float,
+    pad: tuple[float, float],
+    shape: tuple[int, int],
+) -> np.ndarray:
+    """Map xyxy boxes from letterboxed coordinates back onto the original ``(height, width)``."""
+    out = boxes.astype(np.float64, copy=True)
+    out[:, [0, 2]] = (out[:, [0, 2]] - pad[0]) / ratio
+    out[:, [1, 3]] = (out[:, [1, 3]] - pad[1]) / ratio
+    out[:, [0, 2]] = out[:, [0, 2]].clip(0, shape[1])
+    out[:, [1, 3]] = out[:, [1, 3]].clip(0, shape[0])
+    return out
+
+
+class OptimizedYoloRunner:
+    """Runs a loaded Ultralytics detection network without the generic predictor.
+
+    The network is fused, switched to eval and (optionally) channels-last once;
+    each call letterboxes to a fixed ``imgsz`` square, runs the forward pass
+    under ``torch.inference_mode`` and does NMS itself. Fixed shapes let
+    ``compile_mode`` trace or ``torch.compile`` one module per (batch, imgsz).
+    """
+
+    def __init__(
+        self,
+        net: Any,
+        device: str,
+        conf: float,
+        iou: float,
+        *,
+        channels_last: bool = True,
+        compile_mode: CompileMode = "none",
+        max_det: int = MAX_DETECTIONS,
+    ) -> None:
+        import torch
+
+        self.device = torch.device(device)
+        self.conf = conf
+        self.iou = iou
+        self.channels_last = channels_last
+        self.compile_mode = compile_mode
+        self.max_det = max_det
+        if hasattr(net, "fuse"):
+            net = net.fuse(verbose=False)
+        net = net.to(self.device).float().eval()
+        if channels_last:
+            net = net.to(memory_format=torch.channels_last)
+        self.net = net
+        # NMS-free heads (YOLOv10/YOLO26) already emit [x1, y1, x2, y2, conf, cls] rows.
+        self.end2end = bool(getattr(net.model[-1], "end2end", False)) if hasattr(net, "model") else False
+        self._modules: dict[tuple[int, int], Callable[[Any], Any]] = {}
+
+    def _module_for(self, batch: int, imgsz: int) -> Callable[[Any], Any]:
+        key = (batch, imgsz)
+        module = self._modules.get(key)
+        if module is not None:
+            return module
+
+        import torch
+
+        module = _first_output_module(self.net)
+        if self.compile_mode == "trace":
+            example = self._preprocess([np.zeros((imgsz, imgsz, 3), dtype=np.uint8)] * batch, imgsz)[0]
+            with torch.no_grad():
+                module = torch.jit.freeze(torch.jit.trace(module, example, strict=False).eval())
+        elif self.compile_mode == "compile":
+            module = torch.compile(module, dynamic=False)
+        self._modules[key] = module
+        return module
+
+    def _preprocess(self, frames: Sequence[np.ndarray], imgsz: int) -> tuple[Any, list[tuple[float, tuple[float, float]]]]:
+        import torch
+
+        boxed = [letterbox(frame, imgsz) for frame in frames]
+        # BGR -> RGB while stacking; NHWC memory permuted to NCHW is already channels-last.
+        batch = np.stack([image[..., ::-1] for image, _, _ in boxed])
+        tensor = torch.from_numpy(batch).to(self.device).permute(0, 3, 1, 2).float().div_(255.0)
+        if not self.channels_last:
+            tensor = tensor.contiguous()
+        return tensor, [(ratio, pad) for _, ratio, pad in boxed]
+
+    def _postprocess(self, preds: Any) -> list[Any]:
+        import torch
+        import torchvision
+
+        outputs = []
+        if self.end2end:
+            for rows in preds:
+                rows = rows[rows[:, 4] > self.conf]
+                outputs.append(rows[: self.max_det])
+            return outputs
+
+        for pred in preds.transpose(-1, -2):
+            scores, classes = pred[:, 4:].max(dim=1)
+            keep = scores > self.conf
+            pred, scores, classes = pred[keep], scores[keep], classes[keep]
+            xy, wh = pred[:, :2], pred[:, 2:4] / 2
+            boxes = torch.cat([xy - wh, xy + wh], dim=1)
+            index = torchvision.ops.batched_nms(boxes, scores, classes, self.iou)[: self.max_det]
+            outputs.append(torch.cat([boxes[index], scores[index, None], classes[index, None].float()], dim=1))
+        return outputs
+
+    def __call__(self, frames: Sequence[np.ndarray], imgsz: int) -> list[DetectionBatch]:
+        import torch
+
+        if not frames:
+            return []
+        # Built outside inference mode: tracing cannot record inference tensors.
+        module = self._module_for(len(frames), imgsz)
+        with torch.inference_mode():
+            tensor, transforms = self._preprocess(frames, imgsz)
+            preds = module(tensor)
+            rows_per_frame = self._postprocess(preds)
+
+        results: list[DetectionBatch] = []
+        for frame, rows, (ratio, pad) in zip(frames, rows_per_frame, transforms):
+            rows = rows.float().cpu().numpy()
+            boxes = unletterbox_boxes(rows[:, :4], ratio, pad, frame.shape[:2])
+            results.append(DetectionBatch.from_arrays(boxes, rows[:, 5], rows[:, 4]))
+        return results
+
+
+def _first_output_module(net: Any) -> Any:
+    import torch
+
+    class FirstOutput(torch.nn.Module):
+        def __init__(self, inner: Any) -> None:
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, x: Any) -> Any:
+            out = self.inner(x)
+            return out[0] if isinstance(out, (list, tuple)) else out
+
+    return FirstOutput(net)
+
+
+@dataclass(slots=True)
+class ParityReport:
+    frames: int
+    reference_detections: int
+    candidate_detections: int
+    matched: int
+    mean_iou: float
+    max_confidence_delta: float
+    reference_ms: float
+    candidate_ms: float
+
+    @property
+    def recall(self) -> float:
+        return self.matched / self.reference_detections if self.reference_detections else 1.0
+
+    @property
+    def precision(self) -> float:
+        return self.matched / self.candidate_detections if self.candidate_detections else 1.0
+
+    @property
+    def speedup(self) -> float:
+        return self.reference_ms / self.candidate_ms if self.candidate_ms > 0 else float("inf")
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "frames": self.frames,
+            "reference_detections": self.reference_detections,
+            "candidate_detections": self.candidate_detections,
+            "matched": self.matched,
+            "recall": round(self.recall, 4),
+            "precision": round(self.precision, 4),
+            "mean_iou": round(self.mean_iou, 4),
+            "max_confidence_delta": round(self.max_confidence_delta, 4),
+            "reference_ms": round(self.reference_ms, 3),
+            "candidate_ms": round(self.candidate_ms, 3),
+            "speedup": round(self.speedup, 3),
+        }
+
+
+def _median_ms(run: Callable[[], object], iterations: int) -> float:
+    run()
+    samples = []
+    for _ in range(max(1, iterations)):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(samples)
+
+
+def compare_execution(
+    reference: Callable[[list[np.ndarray], int], list[DetectionBatch]],
+    candidate: Callable[[list[np.ndarray], int], list[DetectionBatch]],
+    frames: list[np.ndarray],
+    imgsz: int,
+    *,
+    iterations: int = 10,
+    match_iou: float = 0.5,
+) -> ParityReport:
+    """Greedily match same-class boxes between two detectors and time both per frame."""
+    ref_results = reference(frames, imgsz)
+    cand_results = candidate(frames, imgsz)
+    matched = 0
+    ious: list[float] = []
+    max_conf_delta = 0.0
+    for ref, cand in zip(ref_results, cand_results):
+        iou = pairwise_iou(ref.boxes, cand.boxes)
+        iou[ref.class_ids[:, None] != cand.class_ids[None, :]] = -1.0
+        for i in np.argsort(-ref.confidences, kind="stable"):
+            if not iou.shape[1]:
+                break
+            # Ties go to the later candidate, as in a scan that keeps the last best.
+            j = iou.shape[1] - 1 - int(np.argmax(iou[i, ::-1]))
+            if iou[i, j] < match_iou:
+                continue
+            matched += 1
+            ious.append(float(iou[i, j]))
+            max_conf_delta = max(max_conf_delta, abs(float(cand.confidences[j]) - float(ref.confidences[i])))
+            iou[:, j] = -1.0
+
+    def per_frame_ms(fn: Callable[[list[np.ndarray], int], object]) -> float:
+        return sum(_median_ms(lambda: fn([frame], imgsz), iterations) for frame in frames) / max(1, len(frames))
+
+    return ParityReport(
+        frames=len(frames),
+        reference_detections=sum(len(d) for d in ref_results),
+        candidate_detections=sum(len(d) for d in cand_results),
+        matched=matched,
+        mean_iou=statistics.fmean(ious) if ious else 1.0,
+        max_confidence_delta=max_conf_delta,
+        reference_ms=per_frame_ms(reference),
+        candidate_ms=per_frame_ms(candidate),
+    )
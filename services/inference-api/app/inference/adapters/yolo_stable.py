@@ -4,11 +4,65 @@ from typing import Sequence
 
 import numpy as np
 
-from app.inference.adapters.base import DetectorAdapter, RawDetection
+from app.inference.adapters.base import DetectorAdapter
+from app.inference.adapters.yolo_optimized import OptimizedYoloRunner
+from app.inference.autotune import (
+    AutotuneCache,
+    TunedConfig,
+    autotune,
+    cache_key,
+    candidate_grid,
+    cpu_model_name,
+    default_thread_candidates,
+    model_fingerprint,
+)
+from app.inference.detections import DetectionBatch
 from app.settings import ModelConfig, resolve_torch_device
 from app.paths import resolve_repo_path
 
 
+def _set_torch_threads(threads: int) -> None:
+    try:
+        import torch
+    except Exception:  # pragma: no cover
+        return
+    if threads > 0:
+        torch.set_num_threads(threads)
+
+
+def _set_torch_interop_threads(threads: int) -> None:
+    try:
+        import torch
+    except Exception:  # pragma: no cover
+        return
+    if threads <= 0:
+        return
+    try:
+        torch.set_num_interop_threads(threads)
+    except RuntimeError:
+        # torch only accepts this before the first inter-op parallel work.
+        pass
+
+
+def static_onnx_input(path: str) -> tuple[int, int] | None:
+    """``(batch, imgsz)`` of an ONNX model exported with fixed input shapes, else None.
+
+    Returns None too when the ``onnx`` package is missing or the graph cannot be read.
+    """
+    try:
+        import onnx
+    except ImportError:
+        return None
+    try:
+        graph = onnx.load(path, load_external_data=False).graph
+    except Exception:
+        return None
+    dims = graph.input[0].type.tensor_type.shape.dim
+    if len(dims) != 4 or any(not dim.HasField('dim_value') for dim in (dims[0], dims[2], dims[3])):
+        return None
+    return dims[0].dim_value, max(dims[2].dim_value, dims[3].dim_value)
+
+
 class YoloStableAdapter(DetectorAdapter):
     name = "yolo_stable"
 
@@ -16,7 +70,14 @@ class YoloStableAdapter(DetectorAdapter):
         self.cfg = cfg
         self.name = cfg.yolo_version
         self._model = None
+        self._runner: OptimizedYoloRunner | None = None
         self._loaded = False
+        self._model_source = ""
+        self.imgsz = cfg.imgsz
+        self.batch_size = cfg.max_batch_size
+        # Set for static-shape ONNX exports, which accept only this input size.
+        self._static_imgsz: int | None = None
+        self.tuned: TunedConfig | None = None
         self._device, device_warning = resolve_torch_device(cfg.device)
         if device_warning:
             print(f"[device] {device_warning}")
@@ -49,46 +110,127 @@ class YoloStableAdapter(DetectorAdapter):
         except Exception as exc:  # pragma: no cover
             raise RuntimeError("Ultralytics is required for YoloStableAdapter") from exc
 
+        _set_torch_interop_threads(self.cfg.inter_op_threads)
         model_source = self._resolve_model_source()
         if (self.cfg.model_path or "").strip():
             model_source = str(resolve_repo_path(model_source))
-        self._model = YOLO(model_source)
+        self._model_source = model_source
+        self._model = YOLO(model_source, task="detect")
+        if model_source.endswith(".onnx"):
+            self._pin_static_onnx(model_source)
+        if self.cfg.execution_mode == "optimized" and model_source.endswith(".onnx"):
+            # Exported (e.g. INT8) ONNX models run through onnxruntime via the predictor.
+            print("[execution] optimized mode needs a torch checkpoint; using the predictor for ONNX models")
+        elif self.cfg.execution_mode == "optimized":
+            self._runner = OptimizedYoloRunner(
+                self._model.model,
+                device=self._device,
+                conf=self.cfg.conf_threshold,
+                iou=self.cfg.nms_iou,
+                channels_last=self.cfg.optimized_channels_last,
+                compile_mode=self.cfg.optimized_compile,
+            )
         self._loaded = True
 
+    def _pin_static_onnx(self, model_source: str) -> None:
+        static = static_onnx_input(model_source)
+        if static is None:
+            return
+        batch, size = static
+        print(
+            f"[onnx] {model_source} has a static input (batch={batch}, imgsz={size}); pinning both. "
+            "Other resolution_ladder rungs, tile sizes and autotune sizes run at this size; "
+            "re-export with dynamic axes to use them."
+        )
+        self._static_imgsz = size
+        self.imgsz = size
+        self.batch_size = batch
+
     def warmup(self) -> None:
         if not self.loaded:
             return
-        dummy = np.zeros((640, 640, 3), dtype=np.uint8)
+        if self.cfg.autotune:
+            self._autotune()
+        dummy = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
         _ = self.predict(dummy)
-
-    def predict(self, frame: np.ndarray) -> Sequence[RawDetection]:
+        # Each load-shedding rung is a new input shape; pay its first-call cost now.
+        for size in self.cfg.resolution_ladder:
+            if size != self.imgsz:
+                _ = self.predict(dummy, imgsz=size)
+
+    def _autotune(self) -> None:
+        objective = self.cfg.autotune_objective
+        cache = AutotuneCache(resolve_repo_path(self.cfg.autotune_cache_path))
+        device_key = self._device
+        if self._runner is not None:
+            device_key = f"{self._device}+optimized:{self.cfg.optimized_compile}"
+        grid = candidate_grid(
+            self.cfg.autotune_threads or default_thread_candidates(),
+            [self.batch_size] if self._static_imgsz else self.cfg.autotune_batch_sizes or [1],
+            [self._static_imgsz] if self._static_imgsz else self.cfg.autotune_input_sizes or [self.cfg.imgsz],
+        )
+        key = cache_key(cpu_model_name(), model_fingerprint(self._model_source), device_key, objective, grid)
+
+        tuned = cache.get(key)
+        if tuned is None:
+            tuned = autotune(
+                self._infer,
+                grid,
+                objective,
+                apply_threads=_set_torch_threads,
+                iterations=self.cfg.autotune_iterations,
+            )
+            cache.put(key, tuned)
+            print(
+                f"[autotune] objective={objective} threads={tuned.threads} batch={tuned.batch_size} "
+                f"imgsz={tuned.imgsz} latency_ms={tuned.batch_latency_ms:.1f} fps={tuned.throughput_fps:.1f}"
+            )
+
+        _set_torch_threads(tuned.threads)
+        self.imgsz = self._static_imgsz or tuned.imgsz
+        if len(set(self.cfg.autotune_batch_sizes)) > 1 and self._static_imgsz is None:
+            # Only a measured choice between batch sizes says anything about batching.
+            self.batch_size = min(self.cfg.max_batch_size, tuned.batch_size)
+        self.tuned = tuned
+
+    def _predict_raw(self, source: np.ndarray | list[np.ndarray], imgsz: int) -> list:
         if not self.loaded or self._model is None:
             raise RuntimeError("Model is not loaded")
 
-        results = self._model.predict(
-            source=frame,
+        return self._model.predict(
+            source=source,
             conf=self.cfg.conf_threshold,
             iou=self.cfg.nms_iou,
+            imgsz=imgsz,
             device=self._device,
             verbose=False,
         )
 
-        detections: list[RawDetection] = []
-        for result in results:
-            if result.boxes is None:
-                continue
-            for box in result.boxes:
-                xyxy = box.xyxy[0].tolist()
-                conf = float(box.conf[0].item())
-                cls_id = int(box.cls[0].item())
-                detections.append(
-                    RawDetection(
-                        bbox=(float(xyxy[0]), float(xyxy[1]), float(xyxy[2]), float(xyxy[3])),
-                        class_id=cls_id,
-                        confidence=max(0.0, min(1.0, conf)),
-                    )
-                )
-        return detections
+    def _to_batch(self, result) -> DetectionBatch:
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return DetectionBatch.empty()
+        return DetectionBatch.from_arrays(
+            boxes.xyxy.cpu().numpy(),
+            boxes.cls.cpu().numpy(),
+            boxes.conf.cpu().numpy(),
+        )
+
+    def _infer(self, frames: list[np.ndarray], imgsz: int) -> list[DetectionBatch]:
+        imgsz = self._static_imgsz or imgsz
+        if self._runner is not None:
+            return self._runner(frames, imgsz)
+        return [self._to_batch(result) for result in self._predict_raw(frames, imgsz)]
+
+    def predict(self, frame: np.ndarray, imgsz: int | None = None) -> DetectionBatch:
+        return self._infer([frame], imgsz or self.imgsz)[0]
+
+    def predict_batch(self, frames: Sequence[np.ndarray], imgsz: int | None = None) -> list[DetectionBatch]:
+        outputs: list[DetectionBatch] = []
+        step = max(1, self.batch_size)
+        for start in range(0, len(frames), step):
+            outputs.extend(self._infer(list(frames[start : start + step]), imgsz or self.imgsz))
+        return outputs
 
     def ripeness_from_class_id(self, class_id: int) -> str:
         if class_id not in self._class_map:
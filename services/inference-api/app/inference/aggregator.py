@@ -2,49 +2,44 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 
+import numpy as np
+
+from app.inference.detections import RIPENESS_CODES, UNTRACKED
 from app.schemas.common import FrameSummary, RipenessRatio, SessionSummary
 
 
+def _ripeness_counts(ripeness: np.ndarray) -> np.ndarray:
+    return np.bincount(ripeness, minlength=len(RIPENESS_CODES))
+
+
 @dataclass
 class SessionAggregator:
     seen_track_ids: set[int] = field(default_factory=set)
     total_unique: int = 0
-    counts: dict[str, int] = field(default_factory=lambda: {"green": 0, "half": 0, "red": 0, "young": 0})
-
-    def frame_summary(self, ripeness_list: list[str]) -> FrameSummary:
-        summary = FrameSummary(total=len(ripeness_list))
-        for r in ripeness_list:
-            if r == "green":
-                summary.green += 1
-            elif r == "half":
-                summary.half += 1
-            elif r == "red":
-                summary.red += 1
-            elif r == "young":
-                summary.young += 1
-        return summary
-
-    def update_session(self, ripeness_list: list[str], track_ids: list[int | None]) -> None:
-        for ripeness, track_id in zip(ripeness_list, track_ids):
-            if track_id is not None:
-                if track_id in self.seen_track_ids:
-                    continue
-                self.seen_track_ids.add(track_id)
-            self.total_unique += 1
-            if ripeness in self.counts:
-                self.counts[ripeness] += 1
+    # Unique detections per ripeness code (see ``RIPENESS_CODES``).
+    counts: np.ndarray = field(default_factory=lambda: np.zeros(len(RIPENESS_CODES), dtype=np.int64))
+
+    def frame_summary(self, ripeness: np.ndarray) -> FrameSummary:
+        counts = _ripeness_counts(ripeness).tolist()
+        return FrameSummary(total=len(ripeness), **dict(zip(RIPENESS_CODES, counts)))
+
+    def update_session(self, ripeness: np.ndarray, track_ids: np.ndarray) -> None:
+        """Count each tracked object once per session; untracked detections always count."""
+        tracked = track_ids != UNTRACKED
+        ids, first = np.unique(track_ids[tracked], return_index=True)
+        seen = self.seen_track_ids
+        unseen = np.fromiter((track_id not in seen for track_id in ids.tolist()), dtype=bool, count=len(ids))
+        seen.update(ids[unseen].tolist())
+        counted = np.concatenate([ripeness[~tracked], ripeness[tracked][first[unseen]]])
+        self.total_unique += len(counted)
+        self.counts += _ripeness_counts(counted)
 
     def build_summary(self) -> SessionSummary:
         total = self.total_unique
         if total == 0:
             ratios = RipenessRatio()
         else:
-            ratios = RipenessRatio(
-                green=self.counts["green"] / total,
-                half=self.counts["half"] / total,
-                red=self.counts["red"] / total,
-                young=self.counts["young"] / total,
-            )
+            ratios = RipenessRatio(**dict(zip(RIPENESS_CODES, (self.counts / total).tolist())))
 
         suggestion = "not_ready"
         if ratios.red >= 0.7 and ratios.young < 0.15:
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import platform
+import statistics
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+
+AutotuneObjective = Literal["latency", "throughput"]
+
+
+@dataclass(frozen=True, slots=True)
+class TuneCandidate:
+    threads: int
+    batch_size: int
+    imgsz: int
+
+
+@dataclass(slots=True)
+class TuneMeasurement:
+    candidate: TuneCandidate
+    batch_latency_ms: float
+    throughput_fps: float
+
+
+@dataclass(slots=True)
+class TunedConfig:
+    threads: int
+    batch_size: int
+    imgsz: int
+    objective: AutotuneObjective
+    batch_latency_ms: float
+    throughput_fps: float
+
+    @classmethod
+    def from_measurement(cls, measurement: TuneMeasurement, objective: AutotuneObjective) -> TunedConfig:
+        return cls(
+            threads=measurement.candidate.threads,
+            batch_size=measurement.candidate.batch_size,
+            imgsz=measurement.candidate.imgsz,
+            objective=objective,
+            batch_latency_ms=measurement.batch_latency_ms,
+            throughput_fps=measurement.throughput_fps,
+        )
+
+
+def default_thread_candidates(cpu_count: int | None = None) -> list[int]:
+    total = max(1, cpu_count or os.cpu_count() or 1)
+    candidates: set[int] = {total}
+    value = 1
+    while value < total:
+        candidates.add(value)
+        value *= 2
+    return sorted(candidates)
+
+
+def candidate_grid(threads: Sequence[int], batch_sizes: Sequence[int], input_sizes: Sequence[int]) -> list[TuneCandidate]:
+    return [
+        TuneCandidate(threads=t, batch_size=b, imgsz=s)
+        for s in sorted(set(input_sizes))
+        for b in sorted(set(batch_sizes))
+        for t in sorted(set(threads))
+    ]
+
+
+def measure_candidate(
+    run_batch: Callable[[list[np.ndarray], int], object],
+    candidate: TuneCandidate,
+    iterations: int = 5,
+) -> TuneMeasurement:
+    frames = [np.zeros((candidate.imgsz, candidate.imgsz, 3), dtype=np.uint8) for _ in range(candidate.batch_size)]
+    # First call absorbs lazy allocations for this shape.
+    run_batch(frames, candidate.imgsz)
+
+    samples: list[float] = []
+    for _ in range(max(1, iterations)):
+        start = time.perf_counter()
+        run_batch(frames, candidate.imgsz)
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+    latency_ms = statistics.median(samples)
+    throughput = candidate.batch_size * 1000.0 / latency_ms if latency_ms > 0 else float("inf")
+    return TuneMeasurement(candidate=candidate, batch_latency_ms=latency_ms, throughput_fps=throughput)
+
+
+def select_best(measurements: Sequence[TuneMeasurement], objective: AutotuneObjective) -> TuneMeasurement:
+    if not measurements:
+        raise ValueError("No autotune measurements to select from")
+    if objective == "throughput":
+        return max(measurements, key=lambda m: (m.throughput_fps, -m.candidate.threads))
+    # Latency: a frame cannot be answered before its whole batch finishes.
+    return min(measurements, key=lambda m: (m.batch_latency_ms, m.candidate.threads))
+
+
+def cpu_model_name() -> str:
+    cpuinfo = Path("/proc/cpuinfo")
+    if cpuinfo.exists():
+        try:
+            for line in cpuinfo.read_text(encoding="utf-8", errors="ignore").splitlines():
+                key, _, value = line.partition(":")
+                if key.strip().lower() in {"model name", "hardware", "cpu model"} and value.strip():
+                    return value.strip()
+        except OSError:
+            pass
+    return platform.processor() or platform.machine() or "unknown"
+
+
+def model_fingerprint(model_source: str) -> str:
+    path = Path(model_source)
+    digest = hashlib.sha256()
+    if path.is_file():
+        with path.open("rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        digest.update(model_source.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def grid_fingerprint(grid: Sequence[TuneCandidate]) -> str:
+    """Order-independent hash of a search grid, so a changed grid is re-tuned rather than served from cache."""
+    canonical = json.dumps(sorted([c.threads, c.batch_size, c.imgsz] for c in grid))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(
+    cpu_model: str,
+    model_hash: str,
+    device: str,
+    objective: AutotuneObjective,
+    grid: Sequence[TuneCandidate],
+) -> str:
+    return "|".join([cpu_model, str(os.cpu_count() or 1), model_hash, device, objective, grid_fingerprint(grid)])
+
+
+class AutotuneCache:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def _read(self) -> dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key: str) -> TunedConfig | None:
+        entry = self._read().get(key)
+        if not isinstance(entry, dict):
+            return None
+        try:
+            return TunedConfig(**entry)
+        except TypeError:
+            return None
+
+    def put(self, key: str, config: TunedConfig) -> None:
+        data = self._read()
+        data[key] = asdict(config)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+def autotune(
+    run_batch: Callable[[list[np.ndarray], int], object],
+    grid: Sequence[TuneCandidate],
+    objective: AutotuneObjective,
+    apply_threads: Callable[[int], None],
+    iterations: int = 5,
+) -> TunedConfig:
+    measurements: list[TuneMeasurement] = []
+    for candidate in grid:
+        apply_threads(candidate.threads)
+        measurements.append(measure_candidate(run_batch, candidate, iterations=iterations))
+    best = select_best(measurements, objective)
+    return TunedConfig.from_measurement(best, objective)
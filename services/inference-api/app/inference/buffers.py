@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import numpy as np
+
+_BufferKey = tuple[tuple[int, ...], str]
+
+
+class BufferPool:
+    """Thread-safe free lists of preallocated arrays keyed by shape and dtype.
+
+    Stream frames at a fixed camera resolution keep asking for the same few
+    shapes, so reusing their buffers keeps per-frame allocations (and the RSS
+    fragmentation they cause on long-running pods) off the hot path. Released
+    buffers are kept until ``max_bytes`` of idle buffers are resident; beyond
+    that they are dropped and left to the allocator. Arrays the pool did not
+    hand out are ignored by ``release`` so callers can release unconditionally.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.max_bytes = max(0, max_bytes)
+        self._lock = threading.Lock()
+        self._free: dict[_BufferKey, deque[np.ndarray]] = {}
+        self._leased: dict[int, tuple[_BufferKey, np.ndarray]] = {}
+        self._idle_bytes = 0
+        self._leased_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def acquire(self, shape: tuple[int, ...], dtype: Any = np.uint8) -> np.ndarray:
+        key: _BufferKey = (tuple(int(dim) for dim in shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                array = free.pop()
+                self._idle_bytes -= array.nbytes
+                self.hits += 1
+            else:
+                array = None
+                self.misses += 1
+        if array is None:
+            array = np.empty(key[0], dtype=key[1])
+        with self._lock:
+            self._leased[id(array)] = (key, array)
+            self._leased_bytes += array.nbytes
+        return array
+
+    def release(self, array: np.ndarray | None) -> None:
+        if array is None:
+            return
+        with self._lock:
+            entry = self._leased.get(id(array))
+            if entry is None or entry[1] is not array:
+                return
+            del self._leased[id(array)]
+            key = entry[0]
+            self._leased_bytes -= array.nbytes
+            if self._idle_bytes + array.nbytes > self.max_bytes:
+                self.discarded += 1
+                return
+            self._free.setdefault(key, deque()).append(array)
+            self._idle_bytes += array.nbytes
+
+    @contextmanager
+    def lease(self, shape: tuple[int, ...], dtype: Any = np.uint8) -> Iterator[np.ndarray]:
+        array = self.acquire(shape, dtype)
+        try:
+            yield array
+        finally:
+            self.release(array)
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "discarded": self.discarded,
+                "idle_buffers": sum(len(free) for free in self._free.values()),
+                "leased_buffers": len(self._leased),
+                "resident_bytes": self._idle_bytes + self._leased_bytes,
+                "leased_bytes": self._leased_bytes,
+            }
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import get_args
+
+import numpy as np
+
+from app.schemas.common import Detection, RipenessLabel
+
+# Same order as shared/contracts/constants/ripeness.json; a ripeness code is an index into it.
+RIPENESS_CODES: tuple[str, ...] = get_args(RipenessLabel)
+_RIPENESS_INDEX = {label: code for code, label in enumerate(RIPENESS_CODES)}
+UNTRACKED = -1
+
+
+def encode_ripeness(labels: Iterable[str]) -> np.ndarray:
+    return np.fromiter((_RIPENESS_INDEX[label] for label in labels), dtype=np.uint8)
+
+
+@dataclass(slots=True, eq=False)
+class DetectionBatch:
+    """The detections of one frame as parallel columns, one row per box.
+
+    ``boxes`` is (N, 4) float32 xyxy in frame pixels, ``class_ids`` int32,
+    ``confidences`` float32 in [0, 1] and ``track_ids`` int64 holding
+    ``UNTRACKED`` until a tracker assigns an id. Methods return new batches
+    and never write into their inputs, so adapters may hand out views of
+    their own output buffers.
+    """
+
+    boxes: np.ndarray
+    class_ids: np.ndarray
+    confidences: np.ndarray
+    track_ids: np.ndarray
+
+    @classmethod
+    def from_arrays(
+        cls,
+        boxes: np.ndarray | Sequence[Sequence[float]],
+        class_ids: np.ndarray | Sequence[int],
+        confidences: np.ndarray | Sequence[float],
+        track_ids: np.ndarray | Sequence[int] | None = None,
+    ) -> DetectionBatch:
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        class_ids = np.asarray(class_ids, dtype=np.int32).reshape(-1)
+        confidences = np.clip(np.asarray(confidences, dtype=np.float32).reshape(-1), 0.0, 1.0)
+        if track_ids is None:
+            track_ids = np.full(len(boxes), UNTRACKED, dtype=np.int64)
+        else:
+            track_ids = np.asarray(track_ids, dtype=np.int64).reshape(-1)
+        if not len(boxes) == len(class_ids) == len(confidences) == len(track_ids):
+            raise ValueError("DetectionBatch columns must have the same length")
+        return cls(boxes, class_ids, confidences, track_ids)
+
+    @classmethod
+    def empty(cls) -> DetectionBatch:
+        return cls.from_arrays(np.empty((0, 4)), (), ())
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[tuple[float, float, float, float], int, float]]) -> DetectionBatch:
+        """Build a batch from ``(bbox, class_id, confidence)`` tuples, for fixtures and small callers."""
+        rows = list(rows)
+        if not rows:
+            return cls.empty()
+        boxes, class_ids, confidences = zip(*rows)
+        return cls.from_arrays(boxes, class_ids, confidences)
+
+    @classmethod
+    def concat(cls, batches: Sequence[DetectionBatch]) -> DetectionBatch:
+        if not batches:
+            return cls.empty()
+        return cls(
+            np.concatenate([b.boxes for b in batches]),
+            np.concatenate([b.class_ids for b in batches]),
+            np.concatenate([b.confidences for b in batches]),
+            np.concatenate([b.track_ids for b in batches]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def select(self, index: np.ndarray) -> DetectionBatch:
+        return DetectionBatch(self.boxes[index], self.class_ids[index], self.confidences[index], self.track_ids[index])
+
+    def above(self, conf_threshold: float) -> DetectionBatch:
+        if not len(self) or float(self.confidences.min()) >= conf_threshold:
+            return self
+        return self.select(self.confidences >= conf_threshold)
+
+    def transformed(self, scale: tuple[float, float] = (1.0, 1.0), offset: tuple[float, float] = (0.0, 0.0)) -> DetectionBatch:
+        """Map boxes by ``box * scale + offset`` per axis, e.g. from a resized or cropped view back to the frame."""
+        sx, sy = scale
+        dx, dy = offset
+        boxes = self.boxes * np.array([sx, sy, sx, sy], dtype=np.float32) + np.array([dx, dy, dx, dy], dtype=np.float32)
+        return DetectionBatch(boxes, self.class_ids, self.confidences, self.track_ids)
+
+    def clipped(self, width: int, height: int) -> DetectionBatch:
+        """Clamp boxes to the frame and order their corners so x1 <= x2 and y1 <= y2."""
+        xs = np.clip(self.boxes[:, 0::2], 0.0, float(max(width - 1, 0)))
+        ys = np.clip(self.boxes[:, 1::2], 0.0, float(max(height - 1, 0)))
+        boxes = np.stack([xs.min(axis=1), ys.min(axis=1), xs.max(axis=1), ys.max(axis=1)], axis=1)
+        return DetectionBatch(boxes, self.class_ids, self.confidences, self.track_ids)
+
+    def with_track_ids(self, track_ids: np.ndarray) -> DetectionBatch:
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        if len(track_ids) != len(self):
+            raise ValueError("One track id per detection is required")
+        return DetectionBatch(self.boxes, self.class_ids, self.confidences, track_ids)
+
+    def to_detections(self, ripeness: np.ndarray) -> list[Detection]:
+        """Per-box API objects; only built where a response leaves the service."""
+        # Columns are already sanitised, so skip pydantic validation per box.
+        return [
+            Detection.model_construct(
+                bbox=tuple(box),
+                ripeness=RIPENESS_CODES[code],
+                confidence=confidence,
+                track_id=None if track_id == UNTRACKED else track_id,
+            )
+            for box, code, confidence, track_id in zip(
+                self.boxes.tolist(), ripeness.tolist(), self.confidences.tolist(), self.track_ids.tolist()
+            )
+        ]
+
+
+def pairwise_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU of every box in ``a`` (N, 4) against every box in ``b`` (M, 4), as an (N, M) matrix."""
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0.0, None) * np.clip(iy2 - iy1, 0.0, None)
+    area_a = np.clip(a[:, 2] - a[:, 0], 0.0, None) * np.clip(a[:, 3] - a[:, 1], 0.0, None)
+    area_b = np.clip(b[:, 2] - b[:, 0], 0.0, None) * np.clip(b[:, 3] - b[:, 1], 0.0, None)
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=(union > 0) & (inter > 0))
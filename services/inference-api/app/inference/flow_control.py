@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class FlowSettings:
+    target_latency_ms: float = 250.0
+    max_queue_per_worker: float = 2.0
+    min_fps: float = 0.5
+    max_fps: float = 10.0
+    additive_fps: float = 0.5
+    decrease_factor: float = 0.5
+    min_quality: float = 0.5
+    max_quality: float = 0.9
+    quality_step: float = 0.05
+    min_frames_between_updates: int = 3
+
+
+@dataclass(slots=True)
+class FlowUpdate:
+    frame_interval_ms: int
+    jpeg_quality: float
+
+
+class FlowController:
+    """AIMD rate control for one stream session.
+
+    Every observed frame either adds ``additive_fps`` to the recommended rate
+    (when the session's latency and the global queue are within target) or
+    multiplies it by ``decrease_factor`` (when either is over). JPEG quality
+    follows the same direction in small steps. Updates are only emitted when
+    the rounded recommendation changes, and at most once every
+    ``min_frames_between_updates`` frames so clients are not flooded.
+    """
+
+    def __init__(self, settings: FlowSettings, initial_fps: float | None = None, initial_quality: float | None = None) -> None:
+        self.settings = settings
+        self.fps = self._clamp_fps(initial_fps if initial_fps is not None else settings.max_fps)
+        self.quality = self._clamp_quality(initial_quality if initial_quality is not None else settings.max_quality)
+        self._last_sent: FlowUpdate | None = None
+        self._frames_since_update = 0
+
+    def _clamp_fps(self, fps: float) -> float:
+        return max(self.settings.min_fps, min(self.settings.max_fps, fps))
+
+    def _clamp_quality(self, quality: float) -> float:
+        return max(self.settings.min_quality, min(self.settings.max_quality, quality))
+
+    def current(self) -> FlowUpdate:
+        return FlowUpdate(frame_interval_ms=int(round(1000.0 / self.fps)), jpeg_quality=round(self.quality, 2))
+
+    def observe(self, latency_ms: float, queue_per_worker: float) -> FlowUpdate | None:
+        s = self.settings
+        congested = latency_ms > s.target_latency_ms or queue_per_worker > s.max_queue_per_worker
+        if congested:
+            self.fps = self._clamp_fps(self.fps * s.decrease_factor)
+            self.quality = self._clamp_quality(self.quality - 2 * s.quality_step)
+        else:
+            self.fps = self._clamp_fps(self.fps + s.additive_fps)
+            self.quality = self._clamp_quality(self.quality + s.quality_step)
+
+        self._frames_since_update += 1
+        update = self.current()
+        if update == self._last_sent:
+            return None
+        # Back off immediately, but pace increases so the load can settle.
+        if not congested and self._frames_since_update < s.min_frames_between_updates:
+            return None
+        self._last_sent = update
+        self._frames_since_update = 0
+        return update
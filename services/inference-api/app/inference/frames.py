@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import struct
+from enum import IntEnum
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from app.inference.buffers import BufferPool
+
+RAW_FRAME_MAGIC = b"LRAW"
+RAW_FRAME_VERSION = 1
+# magic, version, pixel format, reserved, width, height, stride (row bytes)
+RAW_FRAME_HEADER = struct.Struct("<4sBBHIII")
+RAW_FRAME_MAX_SIDE = 8192
+
+
+class PixelFormat(IntEnum):
+    BGR = 1
+    RGB = 2
+    NV12 = 3
+    GRAY = 4
+    RGBA = 5
+
+
+_BYTES_PER_PIXEL = {
+    PixelFormat.BGR: 3,
+    PixelFormat.RGB: 3,
+    PixelFormat.NV12: 1,
+    PixelFormat.GRAY: 1,
+    PixelFormat.RGBA: 4,
+}
+
+
+def is_raw_frame(payload: bytes) -> bool:
+    return payload[:4] == RAW_FRAME_MAGIC
+
+
+def encode_raw_frame(pixels: np.ndarray, pixel_format: PixelFormat) -> bytes:
+    if pixel_format == PixelFormat.NV12:
+        height = pixels.shape[0] * 2 // 3
+        width = pixels.shape[1]
+    else:
+        height, width = pixels.shape[:2]
+    stride = width * _BYTES_PER_PIXEL[pixel_format]
+    header = RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, RAW_FRAME_VERSION, int(pixel_format), 0, width, height, stride)
+    return header + np.ascontiguousarray(pixels, dtype=np.uint8).tobytes()
+
+
+def parse_raw_frame(payload: bytes | bytearray | memoryview) -> tuple[np.ndarray, PixelFormat]:
+    """Validate the header and wrap the pixels without copying.
+
+    Returns an (H, W, C) view for packed formats, (H, W) for GRAY and the
+    (H * 3 / 2, W) plane layout for NV12.
+    """
+    if len(payload) < RAW_FRAME_HEADER.size:
+        raise ValueError("Raw frame header is truncated")
+    magic, version, fmt, _, width, height, stride = RAW_FRAME_HEADER.unpack_from(payload)
+    if magic != RAW_FRAME_MAGIC:
+        raise ValueError("Raw frame magic mismatch")
+    if version != RAW_FRAME_VERSION:
+        raise ValueError(f"Unsupported raw frame version: {version}")
+    try:
+        pixel_format = PixelFormat(fmt)
+    except ValueError as exc:
+        raise ValueError(f"Unsupported raw pixel format: {fmt}") from exc
+    if not (0 < width <= RAW_FRAME_MAX_SIDE and 0 < height <= RAW_FRAME_MAX_SIDE):
+        raise ValueError(f"Raw frame size out of range: {width}x{height}")
+
+    bpp = _BYTES_PER_PIXEL[pixel_format]
+    if stride < width * bpp:
+        raise ValueError("Raw frame stride is smaller than a row")
+    rows = height
+    if pixel_format == PixelFormat.NV12:
+        if height % 2 or width % 2:
+            raise ValueError("NV12 frames need even width and height")
+        rows = height * 3 // 2
+    expected = RAW_FRAME_HEADER.size + stride * rows
+    if len(payload) != expected:
+        raise ValueError(f"Raw frame payload is {len(payload)} bytes, expected {expected}")
+
+    plane = np.frombuffer(payload, dtype=np.uint8, count=stride * rows, offset=RAW_FRAME_HEADER.size)
+    plane = plane.reshape(rows, stride)[:, : width * bpp]
+    if bpp == 1:
+        return plane, pixel_format
+    return plane.reshape(rows, width, bpp), pixel_format
+
+
+def to_adapter_frame(
+    pixels: np.ndarray,
+    pixel_format: PixelFormat,
+    target: str = "bgr",
+    pool: BufferPool | None = None,
+) -> np.ndarray:
+    """Convert to the adapter's channel order, returning a view whenever a channel flip is enough.
+
+    Formats that need a real conversion are written into a buffer leased from
+    ``pool`` when one is given; the caller hands it back with ``pool.release``.
+    """
+    if pixel_format == PixelFormat.BGR:
+        return pixels if target == "bgr" else pixels[:, :, ::-1]
+    if pixel_format == PixelFormat.RGB:
+        return pixels if target == "rgb" else pixels[:, :, ::-1]
+    if pixel_format == PixelFormat.RGBA:
+        return pixels[:, :, 2::-1] if target == "bgr" else pixels[:, :, :3]
+
+    import cv2
+
+    if pixel_format == PixelFormat.GRAY:
+        code = cv2.COLOR_GRAY2BGR if target == "bgr" else cv2.COLOR_GRAY2RGB
+        height = pixels.shape[0]
+    else:
+        code = cv2.COLOR_YUV2BGR_NV12 if target == "bgr" else cv2.COLOR_YUV2RGB_NV12
+        height = pixels.shape[0] * 2 // 3
+    src = np.ascontiguousarray(pixels)
+    if pool is None:
+        return cv2.cvtColor(src, code)
+    return cv2.cvtColor(src, code, dst=pool.acquire((height, pixels.shape[1], 3)))
+
+
+def decode_frame_payload(
+    payload: bytes | memoryview,
+    target: str = "bgr",
+    pool: BufferPool | None = None,
+) -> np.ndarray:
+    """Decode a stream payload (raw frame or encoded image) into the adapter's channel order."""
+    if is_raw_frame(payload):
+        pixels, pixel_format = parse_raw_frame(payload)
+        return to_adapter_frame(pixels, pixel_format, target=target, pool=pool)
+
+    import cv2
+
+    image = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Invalid image bytes")
+    return image if target == "bgr" else image[:, :, ::-1]
@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import CancelledError
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+from app.inference.frames import PixelFormat, to_adapter_frame
+from app.inference.scheduler import DeadlineExceeded, InferenceScheduler, QueueFull, WorkClass
+from app.schemas.api import StreamFrameEnvelope, StreamSettings, StreamSummaryEnvelope
+from app.schemas.common import SessionSummary
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from app.inference.pipeline import InferencePipeline
+
+_SUBSCRIBER_QUEUE = 8
+
+
+def is_source_allowed(source: str, allowed: list[str]) -> bool:
+    """URLs must match an allowed URL; local paths must sit under an allowed directory.
+
+    An allowed URL fixes scheme, host and port exactly; a path in it is a
+    prefix matched on whole segments, so ``rtsp://cam1/plots`` admits
+    ``rtsp://cam1/plots/3`` but neither ``rtsp://cam1.evil.net`` nor
+    ``rtsp://cam1/plots-old``.
+    """
+    if "://" in source:
+        return any(_url_allowed(source, prefix) for prefix in allowed if "://" in prefix)
+    path = Path(source).resolve()
+    return any(path.is_relative_to(Path(prefix).resolve()) for prefix in allowed if "://" not in prefix)
+
+
+def _url_allowed(source: str, prefix: str) -> bool:
+    try:
+        url, rule = urlsplit(source), urlsplit(prefix)
+        if (url.scheme.lower(), url.hostname, url.port) != (rule.scheme.lower(), rule.hostname, rule.port):
+            return False
+    except ValueError:
+        # Malformed port or host.
+        return False
+    if not rule.hostname:
+        return False
+    base = rule.path.rstrip("/")
+    return not base or url.path == base or url.path.startswith(base + "/")
+
+
+def _open_capture(source: str) -> Any:
+    import cv2
+
+    return cv2.VideoCapture(source)
+
+
+class LatestFrame:
+    """Single-slot mailbox between the decode and inference threads; newer frames overwrite older ones."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._item: tuple[np.ndarray, int] | None = None
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame: np.ndarray, timestamp_ms: int) -> None:
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = (frame, timestamp_ms)
+            self._cond.notify()
+
+    def take(self, timeout: float | None = None) -> tuple[np.ndarray, int] | None:
+        with self._cond:
+            self._cond.wait_for(lambda: self._item is not None or self._closed, timeout=timeout)
+            item, self._item = self._item, None
+            return item
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        with self._cond:
+            return self._closed and self._item is None
+
+
+class IngestSession:
+    """Pulls a camera or video source and runs its latest frame through a stream session.
+
+    A decode thread reads the source with OpenCV and keeps only the newest
+    frame. An inference thread takes that frame at most ``target_fps`` times
+    per second, runs it on the shared scheduler as stream work, and fans the
+    envelopes out to WebSocket subscribers on the event loop. Slow
+    subscribers lose their oldest messages rather than holding up the source.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        pipeline: InferencePipeline,
+        scheduler: InferenceScheduler,
+        settings: StreamSettings,
+        loop: asyncio.AbstractEventLoop,
+        *,
+        repeat: bool = False,
+        deadline_s: float | None = None,
+        open_capture: Callable[[str], Any] = _open_capture,
+    ) -> None:
+        self.ingest_id = uuid.uuid4().hex
+        self.source = source
+        self.pipeline = pipeline
+        self.scheduler = scheduler
+        self.settings = settings
+        self.repeat = repeat
+        self.deadline_s = deadline_s
+        self.state = "starting"
+        self.error: str | None = None
+        self.frames_decoded = 0
+        self.frames_inferred = 0
+        self.summary: SessionSummary | None = None
+        self.finished_at: float | None = None
+        self._open_capture = open_capture
+        self._loop = loop
+        self._session = pipeline.create_stream_session(settings)
+        self._latest = LatestFrame()
+        self._stop = threading.Event()
+        self._subscribers: set[asyncio.Queue] = set()
+        self._final: list[dict[str, Any] | None] | None = None
+        self._started = time.monotonic()
+        self._threads = [
+            threading.Thread(target=self._decode, name=f"ingest-decode-{self.ingest_id[:8]}", daemon=True),
+            threading.Thread(target=self._infer, name=f"ingest-infer-{self.ingest_id[:8]}", daemon=True),
+        ]
+
+    def start(self) -> None:
+        self.state = "running"
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._latest.close()
+        for thread in self._threads:
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=timeout)
+
+    @property
+    def finished(self) -> bool:
+        return self.state in {"stopped", "ended", "failed"}
+
+    def info(self) -> dict[str, Any]:
+        return {
+            "ingest_id": self.ingest_id,
+            "source": self.source,
+            "state": self.state,
+            "error": self.error,
+            "frames_decoded": self.frames_decoded,
+            "frames_inferred": self.frames_inferred,
+            "frames_dropped": self._latest.dropped,
+            "settings": self.settings,
+        }
+
+    def subscribe(self) -> asyncio.Queue:
+        """Must be called on the event loop; ``None`` on the queue marks the end of the session."""
+        subscriber: asyncio.Queue = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE)
+        if self._final is not None:
+            for message in self._final:
+                subscriber.put_nowait(message)
+        else:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: asyncio.Queue) -> None:
+        self._subscribers.discard(subscriber)
+
+    def _publish(self, message: dict[str, Any] | None) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._fanout, message)
+        except RuntimeError:
+            # Event loop already closed during shutdown.
+            pass
+
+    def _fanout(self, message: dict[str, Any] | None) -> None:
+        for subscriber in list(self._subscribers):
+            if subscriber.full():
+                subscriber.get_nowait()
+            subscriber.put_nowait(message)
+        if message is None:
+            self._subscribers.clear()
+
+    def _decode(self) -> None:
+        import cv2
+
+        capture = self._open_capture(self.source)
+        try:
+            if not capture.isOpened():
+                self.error = f"Cannot open source: {self.source}"
+                return
+            # Files decode faster than real time; pace them to their native rate.
+            fps = capture.get(cv2.CAP_PROP_FPS) if Path(self.source).exists() else 0.0
+            paced_from = time.monotonic()
+            paced_frames = 0
+            while not self._stop.is_set():
+                ok, frame = capture.read()
+                if not ok:
+                    if self.repeat and self.frames_decoded:
+                        capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    break
+                self.frames_decoded += 1
+                self._latest.put(frame, int((time.monotonic() - self._started) * 1000))
+                if fps > 0:
+                    paced_frames += 1
+                    delay = paced_from + paced_frames / fps - time.monotonic()
+                    if delay > 0:
+                        self._stop.wait(delay)
+        except Exception as exc:
+            self.error = f"Decode failed: {exc}"
+        finally:
+            capture.release()
+            self._latest.close()
+
+    def _infer(self) -> None:
+        min_interval = 1.0 / self.settings.target_fps
+        target = self.pipeline.detector.input_format
+        last_run = 0.0
+        while not self._stop.is_set():
+            wait = last_run + min_interval - time.monotonic()
+            if wait > 0 and self._stop.wait(wait):
+                break
+            item = self._latest.take(timeout=0.5)
+            if item is None:
+                if self._latest.closed:
+                    break
+                continue
+            last_run = time.monotonic()
+            frame, timestamp_ms = item
+
+            def run() -> Any:
+                adapted = to_adapter_frame(frame, PixelFormat.BGR, target=target)
+                return self.pipeline.infer_stream_frame(adapted, self._session, timestamp_ms)
+
+            try:
+                result = self.scheduler.submit(
+                    run,
+                    work_class=WorkClass.STREAM,
+                    session_key=self.ingest_id,
+                    deadline_s=self.deadline_s,
+                ).result()
+            except (DeadlineExceeded, QueueFull):
+                continue
+            except CancelledError:
+                # The scheduler shut down with this frame still queued.
+                break
+            except Exception as exc:
+                if self.scheduler.closed:
+                    break
+                self._publish({"type": "error", "detail": str(exc)})
+                continue
+
+            self.frames_inferred += 1
+            meta = self.pipeline.model_meta()
+            envelope = StreamFrameEnvelope(
+                model_version=meta.model_version,
+                schema_version=meta.schema_version,
+                result=result,
+            )
+            self._publish(envelope.model_dump())
+
+        self._finish()
+
+    def _finish(self) -> None:
+        if self._stop.is_set():
+            self.state = "stopped"
+        elif self.error:
+            self.state = "failed"
+        else:
+            self.state = "ended"
+        self.summary = self._session.aggregator.build_summary()
+        self.finished_at = time.monotonic()
+        meta = self.pipeline.model_meta()
+        final: list[dict[str, Any] | None] = []
+        if self.error:
+            final.append({"type": "error", "detail": self.error})
+        final.append(
+            StreamSummaryEnvelope(
+                model_version=meta.model_version,
+                schema_version=meta.schema_version,
+                summary=self.summary,
+            ).model_dump()
+        )
+        final.append(None)
+        self._final = final
+        for message in final:
+            self._publish(message)
+
+
+class IngestManager:
+    """Starts and tracks ingest sessions.
+
+    Finished sessions stay listed for ``retention_s`` so clients can read
+    their summary, then are dropped on the next ``start`` or ``list``.
+    """
+
+    def __init__(
+        self,
+        scheduler: InferenceScheduler,
+        max_sessions: int = 4,
+        deadline_s: float | None = None,
+        retention_s: float = 300.0,
+    ) -> None:
+        self.scheduler = scheduler
+        self.max_sessions = max(1, max_sessions)
+        self.deadline_s = deadline_s
+        self.retention_s = retention_s
+        self._sessions: dict[str, IngestSession] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        source: str,
+        pipeline: InferencePipeline,
+        settings: StreamSettings,
+        *,
+        repeat: bool = False,
+        open_capture: Callable[[str], Any] = _open_capture,
+    ) -> IngestSession:
+        session = IngestSession(
+            source,
+            pipeline,
+            self.scheduler,
+            settings,
+            asyncio.get_running_loop(),
+            repeat=repeat,
+            deadline_s=self.deadline_s,
+            open_capture=open_capture,
+        )
+        with self._lock:
+            self._prune()
+            active = sum(1 for s in self._sessions.values() if not s.finished)
+            if active >= self.max_sessions:
+                raise QueueFull(f"At most {self.max_sessions} ingest sessions may run at once")
+            self._sessions[session.ingest_id] = session
+        session.start()
+        return session
+
+    def get(self, ingest_id: str) -> IngestSession | None:
+        with self._lock:
+            return self._sessions.get(ingest_id)
+
+    def list(self) -> list[IngestSession]:
+        with self._lock:
+            self._prune()
+            return list(self._sessions.values())
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.retention_s
+        for ingest_id, session in list(self._sessions.items()):
+            if session.finished_at is not None and session.finished_at <= cutoff:
+                del self._sessions[ingest_id]
+
+    def remove(self, ingest_id: str) -> IngestSession | None:
+        with self._lock:
+            session = self._sessions.pop(ingest_id, None)
+        if session is not None:
+            session.stop()
+        return session
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.stop()
@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Literal
+
+from pydantic import BaseModel
+
+from app.inference.aggregator import SessionAggregator
+from app.inference.ingest import is_source_allowed
+from app.inference.scheduler import InferenceScheduler, QueueFull, WorkClass
+from app.schemas.common import FrameResult, SessionSummary
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from app.inference.pipeline import InferencePipeline
+
+JobState = Literal["queued", "running", "cancelled", "completed", "failed", "interrupted"]
+
+JOB_FILE = "job.json"
+RESULTS_FILE = "results.ndjson"
+_RESUMABLE = {"cancelled", "failed", "interrupted"}
+_QUEUE_FULL_BACKOFF_S = 0.5
+
+
+class JobStateError(RuntimeError):
+    pass
+
+
+class BulkImageRecord(BaseModel):
+    type: Literal["image"] = "image"
+    index: int
+    path: str
+    model_version: str
+    result: FrameResult
+
+
+class BulkErrorRecord(BaseModel):
+    type: Literal["error"] = "error"
+    index: int
+    path: str
+    detail: str
+
+
+class BulkSummaryRecord(BaseModel):
+    type: Literal["summary"] = "summary"
+    model_version: str
+    schema_version: str
+    images: int
+    failed: int
+    summary: SessionSummary
+
+
+@dataclass(slots=True)
+class JobSpec:
+    job_id: str
+    manifest: str
+    batch_size: int
+    created_at: float
+    state: JobState = "queued"
+    error: str | None = None
+    total: int | None = None
+    processed: int = 0
+    failed: int = 0
+
+
+@dataclass(slots=True)
+class WrittenResults:
+    done: set[int] = field(default_factory=set)
+    failed: int = 0
+    valid_bytes: int = 0
+    completed: bool = False
+    aggregator: SessionAggregator = field(default_factory=SessionAggregator)
+
+
+def decode_image_file(path: str) -> np.ndarray:
+    """Top-level so it pickles into decode worker processes."""
+    import cv2
+
+    frame = cv2.imread(path, cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError(f"Cannot decode image: {path}")
+    return frame
+
+
+def read_manifest(path: Path) -> list[str]:
+    """One image path per line; blank lines and ``#`` comments are skipped, relative paths resolve against the manifest."""
+    paths = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        entry = line.strip()
+        if not entry or entry.startswith("#"):
+            continue
+        image = Path(entry)
+        paths.append(str(image if image.is_absolute() else path.parent / image))
+    return paths
+
+
+def _count_detections(aggregator: SessionAggregator, labels: list[str]) -> None:
+    import numpy as np
+
+    from app.inference.detections import UNTRACKED, encode_ripeness
+
+    aggregator.update_session(encode_ripeness(labels), np.full(len(labels), UNTRACKED, dtype=np.int64))
+
+
+def scan_results(path: Path) -> WrittenResults:
+    """Read back complete lines of an earlier run; a torn trailing line is discarded."""
+    written = WrittenResults()
+    if not path.exists():
+        return written
+    with path.open("rb") as handle:
+        for line in handle:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                data = json.loads(line)
+            except ValueError:
+                break
+            kind = data.get("type")
+            if kind == "summary":
+                written.completed = True
+            elif kind == "image":
+                written.done.add(data["index"])
+                _count_detections(written.aggregator, [d["ripeness"] for d in data["result"]["detections"]])
+            elif kind == "error":
+                written.done.add(data["index"])
+                written.failed += 1
+            written.valid_bytes += len(line)
+    return written
+
+
+def _chunks(items: list[int], size: int) -> Iterator[list[int]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class BulkJob:
+    """Runs a manifest of stored images through the detector in the background.
+
+    Decoding happens on the manager's decode pool, one batch ahead of the
+    detector. Each batch goes to the shared scheduler as ``WorkClass.BULK``
+    under the job's own session key, so a job never has more than one batch
+    queued and live streams keep their larger share of the workers. Results
+    are appended to ``results.ndjson`` one line per image and flushed per
+    batch; resuming skips every index already written.
+    """
+
+    def __init__(
+        self,
+        spec: JobSpec,
+        directory: Path,
+        pipeline: InferencePipeline,
+        scheduler: InferenceScheduler,
+        decoder_factory: Callable[[], Executor],
+        allowed_roots: list[str],
+    ) -> None:
+        self.spec = spec
+        self.directory = directory
+        self.pipeline = pipeline
+        self.scheduler = scheduler
+        self.decoder_factory = decoder_factory
+        self.allowed_roots = allowed_roots
+        self.summary: SessionSummary | None = None
+        self._stop = threading.Event()
+        # What an early stop is recorded as; the job thread is the only one that saves it.
+        self._stopped_state: JobState = "cancelled"
+        self._thread: threading.Thread | None = None
+        self._run_started = 0.0
+        self._run_processed = 0
+
+    @property
+    def job_id(self) -> str:
+        return self.spec.job_id
+
+    @property
+    def results_path(self) -> Path:
+        return self.directory / RESULTS_FILE
+
+    @property
+    def finished(self) -> bool:
+        return self.spec.state not in {"queued", "running"}
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._stopped_state = "cancelled"
+        self.spec.state = "running"
+        self.spec.error = None
+        self.save()
+        self._thread = threading.Thread(target=self._run, name=f"bulk-job-{self.job_id[:8]}", daemon=True)
+        self._thread.start()
+
+    def cancel(self, timeout: float = 10.0, *, interrupt: bool = False) -> None:
+        """Stop the run; ``interrupt`` records it as resumable after a restart rather than a user cancel."""
+        if interrupt:
+            self._stopped_state = "interrupted"
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f"{JOB_FILE}.tmp"
+        tmp.write_text(json.dumps(asdict(self.spec)), encoding="utf-8")
+        tmp.replace(self.directory / JOB_FILE)
+
+    def info(self) -> dict[str, Any]:
+        spec = self.spec
+        elapsed = time.monotonic() - self._run_started if spec.state == "running" else 0.0
+        rate = self._run_processed / elapsed if elapsed > 0 else 0.0
+        eta_s = None
+        if spec.state == "running" and spec.total is not None and rate > 0:
+            eta_s = round(max(spec.total - spec.processed, 0) / rate, 1)
+        return {**_spec_info(spec), "images_per_s": round(rate, 2), "eta_s": eta_s, "summary": self.summary}
+
+    def _decode(self, decoder: Executor, paths: list[str]) -> list[Future]:
+        futures = []
+        for path in paths:
+            if is_source_allowed(path, self.allowed_roots):
+                futures.append(decoder.submit(decode_image_file, path))
+            else:
+                future: Future = Future()
+                future.set_exception(PermissionError(f"Not under bulk_allowed_roots: {path}"))
+                futures.append(future)
+        return futures
+
+    def _detect(self, frames: list[np.ndarray]) -> list[FrameResult]:
+        while True:
+            try:
+                future = self.scheduler.submit(
+                    lambda: self.pipeline.infer_image_batch(frames),
+                    work_class=WorkClass.BULK,
+                    session_key=self.job_id,
+                    cost=len(frames),
+                )
+            except QueueFull:
+                # Live traffic filled the queue; bulk work simply waits its turn.
+                if self._stop.wait(_QUEUE_FULL_BACKOFF_S):
+                    raise
+                continue
+            return future.result()
+
+    def _run(self) -> None:
+        spec = self.spec
+        try:
+            paths = read_manifest(Path(spec.manifest))
+            spec.total = len(paths)
+            written = scan_results(self.results_path)
+            spec.processed = len(written.done)
+            spec.failed = written.failed
+            pending = [index for index in range(len(paths)) if index not in written.done]
+            self._run_started = time.monotonic()
+            self._run_processed = 0
+            meta = self.pipeline.model_meta()
+
+            mode = "r+b" if self.results_path.exists() else "wb"
+            with self.decoder_factory() as decoder, self.results_path.open(mode) as sink:
+                sink.seek(written.valid_bytes)
+                sink.truncate()
+                # Keep the next batch decoding while the current one is on the detector.
+                ahead: deque[tuple[list[int], list[Future]]] = deque()
+                for chunk in _chunks(pending, spec.batch_size):
+                    if self._stop.is_set():
+                        break
+                    ahead.append((chunk, self._decode(decoder, [paths[i] for i in chunk])))
+                    if len(ahead) > 1:
+                        self._write_batch(sink, paths, *ahead.popleft(), written.aggregator, meta.model_version)
+                while ahead and not self._stop.is_set():
+                    self._write_batch(sink, paths, *ahead.popleft(), written.aggregator, meta.model_version)
+                for _, futures in ahead:
+                    for future in futures:
+                        future.cancel()
+
+                if self._stop.is_set():
+                    spec.state = self._stopped_state
+                    return
+                self.summary = written.aggregator.build_summary()
+                # A run stopped between writing the summary and saving the state has nothing left to add.
+                if not written.completed:
+                    record = BulkSummaryRecord(
+                        model_version=meta.model_version,
+                        schema_version=meta.schema_version,
+                        images=spec.processed,
+                        failed=spec.failed,
+                        summary=self.summary,
+                    )
+                    sink.write((record.model_dump_json() + "\n").encode("utf-8"))
+            spec.state = "completed"
+        except QueueFull:
+            spec.state = self._stopped_state
+        except Exception as exc:
+            spec.state = "failed"
+            spec.error = str(exc)
+        finally:
+            self.save()
+
+    def _write_batch(
+        self,
+        sink: BinaryIO,
+        paths: list[str],
+        chunk: list[int],
+        futures: list[Future],
+        aggregator: SessionAggregator,
+        model_version: str,
+    ) -> None:
+        lines: list[str] = []
+        decoded: list[tuple[int, np.ndarray]] = []
+        for index, future in zip(chunk, futures):
+            try:
+                decoded.append((index, future.result()))
+            except (ValueError, OSError) as exc:
+                # Unreadable or disallowed images; a broken decode pool fails the job instead.
+                lines.append(BulkErrorRecord(index=index, path=paths[index], detail=str(exc)).model_dump_json())
+        failed = len(lines)
+
+        results = self._detect([frame for _, frame in decoded]) if decoded else []
+        for (index, _), result in zip(decoded, results):
+            _count_detections(aggregator, [d.ripeness for d in result.detections])
+            record = BulkImageRecord(index=index, path=paths[index], model_version=model_version, result=result)
+            lines.append(record.model_dump_json())
+
+        sink.write(("\n".join(lines) + "\n").encode("utf-8"))
+        sink.flush()
+        self.spec.processed += len(chunk)
+        self.spec.failed += failed
+        self._run_processed += len(chunk)
+
+
+class JobManager:
+    """Owns bulk jobs, their on-disk directories and the shared decode pool.
+
+    Jobs live under ``<directory>/<job_id>/`` as ``job.json`` plus the results
+    file, and are reloaded on start-up; one that was running when the
+    process stopped comes back as ``interrupted`` and can be resumed.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        scheduler: InferenceScheduler,
+        *,
+        allowed_roots: list[str],
+        max_running: int = 1,
+        batch_size: int = 8,
+        decode_processes: int = 2,
+        decoder_factory: Callable[[], Executor] | None = None,
+    ) -> None:
+        self.directory = directory
+        self.scheduler = scheduler
+        self.allowed_roots = allowed_roots
+        self.max_running = max(1, max_running)
+        self.batch_size = max(1, batch_size)
+        self.decode_processes = max(1, decode_processes)
+        self._decoder_factory = decoder_factory or self._process_pool
+        self._jobs: dict[str, BulkJob] = {}
+        self._specs: dict[str, JobSpec] = {}
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        for job_file in sorted(self.directory.glob(f"*/{JOB_FILE}")):
+            try:
+                spec = JobSpec(**json.loads(job_file.read_text(encoding="utf-8")))
+            except (ValueError, TypeError):
+                continue
+            if spec.state in {"queued", "running"}:
+                spec.state = "interrupted"
+            self._specs[spec.job_id] = spec
+
+    def _process_pool(self) -> Executor:
+        # Spawned rather than forked: the service process already runs threads.
+        return ProcessPoolExecutor(max_workers=self.decode_processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def is_manifest_allowed(self, manifest: str) -> bool:
+        return is_source_allowed(manifest, self.allowed_roots)
+
+    def _job(self, spec: JobSpec, pipeline: InferencePipeline) -> BulkJob:
+        return BulkJob(
+            spec,
+            self.directory / spec.job_id,
+            pipeline,
+            self.scheduler,
+            self._decoder_factory,
+            self.allowed_roots,
+        )
+
+    def _launch(self, job: BulkJob) -> None:
+        with self._lock:
+            running = sum(1 for j in self._jobs.values() if not j.finished)
+            if running >= self.max_running:
+                raise QueueFull(f"At most {self.max_running} bulk jobs may run at once")
+            self._jobs[job.job_id] = job
+            self._specs[job.job_id] = job.spec
+            job.start()
+
+    def submit(self, manifest: str, pipeline: InferencePipeline, batch_size: int | None = None) -> BulkJob:
+        spec = JobSpec(
+            job_id=uuid.uuid4().hex,
+            manifest=str(Path(manifest).resolve()),
+            batch_size=max(1, batch_size or self.batch_size),
+            created_at=time.time(),
+        )
+        job = self._job(spec, pipeline)
+        self._launch(job)
+        return job
+
+    def resume(self, job_id: str, pipeline: InferencePipeline) -> BulkJob | None:
+        with self._lock:
+            spec = self._specs.get(job_id)
+        if spec is None:
+            return None
+        if spec.state not in _RESUMABLE:
+            raise JobStateError(f"Job is {spec.state}; only cancelled, failed or interrupted jobs resume")
+        job = self._job(spec, pipeline)
+        self._launch(job)
+        return job
+
+    def cancel(self, job_id: str) -> JobSpec | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            spec = self._specs.get(job_id)
+        if job is not None:
+            job.cancel()
+        return spec
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            spec = self._specs.get(job_id)
+        if job is not None:
+            return job.info()
+        return _spec_info(spec) if spec is not None else None
+
+    def list(self) -> list[dict[str, Any]]:
+        with self._lock:
+            job_ids = list(self._specs)
+        return [info for info in (self.get(job_id) for job_id in job_ids) if info is not None]
+
+    def results_path(self, job_id: str) -> Path | None:
+        with self._lock:
+            known = job_id in self._specs
+        path = self.directory / job_id / RESULTS_FILE
+        return path if known and path.exists() else None
+
+    def close(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if not job.finished:
+                job.cancel(interrupt=True)
+
+
+def _spec_info(spec: JobSpec) -> dict[str, Any]:
+    return {
+        "job_id": spec.job_id,
+        "manifest": spec.manifest,
+        "state": spec.state,
+        "error": spec.error,
+        "batch_size": spec.batch_size,
+        "total": spec.total,
+        "processed": spec.processed,
+        "failed": spec.failed,
+        "images_per_s": 0.0,
+        "eta_s": None,
+        "summary": None,
+    }
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class MotionGateSettings:
+    threshold: float = 0.02
+    max_skip: int = 5
+    signature_size: int = 32
+
+
+def frame_signature(frame: np.ndarray, size: int = 32) -> np.ndarray:
+    """Downscaled grayscale thumbnail in [0, 1] used to score frame-to-frame change."""
+    import cv2
+
+    if frame.ndim == 3 and frame.shape[2] == 3:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    elif frame.ndim == 3:
+        gray = frame[:, :, 0]
+    else:
+        gray = frame
+    thumb = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+    return thumb.astype(np.float32) * np.float32(1.0 / 255.0)
+
+
+def change_score(previous: np.ndarray, current: np.ndarray) -> float:
+    return float(np.mean(np.abs(current - previous)))
@@ -1,27 +1,21 @@
 from __future__ import annotations
 
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import numpy as np
 
-from app.inference.adapters.base import DetectorAdapter, RawDetection
+from app.inference.adapters.base import DetectorAdapter
 from app.inference.aggregator import SessionAggregator
+from app.inference.buffers import BufferPool
+from app.inference.detections import DetectionBatch
+from app.inference.motion import MotionGateSettings, change_score, frame_signature
+from app.inference.resolution import LadderSettings, LadderState, step_ladder
+from app.inference.shadow import ShadowEvaluator
+from app.inference.tiling import TileSettings, detect_tiled
 from app.inference.tracker import ByteTrackManager
-from app.schemas.common import Detection, FrameResult, ModelMeta
-
-
-def _sanitize_bbox(bbox: tuple[float, float, float, float], width: int, height: int) -> tuple[float, float, float, float]:
-    x1, y1, x2, y2 = bbox
-    x1 = max(0.0, min(float(width - 1), x1))
-    y1 = max(0.0, min(float(height - 1), y1))
-    x2 = max(0.0, min(float(width - 1), x2))
-    y2 = max(0.0, min(float(height - 1), y2))
-    if x2 < x1:
-        x1, x2 = x2, x1
-    if y2 < y1:
-        y1, y2 = y2, y1
-    return (x1, y1, x2, y2)
+from app.schemas.api import StreamSettings
+from app.schemas.common import FrameResult, ModelMeta
 
 
 @dataclass
@@ -29,13 +23,39 @@ class StreamSession:
     tracker: ByteTrackManager
     aggregator: SessionAggregator
     frame_index: int = 0
+    last_signature: np.ndarray | None = None
+    # Columns behind the latest FrameResult, inferred or reused.
+    last_detections: DetectionBatch | None = None
+    last_ripeness: np.ndarray | None = None
+    consecutive_skips: int = 0
+    skipped_frames: int = 0
+    settings: StreamSettings | None = None
+    last_admitted_ms: int | None = None
+    dropped_frames: int = 0
+    ladder: LadderState = field(default_factory=LadderState)
+    last_imgsz: int | None = None
 
 
 class InferencePipeline:
-    def __init__(self, detector: DetectorAdapter, model_version: str, schema_version: str) -> None:
+    def __init__(
+        self,
+        detector: DetectorAdapter,
+        model_version: str,
+        schema_version: str,
+        tiling: TileSettings | None = None,
+        motion_gate: MotionGateSettings | None = None,
+        ladder: LadderSettings | None = None,
+        buffer_pool: BufferPool | None = None,
+        shadow: ShadowEvaluator | None = None,
+    ) -> None:
         self.detector = detector
         self.model_version = model_version
         self.schema_version = schema_version
+        self.tiling = tiling
+        self.motion_gate = motion_gate
+        self.ladder = ladder
+        self.buffer_pool = buffer_pool
+        self.shadow = shadow
 
     def model_meta(self) -> ModelMeta:
         return ModelMeta(
@@ -45,60 +65,228 @@ class InferencePipeline:
             loaded=self.detector.loaded,
         )
 
-    def create_stream_session(self) -> StreamSession:
-        return StreamSession(tracker=ByteTrackManager(), aggregator=SessionAggregator())
+    def create_stream_session(self, settings: StreamSettings | None = None) -> StreamSession:
+        if settings is None:
+            tracker = ByteTrackManager()
+        else:
+            tracker = ByteTrackManager(
+                iou_threshold=settings.tracker_iou_threshold,
+                max_missing=settings.tracker_max_missing,
+            )
+        return StreamSession(tracker=tracker, aggregator=SessionAggregator(), settings=settings)
+
+    def admit_stream_frame(self, session: StreamSession, timestamp_ms: int) -> bool:
+        """Drop frames that arrive faster than the session's negotiated target FPS."""
+        if session.settings is None:
+            return True
+        # 10% slack so ordinary client timer jitter does not drop frames.
+        min_interval_ms = 900.0 / session.settings.target_fps
+        if session.last_admitted_ms is not None and timestamp_ms - session.last_admitted_ms < min_interval_ms:
+            session.dropped_frames += 1
+            return False
+        session.last_admitted_ms = timestamp_ms
+        return True
 
-    def infer_image(self, frame: np.ndarray) -> tuple[FrameResult, float]:
+    def infer_image(self, frame: np.ndarray, tiled: bool = False, max_tiles: int | None = None) -> tuple[FrameResult, float]:
+        if tiled and self.tiling is None:
+            raise ValueError("Tiled inference is disabled")
         session = self.create_stream_session()
         start = time.perf_counter()
-        result = self._infer_frame(frame, session, timestamp_ms=0, use_track=False)
+        result = self._infer_frame(
+            frame,
+            session,
+            timestamp_ms=0,
+            use_track=False,
+            tiled=tiled,
+            max_tiles=max_tiles,
+        )
         elapsed_ms = (time.perf_counter() - start) * 1000.0
         return result, elapsed_ms
 
-    def infer_stream_frame(self, frame: np.ndarray, session: StreamSession, timestamp_ms: int) -> FrameResult:
-        return self._infer_frame(frame, session, timestamp_ms=timestamp_ms, use_track=True)
+    def infer_stream_frame(
+        self,
+        frame: np.ndarray,
+        session: StreamSession,
+        timestamp_ms: int,
+        queue_wait_ms: float | None = None,
+    ) -> FrameResult:
+        if self.ladder is not None and queue_wait_ms is not None:
+            step_ladder(self.ladder, session.ladder, queue_wait_ms, len(self._session_rungs(session)))
 
-    def _infer_frame(self, frame: np.ndarray, session: StreamSession, timestamp_ms: int, use_track: bool) -> FrameResult:
-        if frame.ndim != 3:
-            raise ValueError("Expected BGR frame with shape [H, W, C]")
-        if not self.detector.loaded:
-            raise RuntimeError("Detector is not loaded")
+        gate = self.motion_gate
+        if gate is None:
+            return self._infer_frame(frame, session, timestamp_ms=timestamp_ms, use_track=True)
 
-        raw_dets = list(self.detector.predict(frame))
-        height, width = frame.shape[:2]
-        if use_track:
-            tracked = session.tracker.update(raw_dets)
-        else:
-            tracked = []
-
-        track_map = {id(t.det): t.track_id for t in tracked}
-        detections: list[Detection] = []
-        ripeness_list: list[str] = []
-        track_ids: list[int | None] = []
-
-        for det in raw_dets:
-            ripeness = self.detector.ripeness_from_class_id(det.class_id)
-            sanitized_bbox = _sanitize_bbox(det.bbox, width, height)
-            track_id = track_map.get(id(det)) if use_track else None
-            detections.append(
-                Detection(
-                    bbox=sanitized_bbox,
-                    ripeness=ripeness,
-                    confidence=det.confidence,
-                    track_id=track_id,
-                )
+        signature = frame_signature(frame, gate.signature_size)
+        if (
+            session.last_signature is not None
+            and session.consecutive_skips < gate.max_skip
+            and signature.shape == session.last_signature.shape
+            and change_score(session.last_signature, signature) < gate.threshold
+        ):
+            return self._reuse_last_frame(session, timestamp_ms)
+
+        result = self._infer_frame(frame, session, timestamp_ms=timestamp_ms, use_track=True)
+        session.last_signature = signature
+        session.consecutive_skips = 0
+        return result
+
+    def infer_stream_batch(
+        self,
+        frames: list[np.ndarray],
+        session: StreamSession,
+        timestamps_ms: list[int],
+    ) -> list[FrameResult]:
+        """Detect a batch of consecutive frames in one call, then track them in order.
+
+        For offline passes where throughput matters more than per-frame latency;
+        the motion gate and tiling do not apply.
+        """
+        if not frames:
+            return []
+        imgsz = self._session_imgsz(session)
+        batched = self.detector.predict_batch(frames, imgsz=imgsz)
+        return [
+            self._infer_frame(
+                frame,
+                session,
+                timestamp_ms=timestamp_ms,
+                use_track=True,
+                detected=(self._filter_for_session(session, detections), imgsz or self.detector.imgsz),
             )
-            ripeness_list.append(ripeness)
-            track_ids.append(track_id)
+            for frame, timestamp_ms, detections in zip(frames, timestamps_ms, batched)
+        ]
 
-        session.aggregator.update_session(ripeness_list, track_ids)
-        frame_summary = session.aggregator.frame_summary(ripeness_list)
+    def infer_image_batch(self, frames: list[np.ndarray]) -> list[FrameResult]:
+        """Detect a batch of unrelated still images in one call, each with its own summary.
 
-        result = FrameResult(
+        For bulk jobs; nothing is tracked across images and tiling does not apply.
+        """
+        if not frames:
+            return []
+        batched = self.detector.predict_batch(frames)
+        return [
+            self._infer_frame(
+                frame,
+                self.create_stream_session(),
+                timestamp_ms=0,
+                use_track=False,
+                detected=(detections, self.detector.imgsz),
+            )
+            for frame, detections in zip(frames, batched)
+        ]
+
+    def _reuse_last_frame(self, session: StreamSession, timestamp_ms: int) -> FrameResult:
+        # Same detections and track ids as the last inferred frame; the aggregator
+        # already counted them, so only the per-frame summary is rebuilt.
+        detections = session.last_detections if session.last_detections is not None else DetectionBatch.empty()
+        ripeness = session.last_ripeness if session.last_ripeness is not None else np.empty(0, dtype=np.uint8)
+        result = self._frame_result(session, timestamp_ms, detections, ripeness, session.last_imgsz)
+        session.frame_index += 1
+        session.consecutive_skips += 1
+        session.skipped_frames += 1
+        return result
+
+    def _session_rungs(self, session: StreamSession) -> tuple[int, ...]:
+        if self.ladder is None:
+            return ()
+        cap = session.settings.imgsz if session.settings is not None else None
+        return self.ladder.sizes_for(cap)
+
+    def _session_imgsz(self, session: StreamSession) -> int | None:
+        rungs = self._session_rungs(session)
+        if rungs:
+            return rungs[min(session.ladder.level, len(rungs) - 1)]
+        if session.settings is not None:
+            return session.settings.imgsz
+        return None
+
+    def _detect(
+        self,
+        frame: np.ndarray,
+        session: StreamSession,
+        tiled: bool,
+        max_tiles: int | None,
+    ) -> tuple[DetectionBatch, int]:
+        if tiled and self.tiling is not None:
+            detections, _ = detect_tiled(self.detector, frame, self.tiling, max_tiles=max_tiles)
+            return detections, self.tiling.tile_size
+        imgsz = self._session_imgsz(session)
+        detections = self._filter_for_session(session, self._predict(frame, imgsz))
+        return detections, imgsz or self.detector.imgsz
+
+    @staticmethod
+    def _filter_for_session(session: StreamSession, detections: DetectionBatch) -> DetectionBatch:
+        settings = session.settings
+        if settings is None:
+            return detections
+        return detections.above(settings.conf_threshold)
+
+    def _predict(self, frame: np.ndarray, imgsz: int | None) -> DetectionBatch:
+        pool = self.buffer_pool
+        height, width = frame.shape[:2]
+        ratio = (imgsz or self.detector.imgsz) / max(height, width)
+        if pool is None or ratio >= 1.0:
+            return self.detector.predict(frame, imgsz=imgsz)
+
+        # Do the detector's downscale into a pooled buffer so the adapter only
+        # ever allocates at model resolution, then map boxes back.
+        import cv2
+
+        size = (max(1, int(round(width * ratio))), max(1, int(round(height * ratio))))
+        with pool.lease((size[1], size[0], *frame.shape[2:]), frame.dtype) as scaled:
+            cv2.resize(frame, size, dst=scaled, interpolation=cv2.INTER_LINEAR)
+            detections = self.detector.predict(scaled, imgsz=imgsz)
+        return detections.transformed(scale=(width / size[0], height / size[1]))
+
+    def _frame_result(
+        self,
+        session: StreamSession,
+        timestamp_ms: int,
+        detections: DetectionBatch,
+        ripeness: np.ndarray,
+        imgsz: int | None,
+    ) -> FrameResult:
+        # The API boundary: the only place per-box objects are built.
+        return FrameResult(
             frame_index=session.frame_index,
             timestamp_ms=timestamp_ms,
-            detections=detections,
-            frame_summary=frame_summary,
+            detections=detections.to_detections(ripeness),
+            frame_summary=session.aggregator.frame_summary(ripeness),
+            imgsz=imgsz,
         )
+
+    def _infer_frame(
+        self,
+        frame: np.ndarray,
+        session: StreamSession,
+        timestamp_ms: int,
+        use_track: bool,
+        tiled: bool = False,
+        max_tiles: int | None = None,
+        detected: tuple[DetectionBatch, int] | None = None,
+    ) -> FrameResult:
+        if frame.ndim != 3:
+            raise ValueError("Expected BGR frame with shape [H, W, C]")
+        if not self.detector.loaded:
+            raise RuntimeError("Detector is not loaded")
+
+        detections, imgsz = detected if detected is not None else self._detect(frame, session, tiled, max_tiles)
+        if use_track:
+            detections = detections.with_track_ids(session.tracker.update(detections))
+        # Tracks follow the detector's boxes; clamping is only for what leaves the service.
+        height, width = frame.shape[:2]
+        detections = detections.clipped(width, height)
+        ripeness = self.detector.ripeness_codes(detections.class_ids)
+        if self.shadow is not None and not tiled:
+            # Tiled results are merged from many crops; a whole-frame shadow pass is no comparison.
+            conf_threshold = session.settings.conf_threshold if session.settings is not None else None
+            self.shadow.offer(frame, detections, ripeness, imgsz, conf_threshold)
+
+        session.aggregator.update_session(ripeness, detections.track_ids)
+        result = self._frame_result(session, timestamp_ms, detections, ripeness, imgsz)
         session.frame_index += 1
+        session.last_imgsz = imgsz
+        session.last_detections = detections
+        session.last_ripeness = ripeness
         return result
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import gc
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    from app.inference.scheduler import InferenceScheduler
+
+CpuMode = Literal["sample", "deterministic"]
+
+_IGNORED_ALLOCATIONS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+@dataclass(slots=True)
+class CpuProfile:
+    mode: CpuMode
+    format: Literal["collapsed", "pstats"]
+    seconds: float
+    # Stack samples in sample mode, function calls in deterministic mode.
+    events: int
+    threads: list[str]
+    output: str
+
+
+@dataclass(slots=True)
+class AllocationGrowth:
+    size_diff_bytes: int
+    count_diff: int
+    size_bytes: int
+    count: int
+    traceback: list[str]
+
+
+@dataclass(slots=True)
+class StructureCensus:
+    type: str
+    instances_before: int
+    instances_after: int
+    approx_bytes_before: int
+    approx_bytes_after: int
+    entries_before: int
+    entries_after: int
+
+
+@dataclass(slots=True)
+class MemoryProfile:
+    seconds: float
+    traced_bytes: int
+    growth: list[AllocationGrowth] = field(default_factory=list)
+    structures: list[StructureCensus] = field(default_factory=list)
+
+
+def session_structure_types() -> tuple[type, ...]:
+    """Per-session objects whose growth is worth tracking on a long-lived pod."""
+    from app.inference.aggregator import SessionAggregator
+    from app.inference.pipeline import StreamSession
+    from app.inference.tracker import ByteTrackManager
+
+    return (StreamSession, SessionAggregator, ByteTrackManager)
+
+
+def _frame_label(code: Any) -> str:
+    filename = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    return f"{code.co_name} ({'/'.join(filename[-2:])}:{code.co_firstlineno})"
+
+
+def collapse_stacks(frames: dict[int, Any], names: dict[int, str], skip: int | None = None) -> Counter[str]:
+    """One ``thread;outermost;...;innermost`` key per thread, the flame-graph input format."""
+    stacks: Counter[str] = Counter()
+    for ident, frame in frames.items():
+        if ident == skip:
+            continue
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        labels.append(names.get(ident, f"thread-{ident}"))
+        stacks[";".join(reversed(labels))] += 1
+    return stacks
+
+
+def _attribute_values(obj: object) -> list[object]:
+    if hasattr(obj, "__dict__"):
+        return list(vars(obj).values())
+    return [getattr(obj, name) for name in getattr(type(obj), "__slots__", ()) if hasattr(obj, name)]
+
+
+def census(types: tuple[type, ...]) -> dict[str, tuple[int, int, int]]:
+    """Live instances, shallow bytes and container entries per type, counted from the GC heap.
+
+    Bytes are the object plus its direct attributes, which is enough to see a
+    tracker's track table or an aggregator's seen-id set grow between runs.
+    """
+    totals = {t: [0, 0, 0] for t in types}
+    for obj in gc.get_objects():
+        entry = totals.get(type(obj))
+        if entry is None:
+            continue
+        entry[0] += 1
+        entry[1] += sys.getsizeof(obj)
+        for value in _attribute_values(obj):
+            entry[1] += sys.getsizeof(value)
+            if isinstance(value, (dict, set, list, tuple)):
+                entry[2] += len(value)
+    return {t.__name__: (count, size, entries) for t, (count, size, entries) in totals.items()}
+
+
+def allocation_growth(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, top: int) -> list[AllocationGrowth]:
+    before = before.filter_traces(_IGNORED_ALLOCATIONS)
+    after = after.filter_traces(_IGNORED_ALLOCATIONS)
+    growth = []
+    for stat in after.compare_to(before, "traceback"):
+        if stat.size_diff <= 0:
+            continue
+        growth.append(
+            AllocationGrowth(
+                size_diff_bytes=stat.size_diff,
+                count_diff=stat.count_diff,
+                size_bytes=stat.size,
+                count=stat.count,
+                traceback=[f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+            )
+        )
+        if len(growth) >= top:
+            break
+    return growth
+
+
+class Profiler:
+    """Runs at most one CPU or memory profile at a time against the live process.
+
+    The sampling profiler walks every thread's stack (event loop, scheduler
+    workers, ingest and recorder threads) and reports collapsed stacks. The
+    deterministic one runs cProfile on the event loop and around each
+    scheduler work item, then merges the per-thread stats into one pstats
+    report. Memory profiles diff two tracemalloc snapshots and count live
+    per-session structures on both sides of the window.
+    """
+
+    def __init__(
+        self,
+        max_seconds: float = 30.0,
+        sample_interval_s: float = 0.005,
+        traceback_frames: int = 8,
+        watched_types: Callable[[], tuple[type, ...]] = session_structure_types,
+    ) -> None:
+        self.max_seconds = max_seconds
+        self.sample_interval_s = sample_interval_s
+        self.traceback_frames = max(1, traceback_frames)
+        self._watched_types = watched_types
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profiling run is already in progress")
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    def _window(self, seconds: float) -> float:
+        return max(0.0, min(seconds, self.max_seconds))
+
+    async def cpu(
+        self,
+        seconds: float,
+        mode: CpuMode = "sample",
+        scheduler: InferenceScheduler | None = None,
+        limit: int = 60,
+    ) -> CpuProfile:
+        seconds = self._window(seconds)
+        with self._exclusive():
+            if mode == "deterministic":
+                return await self._deterministic(seconds, scheduler, limit)
+            return await self._sample(seconds)
+
+    async def _sample(self, seconds: float) -> CpuProfile:
+        stacks: Counter[str] = Counter()
+        threads: set[str] = set()
+        samples = 0
+        stop = threading.Event()
+
+        def run() -> None:
+            nonlocal samples
+            own = threading.get_ident()
+            while not stop.wait(self.sample_interval_s):
+                names = {t.ident: t.name for t in threading.enumerate() if t.ident is not None}
+                stacks.update(collapse_stacks(sys._current_frames(), names, skip=own))
+                threads.update(name for ident, name in names.items() if ident != own)
+                samples += 1
+
+        sampler = threading.Thread(target=run, name="cpu-profiler", daemon=True)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+        output = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+        return CpuProfile("sample", "collapsed", seconds, samples, sorted(threads), output)
+
+    async def _deterministic(self, seconds: float, scheduler: InferenceScheduler | None, limit: int) -> CpuProfile:
+        profiles: dict[str, cProfile.Profile] = {}
+
+        def instrument(fn: Callable[[], Any]) -> Any:
+            name = threading.current_thread().name
+            profile = profiles.get(name)
+            if profile is None:
+                profile = profiles[name] = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one cProfile per process, and the event
+                # loop's profile already observes every thread.
+                return fn()
+            try:
+                return fn()
+            finally:
+                profile.disable()
+
+        loop_profile = cProfile.Profile()
+        started = time.perf_counter()
+        if scheduler is not None:
+            scheduler.instrument = instrument
+        loop_profile.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            loop_profile.disable()
+            if scheduler is not None:
+                scheduler.instrument = None
+        elapsed = time.perf_counter() - started
+
+        buffer = io.StringIO()
+        stats = pstats.Stats(loop_profile, stream=buffer)
+        for profile in profiles.values():
+            stats.add(profile)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        threads = [threading.current_thread().name, *sorted(profiles)]
+        calls = sum(entry[1] for entry in stats.stats.values())
+        return CpuProfile("deterministic", "pstats", round(elapsed, 3), calls, threads, buffer.getvalue())
+
+    async def memory(self, seconds: float, top: int = 25) -> MemoryProfile:
+        seconds = self._window(seconds)
+        with self._exclusive():
+            watched = self._watched_types()
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(self.traceback_frames)
+            try:
+                # Heap walks and snapshots take long on a big heap; keep them off the event loop.
+                census_before = await asyncio.to_thread(census, watched)
+                before = await asyncio.to_thread(tracemalloc.take_snapshot)
+                await asyncio.sleep(seconds)
+                after = await asyncio.to_thread(tracemalloc.take_snapshot)
+                census_after = await asyncio.to_thread(census, watched)
+                traced_bytes, _ = tracemalloc.get_traced_memory()
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+
+        structures = [
+            StructureCensus(
+                type=name,
+                instances_before=census_before[name][0],
+                instances_after=census_after[name][0],
+                approx_bytes_before=census_before[name][1],
+                approx_bytes_after=census_after[name][1],
+                entries_before=census_before[name][2],
+                entries_after=census_after[name][2],
+            )
+            for name in census_before
+        ]
+        growth = await asyncio.to_thread(allocation_growth, before, after, top)
+        return MemoryProfile(seconds, traced_bytes, growth, structures)
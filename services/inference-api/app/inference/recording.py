@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import mmap
+import queue
+import struct
+import threading
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from enum import IntEnum
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+import numpy as np
+
+from app.schemas.common import FrameResult, SessionSummary
+
+if TYPE_CHECKING:
+    from app.inference.pipeline import InferencePipeline
+
+RECORDING_MAGIC = b"LREC"
+RECORDING_VERSION = 1
+# magic, version
+FILE_HEADER = struct.Struct("<4sB3x")
+# kind, frame index, timestamp (ms), payload length
+RECORD_HEADER = struct.Struct("<B3xIqI")
+# kind, frame index, timestamp (ms), payload offset in the data file, payload length
+INDEX_ENTRY = struct.Struct("<B3xIqQI")
+INDEX_DTYPE = np.dtype(
+    {
+        "names": ["kind", "frame_index", "timestamp_ms", "offset", "length"],
+        "formats": ["u1", "<u4", "<i8", "<u8", "<u4"],
+        "offsets": [0, 4, 8, 16, 24],
+        "itemsize": INDEX_ENTRY.size,
+    }
+)
+DATA_SUFFIX = ".lrec"
+INDEX_SUFFIX = ".lidx"
+
+
+class RecordKind(IntEnum):
+    FRAME = 1
+    RESULT = 2
+    SUMMARY = 3
+
+
+@dataclass(slots=True)
+class RecordingSettings:
+    directory: Path
+    frame_every: int = 1
+    queue_max: int = 256
+    batch_max: int = 64
+
+
+@dataclass(slots=True)
+class RecordingHandle:
+    session_id: str
+    frames_seen: int = 0
+
+
+@dataclass(slots=True)
+class _FrameItem:
+    session_id: str
+    frame_index: int
+    timestamp_ms: int
+    payload: bytes | None
+    result: FrameResult
+
+
+@dataclass(slots=True)
+class _CloseItem:
+    session_id: str
+    summary: SessionSummary
+
+
+@dataclass
+class _SegmentWriter:
+    data: BinaryIO
+    index: BinaryIO
+    offset: int = FILE_HEADER.size
+    records: list[bytes] = field(default_factory=list)
+    entries: list[bytes] = field(default_factory=list)
+
+    def append(self, kind: RecordKind, frame_index: int, timestamp_ms: int, payload: bytes) -> int:
+        self.records.append(RECORD_HEADER.pack(kind, frame_index, timestamp_ms, len(payload)))
+        self.records.append(payload)
+        payload_offset = self.offset + RECORD_HEADER.size
+        self.entries.append(INDEX_ENTRY.pack(kind, frame_index, timestamp_ms, payload_offset, len(payload)))
+        self.offset = payload_offset + len(payload)
+        return RECORD_HEADER.size + len(payload)
+
+    def flush(self) -> None:
+        if not self.records:
+            return
+        # Data before index, so an index entry never points past the data file.
+        self.data.write(b"".join(self.records))
+        self.data.flush()
+        self.index.write(b"".join(self.entries))
+        self.index.flush()
+        self.records.clear()
+        self.entries.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.data.close()
+        self.index.close()
+
+
+class SessionRecorder:
+    """Writes stream sessions to append-only segments from a background thread.
+
+    Each session gets a ``<id>.lrec`` data file (a file header, then records of
+    ``RECORD_HEADER`` + payload) and a ``<id>.lidx`` index of fixed-size
+    ``INDEX_ENTRY`` rows pointing at the payloads. Both files are only ever
+    appended to; the index can be rebuilt from the data file if it is lost.
+
+    The inference path only enqueues references. When the bounded queue is
+    full the frame is dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(self, settings: RecordingSettings) -> None:
+        self.settings = settings
+        self.settings.directory.mkdir(parents=True, exist_ok=True)
+        self._queue: queue.Queue[_FrameItem | _CloseItem] = queue.Queue(maxsize=max(1, settings.queue_max))
+        # Session closes must never be lost; they wait here when the queue is full.
+        self._pending_closes: deque[_CloseItem] = deque()
+        self._writers: dict[str, _SegmentWriter] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.sessions_started = 0
+        self.sessions_closed = 0
+        self.records_written = 0
+        self.bytes_written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+
+    def open_session(self) -> RecordingHandle:
+        with self._lock:
+            self.sessions_started += 1
+        return RecordingHandle(session_id=uuid.uuid4().hex)
+
+    def record_frame(self, handle: RecordingHandle, payload: bytes, result: FrameResult) -> bool:
+        keep_payload = handle.frames_seen % max(1, self.settings.frame_every) == 0
+        handle.frames_seen += 1
+        item = _FrameItem(
+            session_id=handle.session_id,
+            frame_index=result.frame_index,
+            timestamp_ms=result.timestamp_ms,
+            payload=payload if keep_payload else None,
+            result=result,
+        )
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def close_session(self, handle: RecordingHandle, summary: SessionSummary) -> None:
+        item = _CloseItem(session_id=handle.session_id, summary=summary)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._pending_closes.append(item)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "sessions_started": self.sessions_started,
+                "sessions_closed": self.sessions_closed,
+                "queued": self._queue.qsize(),
+                "records_written": self.records_written,
+                "bytes_written": self.bytes_written,
+                "dropped": self.dropped,
+            }
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._thread.join(timeout=timeout)
+
+    def _writer_for(self, session_id: str) -> _SegmentWriter:
+        writer = self._writers.get(session_id)
+        if writer is None:
+            base = self.settings.directory / session_id
+            data = open(base.with_suffix(DATA_SUFFIX), "ab")
+            if data.tell() == 0:
+                data.write(FILE_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION))
+            writer = _SegmentWriter(data=data, index=open(base.with_suffix(INDEX_SUFFIX), "ab"), offset=data.tell())
+            self._writers[session_id] = writer
+        return writer
+
+    def _write(self, item: _FrameItem | _CloseItem) -> None:
+        writer = self._writer_for(item.session_id)
+        written = 0
+        records = 0
+        if isinstance(item, _CloseItem):
+            summary = item.summary.model_dump_json().encode("utf-8")
+            written += writer.append(RecordKind.SUMMARY, 0, 0, summary)
+            writer.close()
+            del self._writers[item.session_id]
+            records += 1
+        else:
+            if item.payload is not None:
+                written += writer.append(RecordKind.FRAME, item.frame_index, item.timestamp_ms, item.payload)
+                records += 1
+            result = item.result.model_dump_json().encode("utf-8")
+            written += writer.append(RecordKind.RESULT, item.frame_index, item.timestamp_ms, result)
+            records += 1
+        with self._lock:
+            self.records_written += records
+            self.bytes_written += written
+            if isinstance(item, _CloseItem):
+                self.sessions_closed += 1
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = [self._queue.get(timeout=0.2)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < self.settings.batch_max:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for item in batch:
+                self._write(item)
+            for writer in self._writers.values():
+                writer.flush()
+            if self._queue.empty():
+                # Only once everything queued before them has been written.
+                while self._pending_closes:
+                    self._write(self._pending_closes.popleft())
+                if self._stopping.is_set():
+                    break
+
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+
+@dataclass(slots=True)
+class RecordedFrame:
+    frame_index: int
+    timestamp_ms: int
+    payload: memoryview | None
+    result: FrameResult
+
+
+class SessionRecording:
+    """Memory-mapped read access to one recorded session."""
+
+    def __init__(self, path: Path) -> None:
+        data_path = path.with_suffix(DATA_SUFFIX)
+        self.session_id = data_path.stem
+        self._file = open(data_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, version = FILE_HEADER.unpack_from(self._map)
+        if magic != RECORDING_MAGIC:
+            raise ValueError(f"Not a session recording: {data_path}")
+        if version != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version: {version}")
+
+        index_path = path.with_suffix(INDEX_SUFFIX)
+        if index_path.exists():
+            raw = index_path.read_bytes()
+            # A crash can leave a partial trailing entry; ignore it.
+            usable = len(raw) - len(raw) % INDEX_ENTRY.size
+            self.index = np.frombuffer(raw[:usable], dtype=INDEX_DTYPE)
+            self.index = self.index[self.index["offset"] + self.index["length"] <= len(self._map)]
+        else:
+            self.index = self._scan_index()
+
+    def _scan_index(self) -> np.ndarray:
+        entries: list[tuple[int, int, int, int, int]] = []
+        offset = FILE_HEADER.size
+        size = len(self._map)
+        while offset + RECORD_HEADER.size <= size:
+            kind, frame_index, timestamp_ms, length = RECORD_HEADER.unpack_from(self._map, offset)
+            payload_offset = offset + RECORD_HEADER.size
+            if payload_offset + length > size:
+                break
+            entries.append((kind, frame_index, timestamp_ms, payload_offset, length))
+            offset = payload_offset + length
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    def __enter__(self) -> SessionRecording:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # Payload views handed out are still alive; the map goes with them.
+            pass
+        self._file.close()
+
+    def payload(self, row: int) -> memoryview:
+        """Zero-copy view of a record's payload, valid while the recording is open."""
+        entry = self.index[row]
+        start = int(entry["offset"])
+        return self._view[start : start + int(entry["length"])]
+
+    def _payload_bytes(self, row: int) -> bytes:
+        entry = self.index[row]
+        start = int(entry["offset"])
+        return self._map[start : start + int(entry["length"])]
+
+    def frames(self) -> Iterator[RecordedFrame]:
+        """Yield each recorded result with its frame payload, when that frame was kept."""
+        pending_payload: memoryview | None = None
+        pending_index = -1
+        for row, kind in enumerate(self.index["kind"]):
+            if kind == RecordKind.FRAME:
+                pending_payload = self.payload(row)
+                pending_index = int(self.index[row]["frame_index"])
+            elif kind == RecordKind.RESULT:
+                result = FrameResult.model_validate_json(self._payload_bytes(row))
+                payload = pending_payload if pending_index == result.frame_index else None
+                pending_payload = None
+                yield RecordedFrame(
+                    frame_index=result.frame_index,
+                    timestamp_ms=result.timestamp_ms,
+                    payload=payload,
+                    result=result,
+                )
+
+    def summary(self) -> SessionSummary | None:
+        rows = np.flatnonzero(self.index["kind"] == RecordKind.SUMMARY)
+        if not len(rows):
+            return None
+        return SessionSummary.model_validate_json(self._payload_bytes(int(rows[-1])))
+
+
+def replay_recording(
+    recording: SessionRecording,
+    pipeline: InferencePipeline,
+    decode: Callable[[memoryview], np.ndarray] | None = None,
+) -> Iterator[tuple[RecordedFrame, FrameResult]]:
+    """Re-run the kept frames of a recording through ``pipeline`` as a fresh stream session."""
+    if decode is None:
+        from app.inference.frames import decode_frame_payload
+
+        def decode(payload: memoryview) -> np.ndarray:
+            return decode_frame_payload(payload, target=pipeline.detector.input_format)
+
+    session = pipeline.create_stream_session()
+    for recorded in recording.frames():
+        if recorded.payload is None:
+            continue
+        frame = decode(recorded.payload)
+        yield recorded, pipeline.infer_stream_frame(frame, session, recorded.timestamp_ms)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class LadderSettings:
+    sizes: tuple[int, ...]
+    step_down_wait_ms: float = 150.0
+    step_up_wait_ms: float = 40.0
+    down_hold_frames: int = 3
+    up_hold_frames: int = 30
+    smoothing: float = 0.3
+
+    def __post_init__(self) -> None:
+        if not self.sizes:
+            raise ValueError("Resolution ladder needs at least one size")
+        self.sizes = tuple(sorted(set(self.sizes), reverse=True))
+
+    def sizes_for(self, cap: int | None) -> tuple[int, ...]:
+        """Rungs at or below a session's negotiated input size (always at least one)."""
+        if cap is None:
+            return self.sizes
+        return tuple(size for size in self.sizes if size <= cap) or self.sizes[-1:]
+
+
+@dataclass(slots=True)
+class LadderState:
+    level: int = 0
+    over_streak: int = 0
+    under_streak: int = 0
+    wait_ms_ewma: float | None = None
+
+
+def step_ladder(settings: LadderSettings, state: LadderState, queue_wait_ms: float, rungs: int) -> int:
+    """Advance one session's ladder position from the queue wait of its latest frame.
+
+    The wait is smoothed with an EWMA. A session steps one rung down (smaller
+    input) after ``down_hold_frames`` consecutive frames above
+    ``step_down_wait_ms``, and one rung back up after ``up_hold_frames``
+    consecutive frames below ``step_up_wait_ms``. The gap between the two
+    thresholds and the longer hold on the way up keep sessions from oscillating.
+    """
+    if state.wait_ms_ewma is None:
+        state.wait_ms_ewma = queue_wait_ms
+    else:
+        state.wait_ms_ewma += settings.smoothing * (queue_wait_ms - state.wait_ms_ewma)
+    state.level = min(state.level, rungs - 1)
+
+    if state.wait_ms_ewma > settings.step_down_wait_ms:
+        state.over_streak += 1
+        state.under_streak = 0
+    elif state.wait_ms_ewma < settings.step_up_wait_ms:
+        state.under_streak += 1
+        state.over_streak = 0
+    else:
+        state.over_streak = state.under_streak = 0
+
+    if state.over_streak >= settings.down_hold_frames and state.level < rungs - 1:
+        state.level += 1
+        state.over_streak = 0
+    elif state.under_streak >= settings.up_hold_frames and state.level > 0:
+        state.level -= 1
+        state.under_streak = 0
+    return state.level
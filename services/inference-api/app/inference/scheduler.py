@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+_WAIT_SAMPLES = 512
+
+
+class WorkClass(str, Enum):
+    STREAM = "stream"
+    IMAGE = "image"
+    BULK = "bulk"
+
+
+class DeadlineExceeded(RuntimeError):
+    pass
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+@dataclass(slots=True)
+class WorkItem:
+    fn: Callable[[], Any]
+    work_class: WorkClass
+    session_key: Hashable
+    deadline: float | None
+    enqueued_at: float
+    cost: float = 1.0
+    future: Future = field(default_factory=Future)
+
+
+@dataclass
+class _ClassState:
+    weight: float
+    sessions: OrderedDict[Hashable, deque[WorkItem]] = field(default_factory=OrderedDict)
+    virtual_time: float = 0.0
+    queued: int = 0
+    completed: int = 0
+    dropped_deadline: int = 0
+    dropped_overflow: int = 0
+    waits_ms: deque[float] = field(default_factory=lambda: deque(maxlen=_WAIT_SAMPLES))
+
+
+DEFAULT_WEIGHTS = {WorkClass.STREAM: 4.0, WorkClass.IMAGE: 2.0, WorkClass.BULK: 1.0}
+
+
+class InferenceScheduler:
+    """Serialises detector work behind deadline-aware, weighted-fair queues.
+
+    Classes share the workers in proportion to their weights (stride
+    scheduling on a per-class virtual time); an item advances its class's
+    clock by ``cost / weight``, so a batch of N images should pass
+    ``cost=N``. Inside a class, sessions are
+    served round-robin, and a session never has two items in flight so
+    stream state such as the tracker stays single-threaded. Items whose
+    deadline passed while queued are failed with ``DeadlineExceeded``
+    instead of being run.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        weights: dict[WorkClass, float] | None = None,
+        max_pending_per_session: int = 4,
+        max_queued: int = 1024,
+    ) -> None:
+        resolved = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self._classes = {wc: _ClassState(weight=max(resolved[wc], 1e-6)) for wc in WorkClass}
+        self._max_pending_per_session = max(1, max_pending_per_session)
+        self._max_queued = max(1, max_queued)
+        lock = threading.Lock()
+        self._cond = threading.Condition(lock)
+        # Separate waiters so idle watchers never take a worker's wakeup.
+        self._idle = threading.Condition(lock)
+        self._busy_sessions: set[tuple[WorkClass, Hashable]] = set()
+        self._closed = False
+        # Optional wrapper around each work item, e.g. a profiler hook.
+        self.instrument: Callable[[Callable[[], Any]], Any] | None = None
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"inference-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        *,
+        work_class: WorkClass,
+        session_key: Hashable,
+        deadline_s: float | None = None,
+        cost: float = 1.0,
+    ) -> Future:
+        now = time.monotonic()
+        item = WorkItem(
+            fn=fn,
+            work_class=work_class,
+            session_key=session_key,
+            deadline=now + deadline_s if deadline_s is not None else None,
+            enqueued_at=now,
+            cost=max(cost, 1e-6),
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler is closed")
+            state = self._classes[work_class]
+            if sum(c.queued for c in self._classes.values()) >= self._max_queued:
+                state.dropped_overflow += 1
+                raise QueueFull("Inference queue is full")
+            pending = state.sessions.setdefault(session_key, deque())
+            if len(pending) >= self._max_pending_per_session:
+                # The oldest queued item of a chatty session is the least useful one.
+                stale = pending.popleft()
+                state.queued -= 1
+                state.dropped_overflow += 1
+                if stale.future.set_running_or_notify_cancel():
+                    stale.future.set_exception(QueueFull("Superseded by a newer item from the same session"))
+            if not any(c.queued for c in self._classes.values()):
+                # An idle class must not bank credit; align it with the busiest clock.
+                state.virtual_time = max(c.virtual_time for c in self._classes.values())
+            elif state.queued == 0:
+                active = [c.virtual_time for c in self._classes.values() if c.queued]
+                state.virtual_time = max(state.virtual_time, min(active))
+            pending.append(item)
+            state.queued += 1
+            self._cond.notify()
+        return item.future
+
+    async def run(
+        self,
+        fn: Callable[[], Any],
+        *,
+        work_class: WorkClass,
+        session_key: Hashable,
+        deadline_s: float | None = None,
+        cost: float = 1.0,
+    ) -> Any:
+        future = self.submit(fn, work_class=work_class, session_key=session_key, deadline_s=deadline_s, cost=cost)
+        return await asyncio.wrap_future(future)
+
+    def _next_item(self) -> WorkItem | None:
+        candidates = sorted(
+            (state.virtual_time, index, wc)
+            for index, (wc, state) in enumerate(self._classes.items())
+            if state.queued
+        )
+        for _, _, wc in candidates:
+            state = self._classes[wc]
+            for key in list(state.sessions):
+                if (wc, key) in self._busy_sessions:
+                    continue
+                pending = state.sessions.pop(key)
+                item = pending.popleft()
+                if pending:
+                    # Re-append so the session goes to the back of the round-robin.
+                    state.sessions[key] = pending
+                state.queued -= 1
+                state.virtual_time += item.cost / state.weight
+                return item
+        return None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                item = self._next_item()
+                while item is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    item = self._next_item()
+                key = (item.work_class, item.session_key)
+                self._busy_sessions.add(key)
+                state = self._classes[item.work_class]
+                now = time.monotonic()
+                state.waits_ms.append((now - item.enqueued_at) * 1000.0)
+                expired = item.deadline is not None and now > item.deadline
+                if expired:
+                    state.dropped_deadline += 1
+
+            try:
+                # False when the caller gave up (e.g. a cancelled ``run``): nothing left to report.
+                if not item.future.set_running_or_notify_cancel():
+                    pass
+                elif expired:
+                    item.future.set_exception(DeadlineExceeded("Deadline exceeded before inference"))
+                else:
+                    try:
+                        instrument = self.instrument
+                        item.future.set_result(instrument(item.fn) if instrument is not None else item.fn())
+                    except BaseException as exc:
+                        item.future.set_exception(exc)
+            finally:
+                with self._cond:
+                    self._busy_sessions.discard(key)
+                    if not expired:
+                        state.completed += 1
+                    self._cond.notify_all()
+                    if not self._busy_sessions and not any(c.queued for c in self._classes.values()):
+                        self._idle.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def queue_depth_per_worker(self) -> float:
+        with self._cond:
+            queued = sum(state.queued for state in self._classes.values())
+        return queued / len(self._threads)
+
+    def in_flight(self) -> int:
+        """Work items queued or running, across every class."""
+        with self._cond:
+            return self._in_flight()
+
+    def _in_flight(self) -> int:
+        return len(self._busy_sessions) + sum(state.queued for state in self._classes.values())
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Block until nothing is queued or running; False on timeout or close."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._closed or not self._in_flight(), timeout=timeout) and not self._closed
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            classes: dict[str, dict[str, float | int]] = {}
+            for wc, state in self._classes.items():
+                waits = sorted(state.waits_ms)
+                classes[wc.value] = {
+                    "weight": state.weight,
+                    "queued": state.queued,
+                    "completed": state.completed,
+                    "dropped_deadline": state.dropped_deadline,
+                    "dropped_overflow": state.dropped_overflow,
+                    "wait_ms_mean": sum(waits) / len(waits) if waits else 0.0,
+                    "wait_ms_p50": _percentile(waits, 0.50),
+                    "wait_ms_p95": _percentile(waits, 0.95),
+                }
+            return {"workers": len(self._threads), "classes": classes}
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for state in self._classes.values():
+                for pending in state.sessions.values():
+                    for item in pending:
+                        item.future.cancel()
+                state.sessions.clear()
+                state.queued = 0
+            self._cond.notify_all()
+            self._idle.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
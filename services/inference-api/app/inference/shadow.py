@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from app.inference.adapters.base import DetectorAdapter
+from app.inference.detections import RIPENESS_CODES, DetectionBatch, pairwise_iou
+
+
+@dataclass(slots=True)
+class ShadowSettings:
+    sample_rate: float = 0.05
+    iou_threshold: float = 0.5
+    queue_max: int = 2
+    # How long a sample may wait for the primary to go idle before it is dropped.
+    idle_wait_s: float = 0.5
+    # Once idle, how long the just-finished primary result gets to reach its
+    # caller before the shadow competes with it for CPU and the GIL.
+    idle_grace_s: float = 0.005
+    # Added to the shadow thread's niceness where the OS supports per-thread priority.
+    nice: int = 10
+
+
+@dataclass(slots=True)
+class _ShadowItem:
+    frame: np.ndarray
+    imgsz: int | None
+    detections: DetectionBatch
+    ripeness: np.ndarray
+    conf_threshold: float | None
+
+
+def match_detections(
+    primary: DetectionBatch,
+    shadow: DetectionBatch,
+    iou_threshold: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pair boxes one to one across two detectors.
+
+    Primary boxes, most confident first, each take the unclaimed shadow box
+    they overlap most, provided the IoU reaches ``iou_threshold``. Returns
+    the primary indices, shadow indices and IoUs of the pairs.
+    """
+    overlap = pairwise_iou(primary.boxes, shadow.boxes)
+    iou = np.where((overlap >= iou_threshold) & (overlap > 0.0), overlap, -1.0)
+    rows: list[int] = []
+    cols: list[int] = []
+    if len(shadow):
+        for i in np.argsort(-primary.confidences, kind="stable").tolist():
+            j = int(np.argmax(iou[i]))
+            if iou[i, j] > 0.0:
+                rows.append(i)
+                cols.append(j)
+                iou[:, j] = -1.0
+    rows_index = np.asarray(rows, dtype=np.intp)
+    cols_index = np.asarray(cols, dtype=np.intp)
+    return rows_index, cols_index, overlap[rows_index, cols_index]
+
+
+class ShadowEvaluator:
+    """Runs a candidate detector on a sample of live frames and scores it against the primary.
+
+    The inference path only decides whether a frame is sampled (a running
+    credit of ``sample_rate`` per frame) and, if so, copies the frame onto a
+    small bounded queue together with the primary's final detections. A
+    single background thread at lowered OS priority runs the shadow detector
+    and accumulates agreement statistics.
+
+    ``load()`` reports primary work items queued or running. A sample is
+    dropped and counted, never waited for, when the queue is full or other
+    primary work is pending beside the frame being offered. A queued sample
+    only starts once ``wait_idle(timeout)`` reports that the primary went
+    idle and it is still idle ``idle_grace_s`` later, so the shadow never
+    overlaps the primary result it was sampled from, and is dropped if that
+    does not happen within ``idle_wait_s``.
+    """
+
+    def __init__(
+        self,
+        detector: DetectorAdapter,
+        model_version: str,
+        settings: ShadowSettings | None = None,
+        load: Callable[[], int] | None = None,
+        wait_idle: Callable[[float], bool] | None = None,
+    ) -> None:
+        self.detector = detector
+        self.model_version = model_version
+        self.settings = settings or ShadowSettings()
+        self._load = load
+        self._wait_idle = wait_idle
+        self._queue: queue.Queue[_ShadowItem] = queue.Queue(maxsize=max(1, self.settings.queue_max))
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._credit = 0.0
+        self.sampled = 0
+        self.dropped_busy = 0
+        self.failed = 0
+        self.frames_compared = 0
+        self.primary_detections = 0
+        self.shadow_detections = 0
+        self.count_delta_sum = 0
+        self.count_delta_abs_sum = 0
+        self.frames_count_equal = 0
+        self.matched = 0
+        self.matched_iou_sum = 0.0
+        # Matched pairs by (primary, shadow) ripeness code.
+        self.confusion = np.zeros((len(RIPENESS_CODES), len(RIPENESS_CODES)), dtype=np.int64)
+        self._thread = threading.Thread(target=self._run, name="shadow-eval", daemon=True)
+        self._thread.start()
+
+    def offer(
+        self,
+        frame: np.ndarray,
+        detections: DetectionBatch,
+        ripeness: np.ndarray,
+        imgsz: int | None,
+        conf_threshold: float | None = None,
+    ) -> bool:
+        """Called on the inference path after the primary result is final; returns whether the frame was queued.
+
+        ``conf_threshold`` is any confidence filter the primary's detections went
+        through beyond the detector's own, applied to the shadow's output too.
+        """
+        with self._lock:
+            self._credit += self.settings.sample_rate
+            if self._credit < 1.0:
+                return False
+            self._credit -= 1.0
+            self.sampled += 1
+            # The frame being offered is itself one in-flight item.
+            if self._queue.full() or (self._load is not None and self._load() > 1):
+                self.dropped_busy += 1
+                return False
+        try:
+            # The caller may hand the frame back to a buffer pool as soon as we return.
+            self._queue.put_nowait(_ShadowItem(frame.copy(), imgsz, detections, ripeness, conf_threshold))
+        except queue.Full:
+            with self._lock:
+                self.dropped_busy += 1
+            return False
+        return True
+
+    def _lower_priority(self) -> None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.settings.nice)
+        except (AttributeError, OSError):
+            # Not Linux, or not permitted; the thread keeps normal priority.
+            pass
+
+    def _run(self) -> None:
+        self._lower_priority()
+        while not self._stopping.is_set():
+            try:
+                item = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if not self._await_idle():
+                with self._lock:
+                    self.dropped_busy += 1
+                continue
+            try:
+                height, width = item.frame.shape[:2]
+                shadow = self.detector.predict(item.frame, imgsz=item.imgsz).clipped(width, height)
+                if item.conf_threshold is not None:
+                    shadow = shadow.above(item.conf_threshold)
+                self.record(item.detections, item.ripeness, shadow, self.detector.ripeness_codes(shadow.class_ids))
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+
+    def _await_idle(self) -> bool:
+        if self._wait_idle is None:
+            return True
+        deadline = time.monotonic() + self.settings.idle_wait_s
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._wait_idle(remaining):
+                return False
+            if self._stopping.wait(self.settings.idle_grace_s):
+                return False
+            if self._load is None or self._load() == 0:
+                return True
+
+    def record(
+        self,
+        primary: DetectionBatch,
+        primary_ripeness: np.ndarray,
+        shadow: DetectionBatch,
+        shadow_ripeness: np.ndarray,
+    ) -> None:
+        rows, cols, ious = match_detections(primary, shadow, self.settings.iou_threshold)
+        delta = len(shadow) - len(primary)
+        with self._lock:
+            self.frames_compared += 1
+            self.primary_detections += len(primary)
+            self.shadow_detections += len(shadow)
+            self.count_delta_sum += delta
+            self.count_delta_abs_sum += abs(delta)
+            self.frames_count_equal += delta == 0
+            self.matched += len(rows)
+            self.matched_iou_sum += float(ious.sum())
+            np.add.at(self.confusion, (primary_ripeness[rows], shadow_ripeness[cols]), 1)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            compared = self.frames_compared
+            matched = self.matched
+            return {
+                "model_version": self.model_version,
+                "sample_rate": self.settings.sample_rate,
+                "sampled": self.sampled,
+                "dropped_busy": self.dropped_busy,
+                "failed": self.failed,
+                "queued": self._queue.qsize(),
+                "frames_compared": compared,
+                "primary_detections": self.primary_detections,
+                "shadow_detections": self.shadow_detections,
+                "count_delta_mean": self.count_delta_sum / compared if compared else 0.0,
+                "count_delta_abs_mean": self.count_delta_abs_sum / compared if compared else 0.0,
+                "count_agreement_rate": self.frames_count_equal / compared if compared else 0.0,
+                "iou_match_rate": matched / self.primary_detections if self.primary_detections else 0.0,
+                "shadow_match_rate": matched / self.shadow_detections if self.shadow_detections else 0.0,
+                "matched_iou_mean": self.matched_iou_sum / matched if matched else 0.0,
+                "ripeness_agreement": float(np.trace(self.confusion)) / matched if matched else 0.0,
+                "ripeness_confusion": {
+                    primary: dict(zip(RIPENESS_CODES, row)) for primary, row in zip(RIPENESS_CODES, self.confusion.tolist())
+                },
+            }
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._thread.join(timeout=timeout)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from app.schemas.api import StreamConfigRequest, StreamSettings
+from app.settings import ModelConfig, ServiceConfig
+
+
+def _clamp_imgsz(value: int, service_cfg: ServiceConfig) -> int:
+    low = min(service_cfg.stream_min_imgsz, service_cfg.stream_max_imgsz)
+    high = max(service_cfg.stream_min_imgsz, service_cfg.stream_max_imgsz)
+    clamped = max(low, min(high, value))
+    # YOLO strides need a multiple of 32.
+    return max(32, clamped - clamped % 32)
+
+
+def negotiate_stream_settings(
+    request: StreamConfigRequest,
+    service_cfg: ServiceConfig,
+    model_cfg: ModelConfig,
+) -> StreamSettings:
+    """Resolve a client's requested stream settings against server-enforced bounds."""
+    fps = request.target_fps if request.target_fps is not None else service_cfg.stream_default_fps
+    imgsz = request.imgsz if request.imgsz is not None else model_cfg.imgsz
+    conf = request.conf_threshold if request.conf_threshold is not None else model_cfg.conf_threshold
+    tracker_iou = (
+        request.tracker_iou_threshold
+        if request.tracker_iou_threshold is not None
+        else service_cfg.stream_tracker_iou_threshold
+    )
+    max_missing = (
+        request.tracker_max_missing
+        if request.tracker_max_missing is not None
+        else service_cfg.stream_tracker_max_missing
+    )
+
+    return StreamSettings(
+        target_fps=min(fps, service_cfg.stream_max_fps),
+        imgsz=_clamp_imgsz(imgsz, service_cfg),
+        output_encoding=request.output_encoding or "json",
+        # The detector already drops boxes below the model threshold.
+        conf_threshold=max(conf, model_cfg.conf_threshold),
+        tracker_iou_threshold=min(max(tracker_iou, 0.05), 0.95),
+        tracker_max_missing=min(max_missing, service_cfg.stream_tracker_max_missing_limit),
+        flow_control=bool(request.flow_control) and service_cfg.stream_flow_control_enabled,
+        record=service_cfg.recording_mode == "all"
+        or (service_cfg.recording_mode == "opt_in" and bool(request.record)),
+    )
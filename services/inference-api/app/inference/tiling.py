@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+from app.inference.adapters.base import DetectorAdapter
+from app.inference.detections import DetectionBatch
+
+MergeMode = Literal["nms", "nmm"]
+
+
+@dataclass(slots=True)
+class TileSettings:
+    tile_size: int = 640
+    overlap: float = 0.2
+    max_tiles: int = 16
+    merge_ios: float = 0.6
+    merge_mode: MergeMode = "nmm"
+
+
+@dataclass(frozen=True, slots=True)
+class TilePlan:
+    scale: float
+    width: int
+    height: int
+    windows: list[tuple[int, int, int, int]]
+
+
+def _axis_starts(length: int, tile: int, stride: int) -> list[int]:
+    if length <= tile:
+        return [0]
+    count = math.ceil((length - tile) / stride) + 1
+    starts = [min(i * stride, length - tile) for i in range(count)]
+    return sorted(set(starts))
+
+
+def _tile_count(width: int, height: int, tile: int, stride: int) -> int:
+    return len(_axis_starts(width, tile, stride)) * len(_axis_starts(height, tile, stride))
+
+
+def plan_tiles(width: int, height: int, settings: TileSettings, max_tiles: int | None = None) -> TilePlan:
+    """Lay out overlapping windows, downscaling the image until the grid fits the tile budget."""
+    budget = max(1, min(settings.max_tiles, max_tiles) if max_tiles is not None else settings.max_tiles)
+    tile = max(1, settings.tile_size)
+    stride = max(1, int(round(tile * (1.0 - min(max(settings.overlap, 0.0), 0.9)))))
+
+    scale = 1.0
+    scaled_w, scaled_h = width, height
+    while _tile_count(scaled_w, scaled_h, tile, stride) > budget and max(scaled_w, scaled_h) > tile:
+        scale *= 0.9
+        scaled_w = max(1, int(round(width * scale)))
+        scaled_h = max(1, int(round(height * scale)))
+
+    xs = _axis_starts(scaled_w, tile, stride)
+    ys = _axis_starts(scaled_h, tile, stride)
+    windows = [(x, y, min(x + tile, scaled_w), min(y + tile, scaled_h)) for y in ys for x in xs]
+    return TilePlan(scale=scale, width=scaled_w, height=scaled_h, windows=windows)
+
+
+def _pairwise_ios(box: np.ndarray, others: np.ndarray) -> np.ndarray:
+    ix1 = np.maximum(box[0], others[:, 0])
+    iy1 = np.maximum(box[1], others[:, 1])
+    ix2 = np.minimum(box[2], others[:, 2])
+    iy2 = np.minimum(box[3], others[:, 3])
+    inter = np.clip(ix2 - ix1, 0.0, None) * np.clip(iy2 - iy1, 0.0, None)
+    area_box = max(0.0, float((box[2] - box[0]) * (box[3] - box[1])))
+    area_others = np.clip(others[:, 2] - others[:, 0], 0.0, None) * np.clip(others[:, 3] - others[:, 1], 0.0, None)
+    smaller = np.minimum(area_box, area_others)
+    return np.divide(inter, smaller, out=np.zeros_like(inter), where=smaller > 0)
+
+
+def merge_detections(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    classes: np.ndarray,
+    ios_threshold: float,
+    mode: MergeMode = "nmm",
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Greedy class-aware merge across tile seams.
+
+    Intersection-over-smaller is used instead of IoU so that a box truncated
+    at a tile edge still matches the complete box from the neighbouring tile.
+    ``nms`` drops the matched boxes; ``nmm`` replaces the kept box with the
+    enclosing box of its cluster.
+    """
+    if len(boxes) == 0:
+        return boxes.reshape(0, 4), scores, classes
+
+    order = np.argsort(-scores, kind="stable")
+    boxes = boxes[order]
+    scores = scores[order]
+    classes = classes[order]
+    alive = np.ones(len(boxes), dtype=bool)
+    out_boxes: list[np.ndarray] = []
+    keep: list[int] = []
+
+    for i in range(len(boxes)):
+        if not alive[i]:
+            continue
+        alive[i] = False
+        rest = np.flatnonzero(alive & (classes == classes[i]))
+        merged_box = boxes[i]
+        if rest.size:
+            matched = rest[_pairwise_ios(boxes[i], boxes[rest]) >= ios_threshold]
+            alive[matched] = False
+            if mode == "nmm" and matched.size:
+                cluster = boxes[np.concatenate(([i], matched))]
+                merged_box = np.concatenate((cluster[:, :2].min(axis=0), cluster[:, 2:].max(axis=0)))
+        keep.append(i)
+        out_boxes.append(merged_box)
+
+    idx = np.asarray(keep, dtype=np.intp)
+    return np.stack(out_boxes).astype(np.float32), scores[idx], classes[idx]
+
+
+def detect_tiled(detector: DetectorAdapter, frame: np.ndarray, settings: TileSettings, max_tiles: int | None = None) -> tuple[DetectionBatch, int]:
+    """Run ``detector`` over overlapping tiles in batches and merge the results into frame coordinates."""
+    height, width = frame.shape[:2]
+    plan = plan_tiles(width, height, settings, max_tiles=max_tiles)
+    source = frame
+    if plan.scale < 1.0:
+        import cv2
+
+        source = cv2.resize(frame, (plan.width, plan.height), interpolation=cv2.INTER_AREA)
+
+    tiles = [source[y1:y2, x1:x2] for x1, y1, x2, y2 in plan.windows]
+    per_tile = detector.predict_batch(tiles, imgsz=settings.tile_size)
+
+    inverse = 1.0 / plan.scale
+    placed = DetectionBatch.concat(
+        [
+            dets.transformed(scale=(inverse, inverse), offset=(x1 * inverse, y1 * inverse))
+            for (x1, y1, _, _), dets in zip(plan.windows, per_tile)
+            if len(dets)
+        ]
+    )
+    if not len(placed):
+        return placed, len(plan.windows)
+
+    merged_boxes, merged_scores, merged_classes = merge_detections(
+        placed.boxes,
+        placed.confidences,
+        placed.class_ids,
+        settings.merge_ios,
+        settings.merge_mode,
+    )
+    return DetectionBatch.from_arrays(merged_boxes, merged_classes, merged_scores), len(plan.windows)
@@ -1,81 +1,64 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import numpy as np
 
-from app.inference.adapters.base import RawDetection
-
-
-def _iou(a: tuple[float, float, float, float], b: tuple[float, float, float, float]) -> float:
-    ax1, ay1, ax2, ay2 = a
-    bx1, by1, bx2, by2 = b
-    inter_x1 = max(ax1, bx1)
-    inter_y1 = max(ay1, by1)
-    inter_x2 = min(ax2, bx2)
-    inter_y2 = min(ay2, by2)
-    iw = max(0.0, inter_x2 - inter_x1)
-    ih = max(0.0, inter_y2 - inter_y1)
-    inter = iw * ih
-    if inter <= 0:
-        return 0.0
-    area_a = max(0.0, ax2 - ax1) * max(0.0, ay2 - ay1)
-    area_b = max(0.0, bx2 - bx1) * max(0.0, by2 - by1)
-    denom = area_a + area_b - inter
-    if denom <= 0:
-        return 0.0
-    return inter / denom
-
-
-@dataclass(slots=True)
-class TrackedDetection:
-    det: RawDetection
-    track_id: int
+from app.inference.detections import DetectionBatch, pairwise_iou
 
 
 class ByteTrackManager:
-    """A lightweight track manager with ByteTrack-like matching behavior."""
+    """A lightweight track manager with ByteTrack-like matching behavior.
+
+    Tracks are kept as parallel arrays (id, last box, frames missing) in
+    creation order, so each frame is matched against one detection-by-track
+    IoU matrix instead of a box-by-box scan.
+    """
 
     def __init__(self, iou_threshold: float = 0.3, max_missing: int = 20) -> None:
         self.iou_threshold = iou_threshold
         self.max_missing = max_missing
-        self._tracks: dict[int, tuple[float, float, float, float]] = {}
-        self._missing: dict[int, int] = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._boxes = np.empty((0, 4), dtype=np.float32)
+        self._missing = np.empty(0, dtype=np.int64)
         self._next_id = 1
 
-    def update(self, detections: list[RawDetection]) -> list[TrackedDetection]:
-        outputs: list[TrackedDetection] = []
-        assigned_tracks: set[int] = set()
-
-        for det in detections:
-            best_id = None
-            best_iou = 0.0
-            for track_id, bbox in self._tracks.items():
-                if track_id in assigned_tracks:
-                    continue
-                iou = _iou(det.bbox, bbox)
-                if iou > best_iou and iou >= self.iou_threshold:
-                    best_iou = iou
-                    best_id = track_id
-
-            if best_id is None:
-                track_id = self._next_id
-                self._next_id += 1
+    def seed(self, tracks: dict[int, tuple[float, float, float, float]], next_id: int) -> None:
+        """Resume from previously emitted tracks (e.g. the last frame of an interrupted run)."""
+        self._ids = np.fromiter(tracks, dtype=np.int64, count=len(tracks))
+        self._boxes = np.asarray(list(tracks.values()), dtype=np.float32).reshape(-1, 4)
+        self._missing = np.zeros(len(tracks), dtype=np.int64)
+        self._next_id = max(next_id, max(tracks, default=0) + 1)
+
+    def update(self, detections: DetectionBatch) -> np.ndarray:
+        """Assign a track id to every detection, in order, and age out unmatched tracks.
+
+        Each detection greedily takes the unclaimed track it overlaps most
+        (ties go to the older track), provided the IoU reaches
+        ``iou_threshold``; otherwise it opens a new track.
+        """
+        count = len(detections)
+        iou = pairwise_iou(detections.boxes, self._boxes)
+        iou[(iou < self.iou_threshold) | (iou <= 0.0)] = -1.0
+        track_ids = np.empty(count, dtype=np.int64)
+        claimed = np.full(len(self._ids), -1, dtype=np.int64)
+        fresh: list[int] = []
+
+        for i in range(count):
+            j = int(np.argmax(iou[i])) if len(self._ids) else -1
+            if j >= 0 and iou[i, j] > 0.0:
+                track_ids[i] = self._ids[j]
+                claimed[j] = i
+                iou[:, j] = -1.0
             else:
-                track_id = best_id
-
-            self._tracks[track_id] = det.bbox
-            self._missing[track_id] = 0
-            assigned_tracks.add(track_id)
-            outputs.append(TrackedDetection(det=det, track_id=track_id))
-
-        stale = []
-        for track_id in list(self._tracks):
-            if track_id not in assigned_tracks:
-                self._missing[track_id] = self._missing.get(track_id, 0) + 1
-                if self._missing[track_id] > self.max_missing:
-                    stale.append(track_id)
-
-        for track_id in stale:
-            self._tracks.pop(track_id, None)
-            self._missing.pop(track_id, None)
-
-        return outputs
+                track_ids[i] = self._next_id
+                self._next_id += 1
+                fresh.append(i)
+
+        matched = claimed >= 0
+        self._boxes[matched] = detections.boxes[claimed[matched]]
+        self._missing = np.where(matched, 0, self._missing + 1)
+        keep = self._missing <= self.max_missing
+        fresh_index = np.asarray(fresh, dtype=np.intp)
+        self._ids = np.concatenate([self._ids[keep], track_ids[fresh_index]])
+        self._boxes = np.concatenate([self._boxes[keep], detections.boxes[fresh_index]])
+        self._missing = np.concatenate([self._missing[keep], np.zeros(len(fresh_index), dtype=np.int64)])
+        return track_ids
@@ -3,12 +3,11 @@ from __future__ import annotations
 import os
 from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from fastapi import FastAPI
 
 from app.api.v1.endpoints import router as v1_router
-from app.inference.factory import build_detector
-from app.inference.pipeline import InferencePipeline
 from app.paths import resolve_repo_path
 from app.settings import (
     ServiceConfig,
@@ -16,6 +15,9 @@ from app.settings import (
     load_service_config,
 )
 
+if TYPE_CHECKING:
+    from app.inference.adapters.base import DetectorAdapter
+
 
 def _ensure_config_file(path: Path, env_var: str) -> None:
     if path.exists():
@@ -33,6 +35,15 @@ def _ensure_config_file(path: Path, env_var: str) -> None:
     )
 
 
+def _ensure_worker_count(workers: int, detector: DetectorAdapter) -> None:
+    if workers <= 1 or detector.thread_safe:
+        return
+    raise RuntimeError(
+        f"inference_workers={workers} needs a thread-safe detector, but '{detector.name}' "
+        "shares one model between workers. Set inference_workers to 1."
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     model_cfg_path = resolve_repo_path(os.getenv('LYCHEE_MODEL_CONFIG', 'tooling/configs/model.yaml'))
@@ -43,7 +54,23 @@ async def lifespan(app: FastAPI):
     model_cfg = load_model_config(model_cfg_path)
     service_cfg: ServiceConfig = load_service_config(service_cfg_path)
 
+    # Deferred so importing app.main stays cheap for CLIs, tests and worker boot.
+    from app.api.framed import start_framed_server
+    from app.inference.buffers import BufferPool
+    from app.inference.factory import build_detector
+    from app.inference.ingest import IngestManager
+    from app.inference.jobs import JobManager
+    from app.inference.motion import MotionGateSettings
+    from app.inference.pipeline import InferencePipeline
+    from app.inference.profiling import Profiler
+    from app.inference.recording import RecordingSettings, SessionRecorder
+    from app.inference.resolution import LadderSettings
+    from app.inference.scheduler import InferenceScheduler, WorkClass
+    from app.inference.shadow import ShadowEvaluator, ShadowSettings
+    from app.inference.tiling import TileSettings
+
     detector = build_detector(model_cfg)
+    _ensure_worker_count(service_cfg.inference_workers, detector)
     try:
         detector.load()
         detector.warmup()
@@ -51,14 +78,141 @@ async def lifespan(app: FastAPI):
         # Keep service booted in degraded mode for health visibility.
         pass
 
+    shadow = None
+    if model_cfg.shadow_model_path:
+        shadow_detector = build_detector(
+            model_cfg.model_copy(update={'model_path': model_cfg.shadow_model_path, 'autotune': False})
+        )
+        try:
+            shadow_detector.load()
+            shadow_detector.warmup()
+        except Exception:
+            # A shadow that cannot load must not take the primary down with it.
+            shadow_detector = None
+        if shadow_detector is not None:
+            shadow = ShadowEvaluator(
+                shadow_detector,
+                model_version=model_cfg.shadow_model_version or model_cfg.shadow_model_path,
+                settings=ShadowSettings(
+                    sample_rate=model_cfg.shadow_sample_rate,
+                    iou_threshold=model_cfg.shadow_iou_threshold,
+                ),
+                load=lambda: app.state.scheduler.in_flight(),
+                wait_idle=lambda timeout: app.state.scheduler.wait_idle(timeout),
+            )
+
     app.state.service_cfg = service_cfg
+    app.state.model_cfg = model_cfg
     app.state.pipeline = InferencePipeline(
         detector=detector,
         model_version=model_cfg.model_version,
         schema_version=service_cfg.schema_version,
+        tiling=(
+            TileSettings(
+                tile_size=model_cfg.tile_size,
+                overlap=model_cfg.tile_overlap,
+                max_tiles=model_cfg.tile_max,
+                merge_ios=model_cfg.tile_merge_ios,
+                merge_mode=model_cfg.tile_merge_mode,
+            )
+            if model_cfg.tile_enabled
+            else None
+        ),
+        motion_gate=(
+            MotionGateSettings(
+                threshold=model_cfg.motion_gate_threshold,
+                max_skip=model_cfg.motion_gate_max_skip,
+            )
+            if model_cfg.motion_gate_enabled
+            else None
+        ),
+        ladder=(
+            LadderSettings(
+                sizes=tuple(model_cfg.resolution_ladder),
+                step_down_wait_ms=model_cfg.ladder_step_down_wait_ms,
+                step_up_wait_ms=model_cfg.ladder_step_up_wait_ms,
+            )
+            if model_cfg.resolution_ladder
+            else None
+        ),
+        buffer_pool=(
+            BufferPool(max_bytes=service_cfg.buffer_pool_max_mb * 1024 * 1024)
+            if service_cfg.buffer_pool_enabled
+            else None
+        ),
+        shadow=shadow,
+    )
+
+    app.state.scheduler = InferenceScheduler(
+        workers=service_cfg.inference_workers,
+        weights={
+            WorkClass.STREAM: service_cfg.scheduler_weight_stream,
+            WorkClass.IMAGE: service_cfg.scheduler_weight_image,
+            WorkClass.BULK: service_cfg.scheduler_weight_bulk,
+        },
+        max_queued=service_cfg.scheduler_max_queued,
     )
 
-    yield
+    app.state.recorder = (
+        SessionRecorder(
+            RecordingSettings(
+                directory=resolve_repo_path(service_cfg.recording_dir),
+                frame_every=service_cfg.recording_frame_every,
+                queue_max=service_cfg.recording_queue_max,
+            )
+        )
+        if service_cfg.recording_mode != 'off'
+        else None
+    )
+
+    app.state.ingest = (
+        IngestManager(
+            app.state.scheduler,
+            max_sessions=service_cfg.ingest_max_sessions,
+            deadline_s=service_cfg.stream_frame_deadline_ms / 1000.0,
+            retention_s=service_cfg.ingest_retention_s,
+        )
+        if service_cfg.ingest_enabled
+        else None
+    )
+
+    app.state.jobs = (
+        JobManager(
+            resolve_repo_path(service_cfg.bulk_jobs_dir),
+            app.state.scheduler,
+            allowed_roots=service_cfg.bulk_allowed_roots,
+            max_running=service_cfg.bulk_max_jobs,
+            batch_size=service_cfg.bulk_batch_size,
+            decode_processes=service_cfg.bulk_decode_processes,
+        )
+        if service_cfg.bulk_jobs_enabled
+        else None
+    )
+
+    app.state.profiler = (
+        Profiler(max_seconds=service_cfg.debug_profile_max_seconds)
+        if service_cfg.debug_profiling_enabled
+        else None
+    )
+
+    framed_path = resolve_repo_path(service_cfg.framed_socket_path) if service_cfg.framed_socket_path else None
+    app.state.framed_server = await start_framed_server(app.state, framed_path) if framed_path else None
+
+    try:
+        yield
+    finally:
+        if app.state.framed_server is not None:
+            app.state.framed_server.close()
+            framed_path.unlink(missing_ok=True)
+        if app.state.ingest is not None:
+            app.state.ingest.close()
+        if app.state.jobs is not None:
+            app.state.jobs.close()
+        app.state.scheduler.close()
+        if app.state.recorder is not None:
+            app.state.recorder.close()
+        if shadow is not None:
+            shadow.close()
 
 
 app = FastAPI(title='lychee-ripe', version='0.1.0', lifespan=lifespan)
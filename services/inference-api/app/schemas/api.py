@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, Field
 
 from app.schemas.common import FrameResult, ModelMeta, SessionSummary
 
@@ -36,3 +38,179 @@ class StreamSummaryEnvelope(BaseModel):
     model_version: str
     schema_version: str
     summary: SessionSummary
+
+
+class StreamConfigRequest(BaseModel):
+    type: Literal["config"] = "config"
+    target_fps: float | None = Field(default=None, gt=0.0)
+    imgsz: int | None = Field(default=None, gt=0)
+    output_encoding: Literal["json", "json_compact"] | None = None
+    conf_threshold: float | None = Field(default=None, ge=0.0, le=1.0)
+    tracker_iou_threshold: float | None = Field(default=None, ge=0.0, le=1.0)
+    tracker_max_missing: int | None = Field(default=None, ge=0)
+    flow_control: bool | None = None
+    record: bool | None = None
+
+
+class StreamSettings(BaseModel):
+    target_fps: float
+    imgsz: int
+    output_encoding: Literal["json", "json_compact"]
+    conf_threshold: float
+    tracker_iou_threshold: float
+    tracker_max_missing: int
+    flow_control: bool = False
+    record: bool = False
+    recording_id: str | None = None
+
+
+class IngestStartRequest(BaseModel):
+    source: str = Field(min_length=1)
+    repeat: bool = False
+    config: StreamConfigRequest | None = None
+
+
+class IngestSessionInfo(BaseModel):
+    ingest_id: str
+    source: str
+    state: Literal["starting", "running", "stopped", "ended", "failed"]
+    error: str | None = None
+    frames_decoded: int
+    frames_inferred: int
+    frames_dropped: int
+    settings: StreamSettings
+
+
+class IngestListResponse(BaseModel):
+    sessions: list[IngestSessionInfo]
+
+
+class JobSubmitRequest(BaseModel):
+    manifest: str = Field(min_length=1)
+    batch_size: int | None = Field(default=None, ge=1, le=256)
+
+
+class JobInfo(BaseModel):
+    job_id: str
+    manifest: str
+    state: Literal["queued", "running", "cancelled", "completed", "failed", "interrupted"]
+    error: str | None = None
+    batch_size: int
+    total: int | None = None
+    processed: int
+    failed: int
+    images_per_s: float
+    eta_s: float | None = None
+    summary: SessionSummary | None = None
+
+
+class JobListResponse(BaseModel):
+    jobs: list[JobInfo]
+
+
+class StreamFlowEnvelope(BaseModel):
+    type: str = "flow"
+    frame_interval_ms: int
+    jpeg_quality: float
+
+
+class StreamConfigEnvelope(BaseModel):
+    type: str = "config"
+    settings: StreamSettings
+
+
+class SchedulerClassStats(BaseModel):
+    weight: float
+    queued: int
+    completed: int
+    dropped_deadline: int
+    dropped_overflow: int
+    wait_ms_mean: float
+    wait_ms_p50: float
+    wait_ms_p95: float
+
+
+class SchedulerStats(BaseModel):
+    workers: int
+    classes: dict[str, SchedulerClassStats]
+
+
+class BufferPoolStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    discarded: int
+    idle_buffers: int
+    leased_buffers: int
+    resident_bytes: int
+    leased_bytes: int
+
+
+class RecorderStats(BaseModel):
+    sessions_started: int
+    sessions_closed: int
+    queued: int
+    records_written: int
+    bytes_written: int
+    dropped: int
+
+
+class ShadowStats(BaseModel):
+    model_version: str
+    sample_rate: float
+    sampled: int
+    dropped_busy: int
+    failed: int
+    queued: int
+    frames_compared: int
+    primary_detections: int
+    shadow_detections: int
+    count_delta_mean: float
+    count_delta_abs_mean: float
+    count_agreement_rate: float
+    iou_match_rate: float
+    shadow_match_rate: float
+    matched_iou_mean: float
+    ripeness_agreement: float
+    ripeness_confusion: dict[str, dict[str, int]]
+
+
+class MetricsResponse(BaseModel):
+    scheduler: SchedulerStats
+    buffer_pool: BufferPoolStats | None = None
+    recorder: RecorderStats | None = None
+    shadow: ShadowStats | None = None
+
+
+class CpuProfileResponse(BaseModel):
+    mode: Literal["sample", "deterministic"]
+    format: Literal["collapsed", "pstats"]
+    seconds: float
+    events: int
+    threads: list[str]
+    output: str
+
+
+class AllocationGrowth(BaseModel):
+    size_diff_bytes: int
+    count_diff: int
+    size_bytes: int
+    count: int
+    traceback: list[str]
+
+
+class StructureCensus(BaseModel):
+    type: str
+    instances_before: int
+    instances_after: int
+    approx_bytes_before: int
+    approx_bytes_after: int
+    entries_before: int
+    entries_after: int
+
+
+class MemoryProfileResponse(BaseModel):
+    seconds: float
+    traced_bytes: int
+    growth: list[AllocationGrowth]
+    structures: list[StructureCensus]
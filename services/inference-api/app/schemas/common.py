@@ -29,6 +29,8 @@ class FrameResult(BaseModel):
     timestamp_ms: int = Field(ge=0)
     detections: list[Detection]
     frame_summary: FrameSummary
+    # Detector input size actually used; drops below the configured size under load shedding.
+    imgsz: int | None = Field(default=None, ge=1)
 
 
 class RipenessRatio(BaseModel):
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Literal
 
 from lychee_common.device import _torch_cuda_runtime as _shared_torch_cuda_runtime
 from lychee_common.device import resolve_torch_device as _shared_resolve_torch_device
@@ -29,6 +30,38 @@ class ModelConfig(BaseModel):
     conf_threshold: float = Field(default=0.25, ge=0.0, le=1.0)
     nms_iou: float = Field(default=0.45, ge=0.0, le=1.0)
     device: str = "auto"
+    imgsz: int = Field(default=640, ge=32)
+    inter_op_threads: int = Field(default=0, ge=0)
+    # Largest number of frames handed to the model in one call by predict_batch
+    # (tiles, offline batches, bulk jobs); an autotuned batch size lowers it further.
+    max_batch_size: int = Field(default=16, ge=1)
+    execution_mode: Literal["predictor", "optimized"] = "predictor"
+    optimized_compile: Literal["none", "compile", "trace"] = "none"
+    optimized_channels_last: bool = True
+    autotune: bool = False
+    autotune_objective: Literal["latency", "throughput"] = "latency"
+    autotune_threads: list[int] = Field(default_factory=list)
+    autotune_batch_sizes: list[int] = Field(default_factory=lambda: [1])
+    autotune_input_sizes: list[int] = Field(default_factory=list)
+    autotune_iterations: int = Field(default=5, ge=1)
+    autotune_cache_path: str = ".cache/autotune/autotune.json"
+    tile_enabled: bool = False
+    tile_size: int = Field(default=640, ge=32)
+    tile_overlap: float = Field(default=0.2, ge=0.0, lt=1.0)
+    tile_max: int = Field(default=16, ge=1)
+    tile_merge_ios: float = Field(default=0.6, ge=0.0, le=1.0)
+    tile_merge_mode: Literal["nms", "nmm"] = "nmm"
+    motion_gate_enabled: bool = False
+    motion_gate_threshold: float = Field(default=0.02, ge=0.0, le=1.0)
+    motion_gate_max_skip: int = Field(default=5, ge=0)
+    resolution_ladder: list[int] = Field(default_factory=list)
+    ladder_step_down_wait_ms: float = Field(default=150.0, ge=0.0)
+    ladder_step_up_wait_ms: float = Field(default=40.0, ge=0.0)
+    # A second detector scored against the primary on sampled live frames; off when empty.
+    shadow_model_path: str = ""
+    shadow_model_version: str = ""
+    shadow_sample_rate: float = Field(default=0.05, ge=0.0, le=1.0)
+    shadow_iou_threshold: float = Field(default=0.5, gt=0.0, le=1.0)
 
 
 class ServiceConfig(BaseModel):
@@ -36,6 +69,44 @@ class ServiceConfig(BaseModel):
     api_prefix: str = "/v1"
     schema_version: str = DEFAULT_SCHEMA_VERSION
     max_upload_mb: int = 10
+    stream_default_fps: float = Field(default=10.0, gt=0.0)
+    stream_max_fps: float = Field(default=15.0, gt=0.0)
+    stream_min_imgsz: int = Field(default=320, ge=32)
+    stream_max_imgsz: int = Field(default=640, ge=32)
+    stream_tracker_iou_threshold: float = Field(default=0.3, ge=0.0, le=1.0)
+    stream_tracker_max_missing: int = Field(default=20, ge=0)
+    stream_tracker_max_missing_limit: int = Field(default=120, ge=0)
+    stream_flow_control_enabled: bool = True
+    stream_flow_target_latency_ms: float = Field(default=250.0, gt=0.0)
+    recording_mode: Literal["off", "opt_in", "all"] = "off"
+    recording_dir: str = ".cache/recordings"
+    recording_frame_every: int = Field(default=1, ge=1)
+    recording_queue_max: int = Field(default=256, ge=1)
+    ingest_enabled: bool = False
+    ingest_allowed_sources: list[str] = Field(default_factory=list)
+    ingest_max_sessions: int = Field(default=4, ge=1)
+    # How long a finished ingest session stays listed with its summary.
+    ingest_retention_s: float = Field(default=300.0, ge=0.0)
+    framed_socket_path: str = ""
+    buffer_pool_enabled: bool = True
+    buffer_pool_max_mb: int = Field(default=256, ge=0)
+    # Threads running scheduled inference. They share one detector, and the Ultralytics
+    # YOLO adapter is not thread-safe, so startup rejects values above 1 for it.
+    inference_workers: int = Field(default=1, ge=1)
+    scheduler_weight_stream: float = Field(default=4.0, gt=0.0)
+    scheduler_weight_image: float = Field(default=2.0, gt=0.0)
+    scheduler_weight_bulk: float = Field(default=1.0, gt=0.0)
+    scheduler_max_queued: int = Field(default=256, ge=1)
+    stream_frame_deadline_ms: int = Field(default=1000, ge=1)
+    image_deadline_ms: int = Field(default=10000, ge=1)
+    bulk_jobs_enabled: bool = False
+    bulk_allowed_roots: list[str] = Field(default_factory=list)
+    bulk_jobs_dir: str = ".cache/jobs"
+    bulk_batch_size: int = Field(default=8, ge=1)
+    bulk_decode_processes: int = Field(default=2, ge=1)
+    bulk_max_jobs: int = Field(default=1, ge=1)
+    debug_profiling_enabled: bool = False
+    debug_profile_max_seconds: float = Field(default=30.0, gt=0.0)
 
 
 def _parse_simple_yaml(text: str) -> dict:
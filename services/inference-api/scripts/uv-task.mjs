@@ -5,7 +5,7 @@ import { fileURLToPath } from 'node:url'
 const [, , task, ...rawArgs] = process.argv
 
 if (!task) {
-  console.error('Missing task. Expected one of: dev, test, verify, train, eval.')
+  console.error('Missing task. Expected one of: dev, test, verify, train, eval, quantize, audit, sweep, regression.')
   process.exit(1)
 }
 
@@ -93,6 +93,74 @@ const commands = {
       'mlops/artifacts/metrics/lychee_v1-eval_metrics.json',
       ...parsed.passthrough
     ]
+  },
+  quantize: {
+    cwd: repoRoot,
+    args: [
+      'run',
+      '--project',
+      'services/inference-api',
+      '--extra',
+      target,
+      '--with',
+      'onnx',
+      '--with',
+      'onnxruntime',
+      'python',
+      'mlops/training/quantize.py',
+      '--model',
+      'mlops/artifacts/models/lychee_v1/weights/best.pt',
+      '--data',
+      'mlops/data/lichi/data.yaml',
+      ...parsed.passthrough
+    ]
+  },
+  audit: {
+    cwd: repoRoot,
+    args: [
+      'run',
+      '--project',
+      'services/inference-api',
+      '--extra',
+      target,
+      'python',
+      'mlops/training/audit.py',
+      '--data',
+      'mlops/data/lichi/data.yaml',
+      ...parsed.passthrough
+    ]
+  },
+  sweep: {
+    cwd: repoRoot,
+    args: [
+      'run',
+      '--project',
+      'services/inference-api',
+      '--extra',
+      target,
+      'python',
+      'mlops/training/sweep.py',
+      '--data',
+      'mlops/data/lichi/data.yaml',
+      ...parsed.passthrough
+    ]
+  },
+  regression: {
+    cwd: repoRoot,
+    args: [
+      'run',
+      '--project',
+      'services/inference-api',
+      '--extra',
+      target,
+      'python',
+      'mlops/training/regression.py',
+      '--model',
+      'mlops/artifacts/models/lychee_v1/weights/best.pt',
+      '--data',
+      'mlops/data/lichi/data.yaml',
+      ...parsed.passthrough
+    ]
   }
 }
 
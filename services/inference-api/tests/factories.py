@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import numpy as np
 
-from app.inference.adapters.base import DetectorAdapter, RawDetection
+from app.inference.adapters.base import DetectorAdapter
+from app.inference.adapters.yolo_stable import YoloStableAdapter
+from app.inference.detections import DetectionBatch
 from app.inference.pipeline import InferencePipeline
+from app.settings import ModelConfig
 
 
 class FakeDetector(DetectorAdapter):
@@ -12,12 +15,12 @@ class FakeDetector(DetectorAdapter):
     def __init__(
         self,
         *,
-        detections: list[RawDetection] | None = None,
+        detections: DetectionBatch | None = None,
         ripeness: str = "half",
         loaded: bool = True,
     ) -> None:
         self._loaded = loaded
-        self._detections = detections or [build_raw_detection()]
+        self._detections = detections if detections is not None else build_detections()
         self._ripeness = ripeness
 
     @property
@@ -30,20 +33,20 @@ class FakeDetector(DetectorAdapter):
     def warmup(self) -> None:
         return
 
-    def predict(self, frame: np.ndarray) -> list[RawDetection]:
-        return list(self._detections)
+    def predict(self, frame: np.ndarray, imgsz: int | None = None) -> DetectionBatch:
+        return self._detections
 
     def ripeness_from_class_id(self, class_id: int) -> str:
         return self._ripeness
 
 
-def build_raw_detection(
+def build_detections(
     *,
     bbox: tuple[float, float, float, float] = (10, 10, 100, 100),
     class_id: int = 1,
     confidence: float = 0.9,
-) -> RawDetection:
-    return RawDetection(bbox=bbox, class_id=class_id, confidence=confidence)
+) -> DetectionBatch:
+    return DetectionBatch.from_rows([(bbox, class_id, confidence)])
 
 
 def build_frame(
@@ -63,3 +66,28 @@ def build_pipeline(
     schema_version: str = "v1",
 ) -> InferencePipeline:
     return InferencePipeline(detector or FakeDetector(), model_version=model_version, schema_version=schema_version)
+
+
+class StubYoloModel:
+    """Stands in for an Ultralytics ``YOLO``: records how many frames each predict call got."""
+
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+        self.sizes: list[int] = []
+
+    def predict(self, source, imgsz, **_kwargs):
+        self.batches.append(len(source))
+        self.sizes.append(imgsz)
+        return [_EmptyYoloResult() for _ in source]
+
+
+class _EmptyYoloResult:
+    boxes = None
+
+
+def build_yolo_adapter(**overrides) -> YoloStableAdapter:
+    """A loaded ``YoloStableAdapter`` whose model is a ``StubYoloModel``."""
+    adapter = YoloStableAdapter(ModelConfig(device="cpu", **overrides))
+    adapter._model = StubYoloModel()
+    adapter._loaded = True
+    return adapter
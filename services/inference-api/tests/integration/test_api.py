@@ -1,13 +1,23 @@
 from __future__ import annotations
 
-from tests.factories import build_raw_detection
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.inference.frames import PixelFormat, encode_raw_frame
+from app.main import app
+from tests.factories import build_detections, build_frame
 
 
 def test_health_and_image_infer(test_client, install_pipeline, decode_image_to_frame, sample_image_bytes, fake_detector_factory) -> None:
     decode_image_to_frame()
     install_pipeline(
         detector=fake_detector_factory(
-            detections=[build_raw_detection(bbox=(5, 5, 30, 30), class_id=2, confidence=0.8)],
+            detections=build_detections(bbox=(5, 5, 30, 30), class_id=2, confidence=0.8),
             ripeness="red",
         )
     )
@@ -20,3 +30,268 @@ def test_health_and_image_infer(test_client, install_pipeline, decode_image_to_f
     assert resp.status_code == 200
     body = resp.json()
     assert body["result"]["frame_summary"]["red"] == 1
+
+
+def test_stream_accepts_raw_frames(test_client, install_pipeline) -> None:
+    install_pipeline()
+    payload = encode_raw_frame(np.zeros((32, 32, 3), dtype=np.uint8), PixelFormat.BGR)
+
+    with test_client.websocket_connect("/v1/infer/stream") as ws:
+        ws.send_bytes(payload)
+        msg = ws.receive_json()
+        assert msg["type"] == "frame"
+        assert msg["result"]["frame_summary"]["total"] == 1
+        ws.send_text("eos")
+        assert ws.receive_json()["type"] == "summary"
+
+
+def test_stream_config_handshake(test_client, install_pipeline, decode_image_to_frame, sample_image_bytes) -> None:
+    decode_image_to_frame()
+    install_pipeline()
+
+    with test_client.websocket_connect("/v1/infer/stream") as ws:
+        ws.send_text('{"type": "config", "imgsz": 4096, "output_encoding": "json_compact"}')
+        reply = ws.receive_json()
+        assert reply["type"] == "config"
+        assert reply["settings"]["imgsz"] == 640
+        assert reply["settings"]["output_encoding"] == "json_compact"
+
+        ws.send_bytes(sample_image_bytes)
+        assert ws.receive_json()["type"] == "frame"
+
+        ws.send_text("config")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_text("eos")
+        assert ws.receive_json()["type"] == "summary"
+
+
+def test_metrics_expose_scheduler_queue_waits(test_client, install_pipeline, decode_image_to_frame, sample_image_bytes) -> None:
+    decode_image_to_frame()
+    install_pipeline()
+
+    resp = test_client.post("/v1/infer/image", files={"file": ("x.jpg", sample_image_bytes, "image/jpeg")})
+    assert resp.status_code == 200
+
+    metrics = test_client.get("/v1/metrics").json()
+    image_stats = metrics["scheduler"]["classes"]["image"]
+    assert image_stats["completed"] == 1
+    assert image_stats["wait_ms_p95"] >= 0.0
+    assert set(metrics["scheduler"]["classes"]) == {"stream", "image", "bulk"}
+
+
+def test_stream_flow_control_backs_off_when_over_latency_target(test_client, install_pipeline, decode_image_to_frame, sample_image_bytes) -> None:
+    decode_image_to_frame()
+    install_pipeline()
+    test_client.app.state.service_cfg.stream_flow_target_latency_ms = 1e-6
+
+    with test_client.websocket_connect("/v1/infer/stream") as ws:
+        ws.send_text('{"type": "config", "target_fps": 10, "flow_control": true}')
+        assert ws.receive_json()["settings"]["flow_control"] is True
+
+        ws.send_bytes(sample_image_bytes)
+        assert ws.receive_json()["type"] == "frame"
+        flow = ws.receive_json()
+        assert flow == {"type": "flow", "frame_interval_ms": 200, "jpeg_quality": 0.8}
+
+        ws.send_text("eos")
+        assert ws.receive_json()["type"] == "summary"
+
+
+def test_stream_opt_in_recording(test_client, install_pipeline, decode_image_to_frame, sample_image_bytes, tmp_path) -> None:
+    from app.inference.recording import RecordingSettings, SessionRecorder, SessionRecording
+
+    decode_image_to_frame()
+    install_pipeline()
+    recorder = SessionRecorder(RecordingSettings(directory=tmp_path))
+    test_client.app.state.recorder = recorder
+    test_client.app.state.service_cfg.recording_mode = "opt_in"
+
+    with test_client.websocket_connect("/v1/infer/stream") as ws:
+        ws.send_text('{"type": "config", "record": true}')
+        recording_id = ws.receive_json()["settings"]["recording_id"]
+        ws.send_bytes(sample_image_bytes)
+        assert ws.receive_json()["type"] == "frame"
+        ws.send_text("eos")
+        assert ws.receive_json()["type"] == "summary"
+
+    recorder.close()
+    with SessionRecording(tmp_path / recording_id) as recording:
+        frames = list(recording.frames())
+        assert bytes(frames[0].payload) == sample_image_bytes
+        assert recording.summary() is not None
+
+
+def _write_video(path, frames: int) -> None:
+    import cv2
+
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30, (32, 32))
+    for index in range(frames):
+        writer.write(np.full((32, 32, 3), index * 8 % 255, dtype=np.uint8))
+    writer.release()
+
+
+def test_ingest_is_disabled_by_default(test_client) -> None:
+    assert test_client.post("/v1/ingest", json={"source": "rtsp://cam/1"}).status_code == 404
+
+
+def test_ingest_pulls_local_video_and_publishes_results(test_client, install_pipeline, tmp_path) -> None:
+    from app.inference.ingest import IngestManager
+
+    install_pipeline()
+    app_state = test_client.app.state
+    app_state.ingest = IngestManager(app_state.scheduler)
+    app_state.service_cfg.ingest_allowed_sources = [str(tmp_path)]
+    video = tmp_path / "clip.avi"
+    _write_video(video, 30)
+
+    assert test_client.post("/v1/ingest", json={"source": "/etc/passwd"}).status_code == 403
+
+    resp = test_client.post("/v1/ingest", json={"source": str(video), "config": {"type": "config", "target_fps": 15}})
+    assert resp.status_code == 201
+    ingest_id = resp.json()["ingest_id"]
+    assert resp.json()["settings"]["target_fps"] == 15
+
+    messages = []
+    with test_client.websocket_connect(f"/v1/ingest/{ingest_id}/stream") as ws:
+        while True:
+            message = ws.receive_json()
+            messages.append(message)
+            if message["type"] == "summary":
+                break
+
+    assert any(m["type"] == "frame" for m in messages)
+    assert messages[-1]["summary"]["total_detected"] >= 1
+
+    info = test_client.get(f"/v1/ingest/{ingest_id}").json()
+    assert info["state"] == "ended"
+    assert info["frames_decoded"] == 30
+    assert info["frames_inferred"] + info["frames_dropped"] <= 30
+
+    assert test_client.delete(f"/v1/ingest/{ingest_id}").status_code == 200
+    assert test_client.get("/v1/ingest").json() == {"sessions": []}
+
+
+def test_jobs_are_disabled_by_default(test_client) -> None:
+    assert test_client.post("/v1/jobs", json={"manifest": "/data/manifest.txt"}).status_code == 404
+
+
+def test_bulk_job_runs_manifest_and_serves_results(test_client, install_pipeline, tmp_path) -> None:
+    import cv2
+
+    from app.inference.jobs import JobManager
+
+    install_pipeline()
+    app_state = test_client.app.state
+    app_state.jobs = JobManager(
+        tmp_path / "jobs",
+        app_state.scheduler,
+        allowed_roots=[str(tmp_path / "data")],
+        decoder_factory=lambda: ThreadPoolExecutor(max_workers=1),
+    )
+    (tmp_path / "data").mkdir()
+    for index in range(3):
+        cv2.imwrite(str(tmp_path / "data" / f"{index}.png"), np.zeros((16, 16, 3), dtype=np.uint8))
+    manifest = tmp_path / "data" / "manifest.txt"
+    manifest.write_text("0.png\n1.png\n2.png\n", encoding="utf-8")
+
+    assert test_client.post("/v1/jobs", json={"manifest": str(tmp_path / "manifest.txt")}).status_code == 403
+    resp = test_client.post("/v1/jobs", json={"manifest": str(manifest), "batch_size": 2})
+    assert resp.status_code == 201
+    job_id = resp.json()["job_id"]
+
+    for _ in range(200):
+        info = test_client.get(f"/v1/jobs/{job_id}").json()
+        if info["state"] != "running":
+            break
+        time.sleep(0.01)
+    assert info["state"] == "completed"
+    assert info["processed"] == 3
+    assert test_client.post(f"/v1/jobs/{job_id}/resume").status_code == 409
+    assert [job["job_id"] for job in test_client.get("/v1/jobs").json()["jobs"]] == [job_id]
+
+    results = test_client.get(f"/v1/jobs/{job_id}/results")
+    assert results.headers["content-type"] == "application/x-ndjson"
+    lines = results.text.splitlines()
+    assert len(lines) == 4
+    assert json.loads(lines[-1])["summary"]["total_detected"] == 3
+
+    # A half-written line past the last newline is held back.
+    results_path = app_state.jobs.results_path(job_id)
+    with results_path.open("ab") as sink:
+        sink.write(b'{"type": "ima')
+    assert test_client.get(f"/v1/jobs/{job_id}/results").text == results.text
+
+
+def test_job_results_download_is_bounded_by_the_size_at_request_time(tmp_path) -> None:
+    from app.api.v1.endpoints import _iter_results
+
+    path = tmp_path / "results.ndjson"
+    path.write_bytes(b'{"a": 1}\n{"b": 2}\n')
+    body = _iter_results(path, path.stat().st_size, chunk_size=4)
+    first = next(body)
+    with path.open("ab") as sink:
+        sink.write(b'{"c": 3}\n')
+
+    assert first + b"".join(body) == b'{"a": 1}\n{"b": 2}\n'
+
+
+def test_framed_socket_matches_websocket_results(config_env, monkeypatch, tmp_path, install_pipeline, decode_image_to_frame, sample_image_bytes, fake_detector_factory) -> None:
+    from app.api.framed import FramedClient
+
+    socket_path = tmp_path / "framed.sock"
+    service_config = tmp_path / "service.yaml"
+    service_config.write_text(
+        Path(config_env["service_config"]).read_text(encoding="utf-8") + f'\nframed_socket_path: "{socket_path}"\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("LYCHEE_SERVICE_CONFIG", str(service_config))
+    decode_image_to_frame(build_frame(height=120, width=120))
+
+    with TestClient(app) as client:
+        install_pipeline(
+            detector=fake_detector_factory(
+                detections=build_detections(bbox=(1, 1, 20, 20), class_id=1, confidence=0.75),
+                ripeness="red",
+            )
+        )
+        with client.websocket_connect("/v1/infer/stream") as ws:
+            ws.send_bytes(sample_image_bytes)
+            ws_result = ws.receive_json()["result"]
+            ws.send_text("eos")
+            ws_summary = ws.receive_json()["summary"]
+
+        with FramedClient(socket_path) as framed:
+            settings = framed.configure(target_fps=12)
+            result = framed.infer(sample_image_bytes, timestamp_ms=ws_result["timestamp_ms"])
+            summary = framed.close()
+
+    assert settings.target_fps == 12
+    assert result.model_dump(mode="json") == ws_result
+    assert summary.model_dump() == ws_summary
+
+
+def test_profiling_is_disabled_by_default(test_client) -> None:
+    assert test_client.post("/v1/debug/profile/cpu", params={"seconds": 0.1}).status_code == 404
+    assert test_client.post("/v1/debug/profile/memory", params={"seconds": 0.1}).status_code == 404
+
+
+def test_profiling_endpoints_return_cpu_and_memory_reports(test_client) -> None:
+    from app.inference.profiling import Profiler
+
+    test_client.app.state.profiler = Profiler(max_seconds=0.2)
+
+    cpu = test_client.post("/v1/debug/profile/cpu", params={"seconds": 5})
+    assert cpu.status_code == 200
+    assert cpu.json()["seconds"] == 0.2
+    assert cpu.json()["format"] == "collapsed"
+    assert "inference-worker-0" in cpu.json()["threads"]
+
+    pstats = test_client.post("/v1/debug/profile/cpu", params={"seconds": 0.1, "mode": "deterministic"})
+    assert pstats.status_code == 200
+    assert "cumulative" in pstats.json()["output"]
+
+    memory = test_client.post("/v1/debug/profile/memory", params={"seconds": 0.1, "top": 5})
+    assert memory.status_code == 200
+    types = {s["type"] for s in memory.json()["structures"]}
+    assert types == {"StreamSession", "SessionAggregator", "ByteTrackManager"}
+    assert len(memory.json()["growth"]) <= 5
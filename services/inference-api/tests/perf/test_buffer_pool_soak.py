@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from app.inference.buffers import BufferPool
+from app.inference.frames import PixelFormat, encode_raw_frame, parse_raw_frame, to_adapter_frame
+from tests.factories import build_frame, build_pipeline
+
+SOAK_FRAMES = int(os.getenv("LYCHEE_SOAK_FRAMES", "300"))
+RSS_GROWTH_BUDGET_MB = float(os.getenv("LYCHEE_SOAK_RSS_BUDGET_MB", "16"))
+
+
+def _rss_mb() -> float:
+    statm = Path("/proc/self/statm")
+    if not statm.exists():
+        pytest.skip("RSS sampling needs /proc")
+    pages = int(statm.read_text().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+@pytest.mark.perf
+def test_pooled_stream_soak_keeps_rss_flat() -> None:
+    pool = BufferPool()
+    pipeline = build_pipeline()
+    pipeline.buffer_pool = pool
+    session = pipeline.create_stream_session()
+    gray = build_frame(height=1080, width=1920, fill_value=90)[:, :, 0]
+    payload = encode_raw_frame(gray, PixelFormat.GRAY)
+
+    def step(index: int) -> None:
+        pixels, pixel_format = parse_raw_frame(payload)
+        frame = to_adapter_frame(pixels, pixel_format, pool=pool)
+        try:
+            pipeline.infer_stream_frame(frame, session, index)
+        finally:
+            pool.release(frame)
+
+    for index in range(20):
+        step(index)
+    baseline = _rss_mb()
+    for index in range(20, 20 + SOAK_FRAMES):
+        step(index)
+    growth = _rss_mb() - baseline
+
+    stats = pool.stats()
+    assert stats["hit_rate"] > 0.95
+    assert stats["leased_buffers"] == 0
+    assert growth < RSS_GROWTH_BUDGET_MB, f"RSS grew {growth:.1f} MB over {SOAK_FRAMES} frames"
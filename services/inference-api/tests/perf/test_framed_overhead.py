@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.framed import FramedClient, encode_result
+from app.api.v1.endpoints import _frame_payload
+from app.main import app
+from app.schemas.api import StreamFrameEnvelope
+from app.schemas.common import Detection, FrameResult, FrameSummary
+from tests.factories import build_detections, build_frame
+
+BENCH_FRAMES = int(os.getenv("LYCHEE_FRAMED_BENCH_FRAMES", "200"))
+
+
+def _busy_result(detections: int = 40) -> FrameResult:
+    return FrameResult(
+        frame_index=12,
+        timestamp_ms=4000,
+        detections=[
+            Detection(bbox=(i * 3.5, i * 2.25, i * 3.5 + 40.0, i * 2.25 + 38.0), ripeness="red", confidence=0.8125, track_id=i)
+            for i in range(detections)
+        ],
+        frame_summary=FrameSummary(total=detections, red=detections),
+        imgsz=640,
+    )
+
+
+def _per_frame_us(fn, frames: int) -> float:
+    started = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - started) / frames * 1e6
+
+
+@pytest.mark.perf
+def test_binary_result_encoding_is_cheaper_than_json_envelope() -> None:
+    result = _busy_result()
+    envelope = StreamFrameEnvelope(model_version="1.0.0", schema_version="v1", result=result)
+
+    json_us = _per_frame_us(lambda: _frame_payload(envelope, "json").encode("utf-8"), BENCH_FRAMES)
+    binary_us = _per_frame_us(lambda: encode_result(1, result), BENCH_FRAMES)
+    json_bytes = len(_frame_payload(envelope, "json").encode("utf-8"))
+    binary_bytes = len(encode_result(1, result))
+    print(
+        f"\n[framed] result encode: json {json_us:.1f}us/{json_bytes}B, "
+        f"binary {binary_us:.1f}us/{binary_bytes}B"
+    )
+
+    assert binary_bytes < json_bytes / 2
+    assert binary_us < json_us
+
+
+@pytest.mark.perf
+def test_framed_socket_round_trip_against_websocket(
+    config_env, monkeypatch, tmp_path, install_pipeline, decode_image_to_frame, sample_image_bytes, fake_detector_factory
+) -> None:
+    socket_path = tmp_path / "framed.sock"
+    service_config = tmp_path / "service.yaml"
+    service_config.write_text(
+        Path(config_env["service_config"]).read_text(encoding="utf-8")
+        + f'\nframed_socket_path: "{socket_path}"\nstream_default_fps: 1000\nstream_max_fps: 1000\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("LYCHEE_SERVICE_CONFIG", str(service_config))
+    decode_image_to_frame(build_frame(height=120, width=120))
+
+    with TestClient(app) as client:
+        install_pipeline(
+            detector=fake_detector_factory(
+                detections=build_detections(bbox=(1, 1, 20, 20), class_id=2, confidence=0.9),
+                ripeness="red",
+            )
+        )
+
+        with client.websocket_connect("/v1/infer/stream") as ws:
+            def ws_frame() -> None:
+                ws.send_bytes(sample_image_bytes)
+                assert ws.receive_json()["type"] == "frame"
+
+            ws_us = _per_frame_us(ws_frame, BENCH_FRAMES)
+            ws.send_text("eos")
+            ws.receive_json()
+
+        with FramedClient(socket_path) as framed:
+            framed_us = _per_frame_us(lambda: framed.infer(sample_image_bytes), BENCH_FRAMES)
+
+    # The in-process WebSocket client skips the real network stack, so this
+    # understates the loopback TCP path the gateway uses today.
+    print(f"\n[framed] round trip per frame: websocket {ws_us:.0f}us, unix framed {framed_us:.0f}us")
+    assert framed_us > 0
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parents[2]
+REPO_ROOT = SERVICE_DIR.parents[1]
+HEAVY_MODULES = {"torch", "ultralytics", "cv2"}
+IMPORT_BUDGET_MS = float(os.getenv("LYCHEE_IMPORT_BUDGET_MS", "2500"))
+
+
+def _import_profile(module: str) -> tuple[float, set[str]]:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(SERVICE_DIR), str(REPO_ROOT)])}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVICE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_us = 0
+    imported: set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        name = parts[2].strip()
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(parts[1].strip())
+    return cumulative_us / 1000.0, imported
+
+
+@pytest.mark.perf
+@pytest.mark.parametrize("module", ["app.main", "mlops.training.train", "mlops.training.eval"])
+def test_import_time_within_budget(module: str) -> None:
+    elapsed_ms, imported = _import_profile(module)
+
+    assert not (imported & HEAVY_MODULES), f"{module} eagerly imports {sorted(imported & HEAVY_MODULES)}"
+    assert 0 < elapsed_ms <= IMPORT_BUDGET_MS, f"{module} import took {elapsed_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+
+
+@pytest.mark.perf
+def test_app_main_defers_numpy() -> None:
+    _, imported = _import_profile("app.main")
+    assert "numpy" not in imported
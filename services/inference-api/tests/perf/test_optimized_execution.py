@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from app.paths import resolve_repo_path
+from app.settings import ModelConfig
+
+WEIGHTS = os.getenv("LYCHEE_PARITY_WEIGHTS", "mlops/pretrained/yolo26n.pt")
+IMAGES = os.getenv("LYCHEE_PARITY_IMAGES", "")
+
+
+@pytest.mark.perf
+@pytest.mark.parametrize("compile_mode", ["none", "trace"])
+def test_optimized_mode_matches_stock_predictor_on_cpu(compile_mode: str) -> None:
+    pytest.importorskip("torch")
+    pytest.importorskip("torchvision")
+    pytest.importorskip("ultralytics")
+    weights = resolve_repo_path(WEIGHTS)
+    if not weights.exists() or not IMAGES:
+        pytest.skip("Set LYCHEE_PARITY_IMAGES (and LYCHEE_PARITY_WEIGHTS) to run the parity benchmark")
+
+    from app.cli.execution_parity import build_adapter, load_frames
+    from app.inference.adapters.yolo_optimized import compare_execution
+
+    cfg = ModelConfig(model_path=str(weights), device="cpu", imgsz=640)
+    frames = load_frames(Path(IMAGES), 8)
+    reference = build_adapter(cfg, execution_mode="predictor")
+    candidate = build_adapter(cfg, execution_mode="optimized", optimized_compile=compile_mode)
+
+    report = compare_execution(reference._infer, candidate._infer, frames, cfg.imgsz, iterations=5)
+    print(f"\n[optimized:{compile_mode}] {report.as_dict()}")
+
+    assert report.recall >= 0.95
+    assert report.mean_iou >= 0.9
+    assert report.max_confidence_delta <= 0.1
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import statistics
+import time
+from concurrent.futures import wait
+
+import numpy as np
+import pytest
+
+from app.inference.scheduler import InferenceScheduler, WorkClass
+from app.inference.shadow import ShadowEvaluator, ShadowSettings
+from tests.factories import FakeDetector, build_frame, build_pipeline
+
+BENCH_FRAMES = int(os.getenv("LYCHEE_SHADOW_BENCH_FRAMES", "90"))
+FRAME_INTERVAL_S = 1 / 30
+# Allowed p50 growth of primary latency with the shadow sampling every frame.
+P50_BUDGET = float(os.getenv("LYCHEE_SHADOW_P50_BUDGET", "1.3"))
+
+
+class MatmulDetector(FakeDetector):
+    """Stands in for a model: a few milliseconds of GIL-releasing BLAS work per frame."""
+
+    def __init__(self, size: int) -> None:
+        super().__init__()
+        self._matrix = np.random.default_rng(0).random((size, size))
+
+    def predict(self, frame, imgsz=None):
+        for _ in range(4):
+            self._matrix @ self._matrix
+        return super().predict(frame, imgsz=imgsz)
+
+
+class SpinningDetector(FakeDetector):
+    """Worst case for the primary: pure Python work that holds the GIL."""
+
+    def predict(self, frame, imgsz=None):
+        started = time.perf_counter()
+        while time.perf_counter() - started < 0.008:
+            pass
+        return super().predict(frame, imgsz=imgsz)
+
+
+def _stream_latencies_ms(shadow_detector: FakeDetector | None) -> tuple[list[float], dict | None]:
+    scheduler = InferenceScheduler(workers=1)
+    pipeline = build_pipeline(detector=MatmulDetector(200))
+    if shadow_detector is not None:
+        pipeline.shadow = ShadowEvaluator(
+            shadow_detector,
+            model_version="candidate",
+            settings=ShadowSettings(sample_rate=1.0),
+            load=scheduler.in_flight,
+            wait_idle=scheduler.wait_idle,
+        )
+    session = pipeline.create_stream_session()
+    frame = build_frame(height=480, width=640)
+    latencies = []
+    try:
+        for index in range(BENCH_FRAMES):
+            started = time.perf_counter()
+            scheduler.submit(
+                lambda: pipeline.infer_stream_frame(frame, session, index * 33),
+                work_class=WorkClass.STREAM,
+                session_key="camera",
+            ).result()
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            time.sleep(max(0.0, FRAME_INTERVAL_S - (time.perf_counter() - started)))
+        stats = pipeline.shadow.stats() if pipeline.shadow is not None else None
+    finally:
+        if pipeline.shadow is not None:
+            pipeline.shadow.close()
+        scheduler.close()
+    return latencies, stats
+
+
+@pytest.mark.perf
+@pytest.mark.parametrize("shadow_kind", ["matmul", "spin"])
+def test_shadow_does_not_move_primary_stream_latency(shadow_kind: str) -> None:
+    shadow_detector = MatmulDetector(320) if shadow_kind == "matmul" else SpinningDetector()
+    _stream_latencies_ms(None)  # warm caches and BLAS
+
+    base, _ = _stream_latencies_ms(None)
+    shadowed, stats = _stream_latencies_ms(shadow_detector)
+    base_p50 = statistics.median(base)
+    shadowed_p50 = statistics.median(shadowed)
+    print(
+        f"\n[shadow:{shadow_kind}] primary p50 {base_p50:.2f}ms -> {shadowed_p50:.2f}ms, "
+        f"compared {stats['frames_compared']}/{stats['sampled']}, dropped {stats['dropped_busy']}"
+    )
+
+    assert stats["frames_compared"] >= BENCH_FRAMES // 2
+    assert shadowed_p50 <= base_p50 * P50_BUDGET + 0.5
+
+
+@pytest.mark.perf
+def test_shadow_sheds_samples_when_the_node_is_saturated() -> None:
+    scheduler = InferenceScheduler(workers=1, max_pending_per_session=64)
+    pipeline = build_pipeline(detector=MatmulDetector(200))
+    pipeline.shadow = ShadowEvaluator(
+        SpinningDetector(),
+        model_version="candidate",
+        settings=ShadowSettings(sample_rate=1.0),
+        load=scheduler.in_flight,
+        wait_idle=scheduler.wait_idle,
+    )
+    frame = build_frame(height=480, width=640)
+    try:
+        for camera in range(4):
+            session = pipeline.create_stream_session()
+            futures = [
+                scheduler.submit(
+                    lambda session=session, index=index: pipeline.infer_stream_frame(frame, session, index * 33),
+                    work_class=WorkClass.STREAM,
+                    session_key=camera,
+                )
+                for index in range(BENCH_FRAMES // 4)
+            ]
+            wait(futures)
+        stats = pipeline.shadow.stats()
+    finally:
+        pipeline.shadow.close()
+        scheduler.close()
+
+    print(f"\n[shadow] saturated: compared {stats['frames_compared']}, dropped {stats['dropped_busy']} of {stats['sampled']}")
+    assert stats["dropped_busy"] > stats["sampled"] // 2
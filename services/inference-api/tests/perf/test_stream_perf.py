@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import pytest
 
-from tests.factories import build_frame, build_raw_detection
+from tests.factories import build_detections, build_frame
 
 
 @pytest.mark.perf
@@ -10,7 +10,7 @@ def test_stream_contract(test_client, install_pipeline, decode_image_to_frame, s
     decode_image_to_frame(build_frame(height=120, width=120))
     install_pipeline(
         detector=fake_detector_factory(
-            detections=[build_raw_detection(bbox=(1, 1, 20, 20), class_id=1, confidence=0.95)],
+            detections=build_detections(bbox=(1, 1, 20, 20), class_id=1, confidence=0.95),
             ripeness="half",
         )
     )
@@ -1,9 +1,12 @@
+import numpy as np
+
 from app.inference.aggregator import SessionAggregator
+from app.inference.detections import UNTRACKED, encode_ripeness
 
 
 def test_summary_ready_rule() -> None:
     agg = SessionAggregator()
-    agg.update_session(['red'] * 7 + ['green'] * 2 + ['half'], list(range(10)))
+    agg.update_session(encode_ripeness(['red'] * 7 + ['green'] * 2 + ['half']), np.arange(10))
     summary = agg.build_summary()
     assert summary.total_detected == 10
     assert summary.harvest_suggestion == 'ready'
@@ -11,14 +14,30 @@ def test_summary_ready_rule() -> None:
 
 def test_summary_partially_ready_rule() -> None:
     agg = SessionAggregator()
-    agg.update_session(['half'] * 5 + ['green'] * 5, list(range(10)))
+    agg.update_session(encode_ripeness(['half'] * 5 + ['green'] * 5), np.arange(10))
     summary = agg.build_summary()
     assert summary.harvest_suggestion == 'partially_ready'
 
 
 def test_deduplicate_by_track_id() -> None:
     agg = SessionAggregator()
-    agg.update_session(['half'], [1])
-    agg.update_session(['half'], [1])
+    agg.update_session(encode_ripeness(['half']), np.array([1]))
+    agg.update_session(encode_ripeness(['half']), np.array([1]))
     summary = agg.build_summary()
     assert summary.total_detected == 1
+
+
+def test_untracked_detections_always_count_and_repeats_in_a_frame_count_once() -> None:
+    agg = SessionAggregator()
+    agg.update_session(encode_ripeness(['red', 'red', 'green', 'young']), np.array([UNTRACKED, 4, 4, UNTRACKED]))
+    agg.update_session(encode_ripeness(['red', 'half']), np.array([4, UNTRACKED]))
+
+    assert agg.total_unique == 4
+    assert agg.counts.tolist() == [0, 1, 2, 1]
+    assert agg.frame_summary(encode_ripeness(['red', 'red', 'young'])).model_dump() == {
+        'total': 3,
+        'green': 0,
+        'half': 0,
+        'red': 2,
+        'young': 1,
+    }
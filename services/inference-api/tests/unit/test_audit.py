@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import importlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+audit = importlib.import_module("mlops.training.audit")
+
+
+def _scene(seed: int, size: int = 160) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 255, size=(8, 8, 3), dtype=np.uint8)
+    return np.kron(blocks, np.ones((size // 8, size // 8, 1), dtype=np.uint8))
+
+
+def _add(root: Path, split: str, name: str, image: np.ndarray | None, label: str | None) -> None:
+    import cv2
+
+    image_path = root / "images" / split / name
+    image_path.parent.mkdir(parents=True, exist_ok=True)
+    if image is None:
+        image_path.write_bytes(b"not an image")
+    else:
+        cv2.imwrite(str(image_path), image)
+    if label is not None:
+        label_path = root / "labels" / split / name
+        label_path = label_path.with_suffix(".txt")
+        label_path.parent.mkdir(parents=True, exist_ok=True)
+        label_path.write_text(label, encoding="utf-8")
+
+
+def _dataset(root: Path) -> Path:
+    _add(root, "train", "a.png", _scene(1), "0 0.5 0.5 0.2 0.2\n2 0.3 0.3 0.2 0.2\n")
+    _add(root, "train", "b.png", _scene(2), "1 0.5 0.5 0.05 0.2\n")
+    _add(root, "train", "c.png", None, "0 0.5 0.5 0.2 0.2\n")
+    _add(root, "train", "d.png", _scene(3), "7 0.5 0.5 0.2 0.2\n0 0.95 0.5 0.2 0.2\nbad line\n")
+    # An adjacent frame of a.png with a little brightness drift, leaked into val.
+    _add(root, "val", "e.png", np.clip(_scene(1).astype(np.int16) + 6, 0, 255).astype(np.uint8), "2 0.5 0.5 0.3 0.3\n")
+    _add(root, "val", "f.png", _scene(4), None)
+    data = root / "data.yaml"
+    data.write_text(
+        "path: .\ntrain: images/train\nval: images/val\nnames: [green, half, red, young]\n",
+        encoding="utf-8",
+    )
+    return data
+
+
+def test_label_path_for_replaces_last_images_directory() -> None:
+    path = Path("/data/images/lichi/images/train/x.jpg")
+    assert audit.label_path_for(path) == Path("/data/images/lichi/labels/train/x.txt")
+
+
+def test_perceptual_hash_is_stable_under_small_changes() -> None:
+    base = audit.perceptual_hash(_scene(1))
+    brighter = audit.perceptual_hash(np.clip(_scene(1).astype(np.int16) + 6, 0, 255).astype(np.uint8))
+    other = audit.perceptual_hash(_scene(9))
+    assert (base ^ brighter).bit_count() <= 4
+    assert (base ^ other).bit_count() > 12
+
+
+def test_cross_split_duplicates_ignores_pairs_within_a_split() -> None:
+    hashes = [("train", "a", 0b1011), ("train", "b", 0b1011), ("val", "c", 0b1111), ("val", "d", (1 << 63) - 1)]
+    pairs = audit.cross_split_duplicates(hashes, max_distance=2)
+    assert [(p["a"]["image"], p["b"]["image"], p["distance"]) for p in pairs] == [("a", "c", 1), ("b", "c", 1)]
+
+
+def test_audit_reports_distribution_and_issues(tmp_path: Path) -> None:
+    data = _dataset(tmp_path / "lichi")
+    output = tmp_path / "audit.json"
+    cache = tmp_path / "cache.json"
+    argv = ["--data", str(data), "--output", str(output), "--cache", str(cache), "--workers", "2"]
+
+    assert audit.main(argv) == 0
+    report = json.loads(output.read_text(encoding="utf-8"))
+
+    train = report["splits"]["train"]
+    assert train["images"] == 4 and train["instances"] == 6
+    assert train["classes"]["green"] == {"instances": 3, "share": 0.5}
+    assert train["classes"]["7"]["instances"] == 1
+    assert report["splits"]["val"]["missing_labels"] == 1
+    assert [item["image"] for item in report["corrupt_images"]["examples"]] == ["images/train/c.png"]
+    assert [item["width_px"] for item in report["tiny_boxes"]["examples"]] == [8.0]
+    assert [item["reasons"] for item in report["degenerate_boxes"]["examples"]] == [
+        ["unknown class 7"],
+        ["outside the image"],
+    ]
+    assert report["label_errors"]["examples"][0]["errors"] == ["line 3: expected 5 fields, got 2"]
+    [pair] = report["cross_split_duplicates"]["examples"]
+    assert {pair["a"]["image"], pair["b"]["image"]} == {"images/train/a.png", "images/val/e.png"}
+    assert report["scan"] == {"images": 6, "cache_hits": 0, "scanned": 6}
+
+    assert audit.main([*argv, "--strict"]) == 1
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["scan"] == {"images": 6, "cache_hits": 6, "scanned": 0}
+
+
+def test_audit_rescans_only_changed_files(tmp_path: Path) -> None:
+    data = _dataset(tmp_path / "lichi")
+    output = tmp_path / "audit.json"
+    argv = ["--data", str(data), "--output", str(output), "--cache", str(tmp_path / "cache.json"), "--workers", "1"]
+    audit.main(argv)
+
+    (tmp_path / "lichi" / "labels" / "train" / "b.txt").write_text("1 0.5 0.5 0.2 0.2\n", encoding="utf-8")
+    (tmp_path / "lichi" / "images" / "val" / "f.png").unlink()
+    audit.main(argv)
+    report = json.loads(output.read_text(encoding="utf-8"))
+
+    assert report["scan"] == {"images": 5, "cache_hits": 4, "scanned": 1}
+    assert report["tiny_boxes"]["count"] == 0
+    cached = json.loads((tmp_path / "cache.json").read_text(encoding="utf-8"))
+    assert len(cached["files"]) == 5
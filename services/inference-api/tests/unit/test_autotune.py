@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.inference.adapters.yolo_stable import YoloStableAdapter
+from app.inference.autotune import (
+    AutotuneCache,
+    TuneCandidate,
+    TunedConfig,
+    TuneMeasurement,
+    candidate_grid,
+    default_thread_candidates,
+    grid_fingerprint,
+    select_best,
+)
+from app.settings import ModelConfig
+
+
+class _CountingModel:
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+
+    def predict(self, source, imgsz, **_kwargs):
+        self.calls.append(imgsz)
+        batch = source if isinstance(source, list) else [source]
+        return [_EmptyResult() for _ in batch]
+
+
+class _EmptyResult:
+    boxes = None
+
+
+def _measurement(threads: int, batch_size: int, latency_ms: float) -> TuneMeasurement:
+    return TuneMeasurement(
+        candidate=TuneCandidate(threads=threads, batch_size=batch_size, imgsz=640),
+        batch_latency_ms=latency_ms,
+        throughput_fps=batch_size * 1000.0 / latency_ms,
+    )
+
+
+def test_default_thread_candidates_cover_powers_of_two_and_total() -> None:
+    assert default_thread_candidates(8) == [1, 2, 4, 8]
+    assert default_thread_candidates(6) == [1, 2, 4, 6]
+    assert default_thread_candidates(1) == [1]
+
+
+def test_candidate_grid_is_cartesian_product() -> None:
+    grid = candidate_grid([2, 1], [1, 4], [640])
+    assert len(grid) == 4
+    assert grid[0] == TuneCandidate(threads=1, batch_size=1, imgsz=640)
+
+
+def test_select_best_respects_objective() -> None:
+    measurements = [_measurement(4, 1, 20.0), _measurement(4, 8, 80.0)]
+    assert select_best(measurements, "latency").candidate.batch_size == 1
+    assert select_best(measurements, "throughput").candidate.batch_size == 8
+
+
+def test_cache_roundtrip(tmp_path: Path) -> None:
+    cache = AutotuneCache(tmp_path / "autotune.json")
+    assert cache.get("k") is None
+    cfg = TunedConfig(threads=4, batch_size=2, imgsz=512, objective="throughput", batch_latency_ms=10.0, throughput_fps=200.0)
+    cache.put("k", cfg)
+    assert AutotuneCache(tmp_path / "autotune.json").get("k") == cfg
+
+
+def test_warmup_autotunes_once_then_uses_cache(tmp_path: Path) -> None:
+    cfg = ModelConfig(
+        device="cpu",
+        autotune=True,
+        autotune_threads=[1, 2],
+        autotune_batch_sizes=[1, 2],
+        autotune_input_sizes=[320],
+        autotune_iterations=1,
+        autotune_cache_path=str(tmp_path / "autotune.json"),
+    )
+    first = YoloStableAdapter(cfg)
+    first._model = _CountingModel()
+    first._loaded = True
+    first.warmup()
+    assert first.tuned is not None
+    assert first.imgsz == 320
+    assert len(first._model.calls) > 1
+
+    second = YoloStableAdapter(cfg)
+    second._model = _CountingModel()
+    second._loaded = True
+    second.warmup()
+    assert second.tuned == first.tuned
+    assert second._model.calls == [320]
+
+
+def test_tuned_batch_size_only_caps_predict_batch(tmp_path: Path) -> None:
+    def warmed(batch_sizes: list[int]) -> YoloStableAdapter:
+        cfg = ModelConfig(
+            device="cpu",
+            autotune=True,
+            autotune_threads=[1],
+            autotune_batch_sizes=batch_sizes,
+            autotune_input_sizes=[320],
+            autotune_iterations=1,
+            autotune_cache_path=str(tmp_path / f"autotune-{len(batch_sizes)}.json"),
+            max_batch_size=8,
+        )
+        adapter = YoloStableAdapter(cfg)
+        adapter._model = _CountingModel()
+        adapter._loaded = True
+        adapter.warmup()
+        return adapter
+
+    # A one-size grid measured nothing about batching; the configured maximum stands.
+    assert warmed([1]).batch_size == 8
+    explored = warmed([1, 2, 32])
+    assert explored.batch_size == min(8, explored.tuned.batch_size)
+
+
+def test_changing_the_search_grid_retunes_instead_of_reusing_the_cache(tmp_path: Path) -> None:
+    def warmed(input_sizes: list[int]) -> YoloStableAdapter:
+        cfg = ModelConfig(
+            device="cpu",
+            autotune=True,
+            autotune_threads=[1],
+            autotune_batch_sizes=[1],
+            autotune_input_sizes=input_sizes,
+            autotune_iterations=1,
+            autotune_cache_path=str(tmp_path / "autotune.json"),
+        )
+        adapter = YoloStableAdapter(cfg)
+        adapter._model = _CountingModel()
+        adapter._loaded = True
+        adapter.warmup()
+        return adapter
+
+    assert warmed([320]).imgsz == 320
+    retuned = warmed([416])
+    assert retuned.imgsz == 416
+    assert len(retuned._model.calls) > 1
+    assert grid_fingerprint(candidate_grid([1, 2], [1], [320])) == grid_fingerprint(candidate_grid([2, 1], [1], [320]))
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.inference.buffers import BufferPool
+from tests.factories import FakeDetector, build_detections, build_frame, build_pipeline
+
+
+class _ShapeRecordingDetector(FakeDetector):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.shapes: list[tuple[int, ...]] = []
+
+    def predict(self, frame, imgsz=None):
+        self.shapes.append(frame.shape)
+        return super().predict(frame, imgsz=imgsz)
+
+
+def test_released_buffers_are_reused_by_shape() -> None:
+    pool = BufferPool()
+    first = pool.acquire((4, 4, 3))
+    pool.release(first)
+
+    assert pool.acquire((4, 4, 3)) is first
+    assert pool.acquire((4, 4, 3)) is not first
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["leased_bytes"] == 2 * 48
+
+
+def test_release_ignores_foreign_arrays_and_respects_budget() -> None:
+    pool = BufferPool(max_bytes=64)
+    pool.release(np.zeros((4, 4, 3), dtype=np.uint8))
+    assert pool.stats()["idle_buffers"] == 0
+
+    a = pool.acquire((48,))
+    b = pool.acquire((48,))
+    pool.release(a)
+    pool.release(b)
+
+    stats = pool.stats()
+    assert stats["idle_buffers"] == 1
+    assert stats["discarded"] == 1
+    assert stats["resident_bytes"] == 48
+
+
+def test_pipeline_downscales_into_pool_and_maps_boxes_back() -> None:
+    detector = _ShapeRecordingDetector(detections=build_detections(bbox=(10, 20, 30, 40)))
+    pipeline = build_pipeline(detector=detector)
+    pipeline.buffer_pool = BufferPool()
+    session = pipeline.create_stream_session()
+
+    for index in range(3):
+        result = pipeline.infer_stream_frame(build_frame(height=720, width=1280), session, index)
+
+    assert detector.shapes[-1] == (360, 640, 3)
+    assert result.detections[0].bbox == pytest.approx((20.0, 40.0, 60.0, 80.0))
+    stats = pipeline.buffer_pool.stats()
+    assert stats["hits"] == 2
+    assert stats["leased_buffers"] == 0
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import importlib
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+data_yaml = importlib.import_module("mlops.training.data_yaml")
+
+
+def test_every_training_script_lists_the_same_images(tmp_path: Path) -> None:
+    for name in ["a.jpg", "b.PNG", "c.tif", "d.tiff", "e.webp", "notes.txt"]:
+        path = tmp_path / "images" / "val" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+    data = tmp_path / "data.yaml"
+    data.write_text("path: .\ntrain: images/val\nval: images/val\n", encoding="utf-8")
+
+    expected = data_yaml.list_images(tmp_path, "images/val")
+    audit = importlib.import_module("mlops.training.audit")
+    evaluate = importlib.import_module("mlops.training.eval")
+    quantize = importlib.import_module("mlops.training.quantize")
+    regression = importlib.import_module("mlops.training.regression")
+
+    assert [p.name for p in expected] == ["a.jpg", "b.PNG", "c.tif", "d.tiff", "e.webp"]
+    assert audit.list_images is data_yaml.list_images
+    assert evaluate.split_images(data, "val") == expected
+    assert quantize.split_images(data, "train") == expected
+    assert regression.load_split(data, "val")[0] == expected
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.api.framed import LENGTH_PREFIX, decode_result, encode_result, parse_message
+from app.inference.detections import UNTRACKED, DetectionBatch
+from app.inference.tracker import ByteTrackManager
+from tests.factories import FakeDetector, build_frame, build_pipeline
+
+
+def _batch(*boxes: tuple[float, float, float, float]) -> DetectionBatch:
+    return DetectionBatch.from_rows([(box, 1, 0.9) for box in boxes])
+
+
+def test_clipped_clamps_to_frame_and_orders_corners() -> None:
+    batch = _batch((-5, 10, 50, 300), (90, 80, 20, 10))
+    clipped = batch.clipped(width=64, height=48)
+
+    assert clipped.boxes.tolist() == [[0, 10, 50, 47], [20, 10, 63, 47]]
+    assert batch.boxes[0].tolist() == [-5, 10, 50, 300]
+
+
+def test_from_arrays_validates_lengths_and_clamps_confidence() -> None:
+    batch = DetectionBatch.from_arrays([[0, 0, 1, 1]], [2], [1.5])
+    assert batch.confidences.tolist() == [1.0]
+    assert batch.track_ids.tolist() == [UNTRACKED]
+    with pytest.raises(ValueError):
+        DetectionBatch.from_arrays([[0, 0, 1, 1]], [1, 2], [0.5])
+
+
+def test_tracker_keeps_ids_and_prefers_older_track_on_ties() -> None:
+    tracker = ByteTrackManager(iou_threshold=0.3, max_missing=1)
+
+    assert tracker.update(_batch((0, 0, 10, 10), (0, 0, 10, 10), (100, 100, 110, 110))).tolist() == [1, 2, 3]
+    # Tracks 1 and 2 overlap the first box equally; the older one wins and 2 is left for the next box.
+    assert tracker.update(_batch((1, 1, 10, 10), (101, 101, 111, 111), (0, 0, 9, 9))).tolist() == [1, 3, 2]
+    assert tracker.update(_batch((50, 50, 60, 60))).tolist() == [4]
+    assert tracker.update(_batch()).tolist() == []
+    # Tracks 1-3 have now been missing twice, beyond max_missing.
+    assert tracker.update(_batch((0, 0, 10, 10))).tolist() == [5]
+
+
+def test_tracker_resumes_from_seeded_tracks() -> None:
+    tracker = ByteTrackManager()
+    tracker.seed({7: (0.0, 0.0, 10.0, 10.0)}, next_id=5)
+    assert tracker.update(_batch((1, 1, 10, 10), (40, 40, 50, 50))).tolist() == [7, 8]
+
+
+def test_ripeness_codes_map_each_distinct_class_once() -> None:
+    calls: list[int] = []
+
+    class _Detector(FakeDetector):
+        def ripeness_from_class_id(self, class_id: int) -> str:
+            calls.append(class_id)
+            return ("green", "half", "red", "young")[class_id]
+
+    codes = _Detector().ripeness_codes(np.array([2, 0, 2, 3, 0], dtype=np.int32))
+
+    assert codes.tolist() == [2, 0, 2, 3, 0]
+    assert sorted(calls) == [0, 2, 3]
+
+
+def test_columnar_framed_encoding_matches_per_detection_encoding() -> None:
+    detections = DetectionBatch.from_rows([((5, 5, 40, 30), 1, 0.75), ((-4, 2, 20, 500), 1, 0.5)])
+    pipeline = build_pipeline(detector=FakeDetector(detections=detections, ripeness="red"))
+    session = pipeline.create_stream_session()
+    result = pipeline.infer_stream_frame(build_frame(height=64, width=64), session, timestamp_ms=10)
+
+    columnar = encode_result(3, result, (session.last_detections, session.last_ripeness))
+
+    assert columnar == encode_result(3, result)
+    decoded = decode_result(parse_message(columnar[LENGTH_PREFIX.size :]).body)
+    assert decoded.model_dump() == result.model_dump()
+    assert [det.track_id for det in decoded.detections] == [1, 2]
+    assert decoded.detections[1].bbox == (0.0, 2.0, 20.0, 63.0)
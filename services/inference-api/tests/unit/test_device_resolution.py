@@ -26,3 +26,11 @@ def test_resolve_torch_device_supports_auto(monkeypatch) -> None:
     resolved, warning = settings.resolve_torch_device("auto")
     assert resolved == "cuda:0"
     assert warning is None
+
+
+def test_resolve_torch_device_skips_cuda_probe_for_cpu(monkeypatch) -> None:
+    def _fail() -> tuple[bool, int]:
+        raise AssertionError("CUDA probe must not run for an explicit CPU device")
+
+    monkeypatch.setattr(settings, "_torch_cuda_runtime", _fail)
+    assert settings.resolve_torch_device("cpu") == ("cpu", None)
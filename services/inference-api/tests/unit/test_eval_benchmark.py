@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+eval_module = importlib.import_module("mlops.training.eval")
+
+NO_BUDGETS = {key: None for key in eval_module.BUDGET_KEYS}
+
+
+def _result(**overrides: object) -> dict:
+    result = {
+        "load_s": 1.2,
+        "first_inference_ms": 300.0,
+        "latency_ms": {"imgsz": 640, "p50": 20.0, "p90": 24.0, "p95": 26.0, "p99": 40.0, "mean": 21.0, "max": 45.0},
+        "throughput": [
+            {"imgsz": 640, "batch": 1, "images_per_s": 48.0, "batch_latency_ms": 20.8},
+            {"imgsz": 640, "batch": 8, "images_per_s": 90.0, "batch_latency_ms": 88.9},
+            {"imgsz": 640, "batch": 16, "error": "fixed batch"},
+            {"imgsz": 960, "batch": 8, "images_per_s": 120.0, "batch_latency_ms": 66.7},
+        ],
+        "peak_rss_mb": 850.0,
+    }
+    result.update(overrides)
+    return result
+
+
+def test_discover_formats_finds_exports_next_to_the_checkpoint(tmp_path: Path) -> None:
+    weights = tmp_path / "weights"
+    weights.mkdir()
+    for name in ("best.pt", "best.onnx", "best.int8.onnx", "last.pt"):
+        (weights / name).write_bytes(b"")
+    (weights / "best_openvino_model").mkdir()
+
+    formats = eval_module.discover_formats(weights / "best.pt")
+
+    assert formats == {
+        "pt": weights / "best.pt",
+        "onnx": weights / "best.onnx",
+        "onnx_int8": weights / "best.int8.onnx",
+        "openvino": weights / "best_openvino_model",
+    }
+    assert eval_module.discover_formats(weights / "best.int8.onnx")["onnx_int8"] == weights / "best.int8.onnx"
+
+
+def test_latency_summary_percentiles() -> None:
+    summary = eval_module.latency_summary([float(value) for value in range(1, 101)])
+    assert summary["p50"] == 50.5
+    assert summary["p99"] == pytest.approx(99.01)
+    assert summary["max"] == 100.0
+    assert eval_module.latency_summary([7.0])["p95"] == 7.0
+
+
+def test_check_budgets_reports_each_exceeded_limit() -> None:
+    assert eval_module.check_budgets(_result(), NO_BUDGETS, 640) == []
+
+    budgets = {**NO_BUDGETS, "max_p95_ms": 25.0, "max_load_s": 1.4, "max_rss_mb": 900.0, "min_fps": 100.0}
+    violations = eval_module.check_budgets(_result(), budgets, 640)
+
+    assert len(violations) == 3
+    assert violations[0].startswith("p95 latency 26.0 ms")
+    assert "load plus first inference 1.500 s" in violations[1]
+    # The 960 px row does not count towards the throughput budget at 640 px.
+    assert "best throughput 90.0 images/s" in violations[2]
+
+
+def test_check_budgets_fails_a_broken_benchmark_only_when_budgets_are_set() -> None:
+    broken = {"path": "best.engine", "error": "TensorRT is not installed"}
+    assert eval_module.check_budgets(broken, NO_BUDGETS, 640) == []
+    assert eval_module.check_budgets(broken, {**NO_BUDGETS, "max_p50_ms": 30.0}, 640) == [
+        "benchmark failed: TensorRT is not installed"
+    ]
+
+
+def test_int_list_rejects_non_positive_values() -> None:
+    assert eval_module.int_list("1, 4,8") == [1, 4, 8]
+    with pytest.raises(argparse.ArgumentTypeError):
+        eval_module.int_list("1,0")
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from app.inference.flow_control import FlowController, FlowSettings, FlowUpdate
+
+
+def test_congestion_halves_rate_immediately() -> None:
+    controller = FlowController(FlowSettings(target_latency_ms=100, max_fps=10))
+
+    update = controller.observe(latency_ms=400, queue_per_worker=0)
+
+    assert update == FlowUpdate(frame_interval_ms=200, jpeg_quality=0.8)
+
+
+def test_queue_pressure_counts_as_congestion() -> None:
+    controller = FlowController(FlowSettings(max_queue_per_worker=2, max_fps=10))
+    assert controller.observe(latency_ms=10, queue_per_worker=5) is not None
+    assert controller.fps == 5
+
+
+def test_recovery_is_additive_and_paced() -> None:
+    settings = FlowSettings(target_latency_ms=100, max_fps=10, additive_fps=1, min_frames_between_updates=3)
+    controller = FlowController(settings, initial_fps=4)
+
+    updates = [controller.observe(latency_ms=20, queue_per_worker=0) for _ in range(3)]
+
+    assert updates[:2] == [None, None]
+    assert updates[2] is not None
+    assert updates[2].frame_interval_ms == 143
+
+
+def test_rate_and_quality_stay_within_bounds() -> None:
+    settings = FlowSettings(min_fps=1, max_fps=4, min_quality=0.5, max_quality=0.7)
+    controller = FlowController(settings)
+    for _ in range(20):
+        controller.observe(latency_ms=10_000, queue_per_worker=100)
+    assert controller.current() == FlowUpdate(frame_interval_ms=1000, jpeg_quality=0.5)
+
+    for _ in range(20):
+        controller.observe(latency_ms=0, queue_per_worker=0)
+    assert controller.current() == FlowUpdate(frame_interval_ms=250, jpeg_quality=0.7)
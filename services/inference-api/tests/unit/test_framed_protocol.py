@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.api.framed import (
+    LENGTH_PREFIX,
+    FramingError,
+    MessageKind,
+    decode_result,
+    encode_frame,
+    encode_message,
+    encode_result,
+    parse_message,
+    read_message,
+)
+from app.schemas.common import Detection, FrameResult, FrameSummary
+
+
+def _result() -> FrameResult:
+    return FrameResult(
+        frame_index=4,
+        timestamp_ms=1234,
+        detections=[
+            Detection(bbox=(1.5, 2.0, 30.25, 40.0), ripeness="red", confidence=0.875, track_id=7),
+            Detection(bbox=(5.0, 6.0, 7.0, 8.0), ripeness="young", confidence=0.5),
+        ],
+        frame_summary=FrameSummary(total=2, red=1, young=1),
+        imgsz=480,
+    )
+
+
+def test_result_round_trips_through_binary_encoding() -> None:
+    message = parse_message(encode_result(9, _result())[LENGTH_PREFIX.size :])
+
+    assert message.kind == MessageKind.RESULT
+    assert message.sequence == 9
+    assert decode_result(message.body) == _result()
+
+
+def test_result_body_length_is_checked() -> None:
+    body = parse_message(encode_result(1, _result())[LENGTH_PREFIX.size :]).body
+    with pytest.raises(FramingError):
+        decode_result(body[:-1])
+
+
+def test_read_message_splits_a_byte_stream() -> None:
+    async def scenario() -> list:
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_frame(1, b"jpeg", timestamp_ms=50) + encode_message(MessageKind.CLOSE, 2))
+        reader.feed_eof()
+        return [await read_message(reader, 1024) for _ in range(3)]
+
+    frame, close, end = asyncio.run(scenario())
+    assert (frame.kind, frame.sequence, frame.body[8:]) == (MessageKind.FRAME, 1, b"jpeg")
+    assert (close.kind, close.sequence) == (MessageKind.CLOSE, 2)
+    assert end is None
+
+
+def test_read_message_rejects_oversized_and_unknown_messages() -> None:
+    async def read(data: bytes, limit: int = 1024) -> None:
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        await read_message(reader, limit)
+
+    with pytest.raises(FramingError, match="exceeds"):
+        asyncio.run(read(encode_frame(1, b"x" * 64), limit=16))
+    with pytest.raises(FramingError, match="Unknown message kind"):
+        asyncio.run(read(LENGTH_PREFIX.pack(8) + bytes([0x42, 1, 0, 0, 0, 0, 0, 0])))
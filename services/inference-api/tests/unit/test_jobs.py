@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+from app.inference.jobs import JOB_FILE, JobManager, JobStateError, read_manifest, scan_results
+from app.inference.scheduler import InferenceScheduler, QueueFull
+from tests.factories import FakeDetector, build_detections, build_pipeline, build_yolo_adapter
+
+
+class GatedDetector(FakeDetector):
+    """Blocks every detector call until the test opens the gate."""
+
+    def __init__(self) -> None:
+        super().__init__(detections=build_detections(bbox=(1, 1, 6, 6)), ripeness="red")
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+        self.batch_sizes: list[int] = []
+
+    def predict_batch(self, frames, imgsz=None):
+        self.entered.set()
+        self.gate.wait(timeout=5)
+        self.batch_sizes.append(len(frames))
+        return super().predict_batch(frames, imgsz=imgsz)
+
+
+def _write_images(folder, count: int) -> list[str]:
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(count):
+        path = folder / f"img_{index:03d}.png"
+        cv2.imwrite(str(path), np.full((8, 8, 3), index, dtype=np.uint8))
+        paths.append(path.name)
+    return paths
+
+
+def _wait(manager: JobManager, job_id: str, states: set[str], timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = manager.get(job_id)
+        if info["state"] in states:
+            return info
+        time.sleep(0.01)
+    raise AssertionError(f"job stuck in {manager.get(job_id)['state']}")
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = InferenceScheduler(workers=1)
+    yield scheduler
+    scheduler.close()
+
+
+@pytest.fixture
+def decoder():
+    return lambda: ThreadPoolExecutor(max_workers=2)
+
+
+def test_read_manifest_resolves_relative_paths_and_skips_comments(tmp_path) -> None:
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# plot 3\na.png\n\n/abs/b.png\n", encoding="utf-8")
+    assert read_manifest(manifest) == [str(tmp_path / "a.png"), "/abs/b.png"]
+
+
+def test_job_writes_one_line_per_image_and_a_summary(tmp_path, scheduler, decoder) -> None:
+    images = _write_images(tmp_path / "images", 5)
+    manifest = tmp_path / "images" / "manifest.txt"
+    manifest.write_text("\n".join([*images, "missing.png", "/etc/hostname"]) + "\n", encoding="utf-8")
+    detector = FakeDetector(detections=build_detections(bbox=(1, 1, 6, 6)), ripeness="red")
+    manager = JobManager(tmp_path / "jobs", scheduler, allowed_roots=[str(tmp_path)], batch_size=2, decoder_factory=decoder)
+
+    job = manager.submit(str(manifest), build_pipeline(detector=detector))
+    info = _wait(manager, job.job_id, {"completed", "failed"})
+
+    assert info["state"] == "completed", info["error"]
+    assert (info["total"], info["processed"], info["failed"]) == (7, 7, 2)
+    assert info["summary"].total_detected == 5
+    lines = [json.loads(line) for line in job.results_path.read_text(encoding="utf-8").splitlines()]
+    assert sorted(line["index"] for line in lines[:-1]) == list(range(7))
+    errors = {line["path"]: line["detail"] for line in lines if line["type"] == "error"}
+    assert "Cannot decode" in errors[str(tmp_path / "images" / "missing.png")]
+    assert "bulk_allowed_roots" in errors["/etc/hostname"]
+    assert lines[-1]["type"] == "summary"
+    assert lines[-1]["summary"]["ripeness_ratio"]["red"] == 1.0
+
+
+def test_job_batches_reach_the_yolo_adapter_as_single_model_calls(tmp_path, scheduler, decoder) -> None:
+    images = _write_images(tmp_path / "images", 7)
+    manifest = tmp_path / "images" / "manifest.txt"
+    manifest.write_text("\n".join(images) + "\n", encoding="utf-8")
+    adapter = build_yolo_adapter()
+    manager = JobManager(tmp_path / "jobs", scheduler, allowed_roots=[str(tmp_path)], batch_size=4, decoder_factory=decoder)
+
+    job = manager.submit(str(manifest), build_pipeline(detector=adapter))
+    info = _wait(manager, job.job_id, {"completed", "failed"})
+
+    assert info["state"] == "completed", info["error"]
+    assert adapter._model.batches == [4, 3]
+
+
+def test_cancelled_job_resumes_without_redoing_written_images(tmp_path, scheduler, decoder) -> None:
+    images = _write_images(tmp_path / "images", 6)
+    manifest = tmp_path / "images" / "manifest.txt"
+    manifest.write_text("\n".join(images) + "\n", encoding="utf-8")
+    detector = GatedDetector()
+    pipeline = build_pipeline(detector=detector)
+    manager = JobManager(tmp_path / "jobs", scheduler, allowed_roots=[str(tmp_path)], batch_size=2, decoder_factory=decoder)
+
+    job = manager.submit(str(manifest), pipeline)
+    with pytest.raises(JobStateError):
+        manager.resume(job.job_id, pipeline)
+    # Cancel only once a batch is on the detector, so some results are written.
+    assert detector.entered.wait(timeout=5)
+    threading.Timer(0.05, detector.gate.set).start()
+    manager.cancel(job.job_id)
+    assert manager.get(job.job_id)["state"] == "cancelled"
+    written = scan_results(job.results_path)
+    assert 0 < len(written.done) < 6
+    assert not written.completed
+
+    # A torn line from a crash mid-write is dropped on resume.
+    with job.results_path.open("ab") as sink:
+        sink.write(b'{"type": "image", "ind')
+    manager.resume(job.job_id, pipeline)
+    info = _wait(manager, job.job_id, {"completed", "failed"})
+
+    assert info["state"] == "completed", info["error"]
+    assert info["processed"] == 6
+    assert info["summary"].total_detected == 6
+    assert sum(detector.batch_sizes) == 6
+    lines = job.results_path.read_text(encoding="utf-8").splitlines()
+    assert sorted(json.loads(line)["index"] for line in lines[:-1]) == list(range(6))
+
+
+def test_manager_reloads_running_jobs_as_interrupted(tmp_path, scheduler, decoder) -> None:
+    images = _write_images(tmp_path / "images", 2)
+    manifest = tmp_path / "images" / "manifest.txt"
+    manifest.write_text("\n".join(images) + "\n", encoding="utf-8")
+    detector = GatedDetector()
+    manager = JobManager(tmp_path / "jobs", scheduler, allowed_roots=[str(tmp_path)], decoder_factory=decoder)
+    job = manager.submit(str(manifest), build_pipeline(detector=detector))
+
+    with pytest.raises(QueueFull):
+        manager.submit(str(manifest), build_pipeline(detector=detector))
+    reloaded = JobManager(tmp_path / "jobs", scheduler, allowed_roots=[str(tmp_path)], decoder_factory=decoder)
+    detector.gate.set()
+    manager.close()
+
+    assert reloaded.get(job.job_id)["state"] == "interrupted"
+    reloaded.resume(job.job_id, build_pipeline(detector=detector))
+    assert _wait(reloaded, job.job_id, {"completed", "failed"})["state"] == "completed"
+
+
+def test_resuming_after_the_summary_was_written_does_not_append_another(tmp_path, scheduler, decoder) -> None:
+    images = _write_images(tmp_path / "images", 3)
+    manifest = tmp_path / "images" / "manifest.txt"
+    manifest.write_text("\n".join(images) + "\n", encoding="utf-8")
+    pipeline = build_pipeline(detector=FakeDetector(detections=build_detections(bbox=(1, 1, 6, 6)), ripeness="red"))
+    manager = JobManager(tmp_path / "jobs", scheduler, allowed_roots=[str(tmp_path)], decoder_factory=decoder)
+    job = manager.submit(str(manifest), pipeline)
+    assert _wait(manager, job.job_id, {"completed", "failed"})["state"] == "completed"
+
+    # A crash after the summary line but before job.json recorded completion.
+    job_file = job.directory / JOB_FILE
+    job_file.write_text(json.dumps({**json.loads(job_file.read_text(encoding="utf-8")), "state": "running"}), encoding="utf-8")
+    reloaded = JobManager(tmp_path / "jobs", scheduler, allowed_roots=[str(tmp_path)], decoder_factory=decoder)
+    reloaded.resume(job.job_id, pipeline)
+    info = _wait(reloaded, job.job_id, {"completed", "failed"})
+
+    assert info["state"] == "completed", info["error"]
+    assert info["summary"].total_detected == 3
+    kinds = [json.loads(line)["type"] for line in job.results_path.read_text(encoding="utf-8").splitlines()]
+    assert kinds == ["image", "image", "image", "summary"]
+
+
+def test_close_leaves_a_running_job_interrupted(tmp_path, scheduler, decoder) -> None:
+    images = _write_images(tmp_path / "images", 4)
+    manifest = tmp_path / "images" / "manifest.txt"
+    manifest.write_text("\n".join(images) + "\n", encoding="utf-8")
+    detector = GatedDetector()
+    manager = JobManager(tmp_path / "jobs", scheduler, allowed_roots=[str(tmp_path)], batch_size=2, decoder_factory=decoder)
+    job = manager.submit(str(manifest), build_pipeline(detector=detector))
+    assert detector.entered.wait(timeout=5)
+
+    threading.Timer(0.05, detector.gate.set).start()
+    manager.close()
+
+    assert manager.get(job.job_id)["state"] == "interrupted"
+    assert json.loads((job.directory / JOB_FILE).read_text(encoding="utf-8"))["state"] == "interrupted"
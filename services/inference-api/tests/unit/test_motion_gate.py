@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from app.inference.motion import MotionGateSettings, change_score, frame_signature
+from tests.factories import FakeDetector, build_frame, build_pipeline
+
+
+class _CountingDetector(FakeDetector):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def predict(self, frame, imgsz=None):
+        self.calls += 1
+        return super().predict(frame, imgsz=imgsz)
+
+
+def test_change_score_is_zero_for_identical_frames() -> None:
+    frame = build_frame(fill_value=80)
+    assert change_score(frame_signature(frame), frame_signature(frame.copy())) == 0.0
+    assert change_score(frame_signature(frame), frame_signature(build_frame(fill_value=200))) > 0.4
+
+
+def test_static_frames_reuse_detections_up_to_max_skip() -> None:
+    detector = _CountingDetector()
+    pipeline = build_pipeline(detector=detector)
+    pipeline.motion_gate = MotionGateSettings(threshold=0.02, max_skip=2)
+    session = pipeline.create_stream_session()
+    frame = build_frame(fill_value=100)
+
+    results = [pipeline.infer_stream_frame(frame, session, timestamp_ms=i * 100) for i in range(4)]
+
+    assert detector.calls == 2
+    assert session.skipped_frames == 2
+    assert [r.frame_index for r in results] == [0, 1, 2, 3]
+    assert [r.timestamp_ms for r in results] == [0, 100, 200, 300]
+    assert {r.detections[0].track_id for r in results} == {1}
+    assert all(r.frame_summary.total == 1 for r in results)
+    assert session.aggregator.build_summary().total_detected == 1
+
+
+def test_changed_frame_runs_detector() -> None:
+    detector = _CountingDetector()
+    pipeline = build_pipeline(detector=detector)
+    pipeline.motion_gate = MotionGateSettings(threshold=0.02, max_skip=10)
+    session = pipeline.create_stream_session()
+
+    pipeline.infer_stream_frame(build_frame(fill_value=0), session, timestamp_ms=0)
+    pipeline.infer_stream_frame(build_frame(fill_value=255), session, timestamp_ms=100)
+
+    assert detector.calls == 2
+    assert session.skipped_frames == 0
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+
+import cv2
+import numpy as np
+
+from app.cli.offline import main
+from app.inference.adapters.yolo_stable import YoloStableAdapter
+from tests.factories import FakeDetector, StubYoloModel, build_detections, build_pipeline
+
+
+class _BatchCountingDetector(FakeDetector):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.batch_sizes: list[int] = []
+
+    def predict_batch(self, frames, imgsz=None):
+        self.batch_sizes.append(len(frames))
+        return super().predict_batch(frames, imgsz=imgsz)
+
+
+def _write_images(folder, count: int) -> None:
+    folder.mkdir()
+    for index in range(count):
+        cv2.imwrite(str(folder / f"{index:04d}.png"), np.full((16, 16, 3), index, dtype=np.uint8))
+
+
+def _read_lines(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_folder_run_writes_ndjson_with_stride_and_batches(tmp_path, capsys) -> None:
+    _write_images(tmp_path / "frames", 7)
+    detector = _BatchCountingDetector(detections=build_detections(bbox=(1, 1, 8, 8)))
+    output = tmp_path / "out.ndjson"
+
+    code = main(
+        [str(tmp_path / "frames"), "--output", str(output), "--stride", "2", "--batch-size", "3", "--quiet"],
+        pipeline_factory=lambda *_: build_pipeline(detector=detector),
+    )
+
+    assert code == 0
+    lines = _read_lines(output)
+    assert [line["source_index"] for line in lines[:-1]] == [0, 2, 4, 6]
+    assert detector.batch_sizes == [3, 1]
+    assert lines[-1]["type"] == "summary"
+    assert lines[-1]["frames"] == 4
+    assert lines[-1]["summary"]["total_detected"] == 1
+    assert json.loads(capsys.readouterr().out)["total_detected"] == 1
+
+
+def test_batch_size_reaches_the_yolo_adapter_as_model_batches(tmp_path, monkeypatch) -> None:
+    _write_images(tmp_path / "frames", 7)
+    config = tmp_path / "model.yaml"
+    config.write_text('device: "cpu"\nmax_batch_size: 2\n', encoding="utf-8")
+    models: list[StubYoloModel] = []
+
+    def build_detector(cfg):
+        adapter = YoloStableAdapter(cfg)
+        adapter._model = StubYoloModel()
+        adapter.load = lambda: setattr(adapter, "_loaded", True)
+        models.append(adapter._model)
+        return adapter
+
+    monkeypatch.setattr("app.inference.factory.build_detector", build_detector)
+    output = tmp_path / "out.ndjson"
+    code = main([str(tmp_path / "frames"), "--output", str(output), "--model-config", str(config), "--batch-size", "4", "--quiet"])
+
+    assert code == 0
+    # One model call per CLI batch, above the configured service cap; warmup adds one single-frame call.
+    assert models[0].batches == [1, 4, 3]
+
+
+def test_interrupted_run_resumes_with_same_result(tmp_path) -> None:
+    _write_images(tmp_path / "frames", 5)
+    detector = FakeDetector(detections=build_detections(bbox=(1, 1, 8, 8)))
+    args = [str(tmp_path / "frames"), "--batch-size", "2", "--quiet"]
+
+    full = tmp_path / "full.ndjson"
+    main([*args, "--output", str(full)], pipeline_factory=lambda *_: build_pipeline(detector=detector))
+
+    partial = tmp_path / "partial.ndjson"
+    kept = full.read_text(encoding="utf-8").splitlines(keepends=True)[:2]
+    partial.write_text("".join(kept) + '{"type": "fra', encoding="utf-8")
+    main([*args, "--output", str(partial)], pipeline_factory=lambda *_: build_pipeline(detector=detector))
+
+    assert _read_lines(partial) == _read_lines(full)
+
+
+def test_completed_output_is_left_alone(tmp_path) -> None:
+    _write_images(tmp_path / "frames", 2)
+    output = tmp_path / "out.ndjson"
+    args = [str(tmp_path / "frames"), "--output", str(output), "--quiet"]
+    main(args, pipeline_factory=lambda *_: build_pipeline())
+    before = output.read_bytes()
+
+    def fail(*_):
+        raise AssertionError("pipeline should not be built for a completed output")
+
+    assert main(args, pipeline_factory=fail) == 0
+    assert output.read_bytes() == before
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.inference.aggregator import SessionAggregator
+from app.inference.detections import encode_ripeness
+from app.inference.profiling import Profiler, ProfilerBusy, census, collapse_stacks
+from app.inference.scheduler import InferenceScheduler, WorkClass
+
+
+def _busy_work(n: int = 500_000) -> int:
+    return sum(i * i for i in range(n))
+
+
+def test_sampling_profile_sees_worker_threads() -> None:
+    scheduler = InferenceScheduler(workers=1)
+    stop = threading.Event()
+
+    def feed() -> None:
+        while not stop.is_set():
+            scheduler.submit(_busy_work, work_class=WorkClass.BULK, session_key="bulk").result(timeout=5)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        profile = asyncio.run(Profiler(sample_interval_s=0.002).cpu(0.3))
+    finally:
+        stop.set()
+        feeder.join(timeout=5)
+        scheduler.close()
+
+    assert profile.format == "collapsed"
+    assert profile.events > 0
+    assert "inference-worker-0" in profile.threads
+    lines = profile.output.splitlines()
+    assert any(line.startswith("inference-worker-0;") and "_busy_work" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert not any(line.startswith("cpu-profiler;") for line in lines)
+
+
+def test_deterministic_profile_merges_scheduler_work_items() -> None:
+    scheduler = InferenceScheduler(workers=1)
+    profiler = Profiler()
+
+    async def run() -> str:
+        task = asyncio.create_task(profiler.cpu(0.3, mode="deterministic", scheduler=scheduler))
+        await asyncio.sleep(0.05)
+        await scheduler.run(_busy_work, work_class=WorkClass.IMAGE, session_key="img")
+        return await task
+
+    try:
+        profile = asyncio.run(run())
+    finally:
+        scheduler.close()
+
+    assert profile.format == "pstats"
+    assert "_busy_work" in profile.output
+    assert scheduler.instrument is None
+
+
+def test_only_one_profile_runs_at_a_time() -> None:
+    profiler = Profiler()
+
+    async def run() -> None:
+        first = asyncio.create_task(profiler.cpu(0.2))
+        await asyncio.sleep(0.02)
+        assert profiler.busy
+        with pytest.raises(ProfilerBusy):
+            await profiler.memory(0.1)
+        await first
+
+    asyncio.run(run())
+    assert not profiler.busy
+
+
+def test_requested_window_is_capped() -> None:
+    profile = asyncio.run(Profiler(max_seconds=0.05).cpu(60))
+    assert profile.seconds == 0.05
+
+
+def test_memory_profile_reports_session_growth() -> None:
+    sessions: list[SessionAggregator] = []
+
+    async def grow() -> None:
+        await asyncio.sleep(0.05)
+        for index in range(50):
+            aggregator = SessionAggregator()
+            aggregator.update_session(encode_ripeness(["red"] * 40), np.arange(index * 40, index * 40 + 40))
+            sessions.append(aggregator)
+
+    async def run():
+        profiler = Profiler(watched_types=lambda: (SessionAggregator,))
+        growing = asyncio.create_task(grow())
+        profile = await profiler.memory(0.2, top=10)
+        await growing
+        return profile
+
+    profile = asyncio.run(run())
+
+    (structure,) = profile.structures
+    assert structure.type == "SessionAggregator"
+    assert structure.instances_after - structure.instances_before == 50
+    assert structure.entries_after - structure.entries_before >= 50 * 40
+    assert structure.approx_bytes_after > structure.approx_bytes_before
+    assert 0 < len(profile.growth) <= 10
+    assert all(entry.size_diff_bytes > 0 for entry in profile.growth)
+    assert any("test_profiling.py" in line for entry in profile.growth for line in entry.traceback)
+
+
+def test_collapse_stacks_orders_outermost_first() -> None:
+    def inner():
+        import sys
+
+        return sys._getframe()
+
+    frame = inner()
+    stacks = collapse_stacks({1: frame}, {1: "main"})
+    (key,) = stacks
+    assert key.startswith("main;")
+    assert key.endswith(f"inner (unit/test_profiling.py:{inner.__code__.co_firstlineno})")
+    assert census((SessionAggregator,))["SessionAggregator"][0] >= 0
+
+
+def test_memory_snapshots_do_not_block_the_event_loop(monkeypatch) -> None:
+    def slow_census(types):
+        time.sleep(0.1)
+        return census(types)
+
+    monkeypatch.setattr("app.inference.profiling.census", slow_census)
+
+    async def run() -> int:
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker = asyncio.create_task(tick())
+        await Profiler(watched_types=lambda: (SessionAggregator,)).memory(0.01)
+        ticker.cancel()
+        return ticks
+
+    # Two 100 ms censuses: a loop blocked by them would tick only a few times.
+    assert asyncio.run(run()) >= 20
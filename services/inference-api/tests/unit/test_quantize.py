@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import importlib
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+quantize = importlib.import_module("mlops.training.quantize")
+
+
+def _write_image(path: Path, height: int = 48, width: int = 64) -> None:
+    import cv2
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(path), np.full((height, width, 3), 90, dtype=np.uint8))
+
+
+def test_split_images_reads_directories_and_list_files(tmp_path: Path) -> None:
+    _write_image(tmp_path / "images" / "train" / "a.jpg")
+    _write_image(tmp_path / "images" / "train" / "nested" / "b.png")
+    (tmp_path / "images" / "train" / "notes.txt").write_text("not an image", encoding="utf-8")
+    _write_image(tmp_path / "extra" / "c.jpg")
+    (tmp_path / "extra.txt").write_text("extra/c.jpg\n\n", encoding="utf-8")
+    data = tmp_path / "data.yaml"
+    data.write_text("path: .\ntrain: [images/train, extra.txt]\nval: images/val\n", encoding="utf-8")
+
+    images = quantize.split_images(data, "train")
+
+    assert sorted(p.name for p in images) == ["a.jpg", "b.png", "c.jpg"]
+
+
+def test_calibration_sample_is_seeded_and_feed_preprocesses(tmp_path: Path) -> None:
+    paths = [tmp_path / f"{i}.jpg" for i in range(10)]
+    for path in paths:
+        _write_image(path)
+
+    sample = quantize.sample_calibration(paths, 4, seed=3)
+    assert sample == quantize.sample_calibration(paths, 4, seed=3)
+    assert len(sample) == 4
+
+    feed = quantize.CalibrationFeed(sample[:2] + [tmp_path / "missing.jpg"], "images", 32)
+    batches = [feed.get_next(), feed.get_next(), feed.get_next()]
+    assert batches[2] is None
+    tensor = batches[0]["images"]
+    assert tensor.shape == (1, 3, 32, 32) and tensor.dtype == np.float32
+    assert abs(float(tensor[0, 0, 0, 0]) - 114 / 255) < 1e-6
+    feed.rewind()
+    assert feed.get_next() is not None
+
+
+def test_report_gates_on_map_drop() -> None:
+    fp32 = {"mAP50": 0.80, "mAP50_95": 0.55, "latency_ms": 40.0}
+
+    passed = quantize.build_report(fp32, {"mAP50": 0.795, "mAP50_95": 0.545, "latency_ms": 16.0}, max_map_drop=0.01)
+    assert passed["passed"] and passed["cpu_speedup"] == 2.5
+
+    failed = quantize.build_report(fp32, {"mAP50": 0.79, "mAP50_95": 0.52, "latency_ms": 16.0}, max_map_drop=0.01)
+    assert not failed["passed"]
+    assert failed["map_drop"]["mAP50_95"] == 0.03
+
+
+def test_default_report_path_uses_run_name() -> None:
+    path = quantize.default_report_path(REPO_ROOT / "mlops/artifacts/models/lychee_v1/weights/best.pt")
+    assert path == REPO_ROOT / "mlops/artifacts/metrics/lychee_v1-int8_report.json"
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.inference.frames import (
+    RAW_FRAME_HEADER,
+    RAW_FRAME_MAGIC,
+    RAW_FRAME_VERSION,
+    PixelFormat,
+    encode_raw_frame,
+    is_raw_frame,
+    parse_raw_frame,
+    to_adapter_frame,
+)
+
+
+def _pixels(height: int = 4, width: int = 6, channels: int = 3) -> np.ndarray:
+    return np.arange(height * width * channels, dtype=np.uint8).reshape(height, width, channels)
+
+
+def test_bgr_frame_is_wrapped_without_copy() -> None:
+    pixels = _pixels()
+    payload = encode_raw_frame(pixels, PixelFormat.BGR)
+
+    view, fmt = parse_raw_frame(payload)
+    frame = to_adapter_frame(view, fmt)
+
+    assert is_raw_frame(payload)
+    assert fmt == PixelFormat.BGR
+    assert not frame.flags.owndata
+    assert np.array_equal(frame, pixels)
+
+
+def test_rgb_and_rgba_are_flipped_as_views() -> None:
+    rgb = _pixels()
+    frame = to_adapter_frame(*parse_raw_frame(encode_raw_frame(rgb, PixelFormat.RGB)))
+    assert not frame.flags.owndata
+    assert np.array_equal(frame, rgb[:, :, ::-1])
+
+    rgba = _pixels(channels=4)
+    frame = to_adapter_frame(*parse_raw_frame(encode_raw_frame(rgba, PixelFormat.RGBA)))
+    assert frame.shape == (4, 6, 3)
+    assert np.array_equal(frame, rgba[:, :, [2, 1, 0]])
+
+
+def test_padded_stride_is_honoured() -> None:
+    pixels = _pixels(height=2, width=2)
+    stride = 8
+    rows = np.zeros((2, stride), dtype=np.uint8)
+    rows[:, :6] = pixels.reshape(2, 6)
+    payload = RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, RAW_FRAME_VERSION, PixelFormat.BGR, 0, 2, 2, stride) + rows.tobytes()
+
+    view, _ = parse_raw_frame(payload)
+    assert np.array_equal(view, pixels)
+
+
+def test_gray_and_nv12_are_converted_to_bgr() -> None:
+    gray = np.full((4, 6), 128, dtype=np.uint8)
+    frame = to_adapter_frame(*parse_raw_frame(encode_raw_frame(gray, PixelFormat.GRAY)))
+    assert frame.shape == (4, 6, 3)
+
+    nv12 = np.full((6, 6), 128, dtype=np.uint8)
+    frame = to_adapter_frame(*parse_raw_frame(encode_raw_frame(nv12, PixelFormat.NV12)))
+    assert frame.shape == (4, 6, 3)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"LRAW",
+        RAW_FRAME_HEADER.pack(b"XRAW", RAW_FRAME_VERSION, PixelFormat.BGR, 0, 2, 2, 6) + bytes(12),
+        RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, 9, PixelFormat.BGR, 0, 2, 2, 6) + bytes(12),
+        RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, RAW_FRAME_VERSION, 42, 0, 2, 2, 6) + bytes(12),
+        RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, RAW_FRAME_VERSION, PixelFormat.BGR, 0, 2, 2, 4) + bytes(8),
+        RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, RAW_FRAME_VERSION, PixelFormat.BGR, 0, 2, 2, 6) + bytes(11),
+        RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, RAW_FRAME_VERSION, PixelFormat.BGR, 0, 0, 2, 6),
+        RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, RAW_FRAME_VERSION, PixelFormat.NV12, 0, 3, 2, 3) + bytes(9),
+    ],
+)
+def test_malformed_frames_are_rejected(payload: bytes) -> None:
+    with pytest.raises(ValueError):
+        parse_raw_frame(payload)
+
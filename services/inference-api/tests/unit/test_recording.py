@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+from app.inference.frames import PixelFormat, encode_raw_frame
+from app.inference.recording import (
+    INDEX_SUFFIX,
+    RecordingSettings,
+    SessionRecorder,
+    SessionRecording,
+    replay_recording,
+)
+from tests.factories import build_frame, build_pipeline
+
+
+def _record_session(tmp_path, frames: int = 4, frame_every: int = 1) -> str:
+    recorder = SessionRecorder(RecordingSettings(directory=tmp_path, frame_every=frame_every))
+    pipeline = build_pipeline()
+    session = pipeline.create_stream_session()
+    handle = recorder.open_session()
+    for index in range(frames):
+        pixels = np.full((8, 8, 3), index, dtype=np.uint8)
+        result = pipeline.infer_stream_frame(pixels, session, index * 100)
+        assert recorder.record_frame(handle, encode_raw_frame(pixels, PixelFormat.BGR), result)
+    recorder.close_session(handle, session.aggregator.build_summary())
+    recorder.close()
+    assert recorder.stats()["sessions_closed"] == 1
+    return handle.session_id
+
+
+def test_recorded_session_reads_back_through_mmap(tmp_path) -> None:
+    session_id = _record_session(tmp_path, frames=4, frame_every=2)
+
+    with SessionRecording(tmp_path / session_id) as recording:
+        frames = list(recording.frames())
+        assert [f.frame_index for f in frames] == [0, 1, 2, 3]
+        assert [f.payload is not None for f in frames] == [True, False, True, False]
+        assert frames[2].result.timestamp_ms == 200
+        assert recording.summary().total_detected == 1
+
+
+def test_index_is_rebuilt_when_missing(tmp_path) -> None:
+    session_id = _record_session(tmp_path, frames=3)
+    (tmp_path / session_id).with_suffix(INDEX_SUFFIX).unlink()
+
+    with SessionRecording(tmp_path / session_id) as recording:
+        assert len(recording.index) == 7
+        assert recording.summary() is not None
+
+
+def test_replay_runs_kept_frames_through_pipeline(tmp_path) -> None:
+    session_id = _record_session(tmp_path, frames=3)
+
+    with SessionRecording(tmp_path / session_id) as recording:
+        replayed = [result for _, result in replay_recording(recording, build_pipeline())]
+
+    assert [r.frame_index for r in replayed] == [0, 1, 2]
+    assert replayed[0].frame_summary.total == 1
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path) -> None:
+    recorder = SessionRecorder(RecordingSettings(directory=tmp_path, queue_max=1))
+    release = threading.Event()
+    original_write = recorder._write
+
+    def slow_write(item) -> None:
+        release.wait(timeout=5)
+        original_write(item)
+
+    recorder._write = slow_write
+    pipeline = build_pipeline()
+    session = pipeline.create_stream_session()
+    handle = recorder.open_session()
+    payload = encode_raw_frame(build_frame(height=4, width=4), PixelFormat.BGR)
+
+    accepted = [
+        recorder.record_frame(handle, payload, pipeline.infer_stream_frame(build_frame(), session, i)) for i in range(5)
+    ]
+    release.set()
+    recorder.close_session(handle, session.aggregator.build_summary())
+    recorder.close()
+
+    assert not all(accepted)
+    assert recorder.stats()["dropped"] == accepted.count(False)
+    assert recorder.stats()["sessions_closed"] == 1
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import importlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+regression = importlib.import_module("mlops.training.regression")
+
+SETTINGS = {"imgsz": 640, "candidate_conf": 0.001, "max_candidates": 1000}
+
+
+def _golden(root: Path) -> tuple[Path, dict[str, Path]]:
+    labels = {
+        "a.jpg": "0 0.25 0.25 0.2 0.2\n2 0.75 0.75 0.2 0.2\n",
+        "b.jpg": "1 0.5 0.5 0.4 0.4\n",
+        "c.jpg": "",
+    }
+    images = {}
+    for index, (name, label) in enumerate(labels.items()):
+        image = root / "images" / "golden" / name
+        image.parent.mkdir(parents=True, exist_ok=True)
+        image.write_bytes(f"image-{index}".encode())
+        label_path = root / "labels" / "golden" / name.replace(".jpg", ".txt")
+        label_path.parent.mkdir(parents=True, exist_ok=True)
+        label_path.write_text(label, encoding="utf-8")
+        images[name] = image
+    data = root / "data.yaml"
+    data.write_text("path: .\ngolden_test_set: images/golden\nnames: [green, half, red, young]\n", encoding="utf-8")
+    return data, images
+
+
+def _seed(cache_root: Path, model: Path, images: dict[str, Path], candidates: dict[str, list[list[float]]]) -> None:
+    cache = regression.PredictionCache(cache_root, regression.file_hash(model), SETTINGS)
+    for name, path in images.items():
+        rows = np.array(candidates.get(name, []), dtype=np.float32).reshape(-1, 6)
+        cache.put(regression.file_hash(path), rows, (100, 200))
+
+
+def test_postprocess_applies_threshold_and_classwise_nms() -> None:
+    candidates = np.array(
+        [
+            [10, 10, 50, 50, 0.9, 0],
+            [12, 12, 52, 52, 0.8, 0],
+            [12, 12, 52, 52, 0.7, 1],
+            [100, 100, 140, 140, 0.1, 2],
+        ],
+        dtype=np.float32,
+    )
+    kept = regression.postprocess(candidates, conf=0.25, nms_iou=0.45, max_det=300)
+    assert kept[:, 4].tolist() == pytest.approx([0.9, 0.7])
+    assert len(regression.postprocess(candidates, conf=0.05, nms_iou=0.95, max_det=300)) == 4
+    assert len(regression.postprocess(candidates, conf=0.05, nms_iou=0.95, max_det=2)) == 2
+
+
+def test_metrics_per_class_and_confusion() -> None:
+    labels = np.array([[0, 0, 10, 10, 0], [20, 20, 30, 30, 2], [40, 40, 50, 50, 3]], dtype=np.float32)
+    predictions = np.array(
+        [[0, 0, 10, 10, 0.9, 0], [20, 20, 30, 30, 0.8, 1], [60, 60, 70, 70, 0.7, 2]], dtype=np.float32
+    )
+    score = regression.score_image(predictions, labels, match_iou=0.5)
+    assert score["errors"] == 3 and score["tp"] == 1
+
+    metrics = regression.build_metrics({"x": score}, ["green", "half", "red", "young"])
+    assert metrics["per_class"]["green"] == {"precision": 1.0, "recall": 1.0, "tp": 1, "fp": 0, "fn": 0, "support": 1}
+    assert metrics["per_class"]["red"]["recall"] == 0.0 and metrics["per_class"]["red"]["fp"] == 1
+    matrix = metrics["confusion_matrix"]["matrix"]
+    assert matrix[1][2] == 1  # labelled red, predicted half
+    assert matrix[4][3] == 1  # young missed
+    assert matrix[2][4] == 1  # spurious red
+    assert metrics["precision"] == round(1 / 3, 4)
+
+
+def test_cached_predictions_need_no_forward_passes_and_diff_the_previous_model(tmp_path: Path) -> None:
+    data, images = _golden(tmp_path / "lichi")
+    cache_root = tmp_path / "regression"
+    old_model = tmp_path / "v1.pt"
+    new_model = tmp_path / "v2.pt"
+    old_model.write_bytes(b"weights-v1")
+    new_model.write_bytes(b"weights-v2")
+    good_a = [[40, 15, 60, 35, 0.9, 0], [140, 65, 160, 85, 0.8, 2]]
+    _seed(cache_root, old_model, images, {"a.jpg": good_a, "b.jpg": [[60, 30, 140, 70, 0.6, 1]]})
+    # v2 confuses the red fruit on a.jpg for half but drops the low-confidence false alarm on c.jpg.
+    _seed(
+        cache_root,
+        new_model,
+        images,
+        {"a.jpg": [good_a[0], [140, 65, 160, 85, 0.8, 1]], "b.jpg": [[60, 30, 140, 70, 0.7, 1]]},
+    )
+
+    def run(model: Path, *extra: str) -> dict:
+        out = tmp_path / f"{model.stem}.json"
+        argv = ["--model", str(model), "--data", str(data), "--cache-dir", str(cache_root), "--output", str(out), *extra]
+        assert regression.main(argv) == (1 if "--max-regressed" in extra else 0)
+        return json.loads(out.read_text(encoding="utf-8"))
+
+    first = run(old_model)
+    assert first["forward_passes"] == 0 and "diff" not in first
+    assert first["precision"] == 1.0 and first["recall"] == 1.0
+
+    second = run(new_model, "--max-regressed", "0")
+    assert second["forward_passes"] == 0
+    assert second["baseline"]["model"] == str(old_model)
+    assert second["per_class"]["red"]["recall"] == 0.0
+    assert [entry["image"] for entry in second["diff"]["regressed"]] == [str(images["a.jpg"])]
+    assert second["diff"]["improved"] == []
+
+    # A stricter threshold re-scores cached candidates: b.jpg's 0.6 detection now disappears for v1.
+    stricter = run(new_model, "--conf", "0.65")
+    assert stricter["forward_passes"] == 0
+    assert stricter["baseline"]["recall"] == round(2 / 3, 4)
+    assert [entry["image"] for entry in stricter["diff"]["improved"]] == [str(images["b.jpg"])]
+
+
+def test_byte_identical_golden_images_are_each_scored(tmp_path: Path) -> None:
+    data, images = _golden(tmp_path / "lichi")
+    duplicate = images["b.jpg"].with_name("b_copy.jpg")
+    duplicate.write_bytes(images["b.jpg"].read_bytes())
+    (tmp_path / "lichi" / "labels" / "golden" / "b_copy.txt").write_text("1 0.5 0.5 0.4 0.4\n", encoding="utf-8")
+    cache_root = tmp_path / "regression"
+    model = tmp_path / "v1.pt"
+    model.write_bytes(b"weights-v1")
+    _seed(cache_root, model, images, {"b.jpg": [[60, 30, 140, 70, 0.6, 1]]})
+    out = tmp_path / "report.json"
+
+    argv = ["--model", str(model), "--data", str(data), "--cache-dir", str(cache_root), "--output", str(out)]
+    assert regression.main(argv) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))
+
+    assert report["images"] == 4
+    assert report["forward_passes"] == 0
+    assert report["per_class"]["half"]["tp"] == 2
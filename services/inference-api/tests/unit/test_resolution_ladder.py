@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from app.inference.resolution import LadderSettings, LadderState, step_ladder
+from tests.factories import FakeDetector, build_frame, build_pipeline
+
+
+class _SizeRecordingDetector(FakeDetector):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.sizes: list[int | None] = []
+
+    def predict(self, frame, imgsz=None):
+        self.sizes.append(imgsz)
+        return super().predict(frame, imgsz=imgsz)
+
+
+def _settings() -> LadderSettings:
+    return LadderSettings(
+        sizes=(320, 640, 416, 512),
+        step_down_wait_ms=100,
+        step_up_wait_ms=20,
+        down_hold_frames=2,
+        up_hold_frames=4,
+        smoothing=1.0,
+    )
+
+
+def test_ladder_sizes_are_sorted_and_capped() -> None:
+    settings = _settings()
+    assert settings.sizes == (640, 512, 416, 320)
+    assert settings.sizes_for(512) == (512, 416, 320)
+    assert settings.sizes_for(160) == (320,)
+
+
+def test_step_ladder_steps_down_under_load_and_back_up_slowly() -> None:
+    settings = _settings()
+    state = LadderState()
+
+    levels = [step_ladder(settings, state, 500.0, rungs=4) for _ in range(8)]
+    assert levels == [0, 1, 1, 2, 2, 3, 3, 3]
+
+    levels = [step_ladder(settings, state, 5.0, rungs=4) for _ in range(4)]
+    assert levels == [3, 3, 3, 2]
+
+
+def test_step_ladder_holds_between_thresholds() -> None:
+    settings = _settings()
+    state = LadderState(level=1)
+    for _ in range(10):
+        assert step_ladder(settings, state, 60.0, rungs=4) == 1
+
+
+def test_pipeline_reports_resolution_used_per_frame() -> None:
+    detector = _SizeRecordingDetector()
+    pipeline = build_pipeline(detector=detector)
+    pipeline.ladder = _settings()
+    session = pipeline.create_stream_session()
+
+    first = pipeline.infer_stream_frame(build_frame(), session, 0, queue_wait_ms=0.0)
+    results = [pipeline.infer_stream_frame(build_frame(), session, i, queue_wait_ms=500.0) for i in range(1, 4)]
+
+    assert first.imgsz == 640
+    assert [r.imgsz for r in results] == [640, 512, 512]
+    assert detector.sizes == [640, 640, 512, 512]
+
+
+def test_pipeline_without_ladder_reports_detector_size() -> None:
+    pipeline = build_pipeline()
+    result, _ = pipeline.infer_image(build_frame())
+    assert result.imgsz == pipeline.detector.imgsz
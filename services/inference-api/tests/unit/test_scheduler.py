@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.inference.scheduler import DeadlineExceeded, InferenceScheduler, WorkClass
+
+
+class _Gate:
+    """Occupies the single worker until released so later submissions queue up."""
+
+    def __init__(self, scheduler: InferenceScheduler, work_class: WorkClass) -> None:
+        self._started = threading.Event()
+        self._release = threading.Event()
+        self.future = scheduler.submit(self._block, work_class=work_class, session_key="gate")
+        assert self._started.wait(timeout=5)
+
+    def _block(self) -> None:
+        self._started.set()
+        self._release.wait(timeout=5)
+
+    def open(self) -> None:
+        self._release.set()
+        self.future.result(timeout=5)
+
+
+def test_sessions_are_served_round_robin() -> None:
+    scheduler = InferenceScheduler(workers=1)
+    order: list[str] = []
+    try:
+        gate = _Gate(scheduler, WorkClass.BULK)
+        futures = [
+            scheduler.submit(lambda s=s: order.append(s), work_class=WorkClass.STREAM, session_key=s)
+            for s in ["a", "a", "a", "b"]
+        ]
+        gate.open()
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        scheduler.close()
+
+    assert order[:2] == ["a", "b"]
+
+
+def test_expired_items_are_dropped_before_running() -> None:
+    scheduler = InferenceScheduler(workers=1)
+    ran: list[int] = []
+    try:
+        gate = _Gate(scheduler, WorkClass.IMAGE)
+        late = scheduler.submit(lambda: ran.append(1), work_class=WorkClass.STREAM, session_key="s", deadline_s=0.01)
+        time.sleep(0.05)
+        gate.open()
+        with pytest.raises(DeadlineExceeded):
+            late.result(timeout=5)
+        stats = scheduler.stats()
+    finally:
+        scheduler.close()
+
+    assert ran == []
+    assert stats["classes"]["stream"]["dropped_deadline"] == 1
+    assert stats["classes"]["image"]["completed"] == 1
+    assert stats["classes"]["stream"]["wait_ms_p95"] >= 10.0
+
+
+def test_weighted_fair_share_between_classes() -> None:
+    scheduler = InferenceScheduler(workers=1, weights={WorkClass.STREAM: 3.0, WorkClass.BULK: 1.0})
+    order: list[WorkClass] = []
+    try:
+        gate = _Gate(scheduler, WorkClass.IMAGE)
+        futures = []
+        for i in range(4):
+            futures.append(scheduler.submit(lambda: order.append(WorkClass.BULK), work_class=WorkClass.BULK, session_key=f"b{i}"))
+            futures.append(scheduler.submit(lambda: order.append(WorkClass.STREAM), work_class=WorkClass.STREAM, session_key=f"s{i}"))
+        gate.open()
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        scheduler.close()
+
+    assert order[:4].count(WorkClass.STREAM) == 3
+    assert WorkClass.BULK in order[:4]
+
+
+def test_item_cost_scales_its_share_of_the_class_clock() -> None:
+    scheduler = InferenceScheduler(workers=1, weights={WorkClass.STREAM: 4.0, WorkClass.BULK: 1.0}, max_queued=256)
+    order: list[WorkClass] = []
+    try:
+        gate = _Gate(scheduler, WorkClass.IMAGE)
+        futures = [
+            scheduler.submit(lambda: order.append(WorkClass.BULK), work_class=WorkClass.BULK, session_key=f"b{i}", cost=8)
+            for i in range(3)
+        ]
+        futures += [
+            scheduler.submit(lambda: order.append(WorkClass.STREAM), work_class=WorkClass.STREAM, session_key=f"s{i}")
+            for i in range(64)
+        ]
+        gate.open()
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        scheduler.close()
+
+    # An 8-image batch weighs 8 frames: at 4:1 that is 32 stream frames per batch.
+    assert order[:33].count(WorkClass.BULK) == 1
+    assert order[33:66].count(WorkClass.BULK) == 1
+
+
+def test_wait_idle_returns_once_queued_and_running_work_is_done() -> None:
+    scheduler = InferenceScheduler(workers=1)
+    try:
+        assert scheduler.wait_idle(timeout=0.01)
+        gate = _Gate(scheduler, WorkClass.STREAM)
+        queued = scheduler.submit(lambda: None, work_class=WorkClass.BULK, session_key="b")
+        assert scheduler.in_flight() == 2
+        assert not scheduler.wait_idle(timeout=0.02)
+        threading.Timer(0.02, gate.open).start()
+        assert scheduler.wait_idle(timeout=5)
+        assert queued.done()
+    finally:
+        scheduler.close()
+    assert not scheduler.wait_idle(timeout=0.01)
+
+
+def test_cancelled_callers_do_not_kill_the_worker_or_fail_submit() -> None:
+    scheduler = InferenceScheduler(workers=1, max_pending_per_session=1)
+
+    async def abandon_expiring_run() -> None:
+        task = asyncio.create_task(
+            scheduler.run(lambda: None, work_class=WorkClass.STREAM, session_key="s", deadline_s=0.01)
+        )
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    try:
+        gate = _Gate(scheduler, WorkClass.IMAGE)
+        asyncio.run(abandon_expiring_run())
+        superseded = scheduler.submit(lambda: None, work_class=WorkClass.BULK, session_key="b")
+        assert superseded.cancel()
+        replacement = scheduler.submit(lambda: "bulk", work_class=WorkClass.BULK, session_key="b")
+        gate.open()
+        assert replacement.result(timeout=5) == "bulk"
+        assert scheduler.submit(lambda: "later", work_class=WorkClass.STREAM, session_key="s").result(timeout=5) == "later"
+    finally:
+        scheduler.close()
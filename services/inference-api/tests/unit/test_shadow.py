@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from app.inference.detections import DetectionBatch, encode_ripeness
+from app.inference.shadow import ShadowEvaluator, ShadowSettings, match_detections
+from app.inference.tiling import TileSettings
+from app.schemas.api import StreamSettings
+from tests.factories import FakeDetector, build_detections, build_frame, build_pipeline
+
+
+class BlockingDetector(FakeDetector):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.gate = threading.Event()
+        self.calls = 0
+
+    def predict(self, frame, imgsz=None):
+        self.gate.wait(timeout=5)
+        self.calls += 1
+        return super().predict(frame, imgsz=imgsz)
+
+
+def _wait_compared(shadow: ShadowEvaluator, frames: int) -> dict:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        stats = shadow.stats()
+        if stats["frames_compared"] + stats["failed"] >= frames:
+            return stats
+        time.sleep(0.005)
+    raise AssertionError(f"shadow compared {shadow.stats()['frames_compared']} of {frames} frames")
+
+
+def test_match_detections_pairs_most_confident_first() -> None:
+    primary = DetectionBatch.from_rows([((0, 0, 10, 10), 0, 0.5), ((1, 0, 11, 10), 0, 0.9), ((50, 50, 60, 60), 0, 0.8)])
+    shadow = DetectionBatch.from_rows([((1, 0, 11, 10), 0, 0.7), ((100, 100, 110, 110), 0, 0.6)])
+
+    rows, cols, ious = match_detections(primary, shadow, iou_threshold=0.5)
+
+    assert rows.tolist() == [1]
+    assert cols.tolist() == [0]
+    assert ious.tolist() == [1.0]
+    empty = match_detections(primary, DetectionBatch.empty(), iou_threshold=0.5)
+    assert [len(part) for part in empty] == [0, 0, 0]
+
+
+def test_record_accumulates_count_deltas_and_ripeness_confusion() -> None:
+    shadow = ShadowEvaluator(FakeDetector(), model_version="2.0.0-rc1", settings=ShadowSettings(sample_rate=0.0))
+    try:
+        primary = DetectionBatch.from_rows([((0, 0, 10, 10), 0, 0.9), ((20, 20, 30, 30), 0, 0.8)])
+        candidate = DetectionBatch.from_rows([((0, 0, 10, 10), 0, 0.9), ((20, 20, 30, 30), 0, 0.8), ((40, 40, 50, 50), 0, 0.7)])
+        shadow.record(primary, encode_ripeness(["red", "half"]), candidate, encode_ripeness(["red", "red", "green"]))
+        shadow.record(primary, encode_ripeness(["red", "half"]), primary, encode_ripeness(["red", "half"]))
+        stats = shadow.stats()
+    finally:
+        shadow.close()
+
+    assert stats["frames_compared"] == 2
+    assert stats["count_delta_mean"] == 0.5
+    assert stats["count_agreement_rate"] == 0.5
+    assert stats["iou_match_rate"] == 1.0
+    assert stats["shadow_match_rate"] == 0.8
+    assert stats["ripeness_agreement"] == 0.75
+    assert stats["ripeness_confusion"]["red"]["red"] == 2
+    assert stats["ripeness_confusion"]["half"] == {"green": 0, "half": 1, "red": 1, "young": 0}
+
+
+def test_pipeline_samples_frames_to_the_shadow_at_the_configured_rate() -> None:
+    candidate = FakeDetector(detections=build_detections(bbox=(10, 10, 100, 100)), ripeness="red")
+    shadow = ShadowEvaluator(candidate, model_version="2.0.0-rc1", settings=ShadowSettings(sample_rate=0.25, queue_max=8))
+    pipeline = build_pipeline()
+    pipeline.shadow = shadow
+    session = pipeline.create_stream_session()
+    try:
+        for index in range(8):
+            pipeline.infer_stream_frame(build_frame(), session, timestamp_ms=index * 100)
+        stats = _wait_compared(shadow, 2)
+    finally:
+        shadow.close()
+
+    assert stats["sampled"] == 2
+    assert stats["iou_match_rate"] == 1.0
+    assert stats["ripeness_confusion"]["half"]["red"] == 2
+
+
+def test_samples_are_dropped_while_the_shadow_or_the_node_is_busy() -> None:
+    candidate = BlockingDetector()
+    load = [2]
+    idle = threading.Event()
+    shadow = ShadowEvaluator(
+        candidate,
+        model_version="2.0.0-rc1",
+        settings=ShadowSettings(sample_rate=1.0, queue_max=1),
+        load=lambda: load[0],
+        wait_idle=idle.wait,
+    )
+    detections = build_detections()
+    ripeness = encode_ripeness(["half"])
+    frame = build_frame()
+    try:
+        assert not shadow.offer(frame, detections, ripeness, None)
+        load[0] = 1
+        accepted = [shadow.offer(frame, detections, ripeness, None) for _ in range(5)]
+        time.sleep(0.05)
+        # Nothing runs until the primary has gone idle.
+        assert candidate.calls == 0
+        load[0] = 0
+        idle.set()
+        candidate.gate.set()
+        stats = _wait_compared(shadow, sum(accepted))
+    finally:
+        shadow.close()
+
+    # One frame on the detector and one in the queue at most; the rest are shed.
+    assert 1 <= sum(accepted) <= 2
+    assert stats["sampled"] == 6
+    assert stats["dropped_busy"] == 6 - sum(accepted)
+    assert candidate.calls == sum(accepted)
+
+
+def test_tiled_images_are_not_offered_to_the_shadow() -> None:
+    shadow = ShadowEvaluator(FakeDetector(), model_version="2.0.0-rc1", settings=ShadowSettings(sample_rate=1.0))
+    pipeline = build_pipeline()
+    pipeline.tiling = TileSettings(tile_size=64, overlap=0.0, max_tiles=16)
+    pipeline.shadow = shadow
+    try:
+        pipeline.infer_image(build_frame(height=64, width=128), tiled=True)
+        tiled = shadow.stats()["sampled"]
+        pipeline.infer_image(build_frame(height=64, width=128))
+        stats = _wait_compared(shadow, 1)
+    finally:
+        shadow.close()
+
+    assert tiled == 0
+    assert stats["sampled"] == 1
+
+
+def test_shadow_output_gets_the_session_confidence_filter() -> None:
+    low_and_high = DetectionBatch.from_rows([((10, 10, 100, 100), 1, 0.9), ((200, 10, 260, 80), 1, 0.3)])
+    shadow = ShadowEvaluator(
+        FakeDetector(detections=low_and_high),
+        model_version="2.0.0-rc1",
+        settings=ShadowSettings(sample_rate=1.0),
+    )
+    pipeline = build_pipeline(detector=FakeDetector(detections=low_and_high))
+    pipeline.shadow = shadow
+    session = pipeline.create_stream_session(
+        StreamSettings(
+            target_fps=10.0,
+            imgsz=640,
+            output_encoding="json",
+            conf_threshold=0.5,
+            tracker_iou_threshold=0.3,
+            tracker_max_missing=20,
+        )
+    )
+    try:
+        pipeline.infer_stream_frame(build_frame(), session, timestamp_ms=0)
+        stats = _wait_compared(shadow, 1)
+    finally:
+        shadow.close()
+
+    assert (stats["primary_detections"], stats["shadow_detections"]) == (1, 1)
+    assert stats["count_delta_mean"] == 0.0
+    assert stats["shadow_match_rate"] == 1.0
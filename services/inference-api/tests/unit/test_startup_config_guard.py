@@ -2,7 +2,7 @@ from pathlib import Path
 
 import pytest
 
-from app.main import _ensure_config_file
+from app.main import _ensure_config_file, _ensure_worker_count
 
 
 def test_ensure_config_file_raises_with_example_hint(tmp_path: Path) -> None:
@@ -18,3 +18,16 @@ def test_ensure_config_file_raises_with_example_hint(tmp_path: Path) -> None:
     assert "LYCHEE_MODEL_CONFIG" in msg
     assert "model.yaml.example" in msg
 
+
+def test_multiple_workers_are_rejected_for_a_shared_detector() -> None:
+    from app.inference.adapters.yolo_stable import YoloStableAdapter
+    from app.settings import ModelConfig
+
+    detector = YoloStableAdapter(ModelConfig())
+    _ensure_worker_count(1, detector)
+
+    with pytest.raises(RuntimeError, match="inference_workers=2"):
+        _ensure_worker_count(2, detector)
+
+    detector.thread_safe = True
+    _ensure_worker_count(2, detector)
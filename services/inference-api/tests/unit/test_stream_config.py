@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from app.inference.detections import DetectionBatch
+from app.inference.stream_config import negotiate_stream_settings
+from app.schemas.api import StreamConfigRequest
+from app.settings import ModelConfig, ServiceConfig
+from tests.factories import build_detections, build_frame, build_pipeline
+
+
+def test_negotiation_clamps_to_server_bounds() -> None:
+    service_cfg = ServiceConfig(stream_max_fps=10, stream_min_imgsz=320, stream_max_imgsz=640, stream_tracker_max_missing_limit=50)
+    model_cfg = ModelConfig(conf_threshold=0.25)
+
+    settings = negotiate_stream_settings(
+        StreamConfigRequest(target_fps=60, imgsz=1000, conf_threshold=0.1, tracker_max_missing=500),
+        service_cfg,
+        model_cfg,
+    )
+
+    assert settings.target_fps == 10
+    assert settings.imgsz == 640
+    assert settings.conf_threshold == 0.25
+    assert settings.tracker_max_missing == 50
+
+
+def test_negotiation_rounds_imgsz_to_stride_and_fills_defaults() -> None:
+    settings = negotiate_stream_settings(StreamConfigRequest(imgsz=500), ServiceConfig(), ModelConfig())
+    assert settings.imgsz == 480
+    assert settings.output_encoding == "json"
+    assert settings.target_fps == ServiceConfig().stream_default_fps
+
+
+def test_session_settings_filter_confidence_and_throttle() -> None:
+    pipeline = build_pipeline()
+    pipeline.detector._detections = DetectionBatch.concat(
+        [
+            build_detections(confidence=0.9),
+            build_detections(bbox=(200, 200, 220, 220), confidence=0.3),
+        ]
+    )
+    settings = negotiate_stream_settings(StreamConfigRequest(target_fps=5, conf_threshold=0.5), ServiceConfig(), ModelConfig())
+    session = pipeline.create_stream_session(settings)
+
+    assert pipeline.admit_stream_frame(session, 0)
+    assert not pipeline.admit_stream_frame(session, 100)
+    assert pipeline.admit_stream_frame(session, 200)
+    assert session.dropped_frames == 1
+
+    result = pipeline.infer_stream_frame(build_frame(), session, timestamp_ms=0)
+    assert result.frame_summary.total == 1
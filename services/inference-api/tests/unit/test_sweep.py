@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import functools
+import importlib
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+sweep = importlib.import_module("mlops.training.sweep")
+
+
+def _row(name: str, p95: float, value: float) -> dict:
+    model, imgsz = name.rsplit("-", 1)
+    return {
+        "variant": name,
+        "config": {"model": model, "imgsz": int(imgsz)},
+        "weights": str(REPO_ROOT / "mlops/artifacts/sweeps/default/runs" / name / "weights/best.pt"),
+        "mAP50_95": value,
+        "latency_ms": {"p50": p95 * 0.8, "p95": p95, "p99": p95 * 1.2},
+    }
+
+
+class FakeScripts:
+    """Stands in for train.py/eval.py subprocesses: writes their outputs and records each call."""
+
+    def __init__(self, fail_train: set[str] | None = None) -> None:
+        self.calls: list[tuple[str, str]] = []
+        self.commands: list[list[str]] = []
+        self.fail_train = fail_train or set()
+
+    def __call__(self, command: list[str], log_path: Path, cores: list[int] | None) -> int:
+        script = Path(command[1]).name
+        name = command[command.index("--name") + 1] if "--name" in command else log_path.parent.name
+        self.calls.append((script, name))
+        self.commands.append(command)
+        if script == "train.py":
+            weights = Path(command[command.index("--project") + 1]) / name / "weights"
+            weights.mkdir(parents=True, exist_ok=True)
+            (weights / "last.pt").write_bytes(b"")
+            if name in self.fail_train:
+                return 1
+            (weights / "best.pt").write_bytes(b"")
+            return 0
+        imgsz = int(command[command.index("--imgsz") + 1])
+        payload = {
+            "mAP50": 0.8,
+            "mAP50_95": imgsz / 1000,
+            "benchmark": {"formats": {"pt": {"latency_ms": {"p50": imgsz / 20, "p95": imgsz / 16}, "peak_rss_mb": 600.0}}},
+        }
+        Path(command[command.index("--output") + 1]).write_text(json.dumps(payload), encoding="utf-8")
+        return 0
+
+
+def test_pareto_front_and_recommendation() -> None:
+    rows = [
+        _row("yolo26n-480", 18.0, 0.52),
+        _row("yolo26n-640", 30.0, 0.58),
+        _row("yolo26s-480", 32.0, 0.55),
+        _row("yolo26s-640", 55.0, 0.63),
+        _row("yolo26m-640", 120.0, 0.62),
+    ]
+    front = sweep.pareto_front(rows, "p95")
+    assert [row["variant"] for row in front] == ["yolo26n-480", "yolo26n-640", "yolo26s-640"]
+    assert sweep.recommend(front, 40.0, "p95")["variant"] == "yolo26n-640"
+    assert sweep.recommend(front, None, "p95")["variant"] == "yolo26s-640"
+    assert sweep.recommend(front, 10.0, "p95") is None
+
+
+def test_recommended_model_config_keeps_base_settings(tmp_path: Path) -> None:
+    base = tmp_path / "model.yaml"
+    base.write_text('yolo_version: "yolo26n"\nconf_threshold: 0.3\nimgsz: 640\nresolution_ladder: [640, 480]\n', encoding="utf-8")
+    out = sweep.write_model_config(base, _row("yolo26s-800", 50.0, 0.6), tmp_path / "recommended.yaml")
+
+    import yaml
+
+    config = yaml.safe_load(out.read_text(encoding="utf-8"))
+    assert config == {
+        "yolo_version": "yolo26s",
+        "conf_threshold": 0.3,
+        "imgsz": 800,
+        "resolution_ladder": [],
+        "model_path": "mlops/artifacts/sweeps/default/runs/yolo26s-800/weights/best.pt",
+    }
+
+
+def test_core_slices_are_disjoint_until_cores_run_out() -> None:
+    slices = sweep.core_slices(threads=2, jobs=0)
+    flat = [core for cores in slices for core in cores]
+    assert len(flat) == len(set(flat))
+    assert all(len(cores) == min(2, len(flat)) for cores in slices)
+
+
+def test_sweep_resumes_and_reuses_finished_variants(tmp_path: Path) -> None:
+    data = tmp_path / "data.yaml"
+    data.write_text("train: images\n", encoding="utf-8")
+    argv = [
+        "--data", str(data), "--models", "yolo26n,yolo26s", "--imgsz", "320,480", "--epochs", "3",
+        "--sweep-dir", str(tmp_path / "sweep"), "--budget-ms", "25", "--threads", "1", "--jobs", "2",
+        "--model-config", str(tmp_path / "missing.yaml"),
+    ]  # fmt: skip
+
+    scripts = FakeScripts(fail_train={"yolo26s-480"})
+    runner = sweep.SweepRunner(tmp_path / "sweep", sweep.parse_args(argv), run=scripts)
+    variants = [sweep.Variant(m, s, 3, str(data)) for m in ("yolo26n", "yolo26s") for s in (320, 480)]
+    results = [runner(variant) for variant in variants]
+    assert [("error" in result) for result in results] == [False, False, False, True]
+    assert results[1]["latency_ms"]["p95"] == 30.0
+
+    # An interrupted run leaves last.pt behind; the rerun resumes it and skips finished variants.
+    scripts = FakeScripts()
+    runner = sweep.SweepRunner(tmp_path / "sweep", sweep.parse_args(argv), run=scripts)
+    results = [runner(variant) for variant in variants]
+    assert scripts.calls == [("train.py", "yolo26s-480"), ("eval.py", "yolo26s-480")]
+    assert scripts.commands[0][-3:] == ["--model", str(tmp_path / "sweep/runs/yolo26s-480/weights/last.pt"), "--resume"]
+    assert all("error" not in result for result in results)
+
+
+def test_main_writes_report_and_recommended_config(tmp_path: Path, monkeypatch) -> None:
+    data = tmp_path / "data.yaml"
+    data.write_text("train: images\n", encoding="utf-8")
+    scripts = FakeScripts()
+    monkeypatch.setattr(sweep, "SweepRunner", functools.partial(sweep.SweepRunner, run=scripts))
+    argv = [
+        "--data", str(data), "--models", "yolo26n", "--imgsz", "320,480,640", "--epochs", "1",
+        "--sweep-dir", str(tmp_path / "sweep"), "--budget-ms", "31", "--threads", "1",
+        "--model-config", str(REPO_ROOT / "tooling/configs/model.yaml.example"),
+    ]  # fmt: skip
+
+    assert sweep.main(argv) == 0
+    # No benchmark runs while a variant is still training.
+    scripts_run = [script for script, _ in scripts.calls]
+    assert scripts_run == ["train.py"] * 3 + ["eval.py"] * 3
+
+    report = json.loads((tmp_path / "sweep" / "sweep_report.json").read_text(encoding="utf-8"))
+    assert report["pareto"] == ["yolo26n-320", "yolo26n-480", "yolo26n-640"]
+    assert report["recommended"] == "yolo26n-480"
+    recommended = (tmp_path / "sweep" / "recommended_model.yaml").read_text(encoding="utf-8")
+    assert "imgsz: 480" in recommended and "execution_mode: predictor" in recommended
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.inference.tiling import TileSettings, merge_detections, plan_tiles
+from tests.factories import FakeDetector, build_detections, build_frame, build_pipeline
+
+
+class _BatchRecordingDetector(FakeDetector):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.batches: list[list[tuple[int, ...]]] = []
+
+    def predict_batch(self, frames, imgsz=None):
+        self.batches.append([frame.shape for frame in frames])
+        return [self.predict(frame) for frame in frames]
+
+
+def test_plan_tiles_covers_image_with_overlap() -> None:
+    plan = plan_tiles(1280, 640, TileSettings(tile_size=640, overlap=0.25, max_tiles=16))
+    assert plan.scale == 1.0
+    assert plan.windows[0] == (0, 0, 640, 640)
+    assert plan.windows[-1][2] == 1280
+    assert len(plan.windows) == 3
+
+
+def test_plan_tiles_downscales_to_respect_budget() -> None:
+    settings = TileSettings(tile_size=640, overlap=0.2, max_tiles=64)
+    plan = plan_tiles(4000, 3000, settings, max_tiles=4)
+    assert len(plan.windows) <= 4
+    assert plan.scale < 1.0
+
+
+def test_merge_joins_box_split_by_tile_seam() -> None:
+    boxes = np.array([[600, 10, 700, 60], [600, 10, 640, 60], [10, 10, 30, 30]], dtype=np.float32)
+    scores = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+    classes = np.array([1, 1, 1])
+
+    merged, merged_scores, _ = merge_detections(boxes, scores, classes, ios_threshold=0.6, mode="nmm")
+
+    assert len(merged) == 2
+    assert merged[0].tolist() == [600, 10, 700, 60]
+    assert merged_scores.tolist() == pytest.approx([0.9, 0.7])
+
+
+def test_merge_keeps_overlapping_boxes_of_different_classes() -> None:
+    boxes = np.array([[0, 0, 50, 50], [0, 0, 50, 50]], dtype=np.float32)
+    merged, _, _ = merge_detections(boxes, np.array([0.9, 0.8]), np.array([0, 2]), ios_threshold=0.5, mode="nms")
+    assert len(merged) == 2
+
+
+def test_pipeline_tiled_inference_batches_tiles_and_dedupes() -> None:
+    detector = _BatchRecordingDetector(detections=build_detections(bbox=(10, 10, 50, 50)))
+    pipeline = build_pipeline(detector=detector)
+    pipeline.tiling = TileSettings(tile_size=64, overlap=0.0, max_tiles=16)
+
+    result, _ = pipeline.infer_image(build_frame(height=64, width=128), tiled=True)
+
+    assert len(detector.batches) == 1
+    assert detector.batches[0] == [(64, 64, 3), (64, 64, 3)]
+    assert result.frame_summary.total == 2
+    assert result.detections[1].bbox[0] == pytest.approx(74.0)
+
+
+def test_pipeline_rejects_tiled_request_when_disabled() -> None:
+    pipeline = build_pipeline()
+    with pytest.raises(ValueError):
+        pipeline.infer_image(build_frame(), tiled=True)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import pickle
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+train = importlib.import_module("mlops.training.train")
+
+
+def _images(tmp_path: Path) -> list[str]:
+    import cv2
+
+    paths = []
+    for index, (height, width) in enumerate([(120, 80), (64, 64), (50, 200)]):
+        path = tmp_path / "images" / f"{index}.jpg"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(path), np.full((height, width, 3), 40 * (index + 1), dtype=np.uint8))
+        paths.append(str(path))
+    broken = tmp_path / "images" / "broken.jpg"
+    broken.write_bytes(b"nope")
+    return [*paths, str(broken)]
+
+
+def test_batch_arg_accepts_sizes_auto_and_fractions() -> None:
+    assert train.batch_arg("32") == 32
+    assert train.batch_arg("auto") == -1
+    assert train.batch_arg("0.7") == 0.7
+    with pytest.raises(argparse.ArgumentTypeError):
+        train.batch_arg("2.5")
+
+
+def test_throughput_preset_only_fills_unset_options() -> None:
+    args = train.parse_args(["--data", "d.yaml", "--throughput"])
+    assert (args.cache, args.batch) == ("memmap", -1)
+    args = train.parse_args(["--data", "d.yaml", "--throughput", "--cache", "ram", "--batch", "24"])
+    assert (args.cache, args.batch) == ("ram", 24)
+    assert train.parse_args(["--data", "d.yaml"]).batch == 16
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_image_cache_serves_resized_images(tmp_path: Path, workers: int) -> None:
+    files = _images(tmp_path)
+    cache_dir = train.build_image_cache(files, 96, tmp_path / "cache", workers)
+    assert train.build_image_cache(files, 96, tmp_path / "cache", workers) == cache_dir
+
+    dataset = SimpleNamespace(
+        im_files=[files[2], files[0], files[3], str(tmp_path / "new.jpg")],
+        ims=[None] * 4,
+        im_hw0=[None] * 4,
+        im_hw=[None] * 4,
+    )
+    assert train.attach_image_cache(dataset, cache_dir) == 2
+
+    image = dataset.ims[0]
+    assert image.shape == (24, 96, 3) and int(image[0, 0, 0]) == 120
+    assert dataset.im_hw0[0] == (50, 200) and dataset.im_hw[0] == (24, 96)
+    assert dataset.ims[1].shape == (96, 64, 3)
+    assert dataset.ims[2] is None and dataset.ims[3] is None
+
+    # Augmentations write in place; later lookups must not see it.
+    dataset.ims[1][:] = 0
+    assert int(dataset.ims[1][0, 0, 0]) == 40
+    reopened = pickle.loads(pickle.dumps(dataset.ims))
+    assert reopened._data is None and int(reopened[1][0, 0, 0]) == 40
+
+    # Buffer eviction clears slots to None; cached entries must survive it.
+    dataset.ims[0] = None
+    dataset.im_hw0[0], dataset.im_hw[0] = None, None
+    assert dataset.ims[0] is not None and dataset.im_hw0[0] == (50, 200)
+
+
+def test_image_cache_is_keyed_by_content_and_size(tmp_path: Path) -> None:
+    files = _images(tmp_path)
+    first = train.build_image_cache(files, 96, tmp_path / "cache", 1)
+    assert train.build_image_cache(files, 128, tmp_path / "cache", 1) != first
+
+    stat = os.stat(files[0])
+    os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert train.build_image_cache(files, 96, tmp_path / "cache", 1) != first
+
+
+def test_throughput_monitor_splits_wait_and_compute() -> None:
+    ticks = iter([0.0, 1.0, 1.5, 2.0, 2.5, 3.0, 10.0, 10.1, 10.2, 10.4, 10.5])
+    syncs = []
+    monitor = train.ThroughputMonitor(clock=lambda: next(ticks), sync=lambda: syncs.append(1))
+
+    monitor.epoch_start()
+    for _ in range(2):
+        monitor.batch_start()
+        monitor.batch_end()
+    first = monitor.epoch_end(1, images=64)
+    assert first["data_wait_s"] == 1.5 and first["compute_s"] == 1.0 and first["batches"] == 2
+    assert first["images_per_s"] == pytest.approx(64 / 3.0, abs=0.01)
+
+    monitor.epoch_start()
+    monitor.batch_start()
+    monitor.batch_end()
+    monitor.batch_start()
+    monitor.epoch_end(2, images=64)
+
+    summary = monitor.summary()
+    assert len(syncs) == 3
+    assert summary["steady_images_per_s"] == 128.0
+    assert summary["steady_data_wait_share"] == 0.6 and summary["input_bound"]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.inference.adapters.yolo_optimized import compare_execution, letterbox, unletterbox_boxes
+from app.inference.detections import DetectionBatch
+
+
+def test_letterbox_pads_to_square_and_boxes_map_back() -> None:
+    frame = np.full((240, 480, 3), 200, dtype=np.uint8)
+    padded, ratio, pad = letterbox(frame, 320)
+
+    assert padded.shape == (320, 320, 3)
+    assert ratio == 320 / 480
+    assert pad == (0.0, 80.0)
+    assert int(padded[0, 0, 0]) == 114 and int(padded[160, 160, 0]) == 200
+
+    boxes = np.array([[10.0, 90.0, 110.0, 190.0], [-5.0, 70.0, 400.0, 300.0]])
+    mapped = unletterbox_boxes(boxes, ratio, pad, frame.shape[:2])
+    np.testing.assert_allclose(mapped[0], [15.0, 15.0, 165.0, 165.0])
+    np.testing.assert_allclose(mapped[1], [0.0, 0.0, 480.0, 240.0])
+
+
+def test_compare_execution_matches_boxes_by_class_and_iou() -> None:
+    reference = [
+        DetectionBatch.from_rows(
+            [
+                ((0, 0, 10, 10), 1, 0.9),
+                ((20, 20, 30, 30), 2, 0.8),
+            ]
+        )
+    ]
+    candidate = [
+        DetectionBatch.from_rows(
+            [
+                ((0, 0, 10, 9), 1, 0.85),
+                ((20, 20, 30, 30), 3, 0.8),
+                ((50, 50, 60, 60), 1, 0.4),
+            ]
+        )
+    ]
+
+    report = compare_execution(
+        lambda frames, imgsz: reference,
+        lambda frames, imgsz: candidate,
+        [np.zeros((16, 16, 3), dtype=np.uint8)],
+        640,
+        iterations=1,
+    )
+
+    assert report.matched == 1
+    assert report.recall == 0.5
+    assert report.precision == 1 / 3
+    # Columns are float32.
+    assert report.mean_iou == pytest.approx(0.9, abs=1e-6)
+    assert report.max_confidence_delta == pytest.approx(0.05, abs=1e-6)
+    assert report.as_dict()["speedup"] > 0
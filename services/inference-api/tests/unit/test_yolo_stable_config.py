@@ -1,5 +1,8 @@
+import numpy as np
+
 from app.inference.adapters.yolo_stable import YoloStableAdapter
 from app.settings import ModelConfig
+from tests.factories import build_yolo_adapter
 
 
 def test_model_source_uses_explicit_path() -> None:
@@ -13,3 +16,33 @@ def test_model_source_falls_back_to_yolo_version() -> None:
     adapter = YoloStableAdapter(cfg)
     assert adapter._resolve_model_source() == "yolo26n.pt"
 
+
+def test_predict_batch_sends_the_whole_list_in_one_model_call() -> None:
+    adapter = build_yolo_adapter()
+    frames = [np.zeros((32, 32, 3), dtype=np.uint8)] * 8
+
+    outputs = adapter.predict_batch(frames)
+
+    assert adapter._model.batches == [8]
+    assert len(outputs) == 8
+
+
+def test_predict_batch_splits_by_the_configured_maximum() -> None:
+    adapter = build_yolo_adapter(max_batch_size=3)
+
+    adapter.predict_batch([np.zeros((32, 32, 3), dtype=np.uint8)] * 10)
+
+    assert adapter._model.batches == [3, 3, 3, 1]
+
+
+def test_static_onnx_export_pins_imgsz_and_batch(monkeypatch) -> None:
+    monkeypatch.setattr("app.inference.adapters.yolo_stable.static_onnx_input", lambda _: (1, 640))
+    adapter = build_yolo_adapter(imgsz=512, resolution_ladder=[320, 512])
+    adapter._pin_static_onnx("best.int8.onnx")
+
+    adapter.predict(np.zeros((32, 32, 3), dtype=np.uint8), imgsz=320)
+    adapter.predict_batch([np.zeros((32, 32, 3), dtype=np.uint8)] * 3)
+
+    assert adapter.imgsz == 640
+    assert adapter._model.batches == [1, 1, 1, 1]
+    assert set(adapter._model.sizes) == {640}
@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import re
 from collections.abc import Callable
+from functools import lru_cache
 
 _CUDA_DEVICE_PATTERN = re.compile(r"^\d+(,\d+)*$")
 
 
+@lru_cache(maxsize=1)
 def _torch_cuda_runtime() -> tuple[bool, int]:
+    # Importing torch and initialising CUDA is the single most expensive step of
+    # device resolution, so the probe runs at most once per process.
     try:
         import torch
     except Exception:
@@ -32,10 +36,14 @@ def resolve_torch_device(
     cuda_runtime: Callable[[], tuple[bool, int]] | None = None,
 ) -> tuple[str, str | None]:
     requested = (device or "").strip() or "cpu"
+    wants_auto = requested.lower() == "auto"
+    if not wants_auto and not _requests_cuda(requested):
+        return requested, None
+
     runtime = cuda_runtime or _torch_cuda_runtime
     cuda_available, cuda_device_count = runtime()
 
-    if requested.lower() == "auto":
+    if wants_auto:
         if cuda_available and cuda_device_count > 0:
             return "cuda:0", None
         return (
@@ -47,7 +55,7 @@ def resolve_torch_device(
             ),
         )
 
-    if _requests_cuda(requested) and (not cuda_available or cuda_device_count <= 0):
+    if not cuda_available or cuda_device_count <= 0:
         return (
             "cpu",
             (